@@ -35,29 +35,60 @@ on the parent object.
 
 import constants
 
-class Rotation:
+class Rotation(object):
     """
     Represents a rotation attribute. This includes not only angle, but also whether an object is mirrored or spun. 
+    
+    ``Rotation`` objects are immutable, so a single instance may be shared by any number of objects. (Rotations
+    which are read from a file are shared; see ``ATTR_ROT``.) To change the rotation of an object, assign a new
+    ``Rotation``.
     """
     
+    __slots__ = ('angle', 'mirrored', 'spin', '_str')
+    
     def __init__(self, angle = 0, mirrored = False, spin = False):
-        self.angle = angle
-        self.mirrored = mirrored 
-        self.spin = spin
+        object.__setattr__(self, 'angle', angle)
+        object.__setattr__(self, 'mirrored', mirrored)
+        object.__setattr__(self, 'spin', spin)
+        object.__setattr__(self, '_str', None)
+        
+    def __setattr__(self, name, value):
+        raise AttributeError('Rotation objects are immutable.')
+    
+    def __delattr__(self, name):
+        raise AttributeError('Rotation objects are immutable.')
         
     def is_set(self):
         return (self.angle != 0 or self.mirrored or self.spin)
     
     def __eq__(self, other):
-        return other != None and (self.angle == other.angle and self.mirrored == other.mirrored and self.spin == other.spin)
+        return isinstance(other, Rotation) and (self.angle == other.angle and self.mirrored == other.mirrored and self.spin == other.spin)
      
     def __ne__(self, other):
         return not self.__eq__(other)
+    
+    def __hash__(self):
+        return hash((self.angle, self.mirrored, self.spin))
+    
+    def __reduce__(self):
+        return (Rotation, (self.angle, self.mirrored, self.spin))
+    
+    def __copy__(self):
+        return self
+    
+    def __deepcopy__(self, memo):
+        return self
+    
+    def __repr__(self):
+        return 'Rotation({0!r}, {1!r}, {2!r})'.format(self.angle, self.mirrored, self.spin)
  
-class Extent:
+class Extent(object):
     """
     Represents an extent. Used for ``Via`` elements, and specifies the start and end layers.
     """
+    
+    __slots__ = ('layer_from', 'layer_to')
+    
     def __init__(self, layer_from, layer_to):
         self.layer_from = layer_from
         self.layer_to = layer_to
@@ -169,8 +200,34 @@ class ATTR_AUTO_FLOAT:
             return str(val)
     
 class ATTR_ROT:
+    
+    # The maximum number of distinct rotation strings which are cached by ``parse``.
+    # Files typically contain only a handful of distinct rotations.
+    CACHE_SIZE = 1024
+    
+    _cache = {}
+    
     @staticmethod
     def parse(val):
+        """
+        Parse a rotation string. 
+        
+        The result is cached, so that every occurrence of a rotation string returns the same (immutable)
+        ``Rotation`` object.
+        """
+        
+        rotation = ATTR_ROT._cache.get(val)
+        
+        if rotation == None:
+            rotation = ATTR_ROT.parse_uncached(val)
+            
+            if len(ATTR_ROT._cache) < ATTR_ROT.CACHE_SIZE:
+                ATTR_ROT._cache[val] = rotation
+                
+        return rotation
+    
+    @staticmethod
+    def parse_uncached(val):
         angle = None
         spin = False
         mirror = False
@@ -204,6 +261,12 @@ class ATTR_ROT:
  
     @staticmethod
     def to_str(val):
+        # The string is stored in the (immutable) rotation, so shared rotations are only converted once.
+        out_str = val._str
+        
+        if out_str != None:
+            return out_str
+        
         out_str = ''
         
         if val.mirrored:
@@ -212,9 +275,11 @@ class ATTR_ROT:
         if val.spin:
             out_str += 'S'
             
-        out_str += 'R'
+        out_str += 'R' + str(val.angle)
+        
+        object.__setattr__(val, '_str', out_str)
             
-        return out_str + str(val.angle)
+        return out_str
 
 def parse(cls, n, attr):
     """
@@ -0,0 +1,139 @@
+"""
+Batch
+=====
+
+Loads many EAGLE files in parallel, using a pool of processes.
+
+Each file is loaded (and passed to a callback) in a worker process, so only the value returned by the
+callback is sent back to the calling process. The callback, and the value that it returns, must therefore
+be picklable (e.g. the callback must be a function defined at the top level of a module).
+
+Usage
+-----
+
+    def count_elements(e):
+        return len(e.drawing.document.elements)
+
+    for r in batch.map_files(batch.find_files('boards/'), count_elements, sections = {'elements'}):
+        if r.succeeded():
+            print '{0}: {1}'.format(r.path, r.value)
+        else:
+            print '{0} failed: {1}'.format(r.path, r.error)
+
+The results are returned in the order in which the files are completed, not the order of ``paths``. A file
+which cannot be loaded (or for which the callback raises an exception) produces a result describing the error;
+the remaining files are still processed.
+
+"""
+
+import eagle
+import multiprocessing
+import os
+import traceback
+
+# The extensions of EAGLE files
+EXTENSIONS = ('.sch', '.brd', '.lbr')
+
+class Result(object):
+    """
+    The result of processing a single file.
+    """
+
+    def __init__(self, path, value = None, error = None, traceback = None):
+        """
+        :param path: The path of the file.
+        :param value: The value returned by the callback.
+        :param error: A description of the exception raised while processing the file, or ``None``
+            if the file was processed successfully.
+        :param traceback: The formatted traceback of the exception, or ``None``.
+        """
+
+        self.path = path
+        self.value = value
+        self.error = error
+        self.traceback = traceback
+
+    def succeeded(self):
+        return self.error == None
+
+    def __repr__(self):
+        if self.succeeded():
+            return 'Result({0!r}, {1!r})'.format(self.path, self.value)
+
+        return 'Result({0!r}, error = {1!r})'.format(self.path, self.error)
+
+def find_files(directory, extensions = EXTENSIONS):
+    """
+    Find the EAGLE files within a directory (and its subdirectories).
+
+    :param directory: The directory to search.
+    :param extensions: The extensions of the files to return.
+
+    :returns: A sorted list of paths.
+    """
+
+    paths = []
+
+    for root, _, file_names in os.walk(directory):
+        for f in file_names:
+            if os.path.splitext(f)[1].lower() in extensions:
+                paths.append(os.path.join(root, f))
+
+    return sorted(paths)
+
+def process_file(path, fn, load_options):
+    """
+    Load a file and invoke the callback. Exceptions are not raised, but are reported by the result.
+
+    :param path: The path of the file.
+    :param fn: The callback, which accepts an ``Eagle`` object.
+    :param load_options: A dictionary of options for ``Eagle.load``.
+
+    :returns: A ``Result`` object.
+    """
+
+    try:
+        e = eagle.Eagle.load(path, **load_options)
+        return Result(path, fn(e))
+    except Exception as ex:
+        return Result(path, error = '{0}: {1}'.format(ex.__class__.__name__, ex), traceback = traceback.format_exc())
+
+def _process_file(args):
+    # ``Pool.imap_unordered`` passes a single argument
+    return process_file(*args)
+
+def map_files(paths, fn, workers = None, chunksize = 1, **load_options):
+    """
+    Load each file, and invoke a callback for each loaded file, using a pool of processes.
+
+    :param paths: The paths of the files.
+    :param fn: The callback, which accepts an ``Eagle`` object. The value returned by the callback is
+        returned as the ``value`` of the ``Result``.
+    :param workers: The number of processes, or ``None`` to use one process per CPU. If ``workers``
+        is ``1``, the files are processed in the calling process.
+    :param chunksize: The number of files sent to a process at a time. Larger values reduce the
+        overhead of processing many small files.
+    :param load_options: Options for ``Eagle.load`` (e.g. ``sections``).
+
+    :returns: A generator which yields a ``Result`` for each file, in the order in which the files are completed.
+    """
+
+    tasks = ((path, fn, load_options) for path in paths)
+
+    if workers == 1:
+        for t in tasks:
+            yield _process_file(t)
+
+        return
+
+    pool = multiprocessing.Pool(workers)
+
+    try:
+        for r in pool.imap_unordered(_process_file, tasks, chunksize):
+            yield r
+
+        pool.close()
+    finally:
+        # Stop the workers if the results were not all consumed (or an error occurred)
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,728 @@
+"""
+Binary
+======
+
+Provides a compact, versioned binary format for the object model.
+
+Reading and writing XML is dominated by formatting and parsing text. This format instead stores the object
+graph (e.g. an ``Eagle`` object and everything it references) in tables of packed values, which can be
+read with few Python-level operations per object. Shared references (such as ``Element.package`` and
+``Part.device_set``) are stored once and restored as shared references.
+
+Format
+------
+
+The data begins with a header (``MAGIC``, ``FORMAT_VERSION``, the byte order, and the version of this package),
+followed by:
+
+* The string table: every string in the graph, stored once.
+* The global table: the module and name of each class (and of each function used to reconstruct objects).
+* The objects, grouped by type. Objects of the same class with the same variables are stored together,
+  and each variable is stored as a column: a packed array of floating-point values, integers, booleans,
+  string indices, or object indices, or (if the values have different types) a column of tagged values.
+  Lists and dictionaries are stored as a column of lengths and columns of their contents. Subclasses of
+  ``list`` (e.g. ``item_list.Item_List``) are stored as lists, with their class; they are recreated by calling
+  the class, and their other variables are not stored.
+* The objects which are reconstructed from arguments (tuples, and objects which define ``__reduce__``,
+  such as ``attributes.Rotation``), in the order in which they must be created.
+
+Objects are restored without calling their constructors. An object whose class defines ``__reduce__`` must be
+reconstructable from its class and (non-container) arguments; objects which contain other data (e.g. XML nodes,
+functions, or NumPy arrays) cannot be written.
+
+Trust
+-----
+
+Unlike ``pickle``, reading data does not import modules or call functions which are named by the data. The
+global table may only name the classes of the object model (see ``allowed_classes()``): the classes of ``eagle``
+and ``primitives``, ``attributes.Rotation`` and ``attributes.Extent``, ``Key_List``, ``Item_List``,
+``Tracked_List``, and ``list``. Data which names anything else is rejected before any object is created. The
+only code which is run is the constructor of a list class (with no arguments) and of a class which is
+reconstructed from arguments (e.g. ``Rotation``), and these only store their arguments. Data from an untrusted
+source can therefore produce an invalid document, but cannot run other code.
+
+Other classes (e.g. the classes of an application) can be read by passing them to ``loads()``, which should
+only be done if they can safely be created from untrusted data.
+
+Usage
+-----
+
+    data = binary.dumps(e)
+
+    e = binary.loads(data)
+
+"""
+
+import array
+import collections
+import gc
+import itertools
+import operator
+import struct
+import sys
+import types
+from eaglepy import __version__
+
+MAGIC = 'EAGLEPY\x00'
+# 2: ``Key_List`` stores its names in a list
+# 3: ``Device`` and ``Gate`` are new-style classes
+# 4: Lists store their class (e.g. ``item_list.Item_List``)
+# 5: ``Key_List`` is a new-style class
+FORMAT_VERSION = 5
+
+# The kinds of column
+C_NONE, C_FLOAT, C_INT, C_BOOL, C_STRING, C_OBJECT, C_VALUE = range(7)
+
+# The tags of the values in a ``C_VALUE`` column
+V_NONE, V_FALSE, V_TRUE, V_INT, V_FLOAT, V_STRING, V_OBJECT, V_BIG_INT, V_LONG = range(9)
+
+# The kinds of object group
+G_INSTANCE, G_OBJECT, G_LIST, G_DICT, G_ORDERED_DICT = range(5)
+
+# The global index used to reconstruct tuples
+TUPLE = 0xffffffff
+
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+# Integers which can be stored exactly in a floating-point value
+EXACT_MAX = 2 ** 53
+
+STRING_TYPES = (str, unicode)
+SCALAR_TYPES = frozenset([type(None), bool, int, long, float, str, unicode])
+
+_header = struct.Struct('<8sHc')
+_uint = struct.Struct('<I')
+
+def dumps(obj):
+    """
+    Write an object graph to a string.
+
+    :param obj: The root object (e.g. an ``Eagle`` object).
+    :raises: An ``Exception`` if the graph contains an object which cannot be written.
+
+    :returns: The data (a byte string).
+    """
+
+    return _Encoder().encode(obj)
+
+def loads(data, classes = ()):
+    """
+    Read an object graph from a string.
+
+    :param data: The data (a byte string).
+    :param classes: Classes which may be read, in addition to the classes of the object model (see ``Trust``).
+    :raises: An ``Exception`` if the data is not valid, was written using a different format version, or names a
+        class which is not allowed.
+
+    :returns: The root object.
+    """
+
+    # Decoding creates many objects but no garbage, so the cyclic garbage collector is disabled
+    # (it would otherwise repeatedly traverse the objects which have been created).
+    gc_enabled = gc.isenabled()
+    gc.disable()
+
+    try:
+        return _Decoder(data, classes).decode()
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+def dump(obj, f):
+    """
+    Write an object graph to a file object.
+    """
+
+    f.write(dumps(obj))
+
+def load(f, classes = ()):
+    """
+    Read an object graph from a file object.
+    """
+
+    return loads(f.read(), classes)
+
+# (module, name) -> class, for the classes which may be read (see ``allowed_classes()``)
+_allowed_classes = None
+
+def allowed_classes():
+    """
+    :returns: A dict of the classes of the object model which may be named by data which is read, by
+        ``(module, name)``.
+    """
+
+    global _allowed_classes
+
+    if _allowed_classes == None:
+        # (These modules import this module)
+        import attributes
+        import eagle
+        import item_list
+        import key_list
+        import primitives
+        import tracking
+
+        classes = [list, attributes.Rotation, attributes.Extent, key_list.Key_List, item_list.Item_List,
+                   tracking.Tracked_List]
+
+        for module in (eagle, primitives):
+            classes.extend(v for v in module.__dict__.itervalues()
+                           if isinstance(v, (type, types.ClassType)) and v.__module__ == module.__name__)
+
+        _allowed_classes = dict((_global_name(c), c) for c in classes)
+
+    return _allowed_classes
+
+# Per-class information: (is reconstructed using ``__reduce__``, slot names, a function which returns the slot values)
+_class_info = {}
+
+def _get_class_info(cls):
+    info = _class_info.get(cls)
+
+    if info == None:
+        reduced = False
+        slots = []
+
+        for c in cls.__mro__:
+            if c is object:
+                continue
+
+            if any(c.__dict__.has_key(k) for k in ('__reduce__', '__reduce_ex__', '__getstate__', '__getnewargs__')):
+                reduced = True
+
+            s = c.__dict__.get('__slots__', ())
+
+            for name in ([s] if isinstance(s, STRING_TYPES) else s):
+                if name.startswith('__') and not name.endswith('__'):
+                    name = '_{0}{1}'.format(c.__name__.lstrip('_'), name)
+
+                if name != '__dict__' and name != '__weakref__':
+                    slots.append(name)
+
+        if len(slots) == 0:
+            getter = lambda obj: ()
+        elif len(slots) == 1:
+            getter = lambda obj, get = operator.attrgetter(slots[0]): (get(obj),)
+        else:
+            getter = operator.attrgetter(*slots)
+
+        info = (reduced, tuple(slots), getter)
+        _class_info[cls] = info
+
+    return info
+
+def _global_name(obj):
+    module = getattr(obj, '__module__', None)
+    name = getattr(obj, '__name__', None)
+
+    if module == None or name == None or getattr(sys.modules.get(module), name, None) is not obj:
+        raise Exception('{0!r} cannot be serialized (it is not defined at the top level of a module).'.format(obj))
+
+    return module, name
+
+class _Encoder(object):
+
+    def __init__(self):
+        self.strings = {}
+        self.string_list = []
+        self.globals = {}
+        self.global_list = []
+
+        # The index of each object, by ``id()``, and the objects (which must be kept alive while encoding)
+        self.ids = {}
+        self.objects = []
+
+        # Objects whose contents have not been visited
+        self.pending = []
+
+        # (kind, class, variable names) -> (object indices, rows)
+        self.groups = collections.OrderedDict()
+        self.lists = ([], [], [], [])
+        self.dicts = {G_DICT: ([], [], [], []), G_ORDERED_DICT: ([], [], [], [])}
+
+        # (object index, global index, arguments), in the order in which the objects must be created
+        self.reduced = []
+        self.reduced_ids = set()
+
+    def encode(self, obj):
+        root = self.visit(obj)
+
+        if root == None:
+            raise Exception('The root must be an object.')
+
+        while self.pending:
+            self.expand(self.pending.pop())
+
+        # The contents of the groups are encoded first, because they add to the string and global tables
+        body = []
+        self._encode_groups(body)
+        global_names = self.array('I', [self.string(s) for g in self.global_list for s in g])
+
+        out = [_header.pack(MAGIC, FORMAT_VERSION, sys.byteorder[0]), _uint.pack(self.string(__version__))]
+
+        strings = ''.join(s.encode('utf-8') if isinstance(s, unicode) else s for s in self.string_list)
+        out.append(_uint.pack(len(self.string_list)))
+        out.append(self.array('I', [len(s.encode('utf-8') if isinstance(s, unicode) else s) for s in self.string_list]))
+        out.append(self.array('B', [isinstance(s, unicode) for s in self.string_list]))
+        out.append(_uint.pack(len(strings)))
+        out.append(strings)
+
+        out.append(_uint.pack(len(self.global_list)))
+        out.append(global_names)
+
+        out.append(_uint.pack(len(self.objects)))
+        out.append(_uint.pack(root))
+        out.extend(body)
+
+        return ''.join(out)
+
+    def string(self, s):
+        key = (type(s), s)
+        index = self.strings.get(key)
+
+        if index == None:
+            index = self.strings[key] = len(self.string_list)
+            self.string_list.append(s)
+
+        return index
+
+    def global_index(self, obj):
+        index = self.globals.get(obj)
+
+        if index == None:
+            index = self.globals[obj] = len(self.global_list)
+            self.global_list.append(_global_name(obj))
+
+        return index
+
+    def visit(self, v):
+        """
+        Assign an index to an object (if it is not a scalar), and queue it so that its contents are visited.
+
+        :returns: The index of the object, or ``None`` for a scalar.
+        """
+
+        t = type(v)
+
+        if t in SCALAR_TYPES:
+            return None
+
+        index = self.ids.get(id(v))
+
+        if index != None:
+            return index
+
+        if t is tuple:
+            return self._add_reduced(v, TUPLE, v)
+
+        if not t in (dict, collections.OrderedDict, types.InstanceType) and not issubclass(t, list):
+            reduced, slots, _ = _get_class_info(t)
+
+            if reduced:
+                rv = v.__reduce_ex__(2)
+
+                if len(rv) > 2 and any(x != None for x in rv[2:]):
+                    raise Exception('Objects of type {0} cannot be serialized.'.format(t.__name__))
+
+                return self._add_reduced(v, self.global_index(rv[0]), rv[1])
+
+            if not hasattr(v, '__dict__') and len(slots) == 0:
+                raise Exception('Objects of type {0} cannot be serialized.'.format(t.__name__))
+
+        index = self._add(v)
+        self.pending.append(v)
+        return index
+
+    def expand(self, obj):
+        t = type(obj)
+        index = self.ids[id(obj)]
+
+        if isinstance(obj, list):
+            values = obj
+            indices, classes, lengths, flat = self.lists
+            indices.append(index)
+            classes.append(self.global_index(t))
+            lengths.append(len(obj))
+            flat.extend(obj)
+        elif t is dict or t is collections.OrderedDict:
+            values = obj.keys() + obj.values()
+            indices, lengths, keys, flat = self.dicts[G_DICT if t is dict else G_ORDERED_DICT]
+            indices.append(index)
+            lengths.append(len(obj))
+            keys.extend(obj.keys())
+            flat.extend(obj.values())
+        else:
+            if t is types.InstanceType:
+                kind = G_INSTANCE
+                cls = obj.__class__
+                names = ()
+                values = []
+            else:
+                kind = G_OBJECT
+                cls = t
+                _, names, getter = _get_class_info(t)
+
+                try:
+                    values = list(getter(obj))
+                except AttributeError:
+                    # Some of the slots are not set
+                    names = tuple(name for name in names if hasattr(obj, name))
+                    values = [getattr(obj, name) for name in names]
+
+            if hasattr(obj, '__dict__'):
+                d = obj.__dict__
+                names += tuple(d)
+                values += d.values()
+
+            key = (kind, cls, names)
+            group = self.groups.get(key)
+
+            if group == None:
+                group = self.groups[key] = ([], [])
+
+            group[0].append(index)
+            group[1].append(values)
+
+        visit = self.visit
+
+        for v in values:
+            if not type(v) in SCALAR_TYPES:
+                visit(v)
+
+    def _add(self, v):
+        index = self.ids[id(v)] = len(self.objects)
+        self.objects.append(v)
+        return index
+
+    def _add_reduced(self, v, global_index, args):
+        # The arguments must already exist when the object is created
+        for a in args:
+            if not type(a) in SCALAR_TYPES and not self.visit(a) in self.reduced_ids:
+                raise Exception('Objects of type {0} cannot be serialized (they contain {1} objects).'.format(type(v).__name__,
+                                                                                                              type(a).__name__))
+
+        index = self._add(v)
+        self.reduced_ids.add(index)
+        self.reduced.append((index, global_index, args))
+        return index
+
+    def array(self, typecode, values):
+        a = array.array(typecode, values)
+        return _uint.pack(len(a)) + a.tostring()
+
+    def column(self, values):
+        """
+        Encode a column, using the most compact kind of column which can store the values.
+        """
+
+        kinds = set(map(type, values))
+        n = _uint.pack(len(values))
+
+        if len(kinds) == 0 or kinds == set([type(None)]):
+            return chr(C_NONE) + n
+        elif kinds == set([float]):
+            return chr(C_FLOAT) + self.array('d', values)
+        elif kinds == set([bool]):
+            return chr(C_BOOL) + self.array('B', values)
+        elif kinds == set([int]) and INT_MIN <= min(values) and max(values) <= INT_MAX:
+            return chr(C_INT) + self.array('i', values)
+        elif kinds <= set(STRING_TYPES):
+            return chr(C_STRING) + self.array('I', map(self.string, values))
+        elif not kinds & SCALAR_TYPES:
+            ids = self.ids
+            return chr(C_OBJECT) + self.array('I', [ids[id(v)] for v in values])
+
+        tags = []
+        payloads = []
+
+        for v in values:
+            t = type(v)
+
+            if v is None:
+                tags.append(V_NONE)
+                payloads.append(0)
+            elif t is bool:
+                tags.append(V_TRUE if v else V_FALSE)
+                payloads.append(0)
+            elif t is float:
+                tags.append(V_FLOAT)
+                payloads.append(v)
+            elif t is int and -EXACT_MAX < v < EXACT_MAX:
+                tags.append(V_INT)
+                payloads.append(v)
+            elif t is int or t is long:
+                tags.append(V_BIG_INT if t is int else V_LONG)
+                payloads.append(self.string(str(v)))
+            elif t in STRING_TYPES:
+                tags.append(V_STRING)
+                payloads.append(self.string(v))
+            else:
+                tags.append(V_OBJECT)
+                payloads.append(self.ids[id(v)])
+
+        return chr(C_VALUE) + self.array('B', tags) + self.array('d', payloads)
+
+    def _encode_groups(self, out):
+        out.append(_uint.pack(len(self.groups)))
+
+        for (kind, cls, names), (indices, rows) in self.groups.iteritems():
+            out.append(chr(kind))
+            out.append(_uint.pack(self.global_index(cls)))
+            out.append(self.array('I', map(self.string, names)))
+            out.append(self.array('I', indices))
+
+            for column in zip(*rows) if names else ():
+                out.append(self.column(column))
+
+        indices, classes, lengths, flat = self.lists
+        out.append(self.array('I', indices))
+        out.append(self.array('I', classes))
+        out.append(self.array('I', lengths))
+        out.append(self.column(flat))
+
+        for kind in (G_DICT, G_ORDERED_DICT):
+            indices, lengths, keys, flat = self.dicts[kind]
+            out.append(self.array('I', indices))
+            out.append(self.array('I', lengths))
+            out.append(self.column(keys))
+            out.append(self.column(flat))
+
+        out.append(self.array('I', [r[0] for r in self.reduced]))
+        out.append(self.array('I', [r[1] for r in self.reduced]))
+        out.append(self.array('I', [len(r[2]) for r in self.reduced]))
+        out.append(self.column([a for r in self.reduced for a in r[2]]))
+
+class _Decoder(object):
+
+    def __init__(self, data, classes = ()):
+        self.data = data
+        self.position = 0
+        self.classes = allowed_classes()
+
+        if len(classes) > 0:
+            self.classes = dict(self.classes)
+            self.classes.update((_global_name(c), c) for c in classes)
+
+    def decode(self):
+        magic, version, byte_order = _header.unpack_from(self.data, 0)
+        self.position = _header.size
+
+        if magic != MAGIC:
+            raise Exception('The data is not in the eaglepy binary format.')
+
+        if version != FORMAT_VERSION:
+            raise Exception('Unsupported binary format version {0} (expecting {1}).'.format(version, FORMAT_VERSION))
+
+        self.swap = byte_order != sys.byteorder[0]
+        package_version = self.uint()
+
+        # Strings
+        count = self.uint()
+        lengths = self.array('I')
+        is_unicode = self.array('B')
+        blob = self.bytes(self.uint())
+        self.strings = strings = []
+        position = 0
+
+        for length, u in itertools.izip(lengths, is_unicode):
+            s = blob[position:position + length]
+            strings.append(s.decode('utf-8') if u else s)
+            position += length
+
+        if len(strings) != count:
+            raise Exception('The string table is invalid.')
+
+        # The version of the package which wrote the data
+        self.package_version = strings[package_version]
+
+        # Globals
+        count = self.uint()
+        names = self.array('I')
+        self.globals = [self._find_global(strings[names[2 * i]], strings[names[2 * i + 1]]) for i in xrange(count)]
+
+        self.objects = objects = [None] * self.uint()
+        root = self.uint()
+
+        # Create the objects (without their contents), then fill them once every object exists
+        fill = []
+
+        for _ in xrange(self.uint()):
+            kind = ord(self.bytes(1))
+            cls = self.globals[self.uint()]
+
+            if kind != (G_INSTANCE if type(cls) is types.ClassType else G_OBJECT) or issubclass(cls, list):
+                raise Exception('{0} objects cannot be stored as a group of kind {1}.'.format(cls.__name__, kind))
+            names = [strings[i] for i in self.array('I')]
+            indices = self.array('I')
+            columns = [self.raw_column() for _ in names]
+
+            if kind == G_INSTANCE:
+                created = map(types.InstanceType, itertools.repeat(cls, len(indices)))
+            else:
+                created = map(object.__new__, itertools.repeat(cls, len(indices)))
+
+            map(objects.__setitem__, indices, created)
+            fill.append((self._fill_group, (kind, cls, names, created, columns)))
+
+        indices = self.array('I')
+        classes = [self.globals[i] for i in self.array('I')]
+        lengths = self.array('I')
+
+        for cls in set(classes):
+            if not isinstance(cls, type) or not issubclass(cls, list):
+                raise Exception('{0} is not a list class.'.format(cls.__name__))
+        created = [cls() for cls in classes]
+        map(objects.__setitem__, indices, created)
+        fill.append((self._fill_lists, (created, lengths, self.raw_column())))
+
+        for cls in (dict, collections.OrderedDict):
+            indices = self.array('I')
+            lengths = self.array('I')
+            created = [cls() for _ in indices]
+            map(objects.__setitem__, indices, created)
+            fill.append((self._fill_dicts, (created, lengths, self.raw_column(), self.raw_column())))
+
+        # Reconstructed objects, whose arguments already exist
+        indices = self.array('I')
+        functions = self.array('I')
+        arg_counts = self.array('I')
+        args = self.raw_column()
+        position = 0
+
+        for index, f, n in itertools.izip(indices, functions, arg_counts):
+            a = tuple(self.column_values(args, position, position + n))
+            objects[index] = a if f == TUPLE else self.globals[f](*a)
+            position += n
+
+        for f, args in fill:
+            f(*args)
+
+        return objects[root]
+
+    def _fill_group(self, kind, cls, names, created, columns):
+        slots = _get_class_info(cls)[1] if kind == G_OBJECT else ()
+        dict_names = []
+        dict_columns = []
+
+        for name, column in zip(names, columns):
+            values = self.column_values(column)
+
+            if name in slots:
+                # Set the slot using its descriptor
+                descriptor = next(c.__dict__[name] for c in cls.__mro__ if c.__dict__.has_key(name))
+                map(descriptor.__set__, created, values)
+            else:
+                dict_names.append(name)
+                dict_columns.append(values)
+
+        if dict_names:
+            dicts = map(dict, itertools.imap(zip, itertools.repeat(dict_names), itertools.izip(*dict_columns)))
+            map(setattr, created, itertools.repeat('__dict__', len(created)), dicts)
+
+    def _fill_lists(self, created, lengths, column):
+        values = self.column_values(column)
+        position = 0
+
+        for l, n in itertools.izip(created, lengths):
+            l.extend(values[position:position + n])
+            position += n
+
+    def _fill_dicts(self, created, lengths, keys, values):
+        keys = self.column_values(keys)
+        values = self.column_values(values)
+        position = 0
+
+        for d, n in itertools.izip(created, lengths):
+            d.update(itertools.izip(keys[position:position + n], values[position:position + n]))
+            position += n
+
+    def uint(self):
+        value = _uint.unpack_from(self.data, self.position)[0]
+        self.position += _uint.size
+        return value
+
+    def bytes(self, n):
+        value = self.data[self.position:self.position + n]
+
+        if len(value) != n:
+            raise Exception('Unexpected end of data.')
+
+        self.position += n
+        return value
+
+    def array(self, typecode):
+        a = array.array(typecode)
+        n = self.uint()
+        a.fromstring(self.bytes(n * a.itemsize))
+
+        if self.swap:
+            a.byteswap()
+
+        return a
+
+    def raw_column(self):
+        kind = ord(self.bytes(1))
+
+        if kind == C_NONE:
+            return (kind, self.uint())
+        elif kind == C_FLOAT:
+            return (kind, self.array('d'))
+        elif kind == C_BOOL:
+            return (kind, self.array('B'))
+        elif kind == C_INT:
+            return (kind, self.array('i'))
+        elif kind == C_STRING or kind == C_OBJECT:
+            return (kind, self.array('I'))
+        elif kind == C_VALUE:
+            return (kind, (self.array('B'), self.array('d')))
+
+        raise Exception('Invalid column kind {0}.'.format(kind))
+
+    def column_values(self, column, start = None, end = None):
+        """
+        :returns: A list containing the values of a column (or of a range of the rows of a column).
+        """
+
+        kind, data = column
+
+        if kind == C_NONE:
+            return [None] * ((data if end == None else end) - (start or 0))
+        elif kind == C_VALUE:
+            tags, payloads = data
+            tags = tags[start:end]
+            payloads = payloads[start:end]
+        else:
+            data = data[start:end]
+
+        if kind == C_FLOAT or kind == C_INT:
+            return data.tolist()
+        elif kind == C_BOOL:
+            return map(bool, data)
+        elif kind == C_STRING:
+            return map(self.strings.__getitem__, data)
+        elif kind == C_OBJECT:
+            return map(self.objects.__getitem__, data)
+
+        strings = self.strings
+        objects = self.objects
+        converters = {V_NONE: lambda p: None,
+                      V_FALSE: lambda p: False,
+                      V_TRUE: lambda p: True,
+                      V_INT: int,
+                      V_FLOAT: float,
+                      V_STRING: lambda p: strings[int(p)],
+                      V_OBJECT: lambda p: objects[int(p)],
+                      V_BIG_INT: lambda p: int(strings[int(p)]),
+                      V_LONG: lambda p: long(strings[int(p)])}
+
+        return [converters[t](p) for t, p in itertools.izip(tags, payloads)]
+
+    def _find_global(self, module, name):
+        # (Nothing is imported: only the classes which are allowed can be named)
+        cls = self.classes.get((module, name))
+
+        if cls == None:
+            raise Exception('The data names {0}.{1}, which is not a class which may be read.'.format(module, name))
+
+        return cls
@@ -0,0 +1,211 @@
+"""
+Cache
+=====
+
+Provides a persistent, on-disk cache of parsed EAGLE files.
+
+Parsing a large board or library takes much longer than restoring the parsed objects from a pickled snapshot.
+A ``Cache`` stores a snapshot of each file which is loaded through it. The snapshot is keyed by the SHA-1 hash of
+the contents of the file, the version of this package (and of its object model), and the options which affect the
+parsed objects, so a snapshot is only used if the file (and this package) are unchanged.
+
+The total size of the snapshots is bounded. When the bound is exceeded, the least-recently-used snapshots
+are deleted.
+
+Usage
+-----
+
+    c = cache.Cache(os.path.expanduser('~/.cache/eaglepy'))
+
+    e = eagle.Eagle.load('board.brd', cache = c)
+
+Snapshots are written using ``pickle``, so a cache directory should only be shared by trusted users.
+
+"""
+
+import cPickle
+import eagle
+import gc
+import hashlib
+import os
+import tempfile
+from eaglepy import __version__
+
+class Cache(object):
+    """
+    A directory of snapshots of parsed files.
+    """
+
+    DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+    EXTENSION = '.pickle'
+
+    # The version of the object model, which is incremented when the classes of the parsed objects change
+    # 2: The items of packages, symbols, and plain sections are ``Item_List`` objects
+    # 3: ``Key_List`` is a new-style class
+    SNAPSHOT_VERSION = 3
+
+    def __init__(self, directory, max_size = DEFAULT_MAX_SIZE):
+        """
+        :param directory: The directory in which to store snapshots. It is created if it does not exist.
+        :param max_size: The maximum total size of the snapshots, in bytes.
+        """
+
+        self.directory = directory
+        self.max_size = max_size
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def key(self, data, columnar = False):
+        """
+        :param data: The contents of a file.
+        :param columnar: Whether the wires and vias of signals are stored in columns.
+
+        :returns: The key of the snapshot of the file.
+        """
+
+        h = hashlib.sha1(data)
+        h.update('\0{0}\0{1}\0{2}'.format(__version__, self.SNAPSHOT_VERSION, 'columnar' if columnar else ''))
+
+        return h.hexdigest()
+
+    def load(self, file_name, streaming = False, columnar = False):
+        """
+        Load a file, using its snapshot if one exists. Otherwise, parse the file and store a snapshot.
+
+        Only options which do not leave parts of the file unparsed are supported (libraries which are
+        parsed on demand cannot be stored).
+
+        :param file_name: The name of the file, or a file object.
+        :param streaming: Whether to parse the file incrementally if it is not in the cache.
+        :param columnar: Whether to store the wires and vias of signals in columns.
+
+        :returns: An ``Eagle`` object.
+        """
+
+        if hasattr(file_name, 'read'):
+            data = file_name.read()
+        else:
+            f = open(file_name, 'rb')
+            data = f.read()
+            f.close()
+
+        key = self.key(data, columnar)
+        e = self.get(key)
+
+        if e == None:
+            e = eagle.Eagle.loads(data, streaming = streaming, columnar = columnar)
+            self.put(key, e)
+
+        return e
+
+    def get(self, key):
+        """
+        :param key: The key of a snapshot.
+
+        :returns: The ``Eagle`` object stored in the snapshot, or ``None`` if there is no (valid) snapshot.
+        """
+
+        path = self._path(key)
+
+        try:
+            f = open(path, 'rb')
+        except IOError:
+            return None
+
+        # Unpickling creates many objects but no garbage, so the cyclic garbage collector is
+        # disabled (it would otherwise repeatedly traverse the objects which have been created).
+        gc_enabled = gc.isenabled()
+        gc.disable()
+
+        try:
+            e = cPickle.load(f)
+        except Exception:
+            e = None
+        finally:
+            f.close()
+
+            if gc_enabled:
+                gc.enable()
+
+        if e == None:
+            # The snapshot is corrupt (e.g. it was only partially written)
+            self._remove(path)
+            return None
+
+        # Record the use of the snapshot (for least-recently-used eviction)
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+        return e
+
+    def put(self, key, e):
+        """
+        Store a snapshot, then delete the least-recently-used snapshots if the cache is too large.
+
+        :param key: The key of the snapshot.
+        :param e: The ``Eagle`` object.
+        """
+
+        # Write to a temporary file first, so that other processes never read a partial snapshot
+        fd, temp_path = tempfile.mkstemp(self.EXTENSION + '.tmp', dir = self.directory)
+        f = os.fdopen(fd, 'wb')
+
+        try:
+            cPickle.dump(e, f, cPickle.HIGHEST_PROTOCOL)
+            f.close()
+            os.rename(temp_path, self._path(key))
+        except:
+            f.close()
+            self._remove(temp_path)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """
+        Delete the least-recently-used snapshots until the total size is at most ``max_size``.
+        """
+
+        entries = []
+        total = 0
+
+        for f in os.listdir(self.directory):
+            if f.endswith(self.EXTENSION):
+                path = os.path.join(self.directory, f)
+
+                try:
+                    s = os.stat(path)
+                except OSError:
+                    continue
+
+                entries.append((s.st_mtime, s.st_size, path))
+                total += s.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+
+            self._remove(path)
+            total -= size
+
+    def clear(self):
+        """
+        Delete all snapshots.
+        """
+
+        for f in os.listdir(self.directory):
+            if f.endswith(self.EXTENSION):
+                self._remove(os.path.join(self.directory, f))
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.EXTENSION)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,249 @@
+"""
+Codec
+=====
+
+Provides table-driven parsers and serializers for classes which are represented by a single XML element.
+
+The ``parse()`` and ``append_node()`` methods of most classes consist of a series of calls to
+``attributes.parse``, ``attributes.parse_or_default``, and ``attributes.set_attr``. Each of those calls
+looks up the attribute type in ``ATTR_MAP`` and dispatches to the ``ATTR_`` class. A ``Codec`` performs
+those lookups once, when the class is defined, and compiles a parser and a serializer which are specialized
+for that class.
+
+Fields
+------
+
+Each attribute is described by a ``Field``:
+
+    Field(constants.ATTRIBUTES.CURVE, 'curve', DEFAULT_CURVE, DEFAULT_CURVE)
+
+specifies that the ``curve`` attribute is stored in the ``curve`` variable of the object, that the value
+``DEFAULT_CURVE`` is used if the attribute is missing, and that the attribute is not written if the value
+is equal to ``DEFAULT_CURVE``. A field without a default is required.
+
+The semantics are exactly those of ``attributes.parse``, ``attributes.parse_or_default``, and
+``attributes.set_attr``: attributes which are not contained in ``ATTR_MAP`` are read as strings
+and written using ``str()``, and a value is not written if its string representation is ``None``.
+
+Usage
+-----
+
+The fields of a codec are listed in the order of the arguments to the constructor of the class,
+so the class can be instantiated directly from the tuple returned by ``parse()``:
+
+    class Hole:
+        CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X, 'x'), ...])
+
+        @classmethod
+        def parse(cls, n):
+            return Hole(*cls.CODEC.parse(n))
+
+        def append_node(self, _n):
+            self.CODEC.append(self, _n)
+
+``append_row()`` is equivalent to ``append()``, but accepts a sequence of values in the order of the fields
+(e.g. a tuple returned by ``parse()``) rather than an object. This is used to serialize primitives which are
+not stored as objects (see ``columnar``).
+
+"""
+
+import attributes
+
+# Attempt to use ``lxml``.
+# Otherwise, use ``xml``.
+try:
+    from lxml import etree as ElementTree
+except:
+    from xml.etree import ElementTree
+
+class _Required:
+    """
+    The default value of fields which have no default value.
+    """
+
+    def __repr__(self):
+        return 'REQUIRED'
+
+REQUIRED = _Required()
+
+class Field:
+    """
+    Describes a single attribute of an element.
+    """
+
+    def __init__(self, attr, name, default = REQUIRED, write_default = None, factory = None, ref = False):
+        """
+        :param attr: The name of the attribute (from ``constants.ATTRIBUTES``).
+        :param name: The name of the variable which stores the value.
+        :param default: The value to use if the element does not have the attribute. If not specified,
+            the attribute is required.
+        :param write_default: If not ``None``, the attribute is not written if the value is equal to this value.
+        :param factory: If not ``None``, a function which is called to create the default value (for mutable defaults).
+        :param ref: If ``True``, the variable stores an object whose ``name`` is written. The parser
+            returns the name, which must be resolved by the caller.
+        """
+
+        self.attr = attr
+        self.name = name
+        self.default = default
+        self.write_default = write_default
+        self.factory = factory
+        self.ref = ref
+
+    def is_required(self):
+        return self.default is REQUIRED and self.factory == None
+
+class Codec:
+    """
+    A compiled parser and serializer for a single element type.
+    """
+
+    def __init__(self, tag, attr_map, fields, write_order = None):
+        """
+        :param tag: The tag name of the element.
+        :param attr_map: The ``ATTR_MAP`` of the class.
+        :param fields: A list of ``Field`` objects, in the order in which ``parse()`` returns their values.
+        :param write_order: A list of field names specifying the order in which the attributes are
+            written, or ``None`` to write them in the order of ``fields``.
+        """
+
+        self.tag = tag
+        self.attr_map = attr_map
+        self.fields = fields
+
+        if write_order == None:
+            self.write_fields = fields
+        else:
+            by_name = dict((f.name, f) for f in fields)
+            self.write_fields = [by_name[name] for name in write_order]
+
+        self.parse = self._compile_parse()
+        self.append = self._compile_append()
+        self.append_row = self._compile_append(row = True)
+
+    def parse_generic(self, n):
+        """
+        Parse an element using ``attributes.parse`` and ``attributes.parse_or_default``.
+
+        This is used to report errors (with the same exceptions as the uncompiled functions) when
+        the compiled parser fails.
+
+        :param n: An ElementTree ``Element`` object.
+
+        :returns: A tuple containing the value of each field.
+        """
+
+        values = []
+
+        for f in self.fields:
+            if f.is_required():
+                values.append(attributes.parse(self, n, f.attr))
+            elif f.factory != None and not n.attrib.has_key(f.attr):
+                values.append(f.factory())
+            else:
+                values.append(attributes.parse_or_default(self, n, f.attr, f.default))
+
+        return tuple(values)
+
+    # ``attributes.parse`` and ``attributes.set_attr`` expect an object with an ``ATTR_MAP``.
+    @property
+    def ATTR_MAP(self):
+        return self.attr_map
+
+    def _compile_parse(self):
+        namespace = {'_float': float, '_int': int, '_bool': {'yes': True, 'no': False},
+                     '_generic': self.parse_generic}
+        lines = ['def parse(n):',
+                 '    get = n.attrib.get',
+                 '    try:']
+        names = []
+
+        for i, f in enumerate(self.fields):
+            var = 'v{0}'.format(i)
+            names.append(var)
+            expr = self._parse_expression(f, var, i, namespace)
+
+            lines.append('        {0} = get({1!r})'.format(var, f.attr))
+
+            if f.is_required():
+                lines.append('        if {0} is None: raise KeyError({1!r})'.format(var, f.attr))
+                lines.append('        {0} = {1}'.format(var, expr))
+            else:
+                if f.factory != None:
+                    namespace['_f{0}'.format(i)] = f.factory
+                    default = '_f{0}()'.format(i)
+                else:
+                    namespace['_d{0}'.format(i)] = f.default
+                    default = '_d{0}'.format(i)
+
+                lines.append('        {0} = {1} if {0} is None else {2}'.format(var, default, expr))
+
+        lines.append('    except (KeyError, ValueError, TypeError):')
+        lines.append('        return _generic(n)')
+        lines.append('    return ({0}{1})'.format(', '.join(names), ',' if len(names) == 1 else ''))
+
+        exec '\n'.join(lines) in namespace
+        return namespace['parse']
+
+    def _parse_expression(self, f, var, i, namespace):
+        conv = self.attr_map.get(f.attr)
+
+        if conv == None or conv is attributes.ATTR_STRING:
+            return var
+        elif conv is attributes.ATTR_FLOAT:
+            return '_float({0})'.format(var)
+        elif conv is attributes.ATTR_INT:
+            return '_int({0})'.format(var)
+        elif conv is attributes.ATTR_BOOL:
+            return '_bool[{0}]'.format(var)
+        elif conv is attributes.ATTR_ROT:
+            # Look up the cached rotation before calling the parser
+            namespace['_rot'] = attributes.ATTR_ROT._cache.get
+            namespace['_p{0}'.format(i)] = conv.parse
+            return '(_rot({0}) or _p{1}({0}))'.format(var, i)
+
+        namespace['_p{0}'.format(i)] = conv.parse
+        return '_p{0}({1})'.format(i, var)
+
+    def _compile_append(self, row = False):
+        # If ``row`` is ``True``, the serializer reads the values from a sequence in the order of ``fields``
+        # (as returned by ``parse()``) rather than from the variables of an object.
+        namespace = {'_SubElement': ElementTree.SubElement, '_str': str}
+        index = dict((f.name, i) for i, f in enumerate(self.fields))
+        lines = ['def append(obj, _n):',
+                 '    n = _SubElement(_n, {0!r})'.format(self.tag),
+                 '    set = n.set']
+
+        for i, f in enumerate(self.write_fields):
+            if row:
+                lines.append('    v = obj[{0}]{1}'.format(index[f.name], '.name' if f.ref else ''))
+            else:
+                lines.append('    v = obj.{0}{1}'.format(f.name, '.name' if f.ref else ''))
+            indent = '    '
+
+            if f.write_default != None:
+                namespace['_d{0}'.format(i)] = f.write_default
+                lines.append('    if not v == _d{0}:'.format(i))
+                indent += '    '
+
+            conv = self.attr_map.get(f.attr)
+
+            if conv == None:
+                lines.append('{0}if v is not None: set({1!r}, _str(v))'.format(indent, f.attr))
+            elif conv is attributes.ATTR_FLOAT or conv is attributes.ATTR_INT:
+                lines.append('{0}set({1!r}, _str(v))'.format(indent, f.attr))
+            elif conv is attributes.ATTR_STRING:
+                lines.append('{0}if v is not None: set({1!r}, v)'.format(indent, f.attr))
+            elif conv is attributes.ATTR_BOOL:
+                lines.append('{0}set({1!r}, {2!r} if v == True else {3!r})'.format(indent, f.attr,
+                                                                                   attributes.ATTR_BOOL.to_str(True),
+                                                                                   attributes.ATTR_BOOL.to_str(False)))
+            else:
+                namespace['_s{0}'.format(i)] = conv.to_str
+                lines.append('{0}s = _s{1}(v)'.format(indent, i))
+                lines.append('{0}if s is not None: set({1!r}, s)'.format(indent, f.attr))
+
+        lines.append('    return n')
+
+        exec '\n'.join(lines) in namespace
+        return namespace['append']
@@ -0,0 +1,606 @@
+"""
+Columnar
+========
+
+Provides columnar (NumPy-backed) storage for the wires and vias of signals.
+
+A board may contain hundreds of thousands of wires and vias. When each of them is stored as a ``Wire`` or
+``Via`` object, any geometric analysis of the board must loop over them in Python. An ``Item_Columns``
+object stores each numeric variable of the wires and vias of a signal in a NumPy array, so that the total
+trace length, the copper statistics of each layer, and the bounding box are vectorized operations.
+
+NumPy is only required if columnar storage is used.
+
+Usage
+-----
+
+Columnar storage is enabled when a board is loaded:
+
+    board = eagle.Eagle.load('board.brd', columnar = True).drawing.document
+
+    length = columnar.total_length(board.signals)
+
+The ``items`` of each signal is then an ``Item_Columns`` object rather than a list. It can be iterated,
+indexed, and modified like a list (``append``, ``extend``, ``insert``, ``pop``, ``remove``, ``index``, and
+assigning and deleting items and slices). Wires and vias are returned as ``Wire_View`` and ``Via_View``
+objects. These are instances of ``Wire`` and ``Via`` whose variables are read from (and written to) the
+columns, so code which checks the class of each item and reads its variables is unchanged. A new view is
+created each time an item is retrieved, so views should not be compared using ``is`` (``index`` and
+``remove`` find the row of a view instead).
+
+Removing a wire or via removes its row from the columns, which copies the arrays, so removing many items one
+at a time is slower than with a list (assign a slice to remove them at once). A view which was retrieved before
+an item is removed may then refer to a different row; the items removed by ``pop`` are returned as independent
+``Wire`` and ``Via`` objects.
+
+The numeric variables are stored as 64-bit floating-point values (or integers, for layers), and values
+which are assigned to them are converted accordingly. A floating-point value of ``None`` (e.g. the diameter
+of a via whose diameter is ``auto``) is stored as NaN. The remaining variables (e.g. ``extent`` and ``style``)
+are stored in lists.
+
+"""
+
+import array
+import primitives
+
+# NumPy is optional; it is only required if columnar storage is used.
+from numpy_utils import numpy, require_numpy
+
+# The NumPy type of each numeric variable.
+WIRE_TYPES = {'x1': 'f8', 'y1': 'f8', 'x2': 'f8', 'y2': 'f8', 'width': 'f8', 'layer': 'i4', 'curve': 'f8'}
+VIA_TYPES = {'x': 'f8', 'y': 'f8', 'drill': 'f8', 'diameter': 'f8'}
+
+# The kinds of item stored in an ``Item_Columns`` object.
+WIRE = 0
+VIA = 1
+OTHER = 2
+
+class Columns(object):
+    """
+    Stores the variables of the instances of a primitive class in columns.
+
+    Rows which are added are buffered, and are only copied into the columns when a column is next
+    retrieved, so that adding rows one at a time does not copy the arrays each time.
+    """
+
+    def __init__(self, cls, types):
+        """
+        :param cls: The primitive class (which must have a ``CODEC``).
+        :param types: A dictionary associating the name of each numeric variable with its NumPy type.
+        """
+
+        require_numpy('Columnar storage')
+
+        self.cls = cls
+        self.types = types
+        self.names = [f.name for f in cls.CODEC.fields]
+        self.pending = []
+
+        # The columns are created when they are first retrieved (most signals are never analyzed).
+        self.columns = None
+
+    def __len__(self):
+        return (0 if self.columns == None else len(self.columns[self.names[0]])) + len(self.pending)
+
+    def add_row(self, row):
+        """
+        Add a row.
+
+        :param row: A sequence containing the value of each variable, in the order of the fields of the
+            ``CODEC`` of the class (as returned by ``CODEC.parse()``).
+
+        :returns: The index of the row.
+        """
+
+        self.pending.append(row)
+        return len(self) - 1
+
+    def column(self, name):
+        """
+        :param name: The name of a variable.
+
+        :returns: The column containing the values of that variable: a NumPy array for numeric variables,
+            or a list otherwise.
+        """
+
+        if self.pending or self.columns == None:
+            self._flush()
+
+        return self.columns[name]
+
+    def get(self, index, name):
+        value = self.column(name)[index]
+
+        if not self.types.has_key(name):
+            return value
+        elif self.types[name][0] == 'i':
+            return int(value)
+
+        value = float(value)
+        return None if value != value else value
+
+    def set(self, index, name, value):
+        if self.types.has_key(name) and value == None:
+            value = numpy.nan
+
+        self.column(name)[index] = value
+
+    def rows(self):
+        """
+        :returns: A list containing the values of each row as a tuple, in the order of the fields of the
+            ``CODEC`` of the class. Numeric values are converted to Python values.
+        """
+
+        values = []
+
+        for name in self.names:
+            column = self.column(name)
+
+            if self.types.has_key(name):
+                l = column.tolist()
+
+                if column.dtype.kind == 'f' and numpy.isnan(column).any():
+                    l = [None if v != v else v for v in l]
+
+                values.append(l)
+            else:
+                values.append(column)
+
+        return zip(*values)
+
+    def remove_row(self, index):
+        """
+        Remove a row. The indices of the following rows are reduced by one.
+        """
+
+        for name in self.names:
+            column = self.column(name)
+
+            if self.types.has_key(name):
+                self.columns[name] = numpy.delete(column, index)
+            else:
+                del column[index]
+
+    def extend(self, other):
+        """
+        Add the rows of another ``Columns`` object.
+        """
+
+        for name in self.names:
+            column = self.column(name)
+
+            if self.types.has_key(name):
+                self.columns[name] = numpy.concatenate((column, other.column(name)))
+            else:
+                column.extend(other.column(name))
+
+    def _flush(self):
+        if self.columns == None:
+            self.columns = {}
+
+            for name in self.names:
+                if self.types.has_key(name):
+                    self.columns[name] = numpy.zeros(0, self.types[name])
+                else:
+                    self.columns[name] = []
+
+        values = zip(*self.pending)
+        self.pending = []
+
+        for name, v in zip(self.names, values):
+            if self.types.has_key(name):
+                t = self.types[name]
+
+                if t[0] == 'f':
+                    v = [numpy.nan if x == None else x for x in v]
+
+                self.columns[name] = numpy.concatenate((self.columns[name], numpy.array(v, t)))
+            else:
+                self.columns[name].extend(v)
+
+def make_view_class(cls):
+    """
+    Create a subclass of a primitive class whose variables are stored in a ``Columns`` object.
+
+    :param cls: The primitive class.
+
+    :returns: The view class.
+    """
+
+    def make_property(name):
+        return property(lambda self: self._columns.get(self._index, name),
+                        lambda self, value: self._columns.set(self._index, name, value))
+
+    def reduce_view(self):
+        # Copies and pickles of a view are independent primitives
+        return (cls, tuple(getattr(self, name) for name in self._columns.names))
+
+    namespace = {'__slots__': ('_columns', '_index'),
+                 '__doc__': 'A ``{0}`` whose variables are stored in a ``Columns`` object.'.format(cls.__name__),
+                 '__reduce__': reduce_view}
+
+    for name in cls.__slots__:
+        namespace[name] = make_property(name)
+
+    return type(cls.__name__ + '_View', (cls,), namespace)
+
+Wire_View = make_view_class(primitives.Wire)
+Via_View = make_view_class(primitives.Via)
+
+class Item_Columns(object):
+    """
+    Stores the items of a signal, storing wires and vias in columns.
+    """
+
+    def __init__(self, items = None):
+        """
+        :param items: The initial items (any primitives), or ``None``.
+        """
+
+        self.wires = Columns(primitives.Wire, WIRE_TYPES)
+        self.vias = Columns(primitives.Via, VIA_TYPES)
+        self.others = []
+
+        # The kind of each item, and its index within ``wires``, ``vias``, or ``others``
+        self.kinds = array.array('b')
+        self.indices = array.array('l')
+
+        if items != None:
+            for i in items:
+                self.append(i)
+
+    @classmethod
+    def parse(cls, n):
+        """
+        Parse the items of a signal.
+
+        :param n: The ``signal`` node.
+
+        :returns: An ``Item_Columns`` object.
+        """
+
+        items = Item_Columns()
+        parse_wire = primitives.Wire.CODEC.parse
+        parse_via = primitives.Via.CODEC.parse
+
+        for nn in n.getchildren():
+            if nn.tag == primitives.Wire.TAG_NAME:
+                items._add(WIRE, items.wires.add_row(parse_wire(nn)))
+            elif nn.tag == primitives.Via.TAG_NAME:
+                items._add(VIA, items.vias.add_row(parse_via(nn)))
+            else:
+                item = primitives.parse_item(nn)
+
+                if item != None:
+                    items.append(item)
+
+        return items
+
+    @staticmethod
+    def combine(item_columns):
+        """
+        Combine the wires and vias of several ``Item_Columns`` objects (e.g. to analyze an entire board).
+
+        :param item_columns: A sequence of ``Item_Columns`` objects.
+
+        :returns: An ``Item_Columns`` object containing the wires and vias (but no other items).
+        """
+
+        combined = Item_Columns()
+
+        for i in item_columns:
+            combined.wires.extend(i.wires)
+            combined.vias.extend(i.vias)
+
+        num_wires = len(combined.wires)
+        num_vias = len(combined.vias)
+        combined.kinds = array.array('b', [WIRE]) * num_wires + array.array('b', [VIA]) * num_vias
+        combined.indices = array.array('l', range(num_wires) + range(num_vias))
+
+        return combined
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def __iter__(self):
+        for i in xrange(len(self.kinds)):
+            yield self._item(self.kinds[i], self.indices[i])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in xrange(*index.indices(len(self)))]
+
+        return self._item(self.kinds[index], self.indices[index])
+
+    def __setitem__(self, index, item):
+        if isinstance(index, slice):
+            items = list(self)
+            items[index] = item
+            self._replace(items)
+        else:
+            index = self._position(index)
+            self._remove_at(index)
+            self.insert(index, item)
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            items = list(self)
+            del items[index]
+            self._replace(items)
+        else:
+            self._remove_at(self._position(index))
+
+    def __setslice__(self, i, j, items):
+        self.__setitem__(slice(max(0, i), max(0, j)), items)
+
+    def __delslice__(self, i, j):
+        self.__delitem__(slice(max(0, i), max(0, j)))
+
+    def index(self, item):
+        """
+        :param item: An item, or a view of a wire or via of this object.
+
+        :raises: A ``ValueError`` if the item is not found.
+
+        :returns: The position of the item.
+        """
+
+        if isinstance(item, (Wire_View, Via_View)) and (item._columns is self.wires or item._columns is self.vias):
+            kind = WIRE if item._columns is self.wires else VIA
+
+            for position in xrange(len(self.kinds)):
+                if self.kinds[position] == kind and self.indices[position] == item._index:
+                    return position
+        else:
+            for position in xrange(len(self.kinds)):
+                if self.kinds[position] == OTHER and self.others[self.indices[position]] == item:
+                    return position
+
+        raise ValueError('The item is not in the list.')
+
+    def insert(self, index, item):
+        """
+        Insert an item before the item at ``index``. Its row is added to the end of the columns.
+        """
+
+        self.append(item)
+
+        count = len(self.kinds)
+        index = max(0, min(index + count - 1 if index < 0 else index, count - 1))
+
+        if index < count - 1:
+            kind = self.kinds.pop()
+            self.kinds.insert(index, kind)
+            self.indices.insert(index, self.indices.pop())
+
+    def extend(self, items):
+        for i in list(items):
+            self.append(i)
+
+    def pop(self, index = -1):
+        """
+        Remove an item.
+
+        :returns: The item (wires and vias are returned as ``Wire`` and ``Via`` objects, since their rows are
+            removed).
+        """
+
+        index = self._position(index)
+        item = self._detach(self[index])
+        self._remove_at(index)
+
+        return item
+
+    def remove(self, item):
+        self._remove_at(self.index(item))
+
+    def append(self, item):
+        """
+        Add an item. The variables of wires and vias are copied into the columns.
+
+        :param item: A primitive.
+        """
+
+        if isinstance(item, primitives.Wire):
+            self._add(WIRE, self.wires.add_row(tuple(getattr(item, name) for name in self.wires.names)))
+        elif isinstance(item, primitives.Via):
+            self._add(VIA, self.vias.add_row(tuple(getattr(item, name) for name in self.vias.names)))
+        else:
+            self.others.append(item)
+            self._add(OTHER, len(self.others) - 1)
+
+    def append_nodes(self, n):
+        """
+        Add a node for each item to the ``signal`` node.
+
+        :param n: The ``signal`` node.
+        """
+
+        rows = {WIRE: self.wires.rows(), VIA: self.vias.rows()}
+        append = {WIRE: primitives.Wire.CODEC.append_row, VIA: primitives.Via.CODEC.append_row}
+
+        for kind, index in zip(self.kinds, self.indices):
+            if kind == OTHER:
+                self.others[index].append_node(n)
+            else:
+                append[kind](rows[kind][index], n)
+
+    def wire_lengths(self):
+        """
+        :returns: A NumPy array containing the length of each wire. The length of an arc is the length
+            along the arc.
+        """
+
+        dx = self.wires.column('x2') - self.wires.column('x1')
+        dy = self.wires.column('y2') - self.wires.column('y1')
+        lengths = numpy.hypot(dx, dy)
+
+        # An arc with chord length c and angle a has length c * (a / 2) / sin(a / 2)
+        half_angles = numpy.abs(numpy.radians(self.wires.column('curve'))) / 2.0
+        arcs = half_angles > 0
+        lengths[arcs] *= half_angles[arcs] / numpy.sin(half_angles[arcs])
+
+        return lengths
+
+    def total_length(self):
+        """
+        :returns: The total length of the wires.
+        """
+
+        return float(self.wire_lengths().sum())
+
+    def layer_stats(self):
+        """
+        Calculate the copper statistics of each layer.
+
+        The copper area of a wire is approximated as the product of its length and width.
+
+        :returns: A dictionary which associates each layer number with a dictionary containing the number of
+            wires (``wires``), their total length (``length``), and their copper area (``area``).
+        """
+
+        lengths = self.wire_lengths()
+        layers, inverse = numpy.unique(self.wires.column('layer'), return_inverse = True)
+
+        counts = numpy.bincount(inverse, minlength = len(layers))
+        total_lengths = numpy.bincount(inverse, weights = lengths, minlength = len(layers))
+        areas = numpy.bincount(inverse, weights = lengths * self.wires.column('width'), minlength = len(layers))
+
+        stats = {}
+
+        for layer, count, length, area in zip(layers.tolist(), counts.tolist(), total_lengths.tolist(), areas.tolist()):
+            stats[layer] = {'wires': count, 'length': length, 'area': area}
+
+        return stats
+
+    def bounds(self):
+        """
+        Calculate the bounding box of the wires and vias, including their widths (or diameters).
+
+        Arcs are approximated by their end points.
+
+        :returns: A ``(x_min, y_min, x_max, y_max)`` tuple, or ``None`` if there are no wires or vias.
+        """
+
+        half_widths = self.wires.column('width') / 2.0
+        # A via whose diameter is ``auto`` is at least as large as its drill
+        half_diameters = numpy.fmax(self.vias.column('diameter'), self.vias.column('drill')) / 2.0
+
+        x = (self.wires.column('x1'), self.wires.column('x2'), self.vias.column('x'))
+        y = (self.wires.column('y1'), self.wires.column('y2'), self.vias.column('y'))
+        r = (half_widths, half_widths, half_diameters)
+
+        lower_x = numpy.concatenate([a - b for a, b in zip(x, r)])
+
+        if len(lower_x) == 0:
+            return None
+
+        return (float(lower_x.min()),
+                float(numpy.concatenate([a - b for a, b in zip(y, r)]).min()),
+                float(numpy.concatenate([a + b for a, b in zip(x, r)]).max()),
+                float(numpy.concatenate([a + b for a, b in zip(y, r)]).max()))
+
+    def _add(self, kind, index):
+        self.kinds.append(kind)
+        self.indices.append(index)
+
+    def _position(self, index):
+        count = len(self.kinds)
+        position = index + count if index < 0 else index
+
+        if not 0 <= position < count:
+            raise IndexError('Item_Columns index out of range')
+
+        return position
+
+    def _remove_at(self, position):
+        """
+        Remove the item at a position, and its row (or its entry in ``others``).
+        """
+
+        kind = self.kinds.pop(position)
+        index = self.indices.pop(position)
+
+        if kind == WIRE:
+            self.wires.remove_row(index)
+        elif kind == VIA:
+            self.vias.remove_row(index)
+        else:
+            del self.others[index]
+
+        # The rows which followed the removed row have moved
+        kinds = self.kinds
+        indices = self.indices
+
+        for position in xrange(len(kinds)):
+            if kinds[position] == kind and indices[position] > index:
+                indices[position] -= 1
+
+    def _detach(self, item):
+        """
+        :returns: An independent copy of a view, or the item.
+        """
+
+        if isinstance(item, (Wire_View, Via_View)):
+            cls, args = item.__reduce__()
+            return cls(*args)
+
+        return item
+
+    def _replace(self, items):
+        """
+        Replace the contents with new items (which may include views of this object, which are copied first).
+        """
+
+        replaced = Item_Columns(map(self._detach, items))
+
+        self.wires = replaced.wires
+        self.vias = replaced.vias
+        self.others = replaced.others
+        self.kinds = replaced.kinds
+        self.indices = replaced.indices
+
+    def _item(self, kind, index):
+        if kind == OTHER:
+            return self.others[index]
+
+        if kind == WIRE:
+            view = Wire_View.__new__(Wire_View)
+            view._columns = self.wires
+        else:
+            view = Via_View.__new__(Via_View)
+            view._columns = self.vias
+
+        view._index = index
+        return view
+
+def _combine_signals(signals):
+    # Signals which were not parsed using columnar storage are converted
+    return Item_Columns.combine(s.items if isinstance(s.items, Item_Columns) else Item_Columns(s.items) for s in signals)
+
+def total_length(signals):
+    """
+    :param signals: A sequence of signals (ideally parsed using columnar storage).
+
+    :returns: The total length of the wires of the signals.
+    """
+
+    return _combine_signals(signals).total_length()
+
+def layer_stats(signals):
+    """
+    :param signals: A sequence of signals (ideally parsed using columnar storage).
+
+    :returns: The copper statistics of each layer (see ``Item_Columns.layer_stats``).
+    """
+
+    return _combine_signals(signals).layer_stats()
+
+def bounds(signals):
+    """
+    :param signals: A sequence of signals (ideally parsed using columnar storage).
+
+    :returns: The bounding box of the wires and vias of the signals (see ``Item_Columns.bounds``).
+    """
+
+    return _combine_signals(signals).bounds()
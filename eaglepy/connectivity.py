@@ -0,0 +1,418 @@
+"""
+Connectivity
+============
+
+Determines how the copper of each signal of a board is connected: which wires, vias, and polygons form each
+*island* of copper, and which pads (or SMDs) each island connects. A signal is routed when all of its pads are
+connected by a single island.
+
+Connections
+-----------
+
+Two items of a signal are connected if they have copper on a common layer, and a connection point of one of them
+lies within the copper of the other:
+
+* The connection points of a wire are its ends, those of a via, pad, or SMD are their centers, and those of a
+  polygon are its vertices.
+* The copper of a wire lies within half its width of the wire (or arc). The copper of a via, or of a round or
+  octagonal pad, is a circle, and the copper of an SMD, or of another pad, is a (rotated) rectangle. The copper
+  of a polygon is its outline (with straight edges) and the area which it encloses.
+
+So wires are connected to each other at their ends (or where the end of one lies on the other), and to the vias
+and pads in which their ends lie. The copper which EAGLE pours into polygons is not calculated: a polygon is
+connected to the items whose connection points lie within its outline.
+
+Pads are found by resolving the ``element`` and ``pad`` of each ``Contact_Ref`` of a signal, and are placed on
+the board by their elements (see ``geometry.Placement``). Pads (which have copper on every layer) connect to every
+layer, vias connect to the layers of their ``extent``, and SMDs connect to the layer on which they are placed.
+
+The items of each signal are merged using a union-find structure. The connection points are stored in a spatial
+hash (a dictionary of the points in each cell of a grid), so each item only tests the points near it.
+
+Usage
+-----
+
+    connectivity = board.connectivity()
+
+    for s in connectivity.open_signals():
+        print('{0}: {1} unconnected islands'.format(s.signal.name, len(s.islands)))
+
+    for wire in connectivity['GND'].stubs:
+        ...
+
+``Board.connectivity()`` is reused until the board is modified, in the same way as ``Board.spatial_index()``.
+Routing a signal (changing its wires or vias, or adding items to it) or moving an element is detected if the board
+is tracked (see ``tracking``); otherwise call ``references.changed(board)`` after making such changes:
+
+    signal.items.append(primitives.Wire(2.5, 0, 5, 0.8, 0.254, 16))
+    references.changed(board)
+
+"""
+
+import constants
+import geometry
+import math
+import primitives
+
+# The size of the cells of the spatial hash of connection points
+CELL_SIZE = 1.0
+
+# The distance within which a point is considered to lie on copper (to allow for rounding)
+TOLERANCE = 1e-6
+
+# The kinds of copper
+WIRE = 0
+CIRCLE = 1
+RECTANGLE = 2
+POLYGON = 3
+
+# The first and last copper layers (which pads, and vias without an extent, connect)
+COPPER_LAYERS = (constants.LAYERS.TOP, constants.LAYERS.BOTTOM)
+
+class Island(object):
+    """
+    Connected copper.
+    """
+
+    __slots__ = ('items', 'contacts', 'pads')
+
+    def __init__(self):
+        # The wires, vias and polygons of the signal
+        self.items = []
+        # The ``Contact_Ref`` objects of the signal, and the ``(element, pad)`` tuples of their pads (or SMDs)
+        self.contacts = []
+        self.pads = []
+
+class Signal_Connectivity(object):
+    """
+    The connectivity of the copper of a signal.
+
+    * ``signal``: The ``Signal``.
+    * ``islands``: A list of the ``Island`` objects of the signal, in the order of their first items. The pad
+      of a contact which is not connected to any copper forms an island by itself.
+    * ``stubs``: A list of the wires of which (at least) one end is not connected to anything.
+    * ``unresolved``: A list of the ``Contact_Ref`` objects whose elements or pads could not be found.
+    """
+
+    def __init__(self, signal, islands, stubs, unresolved):
+        self.signal = signal
+        self.islands = islands
+        self.stubs = stubs
+        self.unresolved = unresolved
+
+    def connected_islands(self):
+        """
+        :returns: A list of the islands which connect pads.
+        """
+
+        return [i for i in self.islands if len(i.contacts) > 0]
+
+    def floating_islands(self):
+        """
+        :returns: A list of the islands which do not connect any pads.
+        """
+
+        return [i for i in self.islands if len(i.contacts) == 0]
+
+    def is_routed(self):
+        """
+        :returns: Whether all of the pads of the signal are connected (by a single island).
+        """
+
+        return len(self.unresolved) == 0 and len(self.connected_islands()) <= 1
+
+    def island_of(self, item):
+        """
+        :param item: A wire, via or polygon of the signal, or a ``Contact_Ref``.
+
+        :returns: The island which contains ``item``, or ``None``.
+        """
+
+        for island in self.islands:
+            if any(i is item for i in island.items) or any(c is item for c in island.contacts):
+                return island
+
+        return None
+
+class _Pads(object):
+    """
+    Finds the pads of elements, placed on the board.
+    """
+
+    def __init__(self, board):
+        self.elements = board.elements
+        # element name -> (element, placement, {pad name: pad})
+        self.cache = {}
+
+    def find(self, element_name, pad_name):
+        """
+        :returns: A tuple ``(element, pad, placement)``, or ``None`` if the element or pad does not exist.
+        """
+
+        entry = self.cache.get(element_name)
+
+        if entry == None:
+            if not self.elements.has_name(element_name):
+                return None
+
+            element = self.elements[element_name]
+
+            pads = dict((i.name, i) for i in element.package.items.of_type((primitives.Pad, primitives.SMD)))
+            entry = self.cache[element_name] = (element, geometry.Placement(element), pads)
+
+        pad = entry[2].get(pad_name)
+        return (entry[0], pad, entry[1]) if pad != None else None
+
+def _layers(item):
+    """
+    :returns: The ``(first, last)`` copper layers of a wire, via, or polygon of a signal, or ``None``.
+    """
+
+    if isinstance(item, primitives.Via):
+        return (item.extent.layer_from, item.extent.layer_to) if item.extent != None else COPPER_LAYERS
+
+    layer = item.layer
+    return (layer, layer) if COPPER_LAYERS[0] <= layer <= COPPER_LAYERS[1] else None
+
+def _signal_copper(item):
+    """
+    :returns: A ``(kind, shape, connection points)`` tuple for a wire, via, or polygon.
+    """
+
+    if isinstance(item, primitives.Wire):
+        return (WIRE, (item.x1, item.y1, item.x2, item.y2, item.curve, item.width / 2.0), ((item.x1, item.y1), (item.x2, item.y2)))
+    elif isinstance(item, primitives.Via):
+        r = (item.diameter if item.diameter != None else geometry.auto_diameter(item.drill)) / 2.0
+        return (CIRCLE, (item.x, item.y, r), ((item.x, item.y),))
+    elif isinstance(item, primitives.Polygon) and len(item.points) > 0:
+        return (POLYGON, (item.points, item.width / 2.0), [p[:2] for p in item.points])
+
+    return None
+
+def _pad_copper(pad, placement):
+    """
+    :returns: A ``(kind, shape, connection points, layers)`` tuple for a pad or SMD which is placed on the board.
+    """
+
+    x, y = placement.point(pad.x, pad.y)
+
+    if isinstance(pad, primitives.SMD):
+        layer = placement.layer(pad.layer)
+        half_width = pad.dx / 2.0
+        half_height = pad.dy / 2.0
+        layers = (layer, layer)
+    else:
+        d = pad.diameter if pad.diameter != None else geometry.auto_diameter(pad.drill)
+        layers = COPPER_LAYERS
+
+        if pad.shape in (constants.SHAPE.ROUND, constants.SHAPE.OCTAGON):
+            return (CIRCLE, (x, y, d / 2.0), ((x, y),), layers)
+        elif pad.shape in (constants.SHAPE.LONG, constants.SHAPE.OFFSET):
+            half_width = d
+            half_height = d / 2.0
+        else:
+            half_width = half_height = d / 2.0
+
+    # The center of the rectangle (which is not the center of an offset pad)
+    b = geometry.bounds(pad)
+    cx, cy = placement.point((b[0] + b[2]) / 2.0, (b[1] + b[3]) / 2.0)
+    s, c = geometry.sin_cos(placement.rotation_angle(pad.rotation.angle))
+
+    return (RECTANGLE, (cx, cy, c, s, half_width, half_height), ((x, y),), layers)
+
+def _contains(kind, shape, x, y):
+    """
+    :returns: Whether the point ``(x, y)`` lies within copper.
+    """
+
+    if kind == WIRE:
+        x1, y1, x2, y2, curve, h = shape
+        return geometry.point_arc_distance(x, y, x1, y1, x2, y2, curve) <= h + TOLERANCE
+    elif kind == CIRCLE:
+        return math.hypot(x - shape[0], y - shape[1]) <= shape[2] + TOLERANCE
+    elif kind == RECTANGLE:
+        cx, cy, c, s, half_width, half_height = shape
+        dx = x - cx
+        dy = y - cy
+        return abs(dx * c + dy * s) <= half_width + TOLERANCE and abs(dy * c - dx * s) <= half_height + TOLERANCE
+
+    points, h = shape
+
+    if geometry.point_in_polygon(x, y, points):
+        return True
+
+    return any(geometry.point_segment_distance(x, y, p[0], p[1], q[0], q[1]) <= h + TOLERANCE
+               for p, q in zip(points, points[1:] + points[:1]))
+
+def _find(parent, i):
+    while parent[i] != i:
+        # (Path halving)
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+
+    return i
+
+def analyze_signal(signal, pads, cell_size = CELL_SIZE):
+    """
+    Determine the connectivity of the copper of a signal.
+
+    :param signal: A ``Signal``.
+    :param pads: A ``_Pads`` object for the board.
+    :param cell_size: The size of the cells of the spatial hash.
+
+    :returns: A ``Signal_Connectivity`` object.
+    """
+
+    # The items (or contacts), and their copper: (kind, shape, layers, bounds)
+    items = []
+    copper = []
+    # The connection points: (x, y, index of item, is the end of a wire)
+    points = []
+    unresolved = []
+    # The contacts, and their pads
+    contacts = {}
+
+    for item in signal.items:
+        if isinstance(item, primitives.Contact_Ref):
+            found = pads.find(item.element, item.pad)
+
+            if found == None:
+                unresolved.append(item)
+                continue
+
+            element, pad, placement = found
+            kind, shape, connections, layers = _pad_copper(pad, placement)
+            contacts[len(items)] = (element, pad)
+            b = placement.bounds(geometry.bounds(pad))
+        else:
+            layers = _layers(item)
+            c = _signal_copper(item) if layers != None else None
+
+            if c == None:
+                continue
+
+            kind, shape, connections = c
+            b = geometry.bounds(item)
+
+        index = len(items)
+        items.append(item)
+        copper.append((kind, shape, layers, b))
+
+        for x, y in connections:
+            points.append((x, y, index, kind == WIRE))
+
+    # The spatial hash: (column, row) -> [index of point]
+    grid = {}
+    floor = math.floor
+
+    for i, p in enumerate(points):
+        key = (int(floor(p[0] / cell_size)), int(floor(p[1] / cell_size)))
+        cell = grid.get(key)
+
+        if cell == None:
+            grid[key] = [i]
+        else:
+            cell.append(i)
+
+    parent = range(len(items))
+    connected = [False] * len(points)
+
+    for index, (kind, shape, layers, b) in enumerate(copper):
+        x1 = b[0] - TOLERANCE
+        y1 = b[1] - TOLERANCE
+        x2 = b[2] + TOLERANCE
+        y2 = b[3] + TOLERANCE
+
+        columns = xrange(int(floor(x1 / cell_size)), int(floor(x2 / cell_size)) + 1)
+        rows = xrange(int(floor(y1 / cell_size)), int(floor(y2 / cell_size)) + 1)
+
+        if len(columns) * len(rows) > len(points):
+            # (Large items, e.g. polygons, test every point)
+            candidates = xrange(len(points))
+        else:
+            candidates = [i for c in columns for r in rows for i in grid.get((c, r), ())]
+
+        for i in candidates:
+            x, y, other, _ = points[i]
+
+            if other == index or not (x1 <= x <= x2 and y1 <= y <= y2):
+                continue
+
+            other_layers = copper[other][2]
+
+            if other_layers[0] <= layers[1] and layers[0] <= other_layers[1] and _contains(kind, shape, x, y):
+                connected[i] = True
+                a = _find(parent, index)
+                b = _find(parent, other)
+
+                if a != b:
+                    parent[b] = a
+
+    # Collect the islands, in the order of their first items
+    islands = {}
+    result = []
+
+    for index, item in enumerate(items):
+        root = _find(parent, index)
+        island = islands.get(root)
+
+        if island == None:
+            island = islands[root] = Island()
+            result.append(island)
+
+        if contacts.has_key(index):
+            island.contacts.append(item)
+            island.pads.append(contacts[index])
+        else:
+            island.items.append(item)
+
+    stubs = []
+
+    for i, (x, y, index, is_wire_end) in enumerate(points):
+        if is_wire_end and not connected[i] and (len(stubs) == 0 or stubs[-1] is not items[index]):
+            stubs.append(items[index])
+
+    return Signal_Connectivity(signal, result, stubs, unresolved)
+
+class Connectivity(object):
+    """
+    The connectivity of the copper of each signal of a board.
+    """
+
+    def __init__(self, board, cell_size = CELL_SIZE):
+        """
+        :param board: A ``Board``.
+        :param cell_size: The size of the cells of the spatial hash of connection points.
+        """
+
+        pads = _Pads(board)
+
+        self.signals = [analyze_signal(s, pads, cell_size) for s in board.signals]
+        self._by_name = dict((s.signal.name, s) for s in self.signals)
+
+    def __getitem__(self, name):
+        """
+        :returns: The ``Signal_Connectivity`` of the signal named ``name``.
+        """
+
+        return self._by_name[name]
+
+    def __iter__(self):
+        return iter(self.signals)
+
+    def __len__(self):
+        return len(self.signals)
+
+    def open_signals(self):
+        """
+        :returns: A list of the ``Signal_Connectivity`` of the signals which are not routed.
+        """
+
+        return [s for s in self.signals if not s.is_routed()]
+
+    def stubs(self):
+        """
+        :returns: A list of ``(signal, wire)`` tuples of the wires of which an end is not connected to anything.
+        """
+
+        return [(s.signal, w) for s in self.signals for w in s.stubs]
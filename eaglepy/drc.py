@@ -0,0 +1,597 @@
+"""
+DRC
+===
+
+Checks the copper of a board against its design rules: the parameters of its ``Design_Rules`` (e.g.
+``mdWireWire`` and ``msDrill``), and the minimum widths, drills, and clearances of its net classes.
+
+Checks
+------
+
+* ``CLEARANCE``: the copper of different signals (or of pads which are not connected to a signal) on the same
+  layer is closer than the clearance between them. The clearance is the larger of the clearance between their
+  kinds of copper (wires, pads, SMDs and vias, e.g. ``mdWirePad``) and the clearance between their net classes.
+* ``WIDTH``: a wire or polygon of a signal is narrower than ``msWidth``, or than the width of its net class.
+* ``DRILL``: a via is drilled with a smaller drill than ``msDrill``, or than the drill of its net class; or a pad
+  or hole is drilled with a smaller drill than ``msDrill``.
+* ``ANNULAR_RING``: the restring of a pad or via whose diameter is specified is smaller than the rules require
+  (``rvPadTop``, limited by ``rlMinPadTop`` and ``rlMaxPadTop``, and ``rvViaOuter``, ``rlMinViaOuter`` and
+  ``rlMaxViaOuter``). Pads and vias whose diameter is ``auto`` are not checked.
+
+The copper of each item is modelled as in ``connectivity``, and placed on the copper layers which it occupies:
+wires, polygons, and SMDs on their layers, vias on the layers of their extent, and pads on every layer. Plain
+wires and polygons on copper layers are also checked. Polygons are checked using their outlines (the copper
+which EAGLE pours into them is not calculated, and is kept clear of other signals by EAGLE).
+
+Clearances
+----------
+
+The copper of each layer is split into *strokes*: line segments or arcs with a width (so a via is a stroke of
+length 0). The candidate pairs are found by sweep-and-prune within horizontal strips of the layer: the strokes of
+each strip are sorted by the left edges of their bounding boxes, and each is only compared to the strokes which
+follow it until their left edges are further to the right than its right edge (plus the largest clearance), so
+the number of comparisons is proportional to the number of nearby strokes. The distance between each candidate
+pair is then calculated exactly (see ``geometry.arc_distance()``). SMDs and rectangular pads are checked using
+their edges, and also by whether the copper of the other item lies within them.
+
+The layers are independent, so they are checked in parallel using a pool of processes.
+
+Usage
+-----
+
+    for v in board.check_design_rules():
+        print('{0} on layer {1} at {2}: {3:.3f}mm < {4:.3f}mm'.format(v.kind, v.layer, v.location, v.value, v.required))
+
+"""
+
+import connectivity
+import geometry
+import math
+import multiprocessing
+import primitives
+import re
+
+CLEARANCE = 'clearance'
+WIDTH = 'width'
+DRILL = 'drill'
+ANNULAR_RING = 'annular ring'
+
+# The kinds of copper, for the clearances between them
+WIRE = 0
+PAD = 1
+VIA = 2
+SMD = 3
+
+# The parameter which specifies the clearance between each pair of kinds of copper (wires use the clearance to
+# pads for SMDs, as in EAGLE)
+CLEARANCE_PARAMS = {(WIRE, WIRE): 'mdWireWire',
+                    (WIRE, PAD): 'mdWirePad',
+                    (WIRE, SMD): 'mdWirePad',
+                    (WIRE, VIA): 'mdWireVia',
+                    (PAD, PAD): 'mdPadPad',
+                    (PAD, VIA): 'mdPadVia',
+                    (VIA, VIA): 'mdViaVia',
+                    (PAD, SMD): 'mdSmdPad',
+                    (VIA, SMD): 'mdSmdVia',
+                    (SMD, SMD): 'mdSmdSmd'}
+
+# The values of the parameters which are not specified by a board (those of EAGLE's ``default.dru``)
+DEFAULT_PARAMS = {'mdWireWire': '8mil',
+                  'mdWirePad': '8mil',
+                  'mdWireVia': '8mil',
+                  'mdPadPad': '8mil',
+                  'mdPadVia': '8mil',
+                  'mdViaVia': '8mil',
+                  'mdSmdPad': '8mil',
+                  'mdSmdVia': '8mil',
+                  'mdSmdSmd': '8mil',
+                  'msWidth': '6mil',
+                  'msDrill': '24mil',
+                  'rvPadTop': '0.25',
+                  'rlMinPadTop': '10mil',
+                  'rlMaxPadTop': '20mil',
+                  'rvViaOuter': '0.25',
+                  'rlMinViaOuter': '8mil',
+                  'rlMaxViaOuter': '20mil'}
+
+# The number of millimeters in each unit of the values of parameters
+UNITS = {'mm': 1.0,
+         'mic': 0.001,
+         'mil': 0.0254,
+         'inch': 25.4}
+
+# The distance by which copper may violate a rule (to allow for rounding)
+TOLERANCE = 1e-6
+
+_value_pattern = re.compile(r'^\s*([-+0-9.eE]+)\s*([a-z]*)\s*$')
+
+def parse_value(value):
+    """
+    :param value: The value of a design rule parameter, e.g. ``'8mil'``, ``'0.35mm'`` or ``'0.25'``. Only the
+        first value of a parameter with several values (e.g. one for each layer) is used.
+
+    :raises: An ``Exception`` if the value is not a number (with an optional unit).
+
+    :returns: The value, in millimeters (or as a number, if it has no unit).
+    """
+
+    words = value.split()
+    match = _value_pattern.match(words[0] if len(words) > 0 else '')
+
+    if match == None or (match.group(2) and not UNITS.has_key(match.group(2))):
+        raise Exception('Invalid design rule value {0!r}.'.format(value))
+
+    return float(match.group(1)) * UNITS.get(match.group(2), 1.0)
+
+class Rules(object):
+    """
+    The design rules of a board.
+    """
+
+    def __init__(self, design_rules = None, classes = None):
+        """
+        :param design_rules: A ``Design_Rules`` object, or ``None`` to use the default rules.
+        :param classes: The ``Net_Class`` objects of the board.
+        """
+
+        params = dict(DEFAULT_PARAMS)
+
+        if design_rules != None:
+            params.update((p.name, p.value) for p in design_rules.params)
+
+        self.params = params
+        self.values = {}
+
+        # The minimum width and drill of each net class, and the clearance between each pair of classes
+        # (``(lower number, higher number) -> clearance``)
+        self.widths = {}
+        self.drills = {}
+        self.class_clearances = {}
+
+        for c in (classes if classes != None else ()):
+            self.widths[c.number] = c.width or 0
+            self.drills[c.number] = c.drill or 0
+
+            for clearance in c.clearances:
+                key = tuple(sorted((c.number, clearance.eagle_class)))
+                self.class_clearances[key] = max(self.class_clearances.get(key, 0), clearance.value or 0)
+
+        self.clearances = dict((kinds, self.value(name)) for kinds, name in CLEARANCE_PARAMS.iteritems())
+        self.clearances.update(((b, a), v) for (a, b), v in self.clearances.items())
+
+        self.max_clearance = max(self.clearances.values() + self.class_clearances.values())
+
+    def value(self, name):
+        """
+        :returns: The value of a parameter (see ``parse_value()``).
+        """
+
+        v = self.values.get(name)
+
+        if v == None:
+            v = self.values[name] = parse_value(self.params[name])
+
+        return v
+
+    def clearance(self, kind_a, kind_b, class_a = 0, class_b = 0):
+        """
+        :returns: The clearance between copper of two kinds (e.g. ``WIRE`` and ``PAD``) of signals of two classes.
+        """
+
+        c = self.clearances[(kind_a, kind_b)]
+        class_clearance = self.class_clearances.get((class_a, class_b) if class_a <= class_b else (class_b, class_a))
+
+        return c if class_clearance == None or class_clearance < c else class_clearance
+
+    def min_width(self, signal_class = 0):
+        return max(self.value('msWidth'), self.widths.get(signal_class, 0))
+
+    def min_drill(self):
+        return self.value('msDrill')
+
+    def min_via_drill(self, signal_class = 0):
+        return max(self.value('msDrill'), self.drills.get(signal_class, 0))
+
+    def restring(self, drill, via = False):
+        """
+        :returns: The restring which is required around a drill in a pad (or via) on the outer layers.
+        """
+
+        if via:
+            ratio, low, high = 'rvViaOuter', 'rlMinViaOuter', 'rlMaxViaOuter'
+        else:
+            ratio, low, high = 'rvPadTop', 'rlMinPadTop', 'rlMaxPadTop'
+
+        return min(max(drill * self.value(ratio), self.value(low)), self.value(high))
+
+class Violation(object):
+    """
+    A violation of a design rule.
+
+    * ``kind``: ``CLEARANCE``, ``WIDTH``, ``DRILL`` or ``ANNULAR_RING``.
+    * ``layer``: The layer of a clearance violation, or ``None``.
+    * ``items``: A tuple of the primitives which violate the rule (two, for a clearance violation). The
+      coordinates of the primitives of elements are relative to their packages.
+    * ``owners``: A tuple of the ``Signal`` or ``Element`` which contains each item (or ``None``, for a plain item).
+    * ``value``: The clearance, width, drill or restring.
+    * ``required``: The minimum which the rule requires.
+    * ``location``: The ``(x, y)`` position of the violation on the board.
+    """
+
+    __slots__ = ('kind', 'layer', 'items', 'owners', 'value', 'required', 'location')
+
+    def __init__(self, kind, layer, items, owners, value, required, location):
+        self.kind = kind
+        self.layer = layer
+        self.items = items
+        self.owners = owners
+        self.value = value
+        self.required = required
+        self.location = location
+
+    def __repr__(self):
+        return 'Violation({0!r}, {1!r}, {2!r}, {3:.4f}, {4:.4f})'.format(self.kind, self.layer, self.location,
+                                                                          self.value, self.required)
+
+class _Layer_Copper(object):
+    """
+    The strokes of the copper of a layer.
+
+    Each stroke is ``(x1, y1, x2, y2, curve, half width)``, with its bounding box, the index of its net, the class
+    of its net, its kind of copper (e.g. ``WIRE``), the corners of the area which it fills (or ``None``), and the
+    index of the item to which it belongs. Only these values are sent to the processes which check the layers.
+    """
+
+    def __init__(self, layer):
+        self.layer = layer
+        self.strokes = []
+        self.bounds = []
+        self.nets = []
+        self.classes = []
+        self.kinds = []
+        self.areas = []
+        self.items = []
+
+    def add(self, stroke, net, signal_class, kind, area, item):
+        x1, y1, x2, y2, curve, h = stroke
+
+        if curve:
+            b = geometry.arc_bounds(x1, y1, x2, y2, curve, h)
+        else:
+            b = (min(x1, x2) - h, min(y1, y2) - h, max(x1, x2) + h, max(y1, y2) + h)
+
+        self.strokes.append(stroke)
+        self.bounds.append(b)
+        self.nets.append(net)
+        self.classes.append(signal_class)
+        self.kinds.append(kind)
+        self.areas.append(area)
+        self.items.append(item)
+
+def _rectangle(shape):
+    """
+    :returns: The edges (as strokes) and corners of a ``connectivity.RECTANGLE``.
+    """
+
+    cx, cy, c, s, half_width, half_height = shape
+    corners = [(cx + c * dx - s * dy, cy + s * dx + c * dy)
+               for dx, dy in ((-half_width, -half_height), (half_width, -half_height),
+                              (half_width, half_height), (-half_width, half_height))]
+
+    edges = [(p[0], p[1], q[0], q[1], 0, 0) for p, q in zip(corners, corners[1:] + corners[:1])]
+
+    return edges, corners
+
+def _strokes(kind, shape):
+    """
+    :returns: The strokes of the copper of an item (see ``connectivity``), and the corners of the area which it
+        fills (or ``None``).
+    """
+
+    if kind == connectivity.WIRE:
+        x1, y1, x2, y2, curve, h = shape
+        return [(x1, y1, x2, y2, float(curve or 0), h)], None
+    elif kind == connectivity.CIRCLE:
+        x, y, r = shape
+        return [(x, y, x, y, 0, r)], None
+    elif kind == connectivity.RECTANGLE:
+        return _rectangle(shape)
+
+    points, h = shape
+
+    # The curve of each vertex is the angle of the edge to the next vertex
+    return [(p[0], p[1], q[0], q[1], float(p[2] or 0), h) for p, q in zip(points, points[1:] + points[:1])], None
+
+def _candidates(bounds, nets, margin):
+    """
+    Find the pairs of strokes of different nets whose bounding boxes are within ``margin`` of each other.
+
+    The strokes are divided into horizontal strips (each stroke is added to the strips which its bounding box,
+    extended upwards by ``margin``, overlaps), and the strokes of each strip are swept from left to right. A pair
+    is only returned by the strip which contains the higher of the bottoms of their bounding boxes.
+
+    :returns: A list of ``(index, other index)`` tuples.
+    """
+
+    count = len(bounds)
+
+    if count == 0:
+        return []
+
+    bottom = min(b[1] for b in bounds)
+    top = max(b[3] for b in bounds) + margin
+    strip_count = max(1, int(math.sqrt(count)) // 2)
+    height = (top - bottom) / strip_count or 1.0
+
+    strips = [[] for _ in xrange(strip_count)]
+    last_strip = strip_count - 1
+
+    for i in sorted(xrange(count), key = lambda i: bounds[i][0]):
+        b = bounds[i]
+
+        for s in xrange(min(int((b[1] - bottom) / height), last_strip), min(int((b[3] + margin - bottom) / height), last_strip) + 1):
+            strips[s].append(i)
+
+    pairs = []
+
+    for s, strip in enumerate(strips):
+        n = len(strip)
+
+        for position, i in enumerate(strip):
+            bi = bounds[i]
+            right = bi[2] + margin
+            low = bi[1] - margin
+            high = bi[3] + margin
+            net = nets[i]
+
+            for k in xrange(position + 1, n):
+                j = strip[k]
+                bj = bounds[j]
+
+                if bj[0] > right:
+                    break
+
+                if bj[1] <= high and low <= bj[3] and nets[j] != net:
+                    # (The strip of the higher bottom)
+                    if min(int((max(bi[1], bj[1]) - bottom) / height), last_strip) == s:
+                        pairs.append((i, j))
+
+    return pairs
+
+def check_layer(copper, rules):
+    """
+    Check the clearances between the copper of a layer.
+
+    :param copper: A ``_Layer_Copper`` object.
+    :param rules: The ``Rules``.
+
+    :returns: A list of ``(index of item, index of other item, clearance, required clearance, location)`` tuples,
+        with one tuple for each pair of items which are too close (the closest of their strokes).
+    """
+
+    strokes = copper.strokes
+    bounds = copper.bounds
+    classes = copper.classes
+    kinds = copper.kinds
+    areas = copper.areas
+    items = copper.items
+    clearance = rules.clearance
+    arc_distance = geometry.arc_distance
+    point_in_polygon = geometry.point_in_polygon
+
+    # (item, other item) -> (clearance, required clearance, location)
+    found = {}
+
+    for i, j in _candidates(bounds, copper.nets, rules.max_clearance):
+        bi = bounds[i]
+        bj = bounds[j]
+        required = clearance(kinds[i], kinds[j], classes[i], classes[j])
+
+        # The gap between the bounding boxes is a lower bound of the distance
+        if bj[1] - bi[3] >= required or bi[1] - bj[3] >= required or bj[0] - bi[2] >= required:
+            continue
+
+        a = strokes[i]
+        b = strokes[j]
+
+        if ((areas[i] != None and point_in_polygon(b[0], b[1], areas[i])) or
+                (areas[j] != None and point_in_polygon(a[0], a[1], areas[j]))):
+            d = 0.0
+        else:
+            d = max(arc_distance(a[:5], b[:5]) - a[5] - b[5], 0.0)
+
+        if d < required - TOLERANCE:
+            key = (items[i], items[j]) if items[i] < items[j] else (items[j], items[i])
+            previous = found.get(key)
+
+            if previous == None or d < previous[0]:
+                location = ((max(bi[0], bj[0]) + min(bi[2], bj[2])) / 2.0, (max(bi[1], bj[1]) + min(bi[3], bj[3])) / 2.0)
+                found[key] = (d, required, location)
+
+    return [key + value for key, value in sorted(found.iteritems())]
+
+def _check_layer(args):
+    # ``Pool.map`` passes a single argument
+    return check_layer(*args)
+
+class _Collector(object):
+    """
+    Collects the copper of a board, and the violations of the rules which apply to single items.
+    """
+
+    def __init__(self, board, rules):
+        self.rules = rules
+        self.layers = {}
+        self.violations = []
+
+        # The items, and the signals or elements which contain them (in the order in which they were added)
+        self.items = []
+        self.owners = []
+
+        # The copper layers which are used (pads and vias are only placed on these)
+        self.used_layers = set(connectivity.COPPER_LAYERS)
+
+        # (element name, pad name) -> signal
+        contacts = {}
+        signal_items = []
+
+        for net, signal in enumerate(board.signals):
+            for item in signal.items:
+                if isinstance(item, primitives.Contact_Ref):
+                    contacts[(item.element, item.pad)] = (net, signal)
+                else:
+                    layers = connectivity._layers(item)
+
+                    if layers != None:
+                        signal_items.append((net, signal, item, layers))
+
+                        if not isinstance(item, primitives.Via):
+                            self.used_layers.add(layers[0])
+
+        plain_items = []
+
+        for item in board.plain_items:
+            if isinstance(item, primitives.Hole):
+                self.check_drill(item, None, rules.min_drill())
+            elif isinstance(item, (primitives.Wire, primitives.Polygon)):
+                layers = connectivity._layers(item)
+
+                if layers != None:
+                    plain_items.append((item, layers))
+                    self.used_layers.add(layers[0])
+
+        # (SMDs are only placed on the outer layers, which are always used)
+        nets = len(board.signals)
+
+        for element in board.elements:
+            placement = geometry.Placement(element)
+
+            for item in element.package.items.of_type((primitives.Pad, primitives.SMD, primitives.Hole)):
+                if isinstance(item, primitives.Hole):
+                    self.check_drill(item, element, rules.min_drill())
+                    continue
+
+                net, signal = contacts.get((element.name, item.name), (None, None))
+
+                if net == None:
+                    # A pad which is not connected to a signal is a net by itself
+                    net = nets
+                    nets += 1
+
+                signal_class = signal.signal_class if signal != None else 0
+                kind, shape, _, layers = connectivity._pad_copper(item, placement)
+
+                if isinstance(item, primitives.Pad):
+                    self.check_drill(item, element, rules.min_drill())
+                    self.check_restring(item, element, False)
+                    self.add(item, element, net, signal_class, PAD, kind, shape, layers)
+                else:
+                    self.add(item, element, net, signal_class, SMD, kind, shape, layers)
+
+        for net, signal, item, layers in signal_items:
+            signal_class = signal.signal_class or 0
+
+            if isinstance(item, primitives.Via):
+                self.check_drill(item, signal, rules.min_via_drill(signal_class))
+                self.check_restring(item, signal, True)
+                copper_kind = VIA
+            else:
+                self.check_width(item, signal, rules.min_width(signal_class))
+                copper_kind = WIRE
+
+            c = connectivity._signal_copper(item)
+
+            if c != None:
+                self.add(item, signal, net, signal_class, copper_kind, c[0], c[1], layers)
+
+        # Each plain item is a net by itself
+        for item, layers in plain_items:
+            c = connectivity._signal_copper(item)
+
+            if c != None:
+                self.add(item, None, nets, 0, WIRE, c[0], c[1], layers)
+                nets += 1
+
+    def add(self, item, owner, net, signal_class, copper_kind, kind, shape, layers):
+        index = len(self.items)
+        self.items.append(item)
+        self.owners.append(owner)
+
+        strokes, area = _strokes(kind, shape)
+
+        for layer in xrange(layers[0], layers[1] + 1):
+            if layer in self.used_layers:
+                copper = self.layers.get(layer)
+
+                if copper == None:
+                    copper = self.layers[layer] = _Layer_Copper(layer)
+
+                for stroke in strokes:
+                    copper.add(stroke, net, signal_class, copper_kind, area, index)
+
+    def violation(self, kind, item, owner, value, required, location):
+        self.violations.append(Violation(kind, None, (item,), (owner,), value, required, location))
+
+    def location(self, item, owner):
+        if hasattr(owner, 'package'):
+            return geometry.Placement(owner).point(item.x, item.y)
+
+        return (item.x, item.y)
+
+    def check_width(self, item, owner, required):
+        if item.width < required - TOLERANCE:
+            location = (item.x1, item.y1) if isinstance(item, primitives.Wire) else tuple(item.points[0][:2])
+            self.violation(WIDTH, item, owner, item.width, required, location)
+
+    def check_drill(self, item, owner, required):
+        if item.drill < required - TOLERANCE:
+            self.violation(DRILL, item, owner, item.drill, required, self.location(item, owner))
+
+    def check_restring(self, item, owner, via):
+        if item.diameter != None:
+            restring = (item.diameter - item.drill) / 2.0
+            required = self.rules.restring(item.drill, via)
+
+            if restring < required - TOLERANCE:
+                self.violation(ANNULAR_RING, item, owner, restring, required, self.location(item, owner))
+
+def check(board, workers = None):
+    """
+    Check a board against its design rules.
+
+    :param board: A ``Board``.
+    :param workers: The number of processes which check the clearances of the layers, or ``None`` to use one
+        process per CPU. If ``workers`` is ``1`` (or the board has copper on only one layer), the layers are
+        checked in the calling process.
+
+    :returns: A list of ``Violation`` objects: the violations of the rules for single items (in the order of the
+        items), then the clearance violations of each layer.
+    """
+
+    rules = Rules(board.design_rules, board.classes)
+    collector = _Collector(board, rules)
+    layers = [collector.layers[l] for l in sorted(collector.layers)]
+    tasks = [(copper, rules) for copper in layers]
+
+    if workers == 1 or len(tasks) <= 1:
+        results = map(_check_layer, tasks)
+    else:
+        pool = multiprocessing.Pool(min(workers or multiprocessing.cpu_count(), len(tasks)))
+
+        try:
+            results = pool.map(_check_layer, tasks)
+            pool.close()
+        finally:
+            pool.terminate()
+            pool.join()
+
+    violations = collector.violations
+    items = collector.items
+    owners = collector.owners
+
+    for copper, found in zip(layers, results):
+        for i, j, d, required, location in found:
+            violations.append(Violation(CLEARANCE, copper.layer, (items[i], items[j]), (owners[i], owners[j]), d,
+                                        required, location))
+
+    return violations
@@ -8,11 +8,27 @@ A Python package for creating, modifying, and writing Cadsoft EAGLE files
 """
 
 import attributes
+import binary
+import codec
+import connectivity
 import constants
+import drc
 import etree_utils
+import geometry
+import itertools
 import key_list
+import netlist
+import placement
 import primitives
+import ratsnest
+import references
+import source
+import spatial
 import StringIO
+import tracking
+import walker
+from columnar import Item_Columns
+from item_list import to_item_list
 
 # Attempt to use ``lxml``.
 # Otherwise, use ``xml``.
@@ -30,6 +46,18 @@ class Eagle:
     
     DEFAULT_VERSION = '6.5.0'
     
+    # The ``source.Source_Map`` of a file loaded with ``keep_source``
+    source = None
+    
+    # The ``tracking.Tracker`` of a file loaded with ``track_changes``
+    tracker = None
+    
+    # Attributes which are not part of the document (see ``tracking``)
+    TRANSIENT_ATTRIBUTES = ('source', 'tracker')
+    
+    # The attributes which contain child objects (see ``walker``)
+    CHILD_ATTRIBUTES = ('drawing',)
+    
     def __init__(self, 
                  drawing, 
                  xml_version = '1.0', 
@@ -43,18 +71,130 @@ class Eagle:
         self.compatibility = compatibility
     
     @staticmethod
-    def load(file_name):
+    def load(file_name, streaming = False, lazy_libraries = False, sections = None, columnar = False, cache = None, keep_source = False, track_changes = False):
         """
         Attempt to read an ``Eagle`` object from an XML file.
         
-        :param file_name: The name of the file. 
+        If ``streaming`` is ``True``, the file is read incrementally. Libraries, elements, signals, parts,
+        and sheets are parsed as soon as their closing tags are read, and their XML subtrees are then
+        discarded, so that the complete XML tree is never held in memory alongside the object model.
+        
+        If ``lazy_libraries`` is ``True``, the packages, symbols, and device sets of each library are not
+        parsed until they are first retrieved (see ``Library.parse``).
+        
+        If ``sections`` is specified, only the named sections of a board or schematic are parsed
+        (e.g. ``sections = {'elements', 'signals'}``); the names are the tag names of the sections
+        (see ``SECTION_DEPENDENCIES``). Sections which are required by a requested section are also 
+        parsed; libraries which are only required by another section are parsed on demand. All 
+        other sections are left empty, so an ``Eagle`` object loaded in this way should not be saved.
+        
+        ``file_name`` may also be a file object (opened in binary mode), e.g. a file received over a network 
+        connection, which is read from its current position. See also ``loads()``.
+        
+        If ``columnar`` is ``True``, the items of each signal are stored in an ``Item_Columns`` object, 
+        which stores wires and vias in NumPy arrays (see ``columnar``).
+        
+        If ``cache`` is specified, the file is restored from a snapshot if it has been loaded (through the
+        same cache) before, and is unchanged (see ``cache``). Libraries which are parsed on demand and 
+        partially-parsed files cannot be cached.
+        
+        If ``keep_source`` is ``True``, the parsed XML is kept, and ``save()`` copies the nodes of the objects 
+        which have not been modified rather than generating them (see ``source``). This cannot be combined
+        with ``streaming``, ``lazy_libraries``, ``columnar``, or ``cache``.
+        
+        If ``track_changes`` is ``True``, a ``tracking.Tracker`` is attached to the object (as ``tracker``), 
+        which records changes and notifies subscribers of them. If ``keep_source`` is also ``True``, ``save()`` 
+        uses the tracker to find the modified objects, rather than comparing every object with a snapshot.
+        This cannot be combined with ``lazy_libraries`` or ``columnar``. The tracker slows down every assignment
+        to the object model (in any document) while it is open, so call ``e.tracker.close()`` once the changes
+        have been made (or saved); it is also closed if the object is collected (see ``tracking``).
+        
+        :param file_name: The name of the file, or a file object. 
+        :param streaming: Whether to parse the file incrementally.
+        :param lazy_libraries: Whether to parse the contents of libraries on demand.
+        :param sections: The tag names of the sections to parse, or ``None`` to parse all sections.
+        :param columnar: Whether to store the wires and vias of signals in columns.
+        :param cache: A ``cache.Cache`` object, or ``None``.
+        :param keep_source: Whether to keep the parsed XML for incremental saving.
+        :param track_changes: Whether to track changes to the object.
         :throws: ``Exception`` if an error occurs while attempting to read the file.
         :returns: An ``Eagle`` object.
         
         """
         
-        # Parse the specified input file
-        dom = ElementTree.parse(file_name)
+        if keep_source and (streaming or lazy_libraries or columnar or cache != None):
+            raise Exception('Files which are loaded with keep_source cannot be loaded with streaming, lazy_libraries, columnar, or cache.')
+        
+        if track_changes and (lazy_libraries or columnar):
+            raise Exception('Files which are loaded with lazy_libraries or columnar cannot be tracked.')
+        
+        if cache != None:
+            if lazy_libraries or sections != None:
+                raise Exception('Files which are loaded with lazy_libraries or sections cannot be cached.')
+            
+            e = cache.load(file_name, streaming, columnar)
+        else:
+            sections, lazy_libraries = resolve_sections(sections, lazy_libraries)
+            
+            if streaming:
+                e = Eagle._load_streaming(file_name, lazy_libraries, sections, columnar)
+            else:
+                if keep_source:
+                    # The contents of the file are kept, so that the bytes of unchanged nodes can be copied
+                    if hasattr(file_name, 'read'):
+                        data = file_name.read()
+                    else:
+                        f = open(file_name, 'rb')
+                        
+                        try:
+                            data = f.read()
+                        finally:
+                            f.close()
+                    
+                    file_name = StringIO.StringIO(data)
+                
+                # Parse the specified input file
+                dom = ElementTree.parse(file_name)
+                
+                e = Eagle._parse_root(dom, dom.getroot(), lazy_libraries = lazy_libraries, sections = sections, columnar = columnar)
+        
+        if track_changes:
+            e.tracker = tracking.Tracker(e)
+        
+        if keep_source:
+            e.source = source.Source_Map(e, dom.getroot(), e.tracker, data)
+        
+        return e
+    
+    @staticmethod
+    def loads(data, **kwargs):
+        """
+        Attempt to read an ``Eagle`` object from a string containing the contents of an XML file.
+        
+        :param data: The contents of the file (a byte string).
+        :param kwargs: The options accepted by ``load()`` (e.g. ``streaming``).
+        :throws: ``Exception`` if an error occurs while attempting to read the data.
+        :returns: An ``Eagle`` object.
+        
+        """
+        
+        return Eagle.load(StringIO.StringIO(data), **kwargs)
+    
+    @staticmethod
+    def _parse_root(dom, n_eagle, drawing = None, lazy_libraries = False, sections = None, columnar = False):
+        """
+        Create an ``Eagle`` object from the root node of a parsed file.
+        
+        :param dom: The ``ElementTree`` containing ``n_eagle``.
+        :param n_eagle: The root (``eagle``) node.
+        :param drawing: The already-parsed ``Drawing``, or ``None`` to parse it from ``n_eagle``.
+        :param lazy_libraries: Whether to parse the contents of libraries on demand.
+        :param sections: The tag names of the sections to parse, or ``None`` to parse all sections.
+        :param columnar: Whether to store the wires and vias of signals in columns.
+        :throws: ``Exception`` if the root node is invalid.
+        :returns: An ``Eagle`` object.
+        
+        """
         
         if hasattr(dom, 'docinfo'):
             xml_version = dom.docinfo.xml_version
@@ -63,9 +203,6 @@ class Eagle:
             xml_version = '1.0'
             encoding = 'utf-8'
         
-        # Get the Eagle node
-        n_eagle = dom.getroot()
-        
         if n_eagle.tag != constants.TAGS.EAGLE:
             raise Exception('Invalid tag name for root node--expecting {0}; got {1}.'.format(constants.TAGS.EAGLE, n_eagle.tag))
         
@@ -75,35 +212,255 @@ class Eagle:
         else:
             version = Eagle.DEFAULT_VERSION
         
-        # Get the drawing element
-        # There should only be one drawing per document.
-        n_drawing_arr = n_eagle.findall(constants.TAGS.DRAWING)
-        
-        if len(n_drawing_arr) == 0:
-            raise Exception('Document did not contain a {0} node.'.format(constants.TAGS.DRAWING))
-        elif len(n_drawing_arr) > 1:
-            raise Exception('Document contained multiple ({0}) {1} nodes; only 1 is supported.'.format(len(n_drawing_arr), constants.TAGS.DRAWING))
-        
-        n_drawing = n_drawing_arr[0]
-        
-        # Parse the drawing
-        drawing = Drawing.parse(n_drawing)
+        if drawing == None:
+            # Get the drawing element
+            # There should only be one drawing per document.
+            n_drawing_arr = n_eagle.findall(constants.TAGS.DRAWING)
+            
+            if len(n_drawing_arr) == 0:
+                raise Exception('Document did not contain a {0} node.'.format(constants.TAGS.DRAWING))
+            elif len(n_drawing_arr) > 1:
+                raise Exception('Document contained multiple ({0}) {1} nodes; only 1 is supported.'.format(len(n_drawing_arr), constants.TAGS.DRAWING))
+            
+            n_drawing = n_drawing_arr[0]
+            
+            # Parse the drawing
+            drawing = Drawing.parse(n_drawing, lazy_libraries = lazy_libraries, sections = sections, columnar = columnar)
 
         # Parse the compatibility
         compatibility = etree_utils.parse_grandchildren_of_class(n_eagle, Note)
         
         return Eagle(drawing, xml_version, encoding, version, compatibility)
+    
+    @staticmethod
+    def _load_streaming(file_name, lazy_libraries = False, sections = None, columnar = False):
+        """
+        Read an ``Eagle`` object from an XML file using ``iterparse``.
+        
+        Each library, element, signal, part, and sheet is parsed when its end tag is reached, and its
+        node is then removed from the tree. The remaining (small) sections of the board or schematic 
+        are parsed when the end tag of the board or schematic is reached.
+        
+        :param file_name: The name of the file, or a file object. 
+        :param lazy_libraries: Whether to parse the contents of libraries on demand.
+        :param sections: The tag names of the sections to parse, or ``None`` to parse all sections.
+        :param columnar: Whether to store the wires and vias of signals in columns.
+        :throws: ``Exception`` if an error occurs while attempting to read the file.
+        :returns: An ``Eagle`` object.
+        
+        """
+        
+        context = ElementTree.iterparse(file_name, events = ('start', 'end'))
+        
+        # The currently-open nodes, from the root down
+        path = []
+        
+        n_eagle = None
+        n_document = None
+        document = None
+        drawing = None
+        
+        for event, node in context:
+            if event == 'start':
+                if n_eagle == None:
+                    n_eagle = node
+                elif len(path) == 2 and path[-1].tag == constants.TAGS.DRAWING:
+                    # The board or schematic is created up front, so that elements, parts, and 
+                    # sheets can be resolved against it while it is being read.
+                    if node.tag == constants.TAGS.BOARD:
+                        n_document = node
+                        document = Board()
+                    elif node.tag == constants.TAGS.SCHEMATIC:
+                        n_document = node
+                        document = Schematic()
+                    
+                path.append(node)
+                continue
+            
+            path.pop()
+            
+            if n_document != None and len(path) > 1 and path[-2] is n_document:
+                # A child of a section of the board or schematic (e.g. a library within libraries)
+                parent = path[-1]
+                key = (parent.tag, node.tag)
+                
+                if STREAMED_NODES.has_key(key):
+                    if sections == None or parent.tag in sections:
+                        STREAMED_NODES[key](document, node, lazy_libraries, columnar)
+                        
+                    parent.remove(node)
+                    
+            elif node is n_document:
+                # Parse the remaining sections, then add the sections which have already been read.
+                parsed = document.__class__.parse(node, lazy_libraries, sections)
+                
+                for a in STREAMED_ATTRIBUTES[node.tag]:
+                    setattr(parsed, a, getattr(document, a))
+                    
+                document = parsed
+                path[-1].remove(node)
+                n_document = None
+                
+            elif node.tag == constants.TAGS.DRAWING and len(path) == 1:
+                drawing = Drawing.parse(node, document, lazy_libraries)
+                node.clear()
+        
+        if n_eagle == None:
+            raise Exception('Document did not contain a {0} node.'.format(constants.TAGS.EAGLE))
+        
+        if drawing == None:
+            raise Exception('Document did not contain a {0} node.'.format(constants.TAGS.DRAWING))
+        
+        if hasattr(context, 'root') and hasattr(context.root, 'getroottree'):
+            dom = context.root.getroottree()
+        else: # etree, not lxml
+            dom = None
+        
+        return Eagle._parse_root(dom, n_eagle, drawing)
 
+    @staticmethod
+    def load_binary(file_name):
+        """
+        Read an ``Eagle`` object from a file written by ``save_binary()``. Only the classes of the object model
+        can be created, so reading a file does not run code which is named by the file (see ``binary``).
+        
+        :param file_name: The name of the file, or a file object (opened in binary mode).
+        :throws: ``Exception`` if the file is not valid, or names a class which is not part of the object model.
+        :returns: An ``Eagle`` object.
+        
+        """
+        
+        if hasattr(file_name, 'read'):
+            e = binary.load(file_name)
+        else:
+            f = open(file_name, 'rb')
+            
+            try:
+                e = binary.load(f)
+            finally:
+                f.close()
+        
+        if not isinstance(e, Eagle):
+            raise Exception('File did not contain an {0} object.'.format(Eagle.__name__))
+        
+        return e
+    
+    def save_binary(self, file_name):
+        """
+        Write the object to a file in the binary format (see ``binary``), which is much faster to read than XML.
+        
+        Objects which were loaded with ``lazy_libraries`` or ``columnar`` cannot be written in this format.
+        
+        :param file_name: The name of the file to write, or a file object (opened in binary mode).
+        :raises: An ``Exception`` if an error occurs while attempting to write the file.
+        :returns: ``None``.
+        
+        """
+        
+        data = binary.dumps(self)
+        
+        if hasattr(file_name, 'write'):
+            file_name.write(data)
+        else:
+            f = open(file_name, 'wb')
+            f.write(data)
+            f.close()
+    
     def save(self, file_name):
         """
         Attempt to write the object to an XML file. 
         
-        :param file_name: The name of the file to write. 
+        The file is written incrementally: the node of each child of a large container (e.g. each signal of a
+        board) is written as soon as it is complete, so the tree of the entire document is never held in memory.
+        
+        If the object was loaded with ``keep_source``, the original nodes of unmodified objects are written.
+        
+        :param file_name: The name of the file to write, or a file object (opened in binary mode). 
         :raises: An ``Exception`` if an error occurs while attempting to write the file.
         :returns: ``None``.
         
         """
-
+        
+        if not hasattr(ElementTree, 'xmlfile'):
+            xml_str = self._dumps_tree()
+            
+            if hasattr(file_name, 'write'):
+                file_name.write(xml_str)
+            else:
+                f = open(file_name, 'w')
+                f.write(xml_str);
+                f.close()
+                
+            return
+        
+        if hasattr(file_name, 'write'):
+            self._write(file_name)
+        else:
+            f = open(file_name, 'wb')
+            
+            try:
+                self._write(f)
+            finally:
+                f.close()
+    
+    def dumps(self):
+        """
+        Write the object to a string.
+        
+        :raises: An ``Exception`` if an error occurs while attempting to write the object.
+        :returns: The contents of the XML file (a byte string).
+        
+        """
+        
+        if not hasattr(ElementTree, 'xmlfile'):
+            return self._dumps_tree()
+        
+        io = StringIO.StringIO()
+        self._write(io)
+        
+        return io.getvalue()
+    
+    def walk(self, *visitors):
+        """
+        Visit the objects of the file in one traversal, calling the handlers of each visitor (see ``walker``).
+        
+        :param visitors: ``walker.Visitor`` objects.
+        """
+        
+        walker.walk(self, *visitors)
+    
+    def write(self, writer):
+        n = ElementTree.Element(constants.TAGS.EAGLE)
+        n.attrib[constants.ATTRIBUTES.VERSION] = self.version
+        
+        with writer.element(n) as w:
+            w.append(self.drawing)
+            
+            if len(self.compatibility) > 0:
+                with w.element(ElementTree.Element(constants.TAGS.COMPATIBILITY)) as ww:
+                    for nn in self.compatibility:
+                        ww.append(nn)
+    
+    def _write(self, f):
+        # Writes the same output as ``_dumps_tree()`` (unless source nodes are copied)
+        output = None
+        
+        if self.source != None:
+            self.source.reset()
+            
+            # The bytes of the source nodes can be copied if the encoding is unchanged
+            if self.source.data != None and (self.source.encoding or '').lower() == self.encoding.lower():
+                output = f
+            
+        with ElementTree.xmlfile(f, encoding=self.encoding) as xf:
+            xf.write_declaration()
+            xf.write_doctype('<!DOCTYPE eagle SYSTEM "eagle.dtd">')
+            
+            self.write(etree_utils.Stream_Writer(xf, source = self.source, output = output))
+        
+        f.write('\n')
+    
+    def _dumps_tree(self):
         # Create the tree by parsing a basic XML template. 
         # (This is the only way to set the document type and XML version.)
         io = StringIO.StringIO('<?xml version="' + self.xml_version + '" ?><!DOCTYPE eagle SYSTEM "eagle.dtd"><' + constants.TAGS.EAGLE + ' />')
@@ -123,12 +480,7 @@ class Eagle:
             for nn in self.compatibility:
                 nn.append_node(n_compatibility)
         
-        # Save    
-        xml_str = ElementTree.tostring(tree, xml_declaration=True, encoding=self.encoding, pretty_print=True)
-        
-        f = open(file_name, 'w')
-        f.write(xml_str);
-        f.close()
+        return ElementTree.tostring(tree, xml_declaration=True, encoding=self.encoding, pretty_print=True)
     
 
 class Approved_Error:
@@ -137,19 +489,19 @@ class Approved_Error:
     
     ATTR_MAP = { constants.ATTRIBUTES.HASH: attributes.ATTR_STRING}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.HASH, '_hash')])
+    
     def __init__(self, _hash):
         self._hash = _hash
         
     @classmethod
     def parse(cls, n):
-        _hash = attributes.parse(cls, n, constants.ATTRIBUTES.HASH)
-        return Approved_Error(_hash)
-    
+        return Approved_Error(*cls.CODEC.parse(n))
+        
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.APPROVED)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.HASH, self._hash)
+        self.CODEC.append(self, _n)
 
-class Attribute:
+class Attribute(object):
     TAG_NAME = constants.TAGS.ATTRIBUTE
     PARENT_TAG_NAME = constants.TAGS.ATTRIBUTES
     
@@ -171,6 +523,20 @@ class Attribute:
     DEFAULT_FONT = constants.FONT.PROPORTIONAL
     DEFAULT_RATIO = 8
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value', None),
+                                             codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.SIZE, 'size'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.FONT, 'font', DEFAULT_FONT, DEFAULT_FONT),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(0), attributes.Rotation(0)),
+                                             codec.Field(constants.ATTRIBUTES.ALIGN, 'align', DEFAULT_ALIGN, DEFAULT_ALIGN),
+                                             codec.Field(constants.ATTRIBUTES.DISPLAY, 'display', DEFAULT_DISPLAY, DEFAULT_DISPLAY),
+                                             codec.Field(constants.ATTRIBUTES.RATIO, 'ratio', DEFAULT_RATIO, DEFAULT_RATIO)])
+    
+    __slots__ = ('name', 'value', 'x', 'y', 'size', 'layer', 'font', 'rotation', 'align', 'display', 'ratio')
+    
     def __init__(self, name, value, x, y, size, layer, font, rotation, align, display, ratio =DEFAULT_RATIO):
         self.name = name
         self.value = value
@@ -186,38 +552,15 @@ class Attribute:
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        value = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.VALUE, None)
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        size = attributes.parse(cls, n, constants.ATTRIBUTES.SIZE)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        font = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.FONT, cls.DEFAULT_FONT)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation(0))
-        align = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ALIGN, cls.DEFAULT_ALIGN)
-        display = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.DISPLAY, cls.DEFAULT_DISPLAY)
-        ratio = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.RATIO, cls.DEFAULT_RATIO)
-        
-        return Attribute(name, value, x, y, size, layer, font, rotation, align, display, ratio)
+        return Attribute(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SIZE, self.size)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.FONT, self.font, self.DEFAULT_FONT)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation(0))
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ALIGN, self.align, self.DEFAULT_ALIGN)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DISPLAY, self.display, self.DEFAULT_DISPLAY)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.RATIO, self.ratio, self.DEFAULT_RATIO)
+        self.CODEC.append(self, _n)
 
 
 class Autorouter:
     TAG_NAME = constants.TAGS.AUTOROUTER
+    CHILD_ATTRIBUTES = ('passes',)
     
     def __init__(self, passes):
         self.passes = passes
@@ -236,6 +579,7 @@ class Autorouter:
         
 class Board:
     TAG_NAME = constants.TAGS.BOARD
+    CHILD_ATTRIBUTES = ('plain_items', 'libraries', 'attributes', 'variant_defs', 'classes', 'design_rules', 'autorouter', 'elements', 'signals', 'errors')
     
     def __init__(self, 
                  libraries = None, 
@@ -252,7 +596,7 @@ class Board:
         self.libraries = libraries if libraries else key_list.Key_List()
         self.elements = elements if elements else key_list.Key_List()
         self.signals = signals if signals else key_list.Key_List()
-        self.plain_items = plain_items if plain_items else []
+        self.plain_items = to_item_list(plain_items)
         self.classes = classes if classes else []
         self.design_rules = design_rules
         self.autorouter = autorouter
@@ -261,16 +605,42 @@ class Board:
         self.variant_defs = variant_defs if variant_defs else []
                 
     @classmethod
-    def parse(cls, n):
-        libraries = etree_utils.parse_grandchildren_of_class_into_od(n, Library)
-        signals = etree_utils.parse_grandchildren_of_class_into_od(n, Signal)
-        plain_items = etree_utils.parse_grandchildren_using_function(n, constants.TAGS.PLAIN, primitives.parse_item)
-        attribs = etree_utils.parse_grandchildren_of_class(n, Global_Attribute)
-        classes = etree_utils.parse_grandchildren_of_class(n, Net_Class)
-        design_rules = etree_utils.parse_child_of_class(n, Design_Rules)
-        autorouter = etree_utils.parse_child_of_class(n, Autorouter)
-        errors = etree_utils.parse_grandchildren_of_class(n, Approved_Error)    
-        variant_defs = etree_utils.parse_grandchildren_of_class(n, Variant_Def)
+    def parse(cls, n, lazy_libraries = False, sections = None, columnar = False):
+        """
+        Parse a board.
+        
+        :param n: The ``board`` node.
+        :param lazy_libraries: Whether to parse the contents of libraries on demand.
+        :param sections: The tag names of the sections to parse, or ``None`` to parse all sections.
+            Sections which are not parsed are left empty.
+        :param columnar: Whether to store the wires and vias of signals in columns.
+        
+        :returns: A ``Board`` object.
+        """
+        
+        sections, lazy_libraries = resolve_sections(sections, lazy_libraries)
+        requested = lambda tag: sections == None or tag in sections
+        
+        libraries = signals = plain_items = attribs = classes = design_rules = autorouter = errors = variant_defs = None
+        
+        if requested(constants.TAGS.LIBRARIES):
+            libraries = etree_utils.parse_grandchildren_of_class_into_od_with_obj(n, Library, lazy_libraries)
+        if requested(constants.TAGS.SIGNALS):
+            signals = etree_utils.parse_grandchildren_of_class_into_od_with_obj(n, Signal, columnar)
+        if requested(constants.TAGS.PLAIN):
+            plain_items = etree_utils.parse_grandchildren_using_function(n, constants.TAGS.PLAIN, primitives.parse_item)
+        if requested(constants.TAGS.ATTRIBUTES):
+            attribs = etree_utils.parse_grandchildren_of_class(n, Global_Attribute)
+        if requested(constants.TAGS.CLASSES):
+            classes = etree_utils.parse_grandchildren_of_class(n, Net_Class)
+        if requested(constants.TAGS.DESIGN_RULES):
+            design_rules = etree_utils.parse_child_of_class(n, Design_Rules)
+        if requested(constants.TAGS.AUTOROUTER):
+            autorouter = etree_utils.parse_child_of_class(n, Autorouter)
+        if requested(constants.TAGS.ERRORS):
+            errors = etree_utils.parse_grandchildren_of_class(n, Approved_Error)    
+        if requested(constants.TAGS.VARIANT_DEFS):
+            variant_defs = etree_utils.parse_grandchildren_of_class(n, Variant_Def)
         
         board = Board(libraries = libraries, 
                       signals = signals, 
@@ -282,30 +652,112 @@ class Board:
                       attributes = attribs, 
                       variant_defs = variant_defs)
 
-        board.elements = etree_utils.parse_grandchildren_of_class_into_od_with_obj(n, Element, board)
+        if requested(constants.TAGS.ELEMENTS):
+            board.elements = etree_utils.parse_grandchildren_of_class_into_od_with_obj(n, Element, board)
 
         return board
 
     def append_node(self, _n):
+        self.write(etree_utils.Tree_Writer(_n))
+        
+    def write(self, writer):
         # Add this node
-        n = ElementTree.SubElement(_n, constants.TAGS.BOARD)
+        with writer.element(ElementTree.Element(constants.TAGS.BOARD)) as w:
+            # Add the plain items
+            w.append_grandchildren(constants.TAGS.PLAIN, self.plain_items)
+            w.append_grandchildren(Library.PARENT_TAG_NAME, self.libraries)
+            w.append_grandchildren(Global_Attribute.PARENT_TAG_NAME, self.attributes)
+            w.append_grandchildren(Variant_Def.PARENT_TAG_NAME, self.variant_defs)
+            w.append_grandchildren(Net_Class.PARENT_TAG_NAME, self.classes)
+    
+            if self.design_rules != None:
+                w.append(self.design_rules)
+            
+            if self.autorouter != None:
+                w.append(self.autorouter)
+                
+            w.append_grandchildren(Element.PARENT_TAG_NAME, self.elements)
+            w.append_grandchildren(Signal.PARENT_TAG_NAME, self.signals)
+            w.append_grandchildren(Approved_Error.PARENT_TAG_NAME, self.errors, False)     
+            
+    def elements_using(self, obj):
+        """
+        Returns the elements which use a library or package (see ``references``).
+        
+        :param obj: A ``Library`` or ``Package``.
         
-        # Add the plain items
-        etree_utils.append_grandchildren_with_tag(n, constants.TAGS.PLAIN, self.plain_items)
-        etree_utils.append_grandchildren_of_class_from_od(n, Library, self.libraries)
-        etree_utils.append_grandchildren_of_class(n, Global_Attribute, self.attributes)
-        etree_utils.append_grandchildren_of_class(n, Variant_Def, self.variant_defs)
-        etree_utils.append_grandchildren_of_class(n, Net_Class, self.classes)
+        :returns: A list of the elements which reference ``obj``, in order.
+        """
+        
+        return self._element_index().users_of(obj)
+    
+    def elements_by_package(self):
+        """
+        Returns the elements of each package (see ``references``).
+        
+        :returns: A dict which maps each package which is used by an element to a list of the elements which use it.
+        """
+        
+        return self._element_index().as_dict(Package)
+    
+    def _element_index(self):
+        return references.get_index(self, 'elements', lambda: (self.elements,), 
+                                    lambda: references.Reverse_Index((self.elements,), ('library', 'package')))
 
-        if self.design_rules != None:
-            self.design_rules.append_node(n)
+    def check_design_rules(self, workers = None):
+        """
+        Checks the copper of the board against its design rules and the rules of its net classes (see ``drc``).
         
-        if self.autorouter != None:
-            self.autorouter.append_node(n)
-            
-        etree_utils.append_grandchildren_of_class_from_od(n, Element, self.elements)
-        etree_utils.append_grandchildren_of_class_from_od(n, Signal, self.signals)
-        etree_utils.append_grandchildren_of_class(n, Approved_Error, self.errors, False)     
+        :param workers: The number of processes which check the layers, or ``None`` to use one per CPU.
+        
+        :returns: A list of ``drc.Violation`` objects.
+        """
+        
+        return drc.check(self, workers)
+    
+    def connectivity(self):
+        """
+        Returns the connectivity of the copper of each signal, which is determined when it is first used and reused
+        until the board is modified (see ``connectivity`` and ``references``). Changes to the items of its signals are
+        only detected if the board is tracked; otherwise call ``references.changed(board)`` after making them.
+        
+        :returns: A ``connectivity.Connectivity`` object.
+        """
+        
+        return references.get_index(self, 'connectivity', lambda: (self.elements, self.signals), lambda: connectivity.Connectivity(self))
+    
+    def ratsnest(self):
+        """
+        Returns the airwires of each signal, which are determined when they are first used and reused until the
+        board is modified (see ``ratsnest``).
+        
+        :returns: A ``ratsnest.Ratsnest`` object.
+        """
+        
+        return references.get_index(self, 'ratsnest', lambda: (self.elements, self.signals), lambda: ratsnest.Ratsnest(self.connectivity()))
+    
+    def placed_items(self):
+        """
+        Returns the primitives of the packages of the elements, placed on the board. They are placed when they are
+        first used, and are reused until the elements are added or removed. Moving an element, or changing the
+        primitives of a package, is only detected if the board is tracked; otherwise call
+        ``references.changed(board)`` (see ``references``).
+        
+        :returns: A ``placement.Placed_Items`` object.
+        """
+        
+        return references.get_index(self, 'placed', lambda: (self.elements,), lambda: placement.Placed_Items(self.elements))
+    
+    def spatial_index(self):
+        """
+        Returns the spatial index of the items of the board, which is built when it is first used and reused
+        until the board is modified (see ``spatial``).
+        
+        :returns: A ``spatial.Board_Index``.
+        """
+        
+        return references.get_index(self, 'spatial', lambda: (self.elements, self.signals, self.plain_items), 
+                                    lambda: spatial.Board_Index(self))
 #         
 #     def get_package_dict(self):
 #         """
@@ -347,6 +799,7 @@ class Board:
 class Bus:
     TAG_NAME = constants.TAGS.BUS
     PARENT_TAG_NAME = constants.TAGS.BUSSES
+    CHILD_ATTRIBUTES = ('segments',)
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING}
     
@@ -377,22 +830,19 @@ class Clearance:
     ATTR_MAP = {constants.ATTRIBUTES.CLASS: attributes.ATTR_INT,
                 constants.ATTRIBUTES.VALUE: attributes.ATTR_FLOAT}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.CLASS, 'eagle_class'),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value')])
+    
     def __init__(self, eagle_class, value):
         self.eagle_class = eagle_class
         self.value = value
     
     @classmethod
     def parse(cls, n):
-        eagle_class = attributes.parse(cls, n, constants.ATTRIBUTES.CLASS)
-        value = attributes.parse(cls, n, constants.ATTRIBUTES.VALUE)
+        return Clearance(*cls.CODEC.parse(n))
         
-        return Clearance(eagle_class, value)
-   
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.CLEARANCE)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.CLASS, self.eagle_class)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value)
+        self.CODEC.append(self, _n)
    
 
 class Connect:
@@ -406,6 +856,11 @@ class Connect:
                 constants.ATTRIBUTES.PAD: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.ROUTE: attributes.ATTR_STRING}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.GATE, 'gate'),
+                                             codec.Field(constants.ATTRIBUTES.PIN, 'pin'),
+                                             codec.Field(constants.ATTRIBUTES.PAD, 'pad'),
+                                             codec.Field(constants.ATTRIBUTES.ROUTE, 'route', DEFAULT_ROUTE)])
+    
     def __init__(self, gate, pin, pad, route = DEFAULT_ROUTE):
         self.gate = gate
         self.pin = pin
@@ -414,20 +869,10 @@ class Connect:
         
     @classmethod
     def parse(cls, n):
-        gate = attributes.parse(cls, n, constants.ATTRIBUTES.GATE)
-        pin = attributes.parse(cls, n, constants.ATTRIBUTES.PIN)
-        pad = attributes.parse(cls, n, constants.ATTRIBUTES.PAD)
-        route = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROUTE, cls.DEFAULT_ROUTE)
-        
-        return Connect(gate, pin, pad, route)
+        return Connect(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.CONNECT)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.GATE, self.gate)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PIN, self.pin)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PAD, self.pad)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROUTE, self.route)
+        self.CODEC.append(self, _n)
         
 class Description:
     TAG_NAME = constants.TAGS.DESCRIPTION
@@ -457,6 +902,7 @@ class Description:
 
 class Design_Rules:
     TAG_NAME = constants.TAGS.DESIGN_RULES
+    CHILD_ATTRIBUTES = ('descriptions', 'params')
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING
                 }
@@ -488,9 +934,10 @@ class Design_Rules:
         for p in self.params:
             p.append_node(n)
 
-class Device:
+class Device(object):
     TAG_NAME = constants.TAGS.DEVICE
     PARENT_TAG_NAME = constants.TAGS.DEVICES
+    CHILD_ATTRIBUTES = ('connects', 'technologies')
 
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.PACKAGE: attributes.ATTR_STRING}
@@ -537,6 +984,10 @@ class Device_Attribute:
                 constants.ATTRIBUTES.VALUE: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.CONSTANT: attributes.ATTR_BOOL}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value'),
+                                             codec.Field(constants.ATTRIBUTES.CONSTANT, 'constant', DEFAULT_CONSTANT, DEFAULT_CONSTANT)])
+    
     def __init__(self, name, value, constant = DEFAULT_CONSTANT):
         self.name = name
         self.value = value
@@ -544,22 +995,15 @@ class Device_Attribute:
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        value = attributes.parse(cls, n, constants.ATTRIBUTES.VALUE)
-        constant = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.CONSTANT, cls.DEFAULT_CONSTANT)
-        
-        return Device_Attribute(name, value, constant)
+        return Device_Attribute(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.ATTRIBUTE)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.CONSTANT, self.constant, self.DEFAULT_CONSTANT)
+        self.CODEC.append(self, _n)
         
 class Device_Set:
     TAG_NAME = constants.TAGS.DEVICE_SET
     PARENT_TAG_NAME = constants.TAGS.DEVICE_SETS
+    CHILD_ATTRIBUTES = ('gates', 'devices')
     
     ATTR_MAP = { constants.ATTRIBUTES.NAME: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.PREFIX: attributes.ATTR_STRING,
@@ -627,6 +1071,7 @@ class Device_Set:
 
 class Drawing:
     TAG_NAME = constants.TAGS.DRAWING
+    CHILD_ATTRIBUTES = ('settings', 'grid', 'layers', 'document')
     
     def __init__(self, grid, document, layers = None, settings = None):
         self.grid = grid
@@ -635,29 +1080,31 @@ class Drawing:
         self.settings = settings if settings else []
         
     @staticmethod
-    def parse(n_drawing):
+    def parse(n_drawing, document = None, lazy_libraries = False, sections = None, columnar = False):
         settings = etree_utils.parse_grandchildren_of_class(n_drawing, Setting, False)
         layers = etree_utils.parse_grandchildren_of_class(n_drawing, Layer)
         grid = etree_utils.parse_child_of_class(n_drawing, Grid)
         
-        # An Eagle file is either
-        # 1. A schematic
-        # 2. A board
-        # 3. A library
-        
-        # Determine which type of file this is
-        board = n_drawing.find(constants.TAGS.BOARD)
-        schematic = n_drawing.find(constants.TAGS.SCHEMATIC)
-        library = n_drawing.find(constants.TAGS.LIBRARY)
-        
-        if board != None:
-            document = Board.parse(board)
-        elif schematic != None:
-            document = Schematic.parse(schematic)
-        elif library != None:
-            document = Library.parse(library)
-        else:
-            raise Exception('File did not contain a board, schematic, or library.')
+        # The document may already have been parsed (e.g. when streaming)
+        if document == None:
+            # An Eagle file is either
+            # 1. A schematic
+            # 2. A board
+            # 3. A library
+            
+            # Determine which type of file this is
+            board = n_drawing.find(constants.TAGS.BOARD)
+            schematic = n_drawing.find(constants.TAGS.SCHEMATIC)
+            library = n_drawing.find(constants.TAGS.LIBRARY)
+            
+            if board != None:
+                document = Board.parse(board, lazy_libraries, sections, columnar)
+            elif schematic != None:
+                document = Schematic.parse(schematic, lazy_libraries, sections)
+            elif library != None:
+                document = Library.parse(library, lazy_libraries)
+            else:
+                raise Exception('File did not contain a board, schematic, or library.')
     
         return Drawing(settings = settings, 
                        grid = grid, 
@@ -665,23 +1112,35 @@ class Drawing:
                        document = document)
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.DRAWING)
+        self.write(etree_utils.Tree_Writer(_n))
         
-        etree_utils.append_grandchildren_of_class(n, Setting, self.settings)
-            
-        # Add the grid
-        if self.grid != None:
-            self.grid.append_node(n)
-            
-        # Add the layers
-        etree_utils.append_grandchildren_of_class(n, Layer, self.layers)
-              
-        if self.document != None:
-            self.document.append_node(n)
+    def write(self, writer):
+        with writer.element(ElementTree.Element(constants.TAGS.DRAWING)) as w:
+            w.append_grandchildren(Setting.PARENT_TAG_NAME, self.settings)
+                
+            # Add the grid
+            if self.grid != None:
+                w.append(self.grid)
+                
+            # Add the layers
+            w.append_grandchildren(Layer.PARENT_TAG_NAME, self.layers)
+                  
+            if self.document != None:
+                w.append(self.document)
+    
+    def walk(self, *visitors):
+        """
+        Visit the objects of the drawing in one traversal, calling the handlers of each visitor (see ``walker``).
+        
+        :param visitors: ``walker.Visitor`` objects.
+        """
+        
+        walker.walk(self, *visitors)
 
-class Element:
+class Element(object):
     TAG_NAME = constants.TAGS.ELEMENT
     PARENT_TAG_NAME = constants.TAGS.ELEMENTS
+    CHILD_ATTRIBUTES = ('attributes',)
     
     DEFAULT_SMASHED = False
     DEFAULT_LOCKED = False
@@ -697,6 +1156,18 @@ class Element:
                 constants.ATTRIBUTES.LOCKED: attributes.ATTR_BOOL
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.LIBRARY, 'library', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.PACKAGE, 'package', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value'),
+                                             codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.SMASHED, 'smashed', DEFAULT_SMASHED, DEFAULT_SMASHED),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(), attributes.Rotation()),
+                                             codec.Field(constants.ATTRIBUTES.LOCKED, 'locked', DEFAULT_LOCKED, DEFAULT_LOCKED)])
+    
+    __slots__ = ('name', 'library', 'package', 'value', 'x', 'y', 'smashed', 'rotation', 'attributes', 'locked')
+    
     def __init__(self, name, 
                  library, 
                  package, 
@@ -720,43 +1191,35 @@ class Element:
         
     @classmethod
     def parse(cls, n, board):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
+        name, library_name, package_name, value, x, y, smashed, rotation, locked = cls.CODEC.parse(n)
         
-        library_name = attributes.parse(cls, n, constants.ATTRIBUTES.LIBRARY)
         library = board.libraries[library_name]
-        
-        package_name = attributes.parse(cls, n, constants.ATTRIBUTES.PACKAGE)
         package = library.packages[package_name]
         
-        value = attributes.parse(cls, n, constants.ATTRIBUTES.VALUE)
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)        
-        smashed = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SMASHED, cls.DEFAULT_SMASHED)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation())
-        locked = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.LOCKED, cls.DEFAULT_LOCKED)
         _attributes = etree_utils.parse_children_of_class(n, Attribute)
 
         return Element(name, library, package, value, x, y, smashed, rotation, _attributes, locked)
-
-    def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.ELEMENT)
         
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LIBRARY, self.library.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PACKAGE, self.package.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SMASHED, self.smashed, self.DEFAULT_SMASHED)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation())
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LOCKED, self.locked, self.DEFAULT_LOCKED)
+    def append_node(self, _n):
+        n = self.CODEC.append(self, _n)
         
         # Add the element attributes
         for a in self.attributes:
             a.append_node(n)
+    
+    def bounds(self):
+        """
+        Returns the bounding box of the primitives of the package, placed on the board. It is derived from the
+        bounding box of the package, which is cached (see ``Package.bounds()``).
+        
+        :returns: An ``(x_min, y_min, x_max, y_max)`` tuple, or ``None`` if the package has no primitives with a
+            bounding box.
+        """
+        
+        return geometry.Placement(self).bounds(self.package.bounds())
         
 
-class Gate:
+class Gate(object):
     TAG_NAME = constants.TAGS.GATE
     PARENT_TAG_NAME = constants.TAGS.GATES
     
@@ -770,6 +1233,13 @@ class Gate:
                 constants.ATTRIBUTES.ADD_LEVEL: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.SWAP_LEVEL: attributes.ATTR_INT}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.SYMBOL, 'symbol', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.ADD_LEVEL, 'add_level', DEFAULT_ADD_LEVEL, DEFAULT_ADD_LEVEL),
+                                             codec.Field(constants.ATTRIBUTES.SWAP_LEVEL, 'swap_level', DEFAULT_SWAP_LEVEL, DEFAULT_SWAP_LEVEL)])
+    
     def __init__(self, name, symbol, x, y, add_level = DEFAULT_ADD_LEVEL, swap_level = DEFAULT_SWAP_LEVEL):
         self.name = name
         self.symbol = symbol
@@ -780,25 +1250,13 @@ class Gate:
         
     @classmethod
     def parse(cls, n, lib):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        symbol_name = attributes.parse(cls, n, constants.ATTRIBUTES.SYMBOL)
+        name, symbol_name, x, y, add_level, swap_level = cls.CODEC.parse(n)
         symbol = lib.symbols[symbol_name]
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        add_level = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ADD_LEVEL, cls.DEFAULT_ADD_LEVEL)
-        swap_level = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SWAP_LEVEL, cls.DEFAULT_SWAP_LEVEL)
         
         return Gate(name, symbol, x, y, add_level, swap_level)
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.GATE)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SYMBOL, self.symbol.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ADD_LEVEL, self.add_level, self.DEFAULT_ADD_LEVEL)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SWAP_LEVEL, self.swap_level, self.DEFAULT_SWAP_LEVEL)
+        self.CODEC.append(self, _n)
         
         
 
@@ -811,20 +1269,19 @@ class Global_Attribute:
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.VALUE: attributes.ATTR_STRING}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value')])
+    
     def __init__(self, name, value):
         self.name = name
         self.value = value
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        value = attributes.parse(cls, n, constants.ATTRIBUTES.VALUE)
-        return Global_Attribute(name, value)
-    
+        return Global_Attribute(*cls.CODEC.parse(n))
+        
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value)
+        self.CODEC.append(self, _n)
 
 class Grid:
     TAG_NAME = constants.TAGS.GRID
@@ -840,6 +1297,16 @@ class Grid:
                     constants.ATTRIBUTES.ALT_UNIT: attributes.ATTR_STRING
                   }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.DISTANCE, 'distance'),
+                                             codec.Field(constants.ATTRIBUTES.UNIT_DIST, 'unit_dist'),
+                                             codec.Field(constants.ATTRIBUTES.UNIT, 'unit'),
+                                             codec.Field(constants.ATTRIBUTES.STYLE, 'style'),
+                                             codec.Field(constants.ATTRIBUTES.MULTIPLE, 'multiple'),
+                                             codec.Field(constants.ATTRIBUTES.DISPLAY, 'display'),
+                                             codec.Field(constants.ATTRIBUTES.ALT_DISTANCE, 'alt_distance'),
+                                             codec.Field(constants.ATTRIBUTES.ALT_UNIT_DIST, 'alt_unit_dist'),
+                                             codec.Field(constants.ATTRIBUTES.ALT_UNIT, 'alt_unit')])
+    
     def __init__(self, 
                  distance = 0.1, 
                  unit_dist = constants.UNIT.INCH, 
@@ -863,39 +1330,20 @@ class Grid:
         
     @classmethod
     def parse(cls, n):
-        distance = attributes.parse(cls, n, constants.ATTRIBUTES.DISTANCE)
-        unit_dist = attributes.parse(cls, n, constants.ATTRIBUTES.UNIT_DIST)
-        unit = attributes.parse(cls, n, constants.ATTRIBUTES.UNIT)
-        style = attributes.parse(cls, n, constants.ATTRIBUTES.STYLE)
-        multiple = attributes.parse(cls, n, constants.ATTRIBUTES.MULTIPLE)
-        display = attributes.parse(cls, n, constants.ATTRIBUTES.DISPLAY)
-        altdistance = attributes.parse(cls, n, constants.ATTRIBUTES.ALT_DISTANCE)
-        altunitdist = attributes.parse(cls, n, constants.ATTRIBUTES.ALT_UNIT_DIST)
-        altunit = attributes.parse(cls, n, constants.ATTRIBUTES.ALT_UNIT)
-        
-        return Grid(distance, unit_dist, unit, style, multiple, display, altdistance, altunitdist, altunit)
+        return Grid(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.GRID)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DISTANCE, self.distance)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.UNIT_DIST, self.unit_dist)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.UNIT, self.unit)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.STYLE, self.style)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.MULTIPLE, self.multiple)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DISPLAY, self.display)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ALT_DISTANCE, self.alt_distance)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ALT_UNIT_DIST, self.alt_unit_dist)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ALT_UNIT, self.alt_unit)
+        self.CODEC.append(self, _n)
         
 
 
 
 
 
-class Instance:
+class Instance(object):
     TAG_NAME = constants.TAGS.INSTANCE
     PARENT_TAG_NAME = constants.TAGS.INSTANCES
+    CHILD_ATTRIBUTES = ('attributes',)
     
     ATTR_MAP = {constants.ATTRIBUTES.PART: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.GATE: attributes.ATTR_STRING,
@@ -904,6 +1352,15 @@ class Instance:
                 constants.ATTRIBUTES.ROTATION: attributes.ATTR_ROT,
                 constants.ATTRIBUTES.SMASHED: attributes.ATTR_BOOL}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.PART, 'part', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.GATE, 'gate', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(0), attributes.Rotation(0)),
+                                             codec.Field(constants.ATTRIBUTES.SMASHED, 'smashed', False, False)])
+    
+    __slots__ = ('part', 'gate', 'x', 'y', 'rotation', 'attributes', 'smashed')
+    
     def __init__(self, part, gate, x, y, rotation = attributes.Rotation(0), attributes = None, smashed = False):
         self.part = part
         self.gate = gate
@@ -915,35 +1372,32 @@ class Instance:
 
     @classmethod
     def parse(cls, n, schematic):
+        part_name, gate_name, x, y, rotation, smashed = cls.CODEC.parse(n)
         
-        part_name = attributes.parse(cls, n, constants.ATTRIBUTES.PART)
         part = schematic.parts[part_name]
-        
-        gate_name = attributes.parse(cls, n, constants.ATTRIBUTES.GATE)
         gate = part.device_set.gates[gate_name]
         
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation(0))
-        smashed = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SMASHED, False)
-        
         _attributes = etree_utils.parse_children_of_class(n, Attribute)
         
         return Instance(part, gate, x, y, rotation, _attributes, smashed)
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.INSTANCE)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PART, self.part.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.GATE, self.gate.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation(0))
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SMASHED, self.smashed, False)
+        n = self.CODEC.append(self, _n)
         
         # Add the attributes
         for a in self.attributes:
             a.append_node(n)
+    
+    def bounds(self):
+        """
+        Returns the bounding box of the primitives of the symbol of the gate, placed on the sheet. It is derived
+        from the bounding box of the symbol, which is cached (see ``Symbol.bounds()``).
+        
+        :returns: An ``(x_min, y_min, x_max, y_max)`` tuple, or ``None`` if the symbol has no primitives with a
+            bounding box.
+        """
+        
+        return geometry.Placement(self).bounds(self.gate.symbol.bounds())
 
 class Layer:
     TAG_NAME = constants.TAGS.LAYER
@@ -957,6 +1411,13 @@ class Layer:
                 constants.ATTRIBUTES.ACTIVE: attributes.ATTR_BOOL
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NUMBER, 'number'),
+                                             codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.COLOR, 'color'),
+                                             codec.Field(constants.ATTRIBUTES.FILL, 'fill'),
+                                             codec.Field(constants.ATTRIBUTES.VISIBLE, 'visible'),
+                                             codec.Field(constants.ATTRIBUTES.ACTIVE, 'active')])
+    
     def __init__(self, number, name, color, fill, visible, active):
         self.number = number
         self.name = name
@@ -967,24 +1428,10 @@ class Layer:
             
     @classmethod
     def parse(cls, n):
-        number = attributes.parse(cls, n, constants.ATTRIBUTES.NUMBER)
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        color = attributes.parse(cls, n, constants.ATTRIBUTES.COLOR)
-        fill = attributes.parse(cls, n, constants.ATTRIBUTES.FILL)
-        visible = attributes.parse(cls, n, constants.ATTRIBUTES.VISIBLE)
-        active = attributes.parse(cls, n, constants.ATTRIBUTES.ACTIVE)
+        return Layer(*cls.CODEC.parse(n))
         
-        return Layer(number, name, color, fill, visible, active)
-    
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.LAYER)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NUMBER, self.number)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.COLOR, self.color)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.FILL, self.fill)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VISIBLE, self.visible)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ACTIVE, self.active)
+        self.CODEC.append(self, _n)
         
 
 
@@ -992,6 +1439,7 @@ class Layer:
 class Library:
     TAG_NAME = constants.TAGS.LIBRARY
     PARENT_TAG_NAME = constants.TAGS.LIBRARIES
+    CHILD_ATTRIBUTES = ('packages', 'symbols', 'device_sets')
     
     ATTR_MAP = { constants.ATTRIBUTES.NAME: attributes.ATTR_STRING
                 }
@@ -1008,10 +1456,34 @@ class Library:
         self.description = description
 
     @classmethod
-    def parse(cls, n):
+    def parse(cls, n, lazy = False):
+        """
+        Parse a library.
+        
+        If ``lazy`` is ``True``, the library retains its XML subtree, and each package, symbol, and 
+        device set is parsed only when it is first retrieved from ``packages``, ``symbols``, or 
+        ``device_sets`` (see ``key_list.Lazy_Key_List``). Parsing a device set parses the packages 
+        and symbols which it references.
+        
+        :param n: The ``library`` node.
+        :param lazy: Whether to parse the contents of the library on demand.
+        
+        :returns: A ``Library`` object.
+        """
+        
         name = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.NAME, None)
         description = etree_utils.parse_text(n, constants.TAGS.DESCRIPTION, None)
         
+        if lazy:
+            packages = etree_utils.parse_grandchildren_of_class_into_lazy_od(n, Package, Package.parse)
+            symbols = etree_utils.parse_grandchildren_of_class_into_lazy_od(n, Symbol, Symbol.parse)
+            
+            lib = Library(packages = packages, symbols = symbols, name = name, description = description)
+            
+            lib.device_sets = etree_utils.parse_grandchildren_of_class_into_lazy_od(n, Device_Set, lambda nn: Device_Set.parse(nn, lib))
+            
+            return lib
+        
         # Parse the packages and symbols, which don't have dependencies
         packages = etree_utils.parse_grandchildren_of_class_into_od(n, Package)
         symbols = etree_utils.parse_grandchildren_of_class_into_od(n, Symbol)
@@ -1025,16 +1497,42 @@ class Library:
         return lib
     
     def append_node(self, _n):
+        self.write(etree_utils.Tree_Writer(_n))
+        
+    def write(self, writer):
         # Add this node
-        n = ElementTree.SubElement(_n, constants.TAGS.LIBRARY)
+        n = ElementTree.Element(constants.TAGS.LIBRARY)
         
         attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name, None)
         
-        etree_utils.append_text_node_if_not_none(n, self.description, constants.TAGS.DESCRIPTION)
+        with writer.element(n) as w:
+            w.append_text(constants.TAGS.DESCRIPTION, self.description)
+                
+            w.append_grandchildren(Package.PARENT_TAG_NAME, self.packages, False)
+            w.append_grandchildren(Symbol.PARENT_TAG_NAME, self.symbols, False)
+            w.append_grandchildren(Device_Set.PARENT_TAG_NAME, self.device_sets, False)
             
-        etree_utils.append_grandchildren_of_class_from_od(n, Package, self.packages, False)
-        etree_utils.append_grandchildren_of_class_from_od(n, Symbol, self.symbols, False)
-        etree_utils.append_grandchildren_of_class_from_od(n, Device_Set, self.device_sets, False)
+    def users_of(self, obj):
+        """
+        Returns the devices which use a package, or the gates which use a symbol, within this library (see 
+        ``references``). (The elements of a board which use a package are returned by ``Board.elements_using()``.)
+        
+        :param obj: A ``Package`` or ``Symbol``.
+        
+        :returns: A list of the devices or gates which reference ``obj``, in order.
+        """
+        
+        def build():
+            containers = []
+            
+            for ds in self.device_sets:
+                containers.append(ds.gates)
+                containers.append(ds.devices)
+            
+            # (Adding a device set, or replacing the gates or devices of one, discards the index)
+            return references.Reverse_Index(containers, ('symbol', 'package'), [self.device_sets] + list(self.device_sets))
+        
+        return references.get_index(self, 'users', lambda: (self.device_sets,), build).users_of(obj)
         
 
     
@@ -1042,10 +1540,14 @@ class Library:
 class Net:
     TAG_NAME = constants.TAGS.NET
     PARENT_TAG_NAME = constants.TAGS.NETS
+    CHILD_ATTRIBUTES = ('segments',)
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.CLASS: attributes.ATTR_INT}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.CLASS, 'net_class')])
+    
     def __init__(self, 
                  name, 
                  net_class, 
@@ -1056,18 +1558,14 @@ class Net:
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        net_class = attributes.parse(cls, n, constants.ATTRIBUTES.CLASS)
+        name, net_class = cls.CODEC.parse(n)
         
         segments = etree_utils.parse_children_using_function(n, Segment.parse, constants.TAGS.SEGMENT)
             
         return Net(name, net_class, segments)
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.NET)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.CLASS, self.net_class)
+        n = self.CODEC.append(self, _n)
         
         # Add the segments
         for s in self.segments:
@@ -1077,12 +1575,18 @@ class Net:
 class Net_Class:
     TAG_NAME = constants.TAGS.CLASS
     PARENT_TAG_NAME = constants.TAGS.CLASSES
+    CHILD_ATTRIBUTES = ('clearances',)
     
     ATTR_MAP = {constants.ATTRIBUTES.NUMBER: attributes.ATTR_INT,
                 constants.ATTRIBUTES.NAME: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.WIDTH: attributes.ATTR_FLOAT,
                 constants.ATTRIBUTES.DRILL: attributes.ATTR_FLOAT}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NUMBER, 'number'),
+                                             codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.WIDTH, 'width'),
+                                             codec.Field(constants.ATTRIBUTES.DRILL, 'drill')])
+    
     def __init__(self, 
                  number, 
                  name, 
@@ -1097,23 +1601,15 @@ class Net_Class:
 
     @classmethod
     def parse(cls, n):
-        number = attributes.parse(cls, n, constants.ATTRIBUTES.NUMBER)
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        width = attributes.parse(cls, n, constants.ATTRIBUTES.WIDTH)
-        drill = attributes.parse(cls, n, constants.ATTRIBUTES.DRILL)
+        number, name, width, drill = cls.CODEC.parse(n)
         
         # Parse the clearances
         clearances = etree_utils.parse_children_of_class(n, Clearance)
         
         return Net_Class(number, name, width, drill, clearances)
-
-    def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.CLASS)
         
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NUMBER, self.number)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.WIDTH, self.width)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DRILL, self.drill)
+    def append_node(self, _n):
+        n = self.CODEC.append(self, _n)
         
         # Add the clearances
         for c in self.clearances:
@@ -1160,6 +1656,7 @@ class Note:
 class Package:
     TAG_NAME = constants.TAGS.PACKAGE
     PARENT_TAG_NAME = constants.TAGS.PACKAGES
+    CHILD_ATTRIBUTES = ('items',)
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING}
     
@@ -1169,7 +1666,7 @@ class Package:
                  items = None):
         self.name = name
         self.description = description
-        self.items = items if items else []
+        self.items = to_item_list(items)
         
     @classmethod
     def parse(cls, n):
@@ -1192,6 +1689,17 @@ class Package:
         # Add the primitives
         for i in self.items:
             i.append_node(n)
+    
+    def bounds(self):
+        """
+        Returns the bounding box of the primitives, which is calculated when it is first used and reused until the
+        items are modified (see ``item_list``). Moving or resizing a primitive is only detected if the package is
+        tracked; otherwise call ``items.changed()`` after making such changes.
+        
+        :returns: An ``(x_min, y_min, x_max, y_max)`` tuple, or ``None`` if no primitive has a bounding box.
+        """
+        
+        return self.items.bounds()
 
 class Param:
     TAG_NAME = constants.TAGS.PARAM
@@ -1200,26 +1708,24 @@ class Param:
                 constants.ATTRIBUTES.VALUE: attributes.ATTR_STRING
                 }
         
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value')])
+    
     def __init__(self, name, value):
         self.name = name
         self.value = value
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        value = attributes.parse(cls, n, constants.ATTRIBUTES.VALUE)
+        return Param(*cls.CODEC.parse(n))
         
-        return Param(name, value)
-    
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.PARAM)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value)
+        self.CODEC.append(self, _n)
         
-class Part:
+class Part(object):
     TAG_NAME = constants.TAGS.PART
     PARENT_TAG_NAME = constants.TAGS.PARTS
+    CHILD_ATTRIBUTES = ('attributes', 'variants')
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.LIBRARY: attributes.ATTR_STRING,
@@ -1228,6 +1734,15 @@ class Part:
                 constants.ATTRIBUTES.VALUE: attributes.ATTR_STRING,
                 constants.ATTRIBUTES.TECHNOLOGY: attributes.ATTR_STRING}
 
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.LIBRARY, 'library', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.DEVICE_SET, 'device_set', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.DEVICE, 'device', ref = True),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value', None),
+                                             codec.Field(constants.ATTRIBUTES.TECHNOLOGY, 'technology', "", "")])
+    
+    __slots__ = ('name', 'library', 'device_set', 'device', 'value', 'attributes', 'technology', 'variants')
+    
     def __init__(self, 
                  name, 
                  library, 
@@ -1248,34 +1763,19 @@ class Part:
 
     @classmethod
     def parse(cls, n, schematic):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
+        name, library_name, device_set_name, device_name, value, technology = cls.CODEC.parse(n)
         
-        library_name = attributes.parse(cls, n, constants.ATTRIBUTES.LIBRARY)
         library = schematic.libraries[library_name]
-        
-        device_set_name = attributes.parse(cls, n, constants.ATTRIBUTES.DEVICE_SET)
         device_set = library.device_sets[device_set_name]
-        
-        device_name = attributes.parse(cls, n, constants.ATTRIBUTES.DEVICE)
         device = device_set.devices[device_name]
         
-        value = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.VALUE, None)
-        technology = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.TECHNOLOGY, "")
-        
         _attributes = etree_utils.parse_children_of_class(n, Device_Attribute)
         variants = etree_utils.parse_children_of_class(n, Variant)
         
         return Part(name, library, device_set, device, value, _attributes, technology, variants)
-    
-    def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.PART)
         
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LIBRARY, self.library.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DEVICE_SET, self.device_set.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DEVICE, self.device.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.TECHNOLOGY, self.technology, "")
+    def append_node(self, _n):
+        n = self.CODEC.append(self, _n)
         
         for a in self.attributes:
             a.append_node(n)
@@ -1285,6 +1785,7 @@ class Part:
 
 class Pass:
     TAG_NAME = constants.TAGS.PASS
+    CHILD_ATTRIBUTES = ('params',)
     
     DEFAULT_REFER = None
     DEFAULT_ACTIVE = False
@@ -1294,6 +1795,10 @@ class Pass:
                 constants.ATTRIBUTES.ACTIVE: attributes.ATTR_BOOL}
     
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.REFER, 'refer', DEFAULT_REFER, DEFAULT_REFER),
+                                             codec.Field(constants.ATTRIBUTES.ACTIVE, 'active', DEFAULT_ACTIVE, DEFAULT_ACTIVE)])
+    
     def __init__(self, name, refer, active, params):
         self.name = name
         self.refer = refer
@@ -1302,20 +1807,14 @@ class Pass:
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        refer = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.REFER, cls.DEFAULT_REFER)
-        active = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ACTIVE, cls.DEFAULT_ACTIVE)
+        name, refer, active = cls.CODEC.parse(n)
         
         params = etree_utils.parse_children_of_class(n, Param)
             
         return Pass(name, refer, active, params)
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.PASS)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.REFER, self.refer, self.DEFAULT_REFER)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ACTIVE, self.active, self.DEFAULT_ACTIVE)
+        n = self.CODEC.append(self, _n)
        
         # Add the parameters
         for p in self.params:
@@ -1323,6 +1822,7 @@ class Pass:
 
 class Schematic:
     TAG_NAME = constants.TAGS.SCHEMATIC
+    CHILD_ATTRIBUTES = ('libraries', 'attributes', 'variant_defs', 'classes', 'parts', 'sheets', 'errors')
     
     DEFAULT_XREF_LABEL = None
     DEFAULT_XREF_PART = None
@@ -1352,14 +1852,36 @@ class Schematic:
         self.variant_defs = variant_defs if variant_defs else []
         
     @classmethod
-    def parse(cls, n):
+    def parse(cls, n, lazy_libraries = False, sections = None):
+        """
+        Parse a schematic.
+        
+        :param n: The ``schematic`` node.
+        :param lazy_libraries: Whether to parse the contents of libraries on demand.
+        :param sections: The tag names of the sections to parse, or ``None`` to parse all sections.
+            Sections which are not parsed are left empty.
+        
+        :returns: A ``Schematic`` object.
+        """
+        
+        sections, lazy_libraries = resolve_sections(sections, lazy_libraries)
+        requested = lambda tag: sections == None or tag in sections
+        
+        libraries = classes = errors = attribs = variant_defs = None
+        
         xref_label = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.XREF_LABEL, cls.DEFAULT_XREF_LABEL)
         xref_part = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.XREF_PART, cls.DEFAULT_XREF_PART)
-        libraries = etree_utils.parse_grandchildren_of_class_into_od(n, Library)
-        classes = etree_utils.parse_grandchildren_of_class(n, Net_Class)
-        errors = etree_utils.parse_grandchildren_of_class(n, Approved_Error)
-        attribs = etree_utils.parse_grandchildren_of_class(n, Global_Attribute)
-        variant_defs = etree_utils.parse_grandchildren_of_class(n, Variant_Def)
+        
+        if requested(constants.TAGS.LIBRARIES):
+            libraries = etree_utils.parse_grandchildren_of_class_into_od_with_obj(n, Library, lazy_libraries)
+        if requested(constants.TAGS.CLASSES):
+            classes = etree_utils.parse_grandchildren_of_class(n, Net_Class)
+        if requested(constants.TAGS.ERRORS):
+            errors = etree_utils.parse_grandchildren_of_class(n, Approved_Error)
+        if requested(constants.TAGS.ATTRIBUTES):
+            attribs = etree_utils.parse_grandchildren_of_class(n, Global_Attribute)
+        if requested(constants.TAGS.VARIANT_DEFS):
+            variant_defs = etree_utils.parse_grandchildren_of_class(n, Variant_Def)
         
         schematic = Schematic(libraries = libraries,
                               classes = classes,
@@ -1369,26 +1891,56 @@ class Schematic:
                               attributes = attribs,
                               variant_defs = variant_defs)
                            
-        schematic.parts = etree_utils.parse_grandchildren_of_class_into_od_with_obj(n, Part, schematic)
+        if requested(constants.TAGS.PARTS):
+            schematic.parts = etree_utils.parse_grandchildren_of_class_into_od_with_obj(n, Part, schematic)
 
-        schematic.sheets = etree_utils.parse_grandchildren_of_class_with_obj(n, Sheet, schematic)
+        if requested(constants.TAGS.SHEETS):
+            schematic.sheets = etree_utils.parse_grandchildren_of_class_with_obj(n, Sheet, schematic)
         
         return schematic
 
     def append_node(self, _n):
+        self.write(etree_utils.Tree_Writer(_n))
+        
+    def write(self, writer):
         # Add this node
-        n = ElementTree.SubElement(_n, constants.TAGS.SCHEMATIC)
+        n = ElementTree.Element(constants.TAGS.SCHEMATIC)
 
         attributes.set_attr(self, n, constants.ATTRIBUTES.XREF_LABEL, self.xref_label, self.DEFAULT_XREF_LABEL)
         attributes.set_attr(self, n, constants.ATTRIBUTES.XREF_PART, self.xref_part, self.DEFAULT_XREF_PART)
         
-        etree_utils.append_grandchildren_of_class_from_od(n, Library, self.libraries)
-        etree_utils.append_grandchildren_of_class(n, Global_Attribute, self.attributes)
-        etree_utils.append_grandchildren_of_class(n, Variant_Def, self.variant_defs)
-        etree_utils.append_grandchildren_of_class(n, Net_Class, self.classes)
-        etree_utils.append_grandchildren_of_class_from_od(n, Part, self.parts)
-        etree_utils.append_grandchildren_of_class(n, Sheet, self.sheets)
-        etree_utils.append_grandchildren_of_class(n, Approved_Error, self.errors, False)
+        with writer.element(n) as w:
+            w.append_grandchildren(Library.PARENT_TAG_NAME, self.libraries)
+            w.append_grandchildren(Global_Attribute.PARENT_TAG_NAME, self.attributes)
+            w.append_grandchildren(Variant_Def.PARENT_TAG_NAME, self.variant_defs)
+            w.append_grandchildren(Net_Class.PARENT_TAG_NAME, self.classes)
+            w.append_grandchildren(Part.PARENT_TAG_NAME, self.parts)
+            w.append_grandchildren(Sheet.PARENT_TAG_NAME, self.sheets)
+            w.append_grandchildren(Approved_Error.PARENT_TAG_NAME, self.errors, False)
+            
+    def parts_using(self, obj):
+        """
+        Returns the parts which use a library, device set, or device (see ``references``).
+        
+        :param obj: A ``Library``, ``Device_Set``, or ``Device``.
+        
+        :returns: A list of the parts which reference ``obj``, in order.
+        """
+        
+        return references.get_index(self, 'parts', lambda: (self.parts,), 
+                                    lambda: references.Reverse_Index((self.parts,), ('library', 'device_set', 'device'))).users_of(obj)
+    
+    def netlist(self):
+        """
+        Returns the netlist of the sheets, which is built when it is first used and reused until the schematic is
+        modified (see ``netlist``). Changes to the segments of its nets are only detected if the schematic is
+        tracked; otherwise call ``references.changed(schematic)`` after making them.
+        
+        :returns: A ``netlist.Netlist`` object.
+        """
+        
+        return references.get_index(self, 'netlist', lambda: (self.sheets,) + tuple(s.nets for s in self.sheets), 
+                                    lambda: netlist.Netlist(self.sheets))
 #     
 #     def get_lib_dict(self):
 #         """
@@ -1573,6 +2125,7 @@ class Schematic:
 
 class Segment:
     TAG_NAME = constants.TAGS.SEGMENT
+    CHILD_ATTRIBUTES = ('items',)
     
     def __init__(self, items = None):
         self.items = items if items else []
@@ -1615,6 +2168,7 @@ class Setting:
 class Sheet:
     TAG_NAME = constants.TAGS.SHEET
     PARENT_TAG_NAME = constants.TAGS.SHEETS
+    CHILD_ATTRIBUTES = ('descriptions', 'plain', 'instances', 'busses', 'nets')
     
     ATTR_MAP = {}
     
@@ -1624,7 +2178,7 @@ class Sheet:
                  busses = None, 
                  nets = None, 
                  descriptions = None):
-        self.plain = plain if plain else []
+        self.plain = to_item_list(plain)
         self.instances = instances if instances else []
         self.nets = nets if nets else key_list.Key_List()
         self.descriptions = descriptions if descriptions else []
@@ -1641,19 +2195,39 @@ class Sheet:
         return Sheet(plain_items, instances, busses, nets, descriptions)
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.SHEET)
+        self.write(etree_utils.Tree_Writer(_n))
+        
+    def write(self, writer):
+        with writer.element(ElementTree.Element(constants.TAGS.SHEET)) as w:
+            for d in self.descriptions:
+                w.append(d)
+            
+            w.append_grandchildren(constants.TAGS.PLAIN, self.plain)
+            w.append_grandchildren(constants.TAGS.INSTANCES, self.instances)
+            w.append_grandchildren(constants.TAGS.BUSSES, self.busses)
+            w.append_grandchildren(constants.TAGS.NETS, self.nets)
     
-        for d in self.descriptions:
-            d.append_node(n)
+    def bounds(self):
+        """
+        Returns the bounding box of the sheet: of its plain items, its instances, and the wires of its nets and
+        busses. The bounding boxes of the plain items and of the symbols of the instances are cached.
+        
+        :returns: An ``(x_min, y_min, x_max, y_max)`` tuple, or ``None`` if the sheet is empty.
+        """
+        
+        boxes = [self.plain.bounds()]
+        boxes.extend(i.bounds() for i in self.instances)
+        
+        for net in itertools.chain(self.nets, self.busses):
+            for segment in net.segments:
+                boxes.extend(geometry.bounds(i) for i in segment.items if isinstance(i, primitives.Wire))
         
-        etree_utils.append_grandchildren_with_tag(n, constants.TAGS.PLAIN, self.plain)
-        etree_utils.append_grandchildren_with_tag(n, constants.TAGS.INSTANCES, self.instances)
-        etree_utils.append_grandchildren_with_tag_from_od(n, constants.TAGS.BUSSES, self.busses)
-        etree_utils.append_grandchildren_with_tag_from_od(n, constants.TAGS.NETS, self.nets)
+        return geometry.union(boxes)
 
 class Signal:
     TAG_NAME = constants.TAGS.SIGNAL
     PARENT_TAG_NAME = constants.TAGS.SIGNALS
+    CHILD_ATTRIBUTES = ('items',)
     
     DEFAULT_SIGNAL_CLASS = 0
     DEFAULT_AIRWIRES_HIDDEN = False
@@ -1663,6 +2237,10 @@ class Signal:
                 constants.ATTRIBUTES.AIRWIRES_HIDDEN: attributes.ATTR_BOOL
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.SIGNAL_CLASS, 'signal_class', DEFAULT_SIGNAL_CLASS, DEFAULT_SIGNAL_CLASS),
+                                             codec.Field(constants.ATTRIBUTES.AIRWIRES_HIDDEN, 'airwires_hidden', DEFAULT_AIRWIRES_HIDDEN, DEFAULT_AIRWIRES_HIDDEN)])
+    
     def __init__(self, 
                  name, 
                  signal_class = DEFAULT_SIGNAL_CLASS, 
@@ -1671,33 +2249,43 @@ class Signal:
         self.name = name
         self.signal_class = signal_class
         self.airwires_hidden = airwires_hidden
-        self.items = items if items else []
+        self.items = items if items != None else []
             
     @classmethod
-    def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        signal_class = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SIGNAL_CLASS, cls.DEFAULT_SIGNAL_CLASS)
-        airwires_hidden = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.AIRWIRES_HIDDEN, cls.DEFAULT_AIRWIRES_HIDDEN)
+    def parse(cls, n, columnar = False):
+        """
+        Parse a signal.
         
-        items = etree_utils.parse_children_using_function(n, primitives.parse_item)
+        :param n: The ``signal`` node.
+        :param columnar: If ``True``, the items are stored in an ``Item_Columns`` object rather than a list.
+        
+        :returns: A ``Signal`` object.
+        """
+        
+        name, signal_class, airwires_hidden = cls.CODEC.parse(n)
+        
+        if columnar:
+            items = Item_Columns.parse(n)
+        else:
+            items = etree_utils.parse_children_using_function(n, primitives.parse_item)
             
         return Signal(name, signal_class, airwires_hidden, items)
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, constants.TAGS.SIGNAL)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SIGNAL_CLASS, self.signal_class, self.DEFAULT_SIGNAL_CLASS)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.AIRWIRES_HIDDEN, self.airwires_hidden, self.DEFAULT_AIRWIRES_HIDDEN)
+        n = self.CODEC.append(self, _n)
         
         # Add the primitives
-        for i in self.items:
-            i.append_node(n)
+        if isinstance(self.items, Item_Columns):
+            self.items.append_nodes(n)
+        else:
+            for i in self.items:
+                i.append_node(n)
                 
 
 class Symbol:
     TAG_NAME = constants.TAGS.SYMBOL
     PARENT_TAG_NAME = constants.TAGS.SYMBOLS
+    CHILD_ATTRIBUTES = ('items',)
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING}
     
@@ -1707,7 +2295,7 @@ class Symbol:
                  items = None):
         self.name = name
         self.description = description
-        self.items = items if items else []
+        self.items = to_item_list(items)
         
     @classmethod
     def parse(cls, n):
@@ -1730,10 +2318,22 @@ class Symbol:
         # Add the primitives
         for i in self.items:
             i.append_node(n)
+    
+    def bounds(self):
+        """
+        Returns the bounding box of the primitives, which is calculated when it is first used and reused until the
+        items are modified (see ``item_list``). Moving or resizing a primitive is only detected if the symbol is
+        tracked; otherwise call ``items.changed()`` after making such changes.
+        
+        :returns: An ``(x_min, y_min, x_max, y_max)`` tuple, or ``None`` if no primitive has a bounding box.
+        """
+        
+        return self.items.bounds()
 
 class Technology:
     TAG_NAME = constants.TAGS.TECHNOLOGY
     PARENT_TAG_NAME = constants.TAGS.TECHNOLOGIES
+    CHILD_ATTRIBUTES = ('attributes',)
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING}
     
@@ -1762,6 +2362,10 @@ class Variant:
                 constants.ATTRIBUTES.VALUE: attributes.ATTR_STRING
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.TECHNOLOGY, 'technology', None),
+                                             codec.Field(constants.ATTRIBUTES.VALUE, 'value', None)])
+    
     def __init__(self, name, technology, value):
         self.name = name
         self.technology = technology
@@ -1769,16 +2373,10 @@ class Variant:
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        technology = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.TECHNOLOGY, None)
-        value = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.VALUE, None)
-        return Variant(name, technology, value)
+        return Variant(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.TECHNOLOGY, self.technology, None)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VALUE, self.value, None)
+        self.CODEC.append(self, _n)
         
 class Variant_Def:
     TAG_NAME = constants.TAGS.VARIANT_DEF
@@ -1786,29 +2384,61 @@ class Variant_Def:
     
     ATTR_MAP = {constants.ATTRIBUTES.NAME: attributes.ATTR_STRING}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name')])
+    
     def __init__(self, name):
         self.name = name
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        return Variant_Def(name)
-    
-    def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-
-
-
-
-
+        return Variant_Def(*cls.CODEC.parse(n))
         
+    def append_node(self, _n):
+        self.CODEC.append(self, _n)
 
 
+# The sections of a board or schematic which must be parsed in order to parse each section.
+# (Elements and parts reference libraries, and the instances on each sheet reference parts.)
+SECTION_DEPENDENCIES = {constants.TAGS.ELEMENTS: (constants.TAGS.LIBRARIES,),
+                        constants.TAGS.PARTS: (constants.TAGS.LIBRARIES,),
+                        constants.TAGS.SHEETS: (constants.TAGS.PARTS, constants.TAGS.LIBRARIES)}
 
+def resolve_sections(sections, lazy_libraries = False):
+    """
+    Add the sections required by each of the specified sections. 
+    
+    Libraries which are only required by another section are parsed on demand.
+    
+    :param sections: The tag names of the sections to parse, or ``None`` to parse all sections.
+    :param lazy_libraries: Whether to parse the contents of libraries on demand.
+    
+    :returns: A ``(sections, lazy_libraries)`` tuple.
+    """
+    
+    if sections == None:
+        return None, lazy_libraries
+    
+    resolved = set(sections)
+    
+    if not constants.TAGS.LIBRARIES in resolved:
+        lazy_libraries = True
+    
+    for s in sections:
+        resolved.update(SECTION_DEPENDENCIES.get(s, ()))
         
+    return resolved, lazy_libraries
 
-        
-
-   
+# Used by ``Eagle.load`` when streaming. Associates the (parent tag, tag) of each node which is parsed 
+# and discarded as soon as it has been read with a function which parses that node and adds the 
+# result to the (partially-read) board or schematic.
+STREAMED_NODES = {(constants.TAGS.LIBRARIES, constants.TAGS.LIBRARY): lambda d, n, lazy, columnar: d.libraries.append(Library.parse(n, lazy)),
+                  (constants.TAGS.ELEMENTS, constants.TAGS.ELEMENT): lambda d, n, lazy, columnar: d.elements.append(Element.parse(n, d)),
+                  (constants.TAGS.SIGNALS, constants.TAGS.SIGNAL): lambda d, n, lazy, columnar: d.signals.append(Signal.parse(n, columnar)),
+                  (constants.TAGS.PARTS, constants.TAGS.PART): lambda d, n, lazy, columnar: d.parts.append(Part.parse(n, d)),
+                  (constants.TAGS.SHEETS, constants.TAGS.SHEET): lambda d, n, lazy, columnar: d.sheets.append(Sheet.parse(n, d))
+                  }
 
+# The attributes of a board or schematic which are populated from ``STREAMED_NODES``.
+STREAMED_ATTRIBUTES = {constants.TAGS.BOARD: ('libraries', 'elements', 'signals'),
+                       constants.TAGS.SCHEMATIC: ('libraries', 'parts', 'sheets')
+                       }
@@ -25,6 +25,9 @@ The following class would be valid:
 
 """
 
+import attributes
+import collections
+import constants
 import key_list
 
 try:
@@ -249,6 +252,41 @@ def parse_grandchildren_of_class_into_od_with_obj(parent, child_class, obj, opti
                 
         return children
 
+def parse_grandchildren_of_class_into_lazy_od(parent, child_class, parse_function, optional = True):
+    """
+    Find all instances of the specified class contained by the child element with the tag name
+    specified by the ``PARENT_TAG_NAME`` attribute of ``child_class``, and return a ``Lazy_Key_List``
+    which parses each of them the first time it is retrieved.
+    
+    The key for the ``Lazy_Key_List`` is the ``name`` attribute of each node.
+    
+    :param parent: The parent ``Element`` object. 
+    :param child_class: The class of the grandchildren.
+    :param parse_function: A function which accepts an ``Element`` and returns an object of the type child_class.
+    :param optional: If False, raise an exception if no parent node is found.
+    
+    :raises: An Exception if no parent node with the tag name specified by 
+        ``child_class.PARENT_TAG_NAME`` is found and ``optional`` is ``False``.
+    
+    :returns: A ``Lazy_Key_List`` of objects of the type child_class.
+    
+    """
+    
+    children = key_list.Lazy_Key_List(parse_function)
+    
+    node = parent.find(child_class.PARENT_TAG_NAME)
+    
+    if node == None:
+        if optional:
+            return children
+        else:
+            raise Exception('Node {0} does not contain required child node {1}.'.format(parent.tag, child_class.TAG_NAME))
+    else:
+        for n in node.findall(child_class.TAG_NAME):
+            children.add_node(attributes.parse(child_class, n, constants.ATTRIBUTES.NAME), n)
+            
+        return children
+
 def parse_children_using_function(parent, parse_function, tag = None):
     """
     Find and parse children using a specified function. 
@@ -380,4 +418,249 @@ def append_grandchildren_of_class_from_od(parent, child_class, children, add_nod
     
     """
     
-    append_grandchildren_with_tag_from_od(parent, child_class.PARENT_TAG_NAME, children, add_node_if_empty)
\ No newline at end of file
+    append_grandchildren_with_tag_from_od(parent, child_class.PARENT_TAG_NAME, children, add_node_if_empty)
+
+# The indentation added by ``pretty_print``
+INDENT = '  '
+
+def indent(node, level = 0):
+    """
+    Add whitespace to a subtree in the same way as ``pretty_print``, so that the subtree can be written
+    (without ``pretty_print``) at any depth within a document.
+    
+    As with ``pretty_print``, the children of an element are only indented if the element contains no text.
+    
+    :param node: The root ``Element`` of the subtree.
+    :param level: The depth of ``node`` within the document.
+    
+    """
+    
+    if len(node) == 0 or node.text != None:
+        return
+    
+    for c in node:
+        if c.tail != None:
+            return
+    
+    whitespace = '\n' + INDENT * (level + 1)
+    node.text = whitespace
+    
+    for c in node:
+        # (Most children are leaves, which are not indented.)
+        if len(c) > 0:
+            indent(c, level + 1)
+            
+        c.tail = whitespace
+        
+    c.tail = '\n' + INDENT * level
+
+class Writer(object):
+    """
+    Writes the nodes of a document. 
+    
+    Classes whose nodes contain many children (e.g. ``Board``) implement a ``write()`` method, which accepts 
+    a ``Writer``, rather than building their subtree directly. A ``Tree_Writer`` adds the nodes to a tree, 
+    while a ``Stream_Writer`` writes them to a file as soon as they are complete, so that the tree of the 
+    entire document is never held in memory.
+    
+    ``element()`` returns a ``Writer`` for a child element, which is used as a context manager:
+    
+        n = ElementTree.Element(constants.TAGS.LIBRARY)
+        
+        with writer.element(n) as w:
+            w.append(package)
+    
+    """
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type == None:
+            self.close()
+            
+        return False
+    
+    def element(self, node):
+        """
+        :param node: An ``Element`` containing the tag and attributes (but no children) of the child element.
+        
+        :returns: A ``Writer`` for the children of the element.
+        """
+        
+        raise NotImplementedError()
+    
+    def append(self, obj):
+        """
+        Add the node of an object (which has either a ``write()`` or an ``append_node()`` method).
+        """
+        
+        raise NotImplementedError()
+    
+    def close(self):
+        pass
+    
+    def append_text(self, tag, text):
+        """
+        If ``text`` is not ``None``, add an ``Element`` whose ``text`` value is equal to ``text``.
+        """
+        
+        if text != None:
+            with self.element(ElementTree.Element(tag)) as w:
+                w.text = text
+                
+    def append_grandchildren(self, tag, children, add_node_if_empty = True):
+        """
+        Add a single child node and a grandchild for each object in ``children``.
+        
+        :param tag: The name of the parent tag.
+        :param children: A list of grandchildren.
+        :param add_node_if_empty: Whether to add the parent node if the list of grandchildren is empty.
+        
+        """
+        
+        if not add_node_if_empty and len(children) == 0:
+            return
+        
+        with self.element(ElementTree.Element(tag)) as w:
+            for c in children:
+                w.append(c)
+                
+class Tree_Writer(Writer):
+    """
+    Adds nodes to an ``Element``.
+    """
+    
+    def __init__(self, node):
+        self.node = node
+        
+    @property
+    def text(self):
+        return self.node.text
+    
+    @text.setter
+    def text(self, text):
+        self.node.text = text
+        
+    def element(self, node):
+        self.node.append(node)
+        return Tree_Writer(node)
+    
+    def append(self, obj):
+        obj.append_node(self.node)
+
+class Stream_Writer(Writer):
+    """
+    Writes nodes to an ``lxml.etree.xmlfile``, with the same whitespace as ``pretty_print``.
+    
+    The start tag of an element is written when its first child is written, and each child is written
+    (and then discarded) as soon as it is complete.
+    
+    If a ``source.Source_Map`` is specified, the source node of each unchanged object is written in place of 
+    a newly-generated node. If ``output`` is also specified, the original bytes of the node are copied to it.
+    """
+    
+    def __init__(self, xf, parent = None, node = None, source = None, output = None):
+        """
+        :param xf: The ``xmlfile`` context.
+        :param parent: The ``Stream_Writer`` of the parent element, or ``None`` for the writer of the document.
+        :param node: The ``Element`` of this writer (without children), or ``None`` for the writer of the document.
+        :param source: A ``source.Source_Map``, or ``None``. (Child writers use the map of their parent.)
+        :param output: The file object which ``xf`` writes to, to which the bytes of source nodes are copied, or
+            ``None`` to serialize the source nodes. (Child writers use the output of their parent.)
+        """
+        
+        self.xf = xf
+        self.parent = parent
+        self.node = node
+        self.level = -1 if parent == None else parent.level + 1
+        self.source = source if parent == None else parent.source
+        self.output = output if parent == None else parent.output
+        
+        # The ``xmlfile`` context of the element, once the start tag has been written
+        self.context = None
+        
+    @property
+    def text(self):
+        return self.node.text
+    
+    @text.setter
+    def text(self, text):
+        self.node.text = text
+        
+    def element(self, node):
+        return Stream_Writer(self.xf, self, node)
+    
+    def append(self, obj):
+        if self.source != None:
+            n = self.source.node(obj)
+            
+            if n != None:
+                self.write_source_node(n, self.source.original(obj))
+                return
+            
+        if hasattr(obj, 'write'):
+            obj.write(self)
+            return
+        
+        parent = ElementTree.Element('_')
+        obj.append_node(parent)
+        
+        for n in parent:
+            self.write_node(n)
+            
+    def write_node(self, n):
+        """
+        Write a complete subtree.
+        """
+        
+        self._start_child()
+        indent(n, self.level + 1)
+        n.tail = None
+        self.xf.write(n)
+        
+    def write_source_node(self, n, original = None):
+        """
+        Write a subtree of a source document, unchanged.
+        
+        :param n: The source node.
+        :param original: The bytes of the node as they were read, which are copied to the output, or ``None``
+            to serialize the node.
+        """
+        
+        self._start_child()
+        
+        if original != None and self.output != None:
+            self.xf.flush()
+            self.output.write(original)
+            return
+        
+        # ``write()`` also writes the tail
+        tail = n.tail
+        n.tail = None
+        
+        try:
+            self.xf.write(n)
+        finally:
+            n.tail = tail
+        
+    def close(self):
+        if self.context != None:
+            self.xf.write('\n' + INDENT * self.level)
+            self.context.__exit__(None, None, None)
+            self.context = None
+        elif self.node != None:
+            # The element has no children
+            self.parent.write_node(self.node)
+        
+    def _start_child(self):
+        # The document contains a single element, so no whitespace is required
+        if self.node == None:
+            return
+        
+        if self.context == None:
+            self.parent._start_child()
+            self.context = self.xf.element(self.node.tag, collections.OrderedDict(self.node.attrib.items()))
+            self.context.__enter__()
+            
+        self.xf.write('\n' + INDENT * (self.level + 1))
@@ -0,0 +1,548 @@
+"""
+Geometry
+========
+
+Provides the geometric helpers which are shared by the analyses of a board: the bounding box of each primitive,
+the placement of the primitives of a package by an element, and the mirroring of layers.
+
+Bounding boxes are ``(x_min, y_min, x_max, y_max)`` tuples, and include the widths of wires and the diameters of
+pads and vias. The bounding boxes of arcs (wires with a ``curve``, and the curved edges of polygons) are exact.
+
+Placement
+---------
+
+An element places the primitives of its package by mirroring them (if its rotation is mirrored), then rotating
+them by the angle of its rotation, then translating them to its position. The mirrored rotation of an element
+also moves the primitives on the top layers to the corresponding bottom layers (see ``mirror_layer()``).
+
+    placement = geometry.Placement(element)
+
+    for item in element.package.items.of_type(primitives.SMD):
+        x, y = placement.point(item.x, item.y)
+        layer = placement.layer(item.layer)
+
+The diameter of a pad or via whose diameter is ``auto`` is derived from its drill using EAGLE's default
+design rules (see ``auto_diameter()``).
+
+"""
+
+import constants
+import math
+import primitives
+
+# The restring of pads and vias whose diameter is ``auto``, as a fraction of the drill, and its limits
+# (EAGLE's default design rules)
+AUTO_RESTRING = 0.25
+AUTO_RESTRING_MIN = 0.254
+AUTO_RESTRING_MAX = 0.508
+
+# The length (in millimeters) of each ``Pin.length``
+PIN_LENGTHS = {constants.PIN.LENGTH.POINT: 0,
+               constants.PIN.LENGTH.SHORT: 2.54,
+               constants.PIN.LENGTH.MIDDLE: 5.08,
+               constants.PIN.LENGTH.LONG: 7.62}
+
+# The top and bottom layers which are swapped by mirroring (the copper layers are reversed separately)
+MIRRORED_LAYERS = {}
+
+for top, bottom in ((constants.LAYERS.TPLACE, constants.LAYERS.BPLACE),
+                    (constants.LAYERS.TORIGINS, constants.LAYERS.BORIGINS),
+                    (constants.LAYERS.TNAMES, constants.LAYERS.BNAMES),
+                    (constants.LAYERS.TVALUES, constants.LAYERS.BVALUES),
+                    (constants.LAYERS.TSTOP, constants.LAYERS.BSTOP),
+                    (constants.LAYERS.TCREAM, constants.LAYERS.BCREAM),
+                    (constants.LAYERS.TFINISH, constants.LAYERS.BFINISH),
+                    (constants.LAYERS.TGLUE, constants.LAYERS.BGLUE),
+                    (constants.LAYERS.TTEST, constants.LAYERS.BTEST),
+                    (constants.LAYERS.TKEEPOUT, constants.LAYERS.BKEEPOUT),
+                    (constants.LAYERS.TRESTRICT, constants.LAYERS.BRESTRICT),
+                    (constants.LAYERS.TDOCU, constants.LAYERS.BDOCU)):
+    MIRRORED_LAYERS[top] = bottom
+    MIRRORED_LAYERS[bottom] = top
+
+# The layers of the primitives which have no layer (as in EAGLE, pads are shown on the ``Pads`` layer, since
+# they have copper on every layer)
+ITEM_LAYERS = {primitives.Pad: constants.LAYERS.PADS,
+               primitives.Via: constants.LAYERS.VIAS,
+               primitives.Hole: constants.LAYERS.HOLES}
+
+# The exact sine and cosine of multiples of 90 degrees (which are by far the most common angles)
+_RIGHT_ANGLES = {0: (0, 1), 90: (1, 0), 180: (0, -1), 270: (-1, 0)}
+
+# Rotation -> (a, b, c, d), see ``matrix()``
+_matrices = {}
+
+def auto_diameter(drill):
+    """
+    :param drill: The drill of a pad or via.
+
+    :returns: The diameter of a pad or via whose diameter is ``auto``.
+    """
+
+    return drill + 2 * min(max(drill * AUTO_RESTRING, AUTO_RESTRING_MIN), AUTO_RESTRING_MAX)
+
+def mirror_layer(layer):
+    """
+    :returns: The layer on which an item on ``layer`` is placed by a mirrored element.
+    """
+
+    if constants.LAYERS.TOP <= layer <= constants.LAYERS.BOTTOM:
+        return constants.LAYERS.TOP + constants.LAYERS.BOTTOM - layer
+
+    return MIRRORED_LAYERS.get(layer, layer)
+
+def item_layer(item):
+    """
+    :returns: The layer of a primitive (see ``ITEM_LAYERS``).
+    """
+
+    layer = ITEM_LAYERS.get(item.__class__)
+
+    if layer == None:
+        # (Subclasses, e.g. the views of columnar storage)
+        for cls, l in ITEM_LAYERS.iteritems():
+            if isinstance(item, cls):
+                return l
+
+        layer = item.layer
+
+    return layer
+
+def sin_cos(angle):
+    """
+    :param angle: An angle, in degrees.
+
+    :returns: A ``(sin, cos)`` tuple (which is exact for multiples of 90 degrees).
+    """
+
+    right_angle = _RIGHT_ANGLES.get(angle % 360)
+
+    if right_angle != None:
+        return right_angle
+
+    a = math.radians(angle)
+    return math.sin(a), math.cos(a)
+
+def matrix(rotation):
+    """
+    :param rotation: An ``attributes.Rotation``.
+
+    :returns: The ``(a, b, c, d)`` matrix which mirrors and rotates a point: ``(a * x + b * y, c * x + d * y)``.
+        The matrix of each distinct rotation is cached.
+    """
+
+    m = _matrices.get(rotation)
+
+    if m == None:
+        s, c = sin_cos(rotation.angle)
+        sx = -1 if rotation.mirrored else 1
+        m = _matrices[rotation] = (c * sx, -s, s * sx, c)
+
+    return m
+
+def box(x, y, half_width, half_height, angle = 0):
+    """
+    :returns: The bounding box of a rectangle centered at ``(x, y)`` which is rotated by ``angle`` degrees.
+    """
+
+    if angle != 0:
+        s, c = sin_cos(angle)
+        half_width, half_height = (abs(half_width * c) + abs(half_height * s),
+                                   abs(half_width * s) + abs(half_height * c))
+
+    return (x - half_width, y - half_height, x + half_width, y + half_height)
+
+def union(boxes):
+    """
+    :returns: The bounding box of a sequence of bounding boxes, or ``None`` if it is empty.
+    """
+
+    boxes = [b for b in boxes if b != None]
+
+    if len(boxes) == 0:
+        return None
+
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+def arc_center(x1, y1, x2, y2, curve):
+    """
+    :param curve: The angle of an arc from ``(x1, y1)`` to ``(x2, y2)``, in degrees (positive angles are
+        counterclockwise).
+
+    :returns: The center and radius of the arc: ``(x, y, radius)``.
+    """
+
+    dx = x2 - x1
+    dy = y2 - y1
+    chord = math.hypot(dx, dy)
+    half = math.radians(curve) / 2.0
+
+    # The (signed) distance from the middle of the chord to the center, to the left of the chord
+    h = 0.5 / math.tan(half)
+
+    return ((x1 + x2) / 2.0 - dy * h, (y1 + y2) / 2.0 + dx * h, chord / (2.0 * abs(math.sin(half))))
+
+def _on_arc(angle, start, curve):
+    # Whether an angle (in degrees) lies on an arc which starts at ``start`` and turns by ``curve``
+    return (((angle - start) if curve > 0 else (start - angle)) % 360) <= abs(curve)
+
+def arc_bounds(x1, y1, x2, y2, curve, half_width = 0):
+    """
+    :returns: The bounding box of an arc (see ``arc_center()``), expanded by ``half_width``.
+    """
+
+    xs = [x1, x2]
+    ys = [y1, y2]
+
+    if curve != 0 and (x1 != x2 or y1 != y2):
+        cx, cy, r = arc_center(x1, y1, x2, y2, curve)
+        start = math.degrees(math.atan2(y1 - cy, x1 - cx))
+
+        # The extreme points of the circle which lie on the arc
+        for angle, (px, py) in ((0, (r, 0)), (90, (0, r)), (180, (-r, 0)), (270, (0, -r))):
+            if _on_arc(angle, start, curve):
+                xs.append(cx + px)
+                ys.append(cy + py)
+
+    return (min(xs) - half_width, min(ys) - half_width, max(xs) + half_width, max(ys) + half_width)
+
+def point_segment_distance(x, y, x1, y1, x2, y2):
+    """
+    :returns: The distance from the point ``(x, y)`` to the line segment from ``(x1, y1)`` to ``(x2, y2)``.
+    """
+
+    dx = x2 - x1
+    dy = y2 - y1
+    length_squared = dx * dx + dy * dy
+
+    if length_squared > 0:
+        t = min(max(((x - x1) * dx + (y - y1) * dy) / float(length_squared), 0), 1)
+        x1 += t * dx
+        y1 += t * dy
+
+    return math.hypot(x - x1, y - y1)
+
+def point_arc_distance(x, y, x1, y1, x2, y2, curve):
+    """
+    :returns: The distance from the point ``(x, y)`` to an arc (see ``arc_center()``), or to a line segment if
+        ``curve`` is 0.
+    """
+
+    if curve == 0 or (x1 == x2 and y1 == y2):
+        return point_segment_distance(x, y, x1, y1, x2, y2)
+
+    cx, cy, r = arc_center(x1, y1, x2, y2, curve)
+
+    if _on_arc(math.degrees(math.atan2(y - cy, x - cx)), math.degrees(math.atan2(y1 - cy, x1 - cx)), curve):
+        return abs(math.hypot(x - cx, y - cy) - r)
+
+    return min(math.hypot(x - x1, y - y1), math.hypot(x - x2, y - y2))
+
+def _cross(x1, y1, x2, y2, x, y):
+    # The sign of the cross product, which is positive if ``(x, y)`` is to the left of the line through
+    # ``(x1, y1)`` and ``(x2, y2)``
+    return (x2 - x1) * (y - y1) - (y2 - y1) * (x - x1)
+
+def segment_distance(x1, y1, x2, y2, x3, y3, x4, y4):
+    """
+    :returns: The distance between the line segment from ``(x1, y1)`` to ``(x2, y2)`` and the line segment from
+        ``(x3, y3)`` to ``(x4, y4)`` (0 if they intersect).
+    """
+
+    d1 = _cross(x3, y3, x4, y4, x1, y1)
+    d2 = _cross(x3, y3, x4, y4, x2, y2)
+    d3 = _cross(x1, y1, x2, y2, x3, y3)
+    d4 = _cross(x1, y1, x2, y2, x4, y4)
+
+    if ((d1 > 0 and d2 < 0) or (d1 < 0 and d2 > 0)) and ((d3 > 0 and d4 < 0) or (d3 < 0 and d4 > 0)):
+        return 0.0
+
+    # (Segments which touch, or are collinear and overlap, have an end at a distance of 0 from the other)
+    return min(point_segment_distance(x1, y1, x3, y3, x4, y4), point_segment_distance(x2, y2, x3, y3, x4, y4),
+               point_segment_distance(x3, y3, x1, y1, x2, y2), point_segment_distance(x4, y4, x1, y1, x2, y2))
+
+def _arc_circle(x1, y1, x2, y2, curve):
+    # The center and radius of an arc, and the angle of its start (in degrees)
+    cx, cy, r = arc_center(x1, y1, x2, y2, curve)
+    return cx, cy, r, math.degrees(math.atan2(y1 - cy, x1 - cx))
+
+def _arc_segment_distance(arc, x3, y3, x4, y4):
+    x1, y1, x2, y2, curve = arc
+    cx, cy, r, start = _arc_circle(x1, y1, x2, y2, curve)
+
+    # The distance is the least of the distances from the ends of each to the other, and the distances at the
+    # points of the segment which cross the circle or are nearest to its center (if they lie on the arc).
+    candidates = [point_arc_distance(x3, y3, x1, y1, x2, y2, curve), point_arc_distance(x4, y4, x1, y1, x2, y2, curve),
+                  point_segment_distance(x1, y1, x3, y3, x4, y4), point_segment_distance(x2, y2, x3, y3, x4, y4)]
+
+    dx = x4 - x3
+    dy = y4 - y3
+    a = dx * dx + dy * dy
+
+    if a > 0:
+        fx = x3 - cx
+        fy = y3 - cy
+        t = min(max(-(fx * dx + fy * dy) / float(a), 0), 1)
+        px = x3 + t * dx
+        py = y3 + t * dy
+
+        if _on_arc(math.degrees(math.atan2(py - cy, px - cx)), start, curve):
+            candidates.append(abs(math.hypot(px - cx, py - cy) - r))
+
+        b = 2 * (fx * dx + fy * dy)
+        discriminant = b * b - 4 * a * (fx * fx + fy * fy - r * r)
+
+        if discriminant >= 0:
+            root = math.sqrt(discriminant)
+
+            for t in ((-b - root) / (2 * a), (-b + root) / (2 * a)):
+                if 0 <= t <= 1 and _on_arc(math.degrees(math.atan2(y3 + t * dy - cy, x3 + t * dx - cx)), start, curve):
+                    return 0.0
+
+    return min(candidates)
+
+def _arc_arc_distance(a, b):
+    ax1, ay1, ax2, ay2, a_curve = a
+    bx1, by1, bx2, by2, b_curve = b
+    acx, acy, ar, a_start = _arc_circle(ax1, ay1, ax2, ay2, a_curve)
+    bcx, bcy, br, b_start = _arc_circle(bx1, by1, bx2, by2, b_curve)
+
+    # The least of the distances from the ends of each to the other, and the distances between the points of
+    # the arcs which lie on the line through their centers (where the distance between the circles is extremal)
+    candidates = [point_arc_distance(ax1, ay1, bx1, by1, bx2, by2, b_curve), point_arc_distance(ax2, ay2, bx1, by1, bx2, by2, b_curve),
+                  point_arc_distance(bx1, by1, ax1, ay1, ax2, ay2, a_curve), point_arc_distance(bx2, by2, ax1, ay1, ax2, ay2, a_curve)]
+
+    d = math.hypot(bcx - acx, bcy - acy)
+
+    if d > 0:
+        ux = (bcx - acx) / d
+        uy = (bcy - acy) / d
+        a_points = [(acx + s * ar * ux, acy + s * ar * uy) for s in (1, -1)]
+        b_points = [(bcx + s * br * ux, bcy + s * br * uy) for s in (1, -1)]
+
+        for px, py in a_points:
+            if _on_arc(math.degrees(math.atan2(py - acy, px - acx)), a_start, a_curve):
+                for qx, qy in b_points:
+                    if _on_arc(math.degrees(math.atan2(qy - bcy, qx - bcx)), b_start, b_curve):
+                        candidates.append(math.hypot(qx - px, qy - py))
+
+        # The intersections of the circles
+        if abs(ar - br) <= d <= ar + br:
+            along = (d * d + ar * ar - br * br) / (2 * d)
+            across = math.sqrt(max(ar * ar - along * along, 0))
+            mx = acx + along * ux
+            my = acy + along * uy
+
+            for s in (1, -1):
+                px = mx - s * across * uy
+                py = my + s * across * ux
+
+                if (_on_arc(math.degrees(math.atan2(py - acy, px - acx)), a_start, a_curve) and
+                        _on_arc(math.degrees(math.atan2(py - bcy, px - bcx)), b_start, b_curve)):
+                    return 0.0
+
+    return min(candidates)
+
+def arc_distance(a, b):
+    """
+    :param a: An arc ``(x1, y1, x2, y2, curve)`` (see ``arc_center()``), which is a line segment if ``curve`` is 0.
+    :param b: Another arc.
+
+    :returns: The distance between the arcs (0 if they intersect).
+    """
+
+    a_straight = a[4] == 0 or (a[0] == a[2] and a[1] == a[3])
+    b_straight = b[4] == 0 or (b[0] == b[2] and b[1] == b[3])
+
+    if a_straight and b_straight:
+        return segment_distance(*(a[:4] + b[:4]))
+    elif a_straight:
+        return _arc_segment_distance(b, *a[:4])
+    elif b_straight:
+        return _arc_segment_distance(a, *b[:4])
+
+    return _arc_arc_distance(a, b)
+
+def point_in_polygon(x, y, points):
+    """
+    :param points: A sequence of the ``(x, y, ...)`` vertices of a polygon (its edges are considered straight).
+
+    :returns: Whether the point ``(x, y)`` lies inside the polygon (using the even-odd rule).
+    """
+
+    inside = False
+    x2, y2 = points[-1][:2]
+
+    for p in points:
+        x1, y1 = x2, y2
+        x2, y2 = p[:2]
+
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / float(y2 - y1):
+            inside = not inside
+
+    return inside
+
+def _wire_bounds(w):
+    if w.curve:
+        return arc_bounds(w.x1, w.y1, w.x2, w.y2, w.curve, w.width / 2.0)
+
+    h = w.width / 2.0
+    return (min(w.x1, w.x2) - h, min(w.y1, w.y2) - h, max(w.x1, w.x2) + h, max(w.y1, w.y2) + h)
+
+def _via_bounds(v):
+    r = (v.diameter if v.diameter != None else auto_diameter(v.drill)) / 2.0
+    return (v.x - r, v.y - r, v.x + r, v.y + r)
+
+def _pad_bounds(p):
+    d = p.diameter if p.diameter != None else auto_diameter(p.drill)
+    x = p.x
+    y = p.y
+
+    if p.shape == constants.SHAPE.LONG:
+        return box(x, y, d, d / 2.0, p.rotation.angle)
+    elif p.shape == constants.SHAPE.OFFSET:
+        # The pad extends from the drill in the direction of its rotation
+        s, c = sin_cos(p.rotation.angle)
+        return box(x + c * d / 2.0, y + s * d / 2.0, d, d / 2.0, p.rotation.angle)
+
+    return (x - d / 2.0, y - d / 2.0, x + d / 2.0, y + d / 2.0)
+
+def _smd_bounds(s):
+    return box(s.x, s.y, s.dx / 2.0, s.dy / 2.0, s.rotation.angle)
+
+def _hole_bounds(h):
+    r = h.drill / 2.0
+    return (h.x - r, h.y - r, h.x + r, h.y + r)
+
+def _circle_bounds(c):
+    r = c.radius + c.width / 2.0
+    return (c.x - r, c.y - r, c.x + r, c.y + r)
+
+def _rectangle_bounds(r):
+    return box((r.x1 + r.x2) / 2.0, (r.y1 + r.y2) / 2.0, abs(r.x2 - r.x1) / 2.0, abs(r.y2 - r.y1) / 2.0, r.rotation.angle)
+
+def _polygon_bounds(p):
+    points = p.points
+
+    if len(points) == 0:
+        return None
+
+    h = p.width / 2.0
+
+    # The curve of each vertex is the angle of the edge to the next vertex (curves which are read from a file are
+    # strings)
+    return union(arc_bounds(x1, y1, x2, y2, float(curve), h) for (x1, y1, curve), (x2, y2, _) in zip(points, points[1:] + points[:1]))
+
+def _pin_bounds(p):
+    # A pin is a line from its connection point in the direction of its rotation
+    length = PIN_LENGTHS.get(p.length, 0)
+    s, c = sin_cos(p.rotation.angle)
+    x2 = p.x + c * length
+    y2 = p.y + s * length
+
+    return (min(p.x, x2), min(p.y, y2), max(p.x, x2), max(p.y, y2))
+
+def _frame_bounds(f):
+    return (min(f.x1, f.x2), min(f.y1, f.y2), max(f.x1, f.x2), max(f.y1, f.y2))
+
+# The function which calculates the bounding box of each primitive class
+BOUNDS = {primitives.Wire: _wire_bounds,
+          primitives.Via: _via_bounds,
+          primitives.Pad: _pad_bounds,
+          primitives.SMD: _smd_bounds,
+          primitives.Hole: _hole_bounds,
+          primitives.Circle: _circle_bounds,
+          primitives.Rectangle: _rectangle_bounds,
+          primitives.Polygon: _polygon_bounds,
+          primitives.Pin: _pin_bounds,
+          primitives.Frame: _frame_bounds}
+
+def _get_bounds_function(cls):
+    # Subclasses (e.g. the views of columnar storage) use the function of their base class
+    for base in cls.__mro__:
+        function = BOUNDS.get(base)
+
+        if function != None:
+            BOUNDS[cls] = function
+            return function
+
+    BOUNDS[cls] = None
+    return None
+
+def bounds(item):
+    """
+    :param item: A primitive.
+
+    :returns: The bounding box of the primitive, or ``None`` if the primitive has no geometry (or if its
+        geometry is not supported, e.g. for texts, whose size depends on the font).
+    """
+
+    try:
+        function = BOUNDS[item.__class__]
+    except KeyError:
+        function = _get_bounds_function(item.__class__)
+
+    return function(item) if function != None else None
+
+class Placement(object):
+    """
+    The transformation which places the primitives of a package on a board.
+    """
+
+    __slots__ = ('x', 'y', 'matrix', 'mirrored', 'angle')
+
+    def __init__(self, element):
+        """
+        :param element: An ``Element`` (or any object with an ``x``, ``y`` and ``rotation``).
+        """
+
+        self.x = element.x
+        self.y = element.y
+        self.matrix = matrix(element.rotation)
+        self.mirrored = element.rotation.mirrored
+        self.angle = element.rotation.angle
+
+    def point(self, x, y):
+        """
+        :returns: The position on the board of the point ``(x, y)`` of the package.
+        """
+
+        a, b, c, d = self.matrix
+        return (self.x + a * x + b * y, self.y + c * x + d * y)
+
+    def bounds(self, bounds):
+        """
+        :returns: The bounding box on the board of a bounding box in the package. The result is exact if the
+            angle of the element is a multiple of 90 degrees; otherwise, it is the bounding box of the rotated box.
+        """
+
+        if bounds == None:
+            return None
+
+        a, b, c, d = self.matrix
+        x = (bounds[0] + bounds[2]) / 2.0
+        y = (bounds[1] + bounds[3]) / 2.0
+        w = (bounds[2] - bounds[0]) / 2.0
+        h = (bounds[3] - bounds[1]) / 2.0
+
+        # The half width and half height of the transformed box
+        tw = abs(a) * w + abs(b) * h
+        th = abs(c) * w + abs(d) * h
+        tx = self.x + a * x + b * y
+        ty = self.y + c * x + d * y
+
+        return (tx - tw, ty - th, tx + tw, ty + th)
+
+    def layer(self, layer):
+        """
+        :returns: The layer on the board of an item on ``layer`` in the package.
+        """
+
+        return mirror_layer(layer) if self.mirrored else layer
+
+    def rotation_angle(self, angle):
+        """
+        :returns: The angle on the board of an item which is rotated by ``angle`` degrees in the package.
+        """
+
+        return (((180 - angle) if self.mirrored else angle) + self.angle) % 360
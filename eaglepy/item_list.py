@@ -0,0 +1,289 @@
+"""
+Item_List
+=========
+
+Stores the primitives of a package, a symbol, or the plain section of a board or sheet.
+
+An ``Item_List`` is a list (so it is iterated, indexed, and written in document order), which also keeps the
+positions of its items in *buckets*: one for each class of item, and one for each layer. Finding the SMDs of
+a package, or the items on the ``tPlace`` layer, then only touches those items, rather than testing the class
+or layer of every item.
+
+The buckets are built when the list is first queried, and are updated when items are appended, or the last item
+is removed. Other modifications (e.g. inserting or removing an item in the middle of the list, or sorting it)
+discard the buckets, which are rebuilt by the next query.
+
+Items without a ``layer`` variable (e.g. pads and holes) are only bucketed by class.
+
+Bounding box
+------------
+
+The list also keeps the bounding box of its items (see ``geometry.bounds()``), so the extent of a package or
+symbol is only calculated once. It is calculated when it is first used, and is extended when items are added.
+Removing or replacing items discards it.
+
+Changes to the items
+--------------------
+
+The items of the list can be modified without the list being told (e.g. ``package.items[0].layer = 21``). If
+the list is tracked (see ``tracking``), the tracker reports each change to an item to the list: changing the
+``layer`` of an item discards the buckets, and moving or resizing it discards the bounding box. Otherwise, they
+are kept until ``changed()`` is called, so call it after moving, resizing, or changing the layers of items which
+are already in the list:
+
+    package.items[0].x = 5
+    package.items.changed()
+
+Usage
+-----
+
+    for smd in package.items.of_type(primitives.SMD):
+        print smd.name
+
+    silkscreen = package.items.on_layer(constants.LAYERS.TPLACE)
+
+    top_wires = board.plain_items.select(primitives.Wire, constants.LAYERS.TOP)
+
+    x_min, y_min, x_max, y_max = package.items.bounds()
+
+"""
+
+import geometry
+import itertools
+import tracking
+
+class Item_List(tracking.Tracked_List):
+    """
+    A list of primitives with indexes by class and by layer. Changes are reported to trackers as for a
+    ``tracking.Tracked_List``. It is pickled (and copied) as an ``Item_List``.
+    """
+
+    def __init__(self, items = ()):
+        tracking.Tracked_List.__init__(self, items)
+
+        # (class -> positions, layer -> positions), or ``None`` until the list is queried
+        self.buckets = None
+
+        # The bounding box of the items, ``()`` if none of them has one, or ``None`` until it is calculated
+        self.extent = None
+
+    def of_type(self, cls):
+        """
+        :param cls: A class, or a tuple of classes (as for ``isinstance()``).
+
+        :returns: A list of the items which are instances of ``cls``, in order.
+        """
+
+        types = self._get_buckets()[0]
+
+        return self._gather([positions for c, positions in types.iteritems() if issubclass(c, cls)])
+
+    def on_layer(self, layer):
+        """
+        :param layer: The number of a layer.
+
+        :returns: A list of the items on the layer, in order.
+        """
+
+        positions = self._get_buckets()[1].get(layer)
+
+        return self._gather([] if positions == None else [positions])
+
+    def select(self, cls = None, layer = None):
+        """
+        :param cls: A class, or a tuple of classes, or ``None`` to select items of any class.
+        :param layer: The number of a layer, or ``None`` to select items on any layer (or without a layer).
+
+        :returns: A list of the items which are instances of ``cls`` on ``layer``, in order.
+        """
+
+        if layer == None:
+            return list(self) if cls == None else self.of_type(cls)
+
+        if cls == None:
+            return self.on_layer(layer)
+
+        get = self.__getitem__
+
+        return [item for item in map(get, self._get_buckets()[1].get(layer, ())) if isinstance(item, cls)]
+
+    def layers(self):
+        """
+        :returns: A sorted list of the layers of the items.
+        """
+
+        return sorted(layer for layer in self._get_buckets()[1] if layer != None)
+
+    def bounds(self):
+        """
+        :returns: The bounding box of the items, or ``None`` if none of them has a bounding box.
+        """
+
+        if self.extent == None:
+            self.extent = geometry.union(map(geometry.bounds, self)) or ()
+
+        return self.extent or None
+
+    def changed(self):
+        """
+        Record that the layers or geometry of the items may have changed, so that the buckets and the bounding box
+        are recalculated. (The changes to the items of a tracked list are detected without calling this.)
+        """
+
+        self.buckets = None
+        self.extent = None
+
+    def append(self, item):
+        list.append(self, item)
+        self._add_positions(len(self) - 1)
+        self._add_bounds((item,))
+        self._changed(tracking.ADDED, (item,))
+
+    def extend(self, items):
+        items = list(items)
+        start = len(self)
+        list.extend(self, items)
+        self._add_positions(start)
+        self._add_bounds(items)
+        self._changed(tracking.ADDED, items)
+
+    def insert(self, index, item):
+        if index < len(self):
+            self.buckets = None
+
+        list.insert(self, index, item)
+        self._add_positions(len(self) - 1)
+        self._add_bounds((item,))
+        self._changed(tracking.ADDED, (item,))
+
+    def pop(self, index = -1):
+        self._remove_positions(index)
+        self.extent = None
+        return tracking.Tracked_List.pop(self, index)
+
+    def __delitem__(self, index):
+        self._remove_positions(index)
+        self.extent = None
+        tracking.Tracked_List.__delitem__(self, index)
+
+    def __setitem__(self, index, value):
+        self.buckets = None
+        self.extent = None
+        tracking.Tracked_List.__setitem__(self, index, value)
+
+    def __imul__(self, n):
+        self.buckets = None
+        self.extent = None
+        return tracking.Tracked_List.__imul__(self, n)
+
+    def sort(self, *args, **kwargs):
+        self.buckets = None
+        tracking.Tracked_List.sort(self, *args, **kwargs)
+
+    def reverse(self):
+        self.buckets = None
+        tracking.Tracked_List.reverse(self)
+
+    def __reduce__(self):
+        return (Item_List, (list(self),))
+
+    def _item_changed(self, event, obj, detail):
+        self.extent = None
+
+        if detail == 'layer':
+            self.buckets = None
+
+    def _get_buckets(self):
+        if self.buckets == None:
+            self.buckets = ({}, {})
+            self._add_positions(0)
+
+        return self.buckets
+
+    def _add_positions(self, start):
+        """
+        Add the items from ``start`` to the end of the list to the buckets (if they have been built).
+        """
+
+        if self.buckets == None:
+            return
+
+        types, layers = self.buckets
+
+        for i in xrange(start, len(self)):
+            item = self[i]
+            cls = item.__class__
+            layer = getattr(item, 'layer', None)
+
+            positions = types.get(cls)
+
+            if positions == None:
+                types[cls] = [i]
+            else:
+                positions.append(i)
+
+            positions = layers.get(layer)
+
+            if positions == None:
+                layers[layer] = [i]
+            else:
+                positions.append(i)
+
+    def _add_bounds(self, items):
+        """
+        Extend the bounding box (if it has been calculated) by the bounding boxes of added items.
+        """
+
+        if self.extent == None:
+            return
+
+        self.extent = geometry.union([self.extent or None] + map(geometry.bounds, items)) or ()
+
+    def _remove_positions(self, index):
+        """
+        Update the buckets before the item at ``index`` is removed. Only removing the last item is handled
+        in place; otherwise the positions of the following items change, so the buckets are discarded.
+        """
+
+        if self.buckets == None:
+            return
+
+        if type(index) is slice or (index != -1 and index != len(self) - 1):
+            self.buckets = None
+            return
+
+        item = self[-1]
+        types, layers = self.buckets
+
+        for buckets, key in ((types, item.__class__), (layers, getattr(item, 'layer', None))):
+            positions = buckets[key]
+            positions.pop()
+
+            if len(positions) == 0:
+                del buckets[key]
+
+    def _gather(self, buckets):
+        """
+        :param buckets: Lists of positions.
+
+        :returns: A list of the items at the positions, in order.
+        """
+
+        if len(buckets) == 0:
+            return []
+
+        positions = buckets[0] if len(buckets) == 1 else sorted(itertools.chain(*buckets))
+
+        return map(self.__getitem__, positions)
+
+def to_item_list(items):
+    """
+    :param items: An ``Item_List``, a sequence of items, or ``None``.
+
+    :returns: ``items`` if it is an ``Item_List``, or a new ``Item_List`` of its items.
+    """
+
+    if isinstance(items, Item_List):
+        return items
+
+    return Item_List(items if items != None else ())
@@ -1,5 +1,4 @@
-import collections
-import unittest
+import itertools
 
 """
 Key_List
@@ -7,15 +6,24 @@ Key_List
 
 This is a data structure which stores data in the order in which it was added (like a list),
 but also provides access based on a key (like a dict). This functionality is implemented by
-wrapping an instance of ``collections.OrderedDict``.
+storing the objects in a dict (keyed by name), alongside a list of the names in order.
 
 Every object added to the list must have a ``name`` varaible. This name variable is used as the key.
 Thus, every object must have a unique name.
 
 The data structure is designed to keep the keys transparant.
 
-Because this class is a subclass of ``collections.OrderedDict``, this class does not have an
-insert method.
+Access by index (``item_at_index()`` and ``index_of()``) takes constant time. Objects can be inserted at an
+index (``insert_at()``), moved (``move()``), and added in bulk (``extend()``), and a slice of the list
+(e.g. ``nd[1:3]``) returns a new ``Key_List``.
+
+Each modification increments the ``generation`` of the list, so that data which is derived from it can tell
+whether it has been modified (see ``references``).
+
+Removing an object replaces its name with ``None`` in the list of names, rather than shifting the names which
+follow it, so removing an object also takes constant time. Similarly, inserting an object does not update the
+indices of the names which follow it. The removed names are discarded (and the indices of the following names
+updated) the next time an index after them is required, or when they make up more than half of the list.
 
 Consider a ``Key_List`` instantiated as follows:
 
@@ -55,22 +63,104 @@ Or by index:
 
     o = nd.item_at_index(0)
 
+    i = nd.index_of('apple')
+
 """
 
-class Key_List():
+class Key_List(object):
+    # The number of modifications (lists which were stored before it was counted start from 0)
+    generation = 0
+    
     def __init__(self, items = None):
-        self.list = collections.OrderedDict()
+        self.list = {}
+        
+        # The names in order (``None`` where an object has been removed), and the index of each name
+        self._names = []
+        self._slots = {}
+        
+        # The index of the first removed name and the number of removed names, and the index from which
+        # ``_slots`` may be out of date (or ``None``)
+        self._first_removed = None
+        self._removed = 0
+        self._shifted = None
+        
         if items != None:
-            for i in items:
-                self.append(i)
+            self.extend(items)
 
     def append(self, obj):
         """
-        Add an object to the end of the list. 
+        Add an object to the end of the list. If the list already contains an object with the same
+        name, that object is replaced (in its current position).
         
         :param obj: The object to add.
         """
-        self.list[obj.name] = obj
+        self._add(obj.name, obj)
+        
+    def extend(self, objs):
+        """
+        Add several objects to the end of the list (see ``append()``).
+        
+        :param objs: An iterable of the objects to add.
+        """
+        for obj in objs:
+            self.append(obj)
+            
+    def insert_at(self, index, obj):
+        """
+        Insert an object before the specified index (as ``list.insert()``). If the list already contains
+        an object with the same name, that object is replaced, and the new object is inserted at the index
+        in the list without the replaced object.
+        
+        :param index: The index at which to insert the object.
+        :param obj: The object to insert.
+        """
+        
+        name = obj.name
+        
+        if self.list.has_key(name):
+            self._discard(name)
+            
+        count = len(self._slots)
+        
+        if index < 0:
+            index = max(0, index + count)
+        
+        index = min(index, count)
+        
+        if self._first_removed != None:
+            if index > self._first_removed:
+                self._refresh()
+            else:
+                self._first_removed += 1
+        
+        # (The indices of the following names are updated when they are next required.)
+        self._names.insert(index, name)
+        self._slots[name] = index
+        self.list[name] = obj
+        self.generation += 1
+        self._shifted = index if self._shifted == None else min(self._shifted, index)
+            
+    def move(self, name, index):
+        """
+        Move the object with the specified name to the specified index.
+        
+        :param name: The name of the object to move.
+        :param index: The index of the object after it has been moved.
+        
+        :raises: An ``IndexError`` if the index is out of range.
+        """
+        
+        old_index = self.index_of(name)
+        new_index = self._check_index(index)
+        
+        if self._first_removed != None and new_index >= self._first_removed:
+            self._refresh()
+            old_index = self._slots[name]
+        
+        del self._names[old_index]
+        self._names.insert(new_index, name)
+        self._update_slots(min(old_index, new_index), max(old_index, new_index) + 1)
+        self.generation += 1
         
     def count(self):
         """
@@ -86,21 +176,40 @@ class Key_List():
         
         :returns: An iterator for the list values.
         """
-        return self.list.itervalues()
+        
+        get = self.list.get
+        
+        # (Objects which are removed during iteration are skipped.)
+        for name in self._names:
+            if name is not None:
+                obj = get(name)
+                
+                if obj is not None:
+                    yield obj
         
     def clear(self):
         """
         Remove all items from the list.
         """
         self.list.clear()
+        self._names = []
+        self._slots.clear()
+        self._first_removed = None
+        self._removed = 0
+        self._shifted = None
+        self.generation += 1
     
     def __getitem__(self, i):
         """
-        Returns the object with the specified key.
+        Returns the object with the specified key, or a ``Key_List`` of the objects in a slice.
         
         :returns: The object with the specified key.
         """
         
+        if type(i) is slice:
+            self._refresh()
+            return Key_List([self[name] for name in self._names[i]])
+        
         return self.list[i]
 
     def names(self):
@@ -109,7 +218,8 @@ class Key_List():
         
         :returns: A list of the names of all objects in the list.
         """
-        return self.list.keys()
+        self._refresh()
+        return list(self._names)
     
     def items(self):
         """
@@ -118,7 +228,7 @@ class Key_List():
         :returns: A list of all items in the list.
         """
         
-        return self.list.values()
+        return map(self.list.__getitem__, self.names())
     
     def iternames(self):
         """
@@ -127,7 +237,7 @@ class Key_List():
         :returns: An iterator for the object names.
         """
         
-        return self.list.iterkeys()
+        return (name for name in self._names if name is not None)
 
     def pop(self, name):
         """
@@ -137,7 +247,9 @@ class Key_List():
         
         :returns: The object with the specified name.
         """
-        return self.list.pop(name)
+        obj = self.list.pop(name)
+        self._discard(name)
+        return obj
 
     def remove(self, obj):
         """
@@ -147,6 +259,7 @@ class Key_List():
         
         """
         self.list.pop(obj.name)
+        self._discard(obj.name)
     
     def __len__(self):
         """
@@ -173,4 +286,218 @@ class Key_List():
         
         :returns: The list item at the specified index. 
         """
-        return self.list[self.list.keys()[index]]
\ No newline at end of file
+        return self[self.name_at_index(index)]
+    
+    def name_at_index(self, index):
+        """
+        Returns the name of the list item at the specified index.
+        
+        :returns: The name of the list item at the specified index.
+        
+        :raises: An ``IndexError`` if the index is out of range.
+        """
+        
+        index = self._check_index(index)
+        
+        if self._first_removed != None and index >= self._first_removed:
+            self._refresh()
+        
+        return self._names[index]
+    
+    def index_of(self, name):
+        """
+        Returns the index of the object with the specified name.
+        
+        :returns: The index of the object with the specified name.
+        """
+        
+        index = self._slots[name]
+        
+        if (self._first_removed != None and index >= self._first_removed) or (self._shifted != None and index >= self._shifted):
+            self._refresh()
+            index = self._slots[name]
+            
+        return index
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        
+        # Lists which were pickled before the names were indexed store their objects in an ``OrderedDict``
+        if not state.has_key('_names'):
+            self.__init__()
+            
+            for name, obj in state['list'].iteritems():
+                self._add(name, obj)
+    
+    def _add(self, name, obj):
+        if not self.list.has_key(name):
+            self._slots[name] = len(self._names)
+            self._names.append(name)
+            
+        self.list[name] = obj
+        self.generation += 1
+        
+    def _discard(self, name):
+        """
+        Remove a name (whose object has been removed) from the list of names.
+        """
+        
+        index = self._slots[name]
+        
+        if self._shifted != None and index >= self._shifted:
+            self._refresh()
+            index = self._slots[name]
+        
+        del self._slots[name]
+        names = self._names
+        self.generation += 1
+        
+        if index == len(names) - 1:
+            names.pop()
+            
+            while len(names) > 0 and names[-1] is None:
+                names.pop()
+                self._removed -= 1
+                
+            if self._removed == 0:
+                self._first_removed = None
+        else:
+            names[index] = None
+            self._removed += 1
+            
+            if self._first_removed == None or index < self._first_removed:
+                self._first_removed = index
+        
+            if self._removed > len(names) // 2:
+                self._refresh()
+            
+    def _refresh(self):
+        """
+        Discard the removed names, and update the indices of the names which are out of date.
+        """
+        
+        start = min(i for i in (self._first_removed, self._shifted, len(self._names)) if i != None)
+        
+        if self._removed > 0:
+            # (A new list is created, so that the iterators of the previous list are unaffected.)
+            self._names = self._names[:start] + [name for name in itertools.islice(self._names, start, None) if name is not None]
+        
+        self._first_removed = None
+        self._removed = 0
+        self._shifted = None
+        self._update_slots(start, len(self._names))
+        
+    def _update_slots(self, start, stop):
+        names = self._names
+        self._slots.update(itertools.izip(itertools.islice(names, start, stop), xrange(start, stop)))
+        
+        # (Removed names may be within the range.)
+        self._slots.pop(None, None)
+        
+    def _check_index(self, index):
+        count = len(self._slots)
+        
+        if index < 0:
+            index += count
+            
+        if index < 0 or index >= count:
+            raise IndexError('Key_List index out of range')
+        
+        return index
+
+class Lazy_Key_List(Key_List):
+    """
+    A ``Key_List`` whose items are parsed on demand.
+    
+    Items are added as unparsed nodes using ``add_node()``. An item is parsed (using ``parse_function``)
+    the first time it is retrieved, whether by name, by index, or by iteration; the parsed object then
+    replaces the node. Operations which only require the names (e.g. ``names()``, ``has_name()``, 
+    and ``len()``) do not parse any items.
+    """
+    
+    def __init__(self, parse_function, nodes = None):
+        """
+        :param parse_function: A function which accepts a node and returns the corresponding object.
+        :param nodes: A list of ``(name, node)`` tuples to add, or ``None``.
+        """
+        
+        Key_List.__init__(self)
+        self.parse_function = parse_function
+        self.nodes = {}
+        
+        if nodes != None:
+            for name, node in nodes:
+                self.add_node(name, node)
+    
+    def add_node(self, name, node):
+        """
+        Add an unparsed node to the end of the list. 
+        
+        :param name: The name of the object which the node represents.
+        :param node: The node to parse when the object is first retrieved.
+        """
+        
+        self._add(name, None)
+        self.nodes[name] = node
+        
+    def is_parsed(self, name):
+        """
+        Returns a boolean value indicating whether the object with the specified name has been parsed.
+        
+        :returns: Whether the object with the specified name has been parsed.
+        """
+        
+        return not self.nodes.has_key(name)
+    
+    def _parse(self, name):
+        """
+        Parse the node with the specified name, and replace the node with the parsed object.
+        
+        :returns: The parsed object.
+        """
+        
+        obj = self.parse_function(self.nodes[name])
+        del self.nodes[name]
+        self.list[name] = obj
+        return obj
+    
+    def append(self, obj):
+        self.nodes.pop(obj.name, None)
+        Key_List.append(self, obj)
+        
+    def insert_at(self, index, obj):
+        self.nodes.pop(obj.name, None)
+        Key_List.insert_at(self, index, obj)
+        
+    def __iter__(self):
+        for name in self.names():
+            if self.nodes.has_key(name):
+                yield self._parse(name)
+            elif self.list.has_key(name):
+                yield self.list[name]
+        
+    def clear(self):
+        Key_List.clear(self)
+        self.nodes.clear()
+        
+    def __getitem__(self, i):
+        if type(i) is slice:
+            return Key_List.__getitem__(self, i)
+        
+        if self.nodes.has_key(i):
+            return self._parse(i)
+        
+        return self.list[i]
+    
+    def items(self):
+        return list(self.__iter__())
+    
+    def remove(self, obj):
+        self.nodes.pop(obj.name, None)
+        Key_List.remove(self, obj)
+    
+    def pop(self, name):
+        if self.nodes.has_key(name):
+            self._parse(name)
+            
+        return Key_List.pop(self, name)
@@ -0,0 +1,124 @@
+"""
+Netlist
+=======
+
+Provides the netlist of a schematic: the pins which are connected by each net, the net of each pin, and the nets
+to which each part is connected.
+
+A net may have segments on several sheets (each sheet has its own ``Net`` object, with the same name), so a
+``Netlist`` combines the nets of every sheet. It is built in one pass over the segments of the nets, and is
+reused until the schematic is modified (see ``Schematic.netlist()`` and ``references``). Adding or removing sheets
+or nets is detected. Changes to the segments of a net, or to the ``Pin_Ref`` objects which they contain (e.g.
+after renaming a part), are detected if the schematic is tracked (see ``tracking``); otherwise call
+``references.changed(schematic)`` after making them.
+
+Usage
+-----
+
+    netlist = schematic.netlist()
+
+    for name in netlist.names:
+        if len(netlist.pins_of(name)) < 2:
+            print(name)
+
+    net_name = netlist.net_of('R1', 'G$1', '2')
+
+"""
+
+import primitives
+
+class Netlist(object):
+    """
+    The netlist of a set of sheets.
+
+    * ``names``: A list of the names of the nets, in the order in which they first appear.
+    * ``nets``: A dict which maps the name of each net to a list of the ``Pin_Ref`` objects of its pins (in the
+      order of the sheets, then the segments).
+    * ``pins``: A dict which maps the ``(part, gate, pin)`` names of each connected pin to the name of its net.
+    * ``parts``: A dict which maps the name of each connected part to a list of the names of its nets, in the
+      order in which they first appear.
+    * ``shorts``: A dict which maps the ``(part, gate, pin)`` names of each pin which is connected to more than
+      one net to a list of the names of those nets. The ``pins`` entry of such a pin is the first net.
+    """
+
+    def __init__(self, sheets):
+        """
+        :param sheets: A sequence of ``Sheet`` objects (e.g. ``schematic.sheets``).
+        """
+
+        self.names = []
+        self.nets = {}
+        self.pins = {}
+        self.parts = {}
+        self.shorts = {}
+
+        for sheet in sheets:
+            for net in sheet.nets:
+                pin_refs = self.nets.get(net.name)
+
+                if pin_refs == None:
+                    pin_refs = self.nets[net.name] = []
+                    self.names.append(net.name)
+
+                for segment in net.segments:
+                    for item in segment.items:
+                        if isinstance(item, primitives.Pin_Ref):
+                            pin_refs.append(item)
+                            self._add_pin(net.name, item)
+
+    def _add_pin(self, net_name, pin_ref):
+        key = (pin_ref.part, pin_ref.gate, pin_ref.pin)
+        first = self.pins.setdefault(key, net_name)
+
+        if first != net_name:
+            shorted = self.shorts.setdefault(key, [first])
+
+            if net_name not in shorted:
+                shorted.append(net_name)
+
+        part_nets = self.parts.setdefault(pin_ref.part, [])
+
+        if net_name not in part_nets:
+            part_nets.append(net_name)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __contains__(self, net_name):
+        return self.nets.has_key(net_name)
+
+    def pins_of(self, net_name):
+        """
+        :param net_name: The name of a net.
+
+        :returns: A list of the ``Pin_Ref`` objects of the pins which the net connects (which is empty if there
+                  is no such net).
+        """
+
+        return list(self.nets.get(net_name, ()))
+
+    def net_of(self, part, gate, pin):
+        """
+        :param part: The name of a part.
+        :param gate: The name of a gate of the part.
+        :param pin: The name of a pin of the gate.
+
+        :returns: The name of the net to which the pin is connected, or ``None`` if it is not connected.
+        """
+
+        return self.pins.get((part, gate, pin))
+
+    def nets_of(self, part):
+        """
+        :param part: The name of a part (or a ``Part``).
+
+        :returns: A list of the names of the nets to which the pins of the part are connected.
+        """
+
+        if not isinstance(part, basestring):
+            part = part.name
+
+        return list(self.parts.get(part, ()))
@@ -0,0 +1,31 @@
+"""
+NumPy Utilities
+===============
+
+Imports NumPy, which is optional: it is only required by the modules which store or place primitives in arrays
+(``columnar`` and ``placement``), and is not imported by the rest of the package.
+
+Usage
+-----
+
+    from numpy_utils import numpy, require_numpy
+
+    require_numpy('Columnar storage')
+
+"""
+
+# ``numpy`` is ``None`` if NumPy is not available.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+def require_numpy(feature):
+    """
+    :param feature: The feature which requires NumPy (e.g. ``'Columnar storage'``), for the error message.
+
+    :raises: An ``Exception`` if NumPy is not available.
+    """
+
+    if numpy == None:
+        raise Exception('{0} requires NumPy, which could not be imported.'.format(feature))
@@ -0,0 +1,224 @@
+"""
+Placement
+=========
+
+Provides the positions, extents, and layers on a board of the primitives of the packages of its elements,
+calculated for every element at once using NumPy.
+
+``geometry.Placement`` places the primitives of one element at a time. Analyses of a board (e.g. counting the
+SMDs on each side of the board, or finding where each pad lands) place the primitives of every element, so a
+``Placed_Items`` object places them in batches instead: the primitives of each package are converted to arrays
+once, and are placed by all of the elements which use that package using a few array operations. The matrix of
+each distinct rotation is only calculated once (see ``geometry.matrix()``).
+
+The results are the same as those of ``geometry.Placement``: the bounding box of a placed primitive is the
+bounding box of its (exact) bounding box in the package, once placed, and pads and holes are placed on the
+``Pads`` and ``Holes`` layers (see ``geometry.ITEM_LAYERS``).
+
+NumPy is required.
+
+Usage
+-----
+
+    placed = board.placed_items()
+
+    smds = placed.mask(primitives.SMD)
+    num_smds_bottom = (placed.layer[smds] == constants.LAYERS.BOTTOM).sum()
+
+    for element, item, x, y in zip(placed.elements_of_rows(), placed.items, placed.x, placed.y):
+        ...
+
+"""
+
+import geometry
+import primitives
+
+# NumPy is optional; it is only required if placement is used.
+from numpy_utils import numpy, require_numpy
+
+# The classes of the primitives which are placed (the ``kind`` of each row is the index of its class)
+CLASSES = (primitives.Wire, primitives.SMD, primitives.Pad, primitives.Hole, primitives.Circle, primitives.Rectangle,
+           primitives.Polygon, primitives.Via, primitives.Frame)
+
+# The names of the variables which have a value for each row
+COLUMNS = ('element', 'kind', 'x', 'y', 'x2', 'y2', 'angle', 'curve', 'layer', 'bounds')
+
+def _anchors(item):
+    """
+    :returns: The ``(x, y, x2, y2, angle, curve)`` of a primitive in its package.
+    """
+
+    if isinstance(item, primitives.Wire):
+        return (item.x1, item.y1, item.x2, item.y2, 0, item.curve)
+    elif isinstance(item, primitives.Rectangle):
+        return (item.x1, item.y1, item.x2, item.y2, item.rotation.angle, 0)
+    elif isinstance(item, primitives.Frame):
+        return (item.x1, item.y1, item.x2, item.y2, 0, 0)
+    elif isinstance(item, primitives.Polygon):
+        nan = float('nan')
+        return (nan, nan, nan, nan, 0, 0)
+
+    angle = item.rotation.angle if isinstance(item, (primitives.SMD, primitives.Pad)) else 0
+    return (item.x, item.y, item.x, item.y, angle, 0)
+
+class _Package_Columns(object):
+    """
+    The variables of the primitives of a package which are placed.
+    """
+
+    def __init__(self, package):
+        self.items = []
+        kinds = []
+        rows = []
+        layers = []
+        bounds = []
+
+        for item in package.items:
+            for kind, cls in enumerate(CLASSES):
+                if isinstance(item, cls):
+                    b = geometry.bounds(item)
+
+                    if b != None:
+                        self.items.append(item)
+                        kinds.append(kind)
+                        rows.append(_anchors(item))
+                        layers.append(geometry.item_layer(item))
+                        bounds.append(b)
+
+                    break
+
+        self.kind = numpy.array(kinds, 'i1')
+        self.layer = numpy.array(layers, 'i4')
+
+        rows = numpy.array(rows, 'f8').reshape(-1, 6)
+        self.x, self.y, self.x2, self.y2, self.angle, self.curve = rows.T
+
+        bounds = numpy.array(bounds, 'f8').reshape(-1, 4)
+        self.center_x = (bounds[:, 0] + bounds[:, 2]) / 2.0
+        self.center_y = (bounds[:, 1] + bounds[:, 3]) / 2.0
+        self.half_width = (bounds[:, 2] - bounds[:, 0]) / 2.0
+        self.half_height = (bounds[:, 3] - bounds[:, 1]) / 2.0
+
+class Placed_Items(object):
+    """
+    The primitives of the packages of a sequence of elements, placed on the board.
+
+    Each variable has a value for each placed primitive (a *row*). The rows of each element are consecutive, and
+    are in the order of the elements, then the order of the items of their packages. Texts (and other primitives
+    without a bounding box) are omitted.
+
+    * ``elements``: The list of elements.
+    * ``items``: A list of the primitive of each row.
+    * ``element``: The index (in ``elements``) of the element of each row.
+    * ``kind``: The index (in ``CLASSES``) of the class of the primitive of each row.
+    * ``x``, ``y``: The position on the board of the primitive (of the first point of wires, rectangles, and
+      frames; NaN for polygons).
+    * ``x2``, ``y2``: The position on the board of the second point of wires, rectangles, and frames (equal to
+      ``x`` and ``y`` for other primitives).
+    * ``angle``: The angle (in degrees) on the board of the x axis of the primitive (including the rotation of
+      SMDs, pads, and rectangles).
+    * ``curve``: The curve of wires (which is reversed by mirrored elements), or 0.
+    * ``layer``: The layer on the board.
+    * ``bounds``: An array with a ``(x_min, y_min, x_max, y_max)`` bounding box on the board for each row.
+    """
+
+    def __init__(self, elements):
+        """
+        :param elements: A sequence of ``Element`` objects (e.g. ``board.elements``).
+        """
+
+        require_numpy('Placement')
+
+        self.elements = list(elements)
+
+        # id(package) -> (package columns, [index of element])
+        packages = {}
+        # Each package is placed in turn (in the order in which they are first used)
+        order = []
+
+        for i, element in enumerate(self.elements):
+            entry = packages.get(id(element.package))
+
+            if entry == None:
+                entry = packages[id(element.package)] = (_Package_Columns(element.package), [])
+                order.append(entry)
+
+            entry[1].append(i)
+
+        self.items = []
+        parts = [self._place(columns, indices) for columns, indices in order]
+
+        if len(parts) > 0:
+            items = [item for package_columns, indices in order for i in indices for item in package_columns.items]
+            columns = [numpy.concatenate(c) for c in zip(*parts)]
+
+            # Sort the rows into the order of the elements (the sort is stable, so the order of the items is kept)
+            rows = numpy.argsort(columns[0], kind = 'mergesort')
+            self.items = [items[i] for i in rows.tolist()]
+            columns = [c[rows] for c in columns]
+        else:
+            columns = [numpy.zeros(0, 'i4'), numpy.zeros(0, 'i1')] + [numpy.zeros(0, 'f8')] * 6 + [numpy.zeros(0, 'i4'), numpy.zeros((0, 4), 'f8')]
+
+        for name, column in zip(COLUMNS, columns):
+            setattr(self, name, column)
+
+    def _place(self, columns, indices):
+        """
+        Place the primitives of a package for a set of elements.
+
+        :returns: A list of the arrays of the variables (see ``COLUMNS``).
+        """
+
+        elements = [self.elements[i] for i in indices]
+        count = len(columns.items)
+
+        # A row for each element, and a column for each item
+        shape = (len(elements), 1)
+        ex = numpy.array([e.x for e in elements], 'f8').reshape(shape)
+        ey = numpy.array([e.y for e in elements], 'f8').reshape(shape)
+        a, b, c, d = numpy.array([geometry.matrix(e.rotation) for e in elements], 'f8').reshape(-1, 4).T.reshape((4,) + shape)
+        mirrored = numpy.array([e.rotation.mirrored for e in elements], bool).reshape(shape)
+        element_angle = numpy.array([e.rotation.angle for e in elements], 'f8').reshape(shape)
+
+        place_x = lambda x, y: ex + a * x + b * y
+        place_y = lambda x, y: ey + c * x + d * y
+
+        cx = place_x(columns.center_x, columns.center_y)
+        cy = place_y(columns.center_x, columns.center_y)
+        half_width = abs(a) * columns.half_width + abs(b) * columns.half_height
+        half_height = abs(c) * columns.half_width + abs(d) * columns.half_height
+
+        layer_table = numpy.array([geometry.mirror_layer(l) for l in range(columns.layer.max() + 1 if count > 0 else 0)], 'i4')
+
+        # Each variable has a row for each element and a column for each item
+        variables = (place_x(columns.x, columns.y),
+                     place_y(columns.x, columns.y),
+                     place_x(columns.x2, columns.y2),
+                     place_y(columns.x2, columns.y2),
+                     (numpy.where(mirrored, 180 - columns.angle, columns.angle) + element_angle) % 360,
+                     numpy.where(mirrored, -columns.curve, columns.curve),
+                     numpy.where(mirrored, layer_table[columns.layer], columns.layer))
+
+        # Flatten them, so that the rows of each element are consecutive
+        return ([numpy.repeat(numpy.array(indices, 'i4'), count), numpy.tile(columns.kind, len(elements))] +
+                [v.ravel() for v in variables] +
+                [numpy.dstack((cx - half_width, cy - half_height, cx + half_width, cy + half_height)).reshape(-1, 4)])
+
+    def __len__(self):
+        return len(self.items)
+
+    def mask(self, cls):
+        """
+        :param cls: One of ``CLASSES``.
+
+        :returns: A boolean array which is ``True`` for the rows whose primitives are instances of ``cls``.
+        """
+
+        return self.kind == CLASSES.index(cls)
+
+    def elements_of_rows(self):
+        """
+        :returns: A list of the element of each row.
+        """
+
+        return [self.elements[i] for i in self.element.tolist()]
@@ -17,6 +17,10 @@ Each primitive class must contain the following:
 * An ``append_node()`` method which accepts a primitive class object and a parent ElementTree ``Element`` and 
   appends an ``Element`` to that parent.
 
+Boards may contain millions of primitives, so each primitive class declares ``__slots__`` (the variables 
+set by its constructor) rather than using a per-instance ``__dict__``. Consequently, variables other than 
+those listed in ``__slots__`` cannot be added to a primitive.
+
 EAGLE stores the descsription for packages and symbols within the list of primitives. This package stores this
 data separately. Thus, the Description element is not considered a primitive, and it returns None.
 
@@ -31,12 +35,13 @@ populated dynamically (using reflection) when this module is imported.
 """
 
 import attributes
+import codec
 import constants
 import inspect
 import sys
 from xml.etree import ElementTree
 
-class Circle:
+class Circle(object):
     TAG_NAME = constants.TAGS.CIRCLE
     
     DEFAULT_WIDTH = 0.01
@@ -48,6 +53,14 @@ class Circle:
                 constants.ATTRIBUTES.LAYER: attributes.ATTR_INT
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.RADIUS, 'radius'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.WIDTH, 'width', DEFAULT_WIDTH)])
+    
+    __slots__ = ('x', 'y', 'radius', 'width', 'layer')
+    
     def __init__(self, x, y, radius, layer, width = DEFAULT_WIDTH):
         self.x = x
         self.y = y
@@ -57,24 +70,12 @@ class Circle:
     
     @classmethod
     def parse(cls, n):
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        radius = attributes.parse(cls, n, constants.ATTRIBUTES.RADIUS)
-        width = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.WIDTH, cls.DEFAULT_WIDTH)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        
-        return Circle(x, y, radius, layer, width)
+        return Circle(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.RADIUS, self.radius)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.WIDTH, self.width)
+        self.CODEC.append(self, _n)
     
-class Contact_Ref:
+class Contact_Ref(object):
     TAG_NAME = constants.TAGS.CONTACT_REF
     
     DEFAULT_ROUTE = None
@@ -86,6 +87,13 @@ class Contact_Ref:
                 constants.ATTRIBUTES.ROUTE_TAG: attributes.ATTR_STRING
                 }
           
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.ELEMENT, 'element'),
+                                             codec.Field(constants.ATTRIBUTES.PAD, 'pad'),
+                                             codec.Field(constants.ATTRIBUTES.ROUTE, 'route', DEFAULT_ROUTE, DEFAULT_ROUTE),
+                                             codec.Field(constants.ATTRIBUTES.ROUTE_TAG, 'route_tag', DEFAULT_ROUTE_TAG, DEFAULT_ROUTE_TAG)])
+    
+    __slots__ = ('element', 'pad', 'route', 'route_tag')
+    
     def __init__(self, element, pad, route = DEFAULT_ROUTE, route_tag = DEFAULT_ROUTE_TAG):
         self.element = element
         self.pad = pad
@@ -94,20 +102,10 @@ class Contact_Ref:
         
     @classmethod
     def parse(cls, n):
-        element = attributes.parse(cls, n, constants.ATTRIBUTES.ELEMENT)
-        pad = attributes.parse(cls, n, constants.ATTRIBUTES.PAD)
-        route = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROUTE, cls.DEFAULT_ROUTE)
-        route_tag = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROUTE_TAG, cls.DEFAULT_ROUTE_TAG)
+        return Contact_Ref(*cls.CODEC.parse(n))
         
-        return Contact_Ref(element, pad, route, route_tag)
-          
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ELEMENT, self.element)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PAD, self.pad)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROUTE, self.route, self.DEFAULT_ROUTE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROUTE_TAG, self.route_tag, self.DEFAULT_ROUTE_TAG)
+        self.CODEC.append(self, _n)
           
 """
 Descriptions are added to the enclosing tags, so this primitive is not used. 
@@ -119,7 +117,7 @@ class Description:
     def parse(cls, n):
         return None
          
-class Dimension:
+class Dimension(object):
     TAG_NAME = constants.TAGS.DIMENSION
     
     DEFAULT_DIMENSION_TYPE = constants.DIMENSION_TYPE.PARALLEL
@@ -146,6 +144,26 @@ class Dimension:
                 
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X1, 'x1'),
+                                             codec.Field(constants.ATTRIBUTES.Y1, 'y1'),
+                                             codec.Field(constants.ATTRIBUTES.X2, 'x2'),
+                                             codec.Field(constants.ATTRIBUTES.Y2, 'y2'),
+                                             codec.Field(constants.ATTRIBUTES.X3, 'x3'),
+                                             codec.Field(constants.ATTRIBUTES.Y3, 'y3'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.TEXT_SIZE, 'text_size', DEFAULT_TEXT_SIZE, DEFAULT_TEXT_SIZE),
+                                             codec.Field(constants.ATTRIBUTES.TEXT_RATIO, 'text_ratio', DEFAULT_TEXT_RATIO, DEFAULT_TEXT_RATIO),
+                                             codec.Field(constants.ATTRIBUTES.DIMENSION_TYPE, 'dimension_type', DEFAULT_DIMENSION_TYPE, DEFAULT_DIMENSION_TYPE),
+                                             codec.Field(constants.ATTRIBUTES.WIDTH, 'width', DEFAULT_WIDTH, DEFAULT_WIDTH),
+                                             codec.Field(constants.ATTRIBUTES.EXT_WIDTH, 'ext_width', DEFAULT_EXT_WIDTH, DEFAULT_EXT_WIDTH),
+                                             codec.Field(constants.ATTRIBUTES.EXT_LENGTH, 'ext_length', DEFAULT_EXT_LENGTH, DEFAULT_EXT_LENGTH),
+                                             codec.Field(constants.ATTRIBUTES.EXT_OFFSET, 'ext_offset', DEFAULT_EXT_OFFSET, DEFAULT_EXT_OFFSET),
+                                             codec.Field(constants.ATTRIBUTES.UNIT, 'unit', DEFAULT_UNIT, DEFAULT_UNIT),
+                                             codec.Field(constants.ATTRIBUTES.PRECISION, 'precision', DEFAULT_PRECISION, DEFAULT_PRECISION),
+                                             codec.Field(constants.ATTRIBUTES.VISIBLE, 'unit_visible', DEFAULT_UNIT_VISIBLE, DEFAULT_UNIT_VISIBLE)])
+    
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'x3', 'y3', 'layer', 'text_size', 'text_ratio', 'dimension_type', 'width', 'ext_width', 'ext_length', 'ext_offset', 'unit', 'precision', 'unit_visible')
+    
     def __init__(self, x1, y1, x2, y2, x3, y3, layer, text_size = DEFAULT_TEXT_SIZE, text_ratio = DEFAULT_TEXT_RATIO,
                  dimension_type = DEFAULT_DIMENSION_TYPE, width = DEFAULT_WIDTH,
                  ext_width = DEFAULT_EXT_WIDTH, ext_length = DEFAULT_EXT_LENGTH,
@@ -171,49 +189,13 @@ class Dimension:
         
     @classmethod
     def parse(cls, n):
-        x1 = attributes.parse(cls, n, constants.ATTRIBUTES.X1)
-        y1 = attributes.parse(cls, n, constants.ATTRIBUTES.Y1)
-        x2 = attributes.parse(cls, n, constants.ATTRIBUTES.X2)
-        y2 = attributes.parse(cls, n, constants.ATTRIBUTES.Y2)
-        x3 = attributes.parse(cls, n, constants.ATTRIBUTES.X3)
-        y3 = attributes.parse(cls, n, constants.ATTRIBUTES.Y3)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        text_size = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.TEXT_SIZE, cls.DEFAULT_TEXT_SIZE)
-        text_ratio = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.TEXT_RATIO, cls.DEFAULT_TEXT_RATIO)
-        dimension_type = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.DIMENSION_TYPE, cls.DEFAULT_DIMENSION_TYPE)
-        width = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.WIDTH, cls.DEFAULT_WIDTH)
-        ext_width = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.EXT_WIDTH, cls.DEFAULT_EXT_WIDTH)
-        ext_length = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.EXT_LENGTH, cls.DEFAULT_EXT_LENGTH)
-        ext_offset = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.EXT_OFFSET, cls.DEFAULT_EXT_OFFSET)
-        unit = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.UNIT, cls.DEFAULT_UNIT)
-        precision = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.PRECISION, cls.DEFAULT_PRECISION)
-        unit_visible = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.VISIBLE, cls.DEFAULT_UNIT_VISIBLE)
-        
-        return Dimension(x1, y1, x2, y2, x3, y3, layer, text_size, text_ratio, dimension_type, width, ext_width, ext_length, ext_offset, unit, precision, unit_visible)
+        return Dimension(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-     
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X1, self.x1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y1, self.y1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X2, self.x2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y2, self.y2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X3, self.x3)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y3, self.y3)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.TEXT_SIZE, self.text_size, self.DEFAULT_TEXT_SIZE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.TEXT_RATIO, self.text_ratio, self.DEFAULT_TEXT_RATIO)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DIMENSION_TYPE, self.dimension_type, self.DEFAULT_DIMENSION_TYPE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.WIDTH, self.width, self.DEFAULT_WIDTH)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.EXT_WIDTH, self.ext_width, self.DEFAULT_EXT_WIDTH)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.EXT_LENGTH, self.ext_length, self.DEFAULT_EXT_LENGTH)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.EXT_OFFSET, self.ext_offset, self.DEFAULT_EXT_OFFSET)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.UNIT, self.unit, self.DEFAULT_UNIT)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PRECISION, self.precision, self.DEFAULT_PRECISION)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VISIBLE, self.unit_visible, self.DEFAULT_UNIT_VISIBLE)
+        self.CODEC.append(self, _n)
      
          
-class Frame:
+class Frame(object):
     TAG_NAME = constants.TAGS.FRAME
     
     DEFAULT_ROWS = 5
@@ -237,6 +219,21 @@ class Frame:
                 
                 }
           
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X1, 'x1'),
+                                             codec.Field(constants.ATTRIBUTES.Y1, 'y1'),
+                                             codec.Field(constants.ATTRIBUTES.X2, 'x2'),
+                                             codec.Field(constants.ATTRIBUTES.Y2, 'y2'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.ROWS, 'rows', DEFAULT_ROWS),
+                                             codec.Field(constants.ATTRIBUTES.COLUMNS, 'columns', DEFAULT_COLUMNS),
+                                             codec.Field(constants.ATTRIBUTES.BORDER.LEFT, 'border_left', DEFAULT_BORDER_LEFT, DEFAULT_BORDER_LEFT),
+                                             codec.Field(constants.ATTRIBUTES.BORDER.TOP, 'border_top', DEFAULT_BORDER_TOP, DEFAULT_BORDER_TOP),
+                                             codec.Field(constants.ATTRIBUTES.BORDER.RIGHT, 'border_right', DEFAULT_BORDER_RIGHT, DEFAULT_BORDER_RIGHT),
+                                             codec.Field(constants.ATTRIBUTES.BORDER.BOTTOM, 'border_bottom', DEFAULT_BORDER_BOTTOM, DEFAULT_BORDER_BOTTOM)],
+                        write_order = ['x1', 'y1', 'x2', 'y2', 'rows', 'columns', 'layer', 'border_top', 'border_left', 'border_bottom', 'border_right'])
+    
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'layer', 'rows', 'columns', 'border_top', 'border_left', 'border_bottom', 'border_right')
+    
     def __init__(self, x1, y1, x2, y2, layer, rows = DEFAULT_ROWS, columns = DEFAULT_COLUMNS, border_left = DEFAULT_BORDER_LEFT,
                  border_top = DEFAULT_BORDER_TOP, border_right = DEFAULT_BORDER_RIGHT, border_bottom = DEFAULT_BORDER_BOTTOM):
         self.x1 = x1
@@ -255,38 +252,12 @@ class Frame:
 
     @classmethod
     def parse(cls, n):
-        x1 = attributes.parse(cls, n, constants.ATTRIBUTES.X1)
-        y1 = attributes.parse(cls, n, constants.ATTRIBUTES.Y1)
-        x2 = attributes.parse(cls, n, constants.ATTRIBUTES.X2)
-        y2 = attributes.parse(cls, n, constants.ATTRIBUTES.Y2)
-        rows = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROWS, cls.DEFAULT_ROWS)
-        columns = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.COLUMNS, cls.DEFAULT_COLUMNS)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        
-        border_top = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.BORDER.TOP, cls.DEFAULT_BORDER_TOP)
-        border_left = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.BORDER.LEFT, cls.DEFAULT_BORDER_LEFT)
-        border_bottom = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.BORDER.BOTTOM, cls.DEFAULT_BORDER_BOTTOM)
-        border_right = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.BORDER.RIGHT, cls.DEFAULT_BORDER_RIGHT)
-        
-        return Frame(x1, y1, x2, y2, layer, rows, columns, border_left, border_top, border_right, border_bottom)
-          
+        return Frame(*cls.CODEC.parse(n))
+        
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X1, self.x1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y1, self.y1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X2, self.x2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y2, self.y2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROWS, self.rows)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.COLUMNS, self.columns)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.BORDER.TOP, self.border_top, self.DEFAULT_BORDER_TOP)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.BORDER.LEFT, self.border_left, self.DEFAULT_BORDER_LEFT)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.BORDER.BOTTOM, self.border_bottom, self.DEFAULT_BORDER_BOTTOM)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.BORDER.RIGHT, self.border_right, self.DEFAULT_BORDER_RIGHT)
-        
-class Hole:
+        self.CODEC.append(self, _n)
+        
+class Hole(object):
     TAG_NAME = constants.TAGS.HOLE
     
     ATTR_MAP = {constants.ATTRIBUTES.X: attributes.ATTR_FLOAT,
@@ -294,6 +265,12 @@ class Hole:
                 constants.ATTRIBUTES.DRILL: attributes.ATTR_FLOAT
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.DRILL, 'drill')])
+    
+    __slots__ = ('x', 'y', 'drill')
+    
     def __init__(self, x, y, drill):
         self.x = x
         self.y = y
@@ -301,43 +278,34 @@ class Hole:
         
     @classmethod
     def parse(cls, n):
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        drill = attributes.parse(cls, n, constants.ATTRIBUTES.DRILL)
+        return Hole(*cls.CODEC.parse(n))
         
-        return Hole(x, y, drill)
-    
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DRILL, self.drill)
+        self.CODEC.append(self, _n)
    
-class Junction:
+class Junction(object):
     TAG_NAME = constants.TAGS.JUNCTION
     
     ATTR_MAP = {constants.ATTRIBUTES.X: attributes.ATTR_FLOAT,
                 constants.ATTRIBUTES.Y: attributes.ATTR_FLOAT}
         
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y')])
+    
+    __slots__ = ('x', 'y')
+    
     def __init__(self, x, y):
         self.x = x
         self.y = y
         
     @classmethod
     def parse(cls, n):
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
+        return Junction(*cls.CODEC.parse(n))
         
-        return Junction(x, y)
-    
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
+        self.CODEC.append(self, _n)
         
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        
-class Label:
+class Label(object):
     TAG_NAME = constants.TAGS.LABEL
     
     DEFAULT_XREF = False
@@ -354,6 +322,17 @@ class Label:
                 constants.ATTRIBUTES.RATIO: attributes.ATTR_INT
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.SIZE, 'size'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.XREF, 'xref', DEFAULT_XREF, DEFAULT_XREF),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(0), attributes.Rotation(0)),
+                                             codec.Field(constants.ATTRIBUTES.FONT, 'font', DEFAULT_FONT, DEFAULT_FONT),
+                                             codec.Field(constants.ATTRIBUTES.RATIO, 'ratio', DEFAULT_RATIO, DEFAULT_RATIO)])
+    
+    __slots__ = ('x', 'y', 'size', 'layer', 'xref', 'rotation', 'font', 'ratio')
+    
     def __init__(self, x, y, size, layer, xref, rotation = attributes.Rotation(0), font = DEFAULT_FONT, ratio = DEFAULT_RATIO):
         self.x = x
         self.y = y
@@ -366,30 +345,12 @@ class Label:
         
     @classmethod
     def parse(cls, n):
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        size = attributes.parse(cls, n, constants.ATTRIBUTES.SIZE)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        xref = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.XREF, cls.DEFAULT_XREF)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation(0))
-        font = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.FONT, cls.DEFAULT_FONT)
-        ratio = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.RATIO, cls.DEFAULT_RATIO)
-        
-        return Label(x, y, size, layer, xref, rotation, font, ratio)
+        return Label(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SIZE, self.size)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.XREF, self.xref, self.DEFAULT_XREF)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation(0))
-        attributes.set_attr(self, n, constants.ATTRIBUTES.FONT, self.font, self.DEFAULT_FONT)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.RATIO, self.ratio, self.DEFAULT_RATIO)
-        
-class Pad:
+        self.CODEC.append(self, _n)
+        
+class Pad(object):
     TAG_NAME = constants.TAGS.PAD
     
     DEFAULT_SHAPE = constants.SHAPE.ROUND
@@ -408,6 +369,19 @@ class Pad:
                 constants.ATTRIBUTES.STOP: attributes.ATTR_BOOL,
                 constants.ATTRIBUTES.THERMALS: attributes.ATTR_BOOL}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.DRILL, 'drill'),
+                                             codec.Field(constants.ATTRIBUTES.DIAMETER, 'diameter', None),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(), attributes.Rotation()),
+                                             codec.Field(constants.ATTRIBUTES.SHAPE, 'shape', DEFAULT_SHAPE, DEFAULT_SHAPE),
+                                             codec.Field(constants.ATTRIBUTES.FIRST, 'first', DEFAULT_FIRST, DEFAULT_FIRST),
+                                             codec.Field(constants.ATTRIBUTES.STOP, 'stop', DEFAULT_STOP, DEFAULT_STOP),
+                                             codec.Field(constants.ATTRIBUTES.THERMALS, 'thermals', DEFAULT_THERMALS, DEFAULT_THERMALS)])
+    
+    __slots__ = ('name', 'x', 'y', 'drill', 'diameter', 'rotation', 'shape', 'first', 'stop', 'thermals')
+    
     def __init__(self, name, x, y, drill, diameter = None, rotation = attributes.Rotation(), shape = DEFAULT_SHAPE, first = DEFAULT_FIRST, stop = DEFAULT_STOP, thermals = DEFAULT_THERMALS):
         self.name = name
         self.x = x
@@ -422,34 +396,12 @@ class Pad:
     
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        drill = attributes.parse(cls, n, constants.ATTRIBUTES.DRILL)
-        diameter = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.DIAMETER, None)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation())
-        shape = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SHAPE, cls.DEFAULT_SHAPE)
-        first = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.FIRST, cls.DEFAULT_FIRST)
-        stop = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.STOP, cls.DEFAULT_STOP)
-        thermals = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.THERMALS, cls.DEFAULT_THERMALS)
-        
-        return Pad(name, x, y, drill, diameter, rotation, shape, first, stop, thermals)
-    
+        return Pad(*cls.CODEC.parse(n))
+        
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DRILL, self.drill)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DIAMETER, self.diameter)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation())
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SHAPE, self.shape, self.DEFAULT_SHAPE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.FIRST, self.first, self.DEFAULT_FIRST)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.STOP, self.stop, self.DEFAULT_STOP)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.THERMALS, self.thermals, self.DEFAULT_THERMALS)
-        
-class Pin:
+        self.CODEC.append(self, _n)
+        
+class Pin(object):
     TAG_NAME = constants.TAGS.PIN
     
     DEFAULT_VISIBLE = constants.PIN.VISIBLE.BOTH
@@ -469,6 +421,19 @@ class Pin:
                 constants.ATTRIBUTES.FUNCTION: attributes.ATTR_STRING
                 }
 
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.VISIBLE, 'visible', DEFAULT_VISIBLE, DEFAULT_VISIBLE),
+                                             codec.Field(constants.ATTRIBUTES.SWAP_LEVEL, 'swap_level', DEFAULT_SWAP_LEVEL, DEFAULT_SWAP_LEVEL),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(), attributes.Rotation()),
+                                             codec.Field(constants.ATTRIBUTES.LENGTH, 'length', DEFAULT_LENGTH, DEFAULT_LENGTH),
+                                             codec.Field(constants.ATTRIBUTES.DIRECTION, 'direction', DEFAULT_DIRECTION, DEFAULT_DIRECTION),
+                                             codec.Field(constants.ATTRIBUTES.FUNCTION, 'function', DEFAULT_FUNCTION, DEFAULT_FUNCTION)],
+                        write_order = ['x', 'y', 'name', 'visible', 'swap_level', 'rotation', 'length', 'direction', 'function'])
+    
+    __slots__ = ('name', 'x', 'y', 'visible', 'swap_level', 'rotation', 'length', 'direction', 'function')
+    
     def __init__(self, name, 
                  x, 
                  y, 
@@ -490,32 +455,12 @@ class Pin:
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        visible = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.VISIBLE, cls.DEFAULT_VISIBLE)
-        swap_level = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SWAP_LEVEL, cls.DEFAULT_SWAP_LEVEL)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation())
-        length = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.LENGTH, cls.DEFAULT_LENGTH)
-        direction = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.DIRECTION, cls.DEFAULT_DIRECTION)
-        function = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.FUNCTION, cls.DEFAULT_FUNCTION)
-        
-        return Pin(name, x, y, visible, swap_level, rotation, length, direction, function)
+        return Pin(*cls.CODEC.parse(n))
         
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.VISIBLE, self.visible, self.DEFAULT_VISIBLE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SWAP_LEVEL, self.swap_level, self.DEFAULT_SWAP_LEVEL)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation())
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LENGTH, self.length, self.DEFAULT_LENGTH)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DIRECTION, self.direction, self.DEFAULT_DIRECTION)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.FUNCTION, self.function, self.DEFAULT_FUNCTION)
+        self.CODEC.append(self, _n)
 
-class Pin_Ref:
+class Pin_Ref(object):
     TAG_NAME = constants.TAGS.PIN_REF
     
     ATTR_MAP = {constants.ATTRIBUTES.PART: attributes.ATTR_STRING,
@@ -523,6 +468,12 @@ class Pin_Ref:
                 constants.ATTRIBUTES.PIN: attributes.ATTR_STRING
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.PART, 'part'),
+                                             codec.Field(constants.ATTRIBUTES.GATE, 'gate'),
+                                             codec.Field(constants.ATTRIBUTES.PIN, 'pin')])
+    
+    __slots__ = ('part', 'gate', 'pin')
+    
     def __init__(self, part, gate, pin):
         self.part = part
         self.gate = gate
@@ -530,21 +481,13 @@ class Pin_Ref:
         
     @classmethod
     def parse(cls, n):
-        part = attributes.parse(cls, n, constants.ATTRIBUTES.PART)
-        gate = attributes.parse(cls, n, constants.ATTRIBUTES.GATE)
-        pin = attributes.parse(cls, n, constants.ATTRIBUTES.PIN)
-
-        return Pin_Ref(part, gate, pin)
-
+        return Pin_Ref(*cls.CODEC.parse(n))
+        
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PART, self.part)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.GATE, self.gate)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.PIN, self.pin)
+        self.CODEC.append(self, _n)
         
 
-class Polygon:
+class Polygon(object):
     TAG_NAME = constants.TAGS.POLYGON
     
     DEFAULT_WIDTH = 0.01
@@ -566,6 +509,18 @@ class Polygon:
                 constants.ATTRIBUTES.ORPHANS: attributes.ATTR_BOOL,
                 constants.ATTRIBUTES.THERMALS: attributes.ATTR_BOOL}
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.WIDTH, 'width', DEFAULT_WIDTH),
+                                             codec.Field(constants.ATTRIBUTES.RANK, 'rank', DEFAULT_RANK, DEFAULT_RANK),
+                                             codec.Field(constants.ATTRIBUTES.SPACING, 'spacing', DEFAULT_SPACING, DEFAULT_SPACING),
+                                             codec.Field(constants.ATTRIBUTES.POUR, 'pour', DEFAULT_POUR, DEFAULT_POUR),
+                                             codec.Field(constants.ATTRIBUTES.ISOLATE, 'isolate', DEFAULT_ISOLATE, DEFAULT_ISOLATE),
+                                             codec.Field(constants.ATTRIBUTES.ORPHANS, 'orphans', DEFAULT_ORPHANS, DEFAULT_ORPHANS),
+                                             codec.Field(constants.ATTRIBUTES.THERMALS, 'thermals', DEFAULT_THERMALS, DEFAULT_THERMALS)],
+                        write_order = ['width', 'layer', 'rank', 'spacing', 'pour', 'isolate', 'orphans', 'thermals'])
+    
+    __slots__ = ('layer', 'points', 'width', 'rank', 'spacing', 'pour', 'isolate', 'orphans', 'thermals')
+    
     def __init__(self, layer, points = [], width = DEFAULT_WIDTH, rank = DEFAULT_RANK, spacing = DEFAULT_SPACING, pour = DEFAULT_POUR, isolate = DEFAULT_ISOLATE,
                  orphans = DEFAULT_ORPHANS, thermals = DEFAULT_THERMALS):
         self.layer = layer
@@ -580,14 +535,7 @@ class Polygon:
         
     @classmethod
     def parse(cls, n):
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        width = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.WIDTH, cls.DEFAULT_WIDTH)
-        rank = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.RANK, cls.DEFAULT_RANK)
-        spacing = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SPACING, cls.DEFAULT_SPACING)
-        pour = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.POUR, cls.DEFAULT_POUR)
-        isolate = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ISOLATE, cls.DEFAULT_ISOLATE)
-        orphans = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ORPHANS, cls.DEFAULT_ORPHANS)
-        thermals = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.THERMALS, cls.DEFAULT_THERMALS)
+        layer, width, rank, spacing, pour, isolate, orphans, thermals = cls.CODEC.parse(n)
         
         # Get the points
         n_vertex_arr = n.findall(constants.TAGS.VERTEX)
@@ -603,16 +551,7 @@ class Polygon:
                        orphans = orphans, thermals = thermals)
             
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.WIDTH, self.width)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.RANK, self.rank, self.DEFAULT_RANK)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SPACING, self.spacing, self.DEFAULT_SPACING)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.POUR, self.pour, self.DEFAULT_POUR)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ISOLATE, self.isolate, self.DEFAULT_ISOLATE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ORPHANS, self.orphans, self.DEFAULT_ORPHANS)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.THERMALS, self.thermals, self.DEFAULT_THERMALS)
+        n = self.CODEC.append(self, _n)
         
         for p in self.points:
             n_vertex = ElementTree.SubElement(n, constants.TAGS.VERTEX)
@@ -620,7 +559,7 @@ class Polygon:
             attributes.set_attr(self, n_vertex, constants.ATTRIBUTES.Y, p[1])
             attributes.set_attr(self, n_vertex, constants.ATTRIBUTES.CURVE, p[2], 0)
             
-class Rectangle:
+class Rectangle(object):
     TAG_NAME = constants.TAGS.RECTANGLE
     
     ATTR_MAP = { constants.ATTRIBUTES.X1: attributes.ATTR_FLOAT,
@@ -631,6 +570,15 @@ class Rectangle:
                 constants.ATTRIBUTES.ROTATION: attributes.ATTR_ROT
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X1, 'x1'),
+                                             codec.Field(constants.ATTRIBUTES.Y1, 'y1'),
+                                             codec.Field(constants.ATTRIBUTES.X2, 'x2'),
+                                             codec.Field(constants.ATTRIBUTES.Y2, 'y2'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(0), attributes.Rotation(0))])
+    
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'layer', 'rotation')
+    
     def __init__(self, x1, y1, x2, y2, layer, rotation = attributes.Rotation(0)):
         self.x1 = x1
         self.y1 = y1
@@ -641,26 +589,12 @@ class Rectangle:
         
     @classmethod
     def parse(cls, n):
-        x1 = attributes.parse(cls, n, constants.ATTRIBUTES.X1)
-        y1 = attributes.parse(cls, n, constants.ATTRIBUTES.Y1)
-        x2 = attributes.parse(cls, n, constants.ATTRIBUTES.X2)
-        y2 = attributes.parse(cls, n, constants.ATTRIBUTES.Y2)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation(0))
+        return Rectangle(*cls.CODEC.parse(n))
         
-        return Rectangle(x1, y1, x2, y2, layer, rotation)
-    
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
+        self.CODEC.append(self, _n)
         
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X1, self.x1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y1, self.y1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X2, self.x2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y2, self.y2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation(0))
-        
-class SMD:
+class SMD(object):
     TAG_NAME = constants.TAGS.SMD
     
     DEFAULT_CREAM = True
@@ -683,6 +617,21 @@ class SMD:
                 constants.ATTRIBUTES.THERMALS: attributes.ATTR_BOOL
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                             codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.DX, 'dx'),
+                                             codec.Field(constants.ATTRIBUTES.DY, 'dy'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(), attributes.Rotation()),
+                                             codec.Field(constants.ATTRIBUTES.ROUNDNESS, 'roundness', DEFAULT_ROUNDNESS, DEFAULT_ROUNDNESS),
+                                             codec.Field(constants.ATTRIBUTES.CREAM, 'cream', DEFAULT_CREAM, DEFAULT_CREAM),
+                                             codec.Field(constants.ATTRIBUTES.FIRST, 'first', DEFAULT_FIRST, DEFAULT_FIRST),
+                                             codec.Field(constants.ATTRIBUTES.STOP, 'stop', DEFAULT_STOP, DEFAULT_STOP),
+                                             codec.Field(constants.ATTRIBUTES.THERMALS, 'thermals', DEFAULT_THERMALS, DEFAULT_THERMALS)])
+    
+    __slots__ = ('name', 'x', 'y', 'dx', 'dy', 'layer', 'rotation', 'roundness', 'cream', 'first', 'stop', 'thermals')
+    
     def __init__(self, name, x, y, dx, dy, layer, rotation = attributes.Rotation(), roundness = DEFAULT_ROUNDNESS, cream = DEFAULT_CREAM, first = DEFAULT_FIRST, stop = DEFAULT_STOP, thermals = DEFAULT_THERMALS):
         self.name = name
         self.x = x 
@@ -699,38 +648,12 @@ class SMD:
         
     @classmethod
     def parse(cls, n):
-        name = attributes.parse(cls, n, constants.ATTRIBUTES.NAME)
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        dx = attributes.parse(cls, n, constants.ATTRIBUTES.DX)
-        dy = attributes.parse(cls, n, constants.ATTRIBUTES.DY)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation())
-        roundness = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROUNDNESS, cls.DEFAULT_ROUNDNESS)
-        cream = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.CREAM, cls.DEFAULT_CREAM)
-        first = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.FIRST, cls.DEFAULT_FIRST)
-        stop = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.STOP, cls.DEFAULT_STOP)
-        thermals = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.THERMALS, cls.DEFAULT_THERMALS)
-        
-        return SMD(name, x, y, dx, dy, layer, rotation, roundness, cream, first, stop, thermals)
-
+        return SMD(*cls.CODEC.parse(n))
+        
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.NAME, self.name)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DX, self.dx)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DY, self.dy)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation())
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROUNDNESS, self.roundness, self.DEFAULT_ROUNDNESS)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.CREAM, self.cream, self.DEFAULT_CREAM)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.FIRST, self.first, self.DEFAULT_FIRST)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.STOP, self.stop, self.DEFAULT_STOP)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.THERMALS, self.thermals, self.DEFAULT_THERMALS)
+        self.CODEC.append(self, _n)
 
-class Text:
+class Text(object):
     TAG_NAME = constants.TAGS.TEXT
     
     DEFAULT_SIZE = 1.27
@@ -752,6 +675,20 @@ class Text:
                 constants.ATTRIBUTES.SPIN: attributes.ATTR_BOOL
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.SIZE, 'size'),
+                                             codec.Field(constants.ATTRIBUTES.ALIGN, 'align', DEFAULT_ALIGN, DEFAULT_ALIGN),
+                                             codec.Field(constants.ATTRIBUTES.FONT, 'font', DEFAULT_FONT, DEFAULT_FONT),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(0), attributes.Rotation(0)),
+                                             codec.Field(constants.ATTRIBUTES.RATIO, 'ratio', DEFAULT_RATIO, DEFAULT_RATIO),
+                                             codec.Field(constants.ATTRIBUTES.DISTANCE, 'distance', DEFAULT_DISTANCE, DEFAULT_DISTANCE),
+                                             codec.Field(constants.ATTRIBUTES.SPIN, 'spin', DEFAULT_SPIN, DEFAULT_SPIN)],
+                        write_order = ['x', 'y', 'layer', 'size', 'font', 'align', 'ratio', 'rotation', 'distance', 'spin'])
+    
+    __slots__ = ('value', 'x', 'y', 'size', 'layer', 'align', 'font', 'rotation', 'ratio', 'distance', 'spin')
+    
     def __init__(self, value, 
                  x, 
                  y, 
@@ -778,38 +715,14 @@ class Text:
     @classmethod
     def parse(cls, n):
         
-        value = n.text
-        
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        size = attributes.parse(cls, n, constants.ATTRIBUTES.SIZE)
-        align = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ALIGN, cls.DEFAULT_ALIGN)
-        font = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.FONT, cls.DEFAULT_FONT)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation())
-        ratio = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.RATIO, cls.DEFAULT_RATIO)
-        distance = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.DISTANCE, cls.DEFAULT_DISTANCE)
-        spin = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SPIN, cls.DEFAULT_SPIN)
-        
-        return Text(value, x, y, layer, size, align, font, rotation, ratio, distance, spin)
+        return Text(n.text, *cls.CODEC.parse(n))
     
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
+        n = self.CODEC.append(self, _n)
         n.text = self.value
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SIZE, self.size)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.FONT, self.font, self.DEFAULT_FONT)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ALIGN, self.align, self.DEFAULT_ALIGN)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.RATIO, self.ratio, self.DEFAULT_RATIO)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation(0))
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DISTANCE, self.distance, self.DEFAULT_DISTANCE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SPIN, self.spin, self.DEFAULT_SPIN)
 
   
-class Via:
+class Via(object):
     TAG_NAME = constants.TAGS.VIA
     
     DEFAULT_EXTENT = None
@@ -826,6 +739,17 @@ class Via:
                 constants.ATTRIBUTES.SHAPE: attributes.ATTR_STRING
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X, 'x'),
+                                             codec.Field(constants.ATTRIBUTES.Y, 'y'),
+                                             codec.Field(constants.ATTRIBUTES.DRILL, 'drill'),
+                                             codec.Field(constants.ATTRIBUTES.DIAMETER, 'diameter', None),
+                                             codec.Field(constants.ATTRIBUTES.ROTATION, 'rotation', attributes.Rotation(0), attributes.Rotation(0)),
+                                             codec.Field(constants.ATTRIBUTES.EXTENT, 'extent', DEFAULT_EXTENT, DEFAULT_EXTENT),
+                                             codec.Field(constants.ATTRIBUTES.ALWAYS_STOP, 'always_stop', DEFAULT_ALWAYS_STOP, DEFAULT_ALWAYS_STOP),
+                                             codec.Field(constants.ATTRIBUTES.SHAPE, 'shape', DEFAULT_SHAPE, DEFAULT_SHAPE)])
+    
+    __slots__ = ('x', 'y', 'drill', 'diameter', 'rotation', 'extent', 'always_stop', 'shape')
+    
     def __init__(self, x, y, drill, diameter = None, rotation = attributes.Rotation(), extent = DEFAULT_EXTENT, always_stop = DEFAULT_ALWAYS_STOP, shape = DEFAULT_SHAPE):
         self.x = x
         self.y = y
@@ -838,30 +762,12 @@ class Via:
         
     @classmethod
     def parse(cls, n):
-        x = attributes.parse(cls, n, constants.ATTRIBUTES.X)
-        y = attributes.parse(cls, n, constants.ATTRIBUTES.Y)
-        drill = attributes.parse(cls, n, constants.ATTRIBUTES.DRILL)
-        diameter = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.DIAMETER, None)
-        rotation = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ROTATION, attributes.Rotation(0))
-        extent = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.EXTENT, cls.DEFAULT_EXTENT)
-        always_stop = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.ALWAYS_STOP, cls.DEFAULT_ALWAYS_STOP)
-        shape = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.SHAPE, cls.DEFAULT_SHAPE)
+        return Via(*cls.CODEC.parse(n))
         
-        return Via(x, y, drill, diameter, rotation, extent, always_stop, shape)
-    
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X, self.x)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y, self.y)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DRILL, self.drill)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.DIAMETER, self.diameter)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ROTATION, self.rotation, attributes.Rotation(0))
-        attributes.set_attr(self, n, constants.ATTRIBUTES.EXTENT, self.extent, self.DEFAULT_EXTENT)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.ALWAYS_STOP, self.always_stop, self.DEFAULT_ALWAYS_STOP)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.SHAPE, self.shape, self.DEFAULT_SHAPE)
+        self.CODEC.append(self, _n)
 
-class Wire:
+class Wire(object):
     TAG_NAME = constants.TAGS.WIRE
     
     DEFAULT_CURVE = 0.0
@@ -881,6 +787,19 @@ class Wire:
                 constants.ATTRIBUTES.CAP: attributes.ATTR_STRING
                 }
     
+    CODEC = codec.Codec(TAG_NAME, ATTR_MAP, [codec.Field(constants.ATTRIBUTES.X1, 'x1'),
+                                             codec.Field(constants.ATTRIBUTES.Y1, 'y1'),
+                                             codec.Field(constants.ATTRIBUTES.X2, 'x2'),
+                                             codec.Field(constants.ATTRIBUTES.Y2, 'y2'),
+                                             codec.Field(constants.ATTRIBUTES.WIDTH, 'width'),
+                                             codec.Field(constants.ATTRIBUTES.LAYER, 'layer'),
+                                             codec.Field(constants.ATTRIBUTES.CURVE, 'curve', DEFAULT_CURVE, DEFAULT_CURVE),
+                                             codec.Field(constants.ATTRIBUTES.EXTENT, 'extent', DEFAULT_EXTENT, DEFAULT_EXTENT),
+                                             codec.Field(constants.ATTRIBUTES.STYLE, 'style', DEFAULT_STYLE, DEFAULT_STYLE),
+                                             codec.Field(constants.ATTRIBUTES.CAP, 'cap', DEFAULT_CAP, DEFAULT_CAP)])
+    
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'width', 'layer', 'curve', 'extent', 'style', 'cap')
+    
     def __init__(self, x1, y1, x2, y2, width, layer, curve = DEFAULT_CURVE, extent = DEFAULT_EXTENT, style = DEFAULT_STYLE, cap = DEFAULT_CAP):
         self.x1 = x1
         self.y1 = y1
@@ -895,32 +814,10 @@ class Wire:
 
     @classmethod
     def parse(cls, n):
-        x1 = attributes.parse(cls, n, constants.ATTRIBUTES.X1)
-        y1 = attributes.parse(cls, n, constants.ATTRIBUTES.Y1)
-        x2 = attributes.parse(cls, n, constants.ATTRIBUTES.X2)
-        y2 = attributes.parse(cls, n, constants.ATTRIBUTES.Y2)
-        width = attributes.parse(cls, n, constants.ATTRIBUTES.WIDTH)
-        layer = attributes.parse(cls, n, constants.ATTRIBUTES.LAYER)
-        curve = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.CURVE, cls.DEFAULT_CURVE)
-        extent = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.EXTENT, cls.DEFAULT_EXTENT)
-        style = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.STYLE, cls.DEFAULT_STYLE)
-        cap = attributes.parse_or_default(cls, n, constants.ATTRIBUTES.CAP, cls.DEFAULT_CAP)
-
-        return Wire(x1, y1, x2, y2, width, layer, curve, extent, style, cap)
-
+        return Wire(*cls.CODEC.parse(n))
+        
     def append_node(self, _n):
-        n = ElementTree.SubElement(_n, self.TAG_NAME)
-        
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X1, self.x1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y1, self.y1)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.X2, self.x2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.Y2, self.y2)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.WIDTH, self.width)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.LAYER, self.layer)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.CURVE, self.curve, self.DEFAULT_CURVE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.EXTENT, self.extent, self.DEFAULT_EXTENT)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.STYLE, self.style, self.DEFAULT_STYLE)
-        attributes.set_attr(self, n, constants.ATTRIBUTES.CAP, self.cap, self.DEFAULT_CAP)
+        self.CODEC.append(self, _n)
 
 def parse_item(n):
     """
@@ -0,0 +1,305 @@
+"""
+Ratsnest
+========
+
+Determines the *airwires* of each signal of a board: the shortest set of straight connections which would
+connect all of its copper, and so the routing which remains to be done.
+
+Airwires
+--------
+
+The copper of each signal is divided into islands (see ``connectivity``), and the islands are connected by a
+minimum spanning tree. The length of the connection between two islands is the distance between the closest of
+their points: the connection points of their items (the ends of wires, the centers of vias, and the vertices of
+polygons), and the centers of their pads. As in EAGLE, every island is connected, including the islands which
+don't connect any pads (e.g. a wire which has been left unconnected). Contacts whose pads can't be found are
+ignored.
+
+A signal which is routed has no airwires, so the sum of the lengths of the airwires of a board is the length of
+the connections which are not yet routed.
+
+Spanning trees
+--------------
+
+The tree is found using Boruvka's algorithm, without calculating the distances between every pair of points. In
+each round, each group of islands which are already connected finds the closest point of another group, and is
+connected to it, so at most ``log2(islands)`` rounds are needed. The closest points are found using a grid of the
+points: the cells around each cell are searched in rings of increasing size (once for the points of each group
+in the cell), until the ring is further from the cell than the closest point which has already been found for
+the group.
+
+Usage
+-----
+
+    ratsnest = board.ratsnest()
+    print('Unrouted: {0:.2f}mm'.format(ratsnest.length()))
+
+    for airwire in ratsnest['GND'].airwires:
+        print('({0}, {1}) - ({2}, {3})'.format(airwire.x1, airwire.y1, airwire.x2, airwire.y2))
+
+``Board.ratsnest()`` is reused until the board is modified, in the same way as ``Board.connectivity()``: after
+routing, its length is up to date if the board is tracked, or once ``references.changed(board)`` has been called.
+To measure many boards, use ``batch.map_files()`` with a callback such as:
+
+    def unrouted_length(e):
+        return e.drawing.document.ratsnest().length()
+
+"""
+
+import connectivity
+import geometry
+import math
+
+class Airwire(object):
+    """
+    An unrouted connection between two islands of a signal.
+
+    * ``x1``, ``y1``, ``x2``, ``y2``: The points which it connects.
+    * ``islands``: The ``(island, other island)`` which it connects.
+    * ``length``: The distance between the points.
+    """
+
+    __slots__ = ('x1', 'y1', 'x2', 'y2', 'islands', 'length')
+
+    def __init__(self, x1, y1, x2, y2, islands, length):
+        self.x1 = x1
+        self.y1 = y1
+        self.x2 = x2
+        self.y2 = y2
+        self.islands = islands
+        self.length = length
+
+    def __repr__(self):
+        return 'Airwire(({0}, {1}), ({2}, {3}))'.format(self.x1, self.y1, self.x2, self.y2)
+
+class Signal_Ratsnest(object):
+    """
+    The airwires of a signal.
+
+    * ``signal``: The ``Signal``.
+    * ``connectivity``: The ``connectivity.Signal_Connectivity`` of the signal.
+    * ``airwires``: A list of ``Airwire`` objects, from the shortest to the longest.
+    """
+
+    def __init__(self, signal_connectivity, airwires):
+        self.signal = signal_connectivity.signal
+        self.connectivity = signal_connectivity
+        self.airwires = airwires
+
+    def length(self):
+        """
+        :returns: The total length of the airwires.
+        """
+
+        return sum(a.length for a in self.airwires)
+
+def _find(parent, i):
+    while parent[i] != i:
+        # (Path halving)
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+
+    return i
+
+def spanning_tree(points, groups, cell_size = None):
+    """
+    Find the shortest connections which connect groups of points (the points of each group are already connected).
+
+    :param points: A list of ``(x, y)`` tuples.
+    :param groups: A list of the number of the group of each point. The groups are numbered from 0, and each
+        group must contain at least one point.
+    :param cell_size: The size of the cells of the grid of points, or ``None`` to choose a size for which each
+        cell contains about one point.
+
+    :returns: A list of ``(length, index of point, index of other point)`` tuples, from the shortest to the longest,
+        with one fewer tuple than there are groups.
+    """
+
+    count = len(points)
+    group_count = max(groups) + 1 if count > 0 else 0
+
+    if group_count <= 1:
+        return []
+
+    min_x = min(p[0] for p in points)
+    min_y = min(p[1] for p in points)
+    width = max(p[0] for p in points) - min_x
+    height = max(p[1] for p in points) - min_y
+
+    if cell_size == None:
+        cell_size = math.sqrt(width * height / count) or max(width, height) / count or 1.0
+
+    columns = int(width / cell_size) + 1
+    rows = int(height / cell_size) + 1
+
+    # The cell of each point, and (column, row) -> [index of point]
+    cells = [(int((x - min_x) / cell_size), int((y - min_y) / cell_size)) for x, y in points]
+    grid = {}
+
+    for i, cell in enumerate(cells):
+        indexes = grid.get(cell)
+
+        if indexes == None:
+            grid[cell] = [i]
+        else:
+            indexes.append(i)
+
+    last_ring = max(columns, rows)
+    hypot = math.hypot
+    parent = range(group_count)
+    edges = []
+
+    while len(edges) < group_count - 1:
+        roots = [_find(parent, g) for g in groups]
+
+        # The points of each group in each cell: (column, row, root) -> [index of point]. The points of a group in
+        # a cell are searched from together, since they are close to the same points.
+        members = {}
+
+        for (column, row), indexes in grid.iteritems():
+            for i in indexes:
+                key = (column, row, roots[i])
+                found = members.get(key)
+
+                if found == None:
+                    members[key] = [i]
+                else:
+                    found.append(i)
+
+        # root -> (length, lower index, higher index) of the shortest connection to another group
+        best = {}
+
+        for (column, row, root), indexes in members.iteritems():
+            nearest = best.get(root)
+            r = 0
+
+            while r <= last_ring:
+                if r == 0:
+                    ring = ((column, row),)
+                else:
+                    # The cells at a distance of ``r`` cells (the top and bottom rows, then the sides)
+                    low = max(column - r, 0)
+                    high = min(column + r, columns - 1) + 1
+                    ring = [(c, row - r) for c in xrange(low, high)] + [(c, row + r) for c in xrange(low, high)]
+                    ring.extend((c, s) for c in (column - r, column + r) if 0 <= c < columns
+                                for s in xrange(max(row - r + 1, 0), min(row + r - 1, rows - 1) + 1))
+
+                for cell in ring:
+                    for j in grid.get(cell, ()):
+                        if roots[j] != root:
+                            xj, yj = points[j]
+
+                            for i in indexes:
+                                d = hypot(xj - points[i][0], yj - points[i][1])
+
+                                if nearest == None or d <= nearest[0]:
+                                    # (Ties are broken by the indexes of the points, so the connections are
+                                    # consistent)
+                                    edge = (d, i, j) if i < j else (d, j, i)
+
+                                    if nearest == None or edge < nearest:
+                                        nearest = edge
+
+                # The points which have not been searched are at least ``r`` cells away
+                if nearest != None and nearest[0] <= r * cell_size:
+                    break
+
+                r += 1
+
+            if nearest != None:
+                best[root] = nearest
+
+        for edge in sorted(best.itervalues()):
+            a = _find(parent, groups[edge[1]])
+            b = _find(parent, groups[edge[2]])
+
+            if a != b:
+                parent[b] = a
+                edges.append(edge)
+
+    edges.sort()
+
+    return edges
+
+def signal_ratsnest(signal_connectivity, placements = None):
+    """
+    Determine the airwires of a signal.
+
+    :param signal_connectivity: The ``connectivity.Signal_Connectivity`` of the signal.
+    :param placements: A dictionary of the ``geometry.Placement`` of each element (by name), which is filled in as
+        elements are placed, or ``None``.
+
+    :returns: A ``Signal_Ratsnest`` object.
+    """
+
+    if placements == None:
+        placements = {}
+
+    islands = signal_connectivity.islands
+    points = []
+    groups = []
+
+    for group, island in enumerate(islands):
+        for item in island.items:
+            for p in connectivity._signal_copper(item)[2]:
+                points.append(p)
+                groups.append(group)
+
+        for element, pad in island.pads:
+            placement = placements.get(element.name)
+
+            if placement == None:
+                placement = placements[element.name] = geometry.Placement(element)
+
+            points.append(placement.point(pad.x, pad.y))
+            groups.append(group)
+
+    airwires = []
+
+    for length, i, j in spanning_tree(points, groups):
+        airwires.append(Airwire(points[i][0], points[i][1], points[j][0], points[j][1],
+                                (islands[groups[i]], islands[groups[j]]), length))
+
+    return Signal_Ratsnest(signal_connectivity, airwires)
+
+class Ratsnest(object):
+    """
+    The airwires of each signal of a board.
+    """
+
+    def __init__(self, board_connectivity):
+        """
+        :param board_connectivity: The ``connectivity.Connectivity`` of a board.
+        """
+
+        placements = {}
+
+        self.signals = [signal_ratsnest(s, placements) for s in board_connectivity]
+        self._by_name = dict((s.signal.name, s) for s in self.signals)
+
+    def __getitem__(self, name):
+        """
+        :returns: The ``Signal_Ratsnest`` of the signal named ``name``.
+        """
+
+        return self._by_name[name]
+
+    def __iter__(self):
+        return iter(self.signals)
+
+    def __len__(self):
+        return len(self.signals)
+
+    def length(self):
+        """
+        :returns: The total length of the airwires of every signal (the length which is not yet routed).
+        """
+
+        return sum(s.length() for s in self.signals)
+
+    def airwires(self):
+        """
+        :returns: A list of ``(signal, airwire)`` tuples of the airwires of every signal.
+        """
+
+        return [(s.signal, a) for s in self.signals for a in s.airwires]
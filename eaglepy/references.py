@@ -0,0 +1,271 @@
+"""
+References
+==========
+
+Provides reverse indexes of the references between the objects of a document: for example, from each package
+to the elements which use it (see ``Board.elements_using()``, ``Schematic.parts_using()``, and
+``Library.users_of()``).
+
+An index is built the first time it is used, and belongs to the document (each document's indexes are separate).
+It is reused until the document is modified, so a query takes constant time (plus the length of its result) while
+the document is unchanged, and the first query after a change rebuilds the index in linear time.
+
+Modifications are detected using counters (*generations*), rather than by hooking the classes of the object model:
+
+* Each ``Key_List`` and ``Item_List`` has a ``generation`` which its methods increment when they modify it (other
+  lists are compared by length). An index records the generations of the containers from which it is built (e.g.
+  ``board.elements``), and is rebuilt if one of them has changed, or if a container is replaced.
+* Each document has a generation, which is incremented by ``changed(document)``. Call it after making other
+  changes which affect an index: assigning a reference (e.g. ``Element.package``), or modifying the objects within
+  a container (e.g. moving a wire of a signal, or adding a device to a device set).
+
+If the document is tracked (e.g. it was loaded with ``track_changes``, see ``tracking``), its indexes subscribe to
+the tracker, and every change is detected without calling ``changed()``. The reverse indexes are then updated in
+place as references are assigned and as users are removed or appended (e.g. ``board.elements.pop()``), so a query
+takes constant time even while the document is being modified; other changes discard an index. Using an index
+never starts tracking a document.
+
+Usage
+-----
+
+    for package in lib.packages.items():
+        if len(board.elements_using(package)) == 0:
+            lib.packages.remove(package)
+
+    board.elements['R1'].package = lib.packages['R0402']
+    references.changed(board)
+
+"""
+
+import itertools
+import tracking
+import weakref
+
+# document -> ``_Indexes``
+_documents = weakref.WeakKeyDictionary()
+
+def changed(document):
+    """
+    Record that a document may have been modified in a way which is not detected (see above), so that its indexes
+    are rebuilt when they are next used.
+    """
+
+    indexes = _documents.get(document)
+
+    if indexes != None:
+        indexes.generation += 1
+
+def discard(document):
+    """
+    Discard the indexes of a document.
+    """
+
+    indexes = _documents.pop(document, None)
+
+    if indexes != None:
+        indexes.watch(None)
+
+def generation_of(container):
+    """
+    :returns: A value which changes when a container is modified: the ``generation`` of a ``Key_List`` or a
+              ``tracking.Tracked_List`` (e.g. an ``Item_List``), or the length of another sequence.
+    """
+
+    generation = getattr(container, 'generation', None)
+
+    return len(container) if generation == None else generation
+
+class _Indexes(object):
+    """
+    The indexes of a document.
+    """
+
+    def __init__(self):
+        self.generation = 0
+
+        # key -> [generation of the document, containers, ids of the containers, generations of the containers, index]
+        self.entries = {}
+
+        # The tracker of the document, and the handler which is subscribed to it
+        self.tracker = None
+        self.handler = None
+
+    def watch(self, tracker):
+        """
+        Subscribe to the tracker of the document (or to no tracker, if ``tracker`` is ``None``).
+        """
+
+        if self.tracker != None and self.tracker.is_open():
+            self.tracker.unsubscribe(self.handler)
+
+        self.tracker = tracker
+        self.handler = None
+
+        if tracker != None:
+            self.handler = tracker.subscribe(self.on_change, weak = True)
+
+            # (The changes which were made since the tracker was opened have not been reported)
+            self.generation += 1
+
+    def on_change(self, event, obj, detail):
+        for key, entry in self.entries.items():
+            update = getattr(entry[4], 'update', None)
+
+            if update == None or not update(event, obj, detail):
+                del self.entries[key]
+            elif id(obj) in entry[2]:
+                # (The index is up to date with the container which was modified)
+                entry[3] = map(generation_of, entry[1])
+
+class Reverse_Index(object):
+    """
+    Maps each object which is referenced by a set of objects (the *users*) to the users which reference it.
+    """
+
+    def __init__(self, containers, names, watched = ()):
+        """
+        :param containers: The containers of the users (e.g. ``(board.elements,)``).
+        :param names: The names of the attributes of the users which reference other objects. Attributes which
+                      a user does not have (or which are ``None``) are ignored.
+        :param watched: Other objects and containers whose modification discards the index (e.g. the device sets
+                        which contain the users).
+        """
+
+        self.containers = list(containers)
+        self.names = names
+        self.watched = dict((id(o), o) for o in itertools.chain(self.containers, watched))
+
+        # id(referenced object) -> (referenced object, {id(user): (position, user)})
+        self.entries = {}
+
+        # id(user) -> (user, position, referenced objects)
+        self.users = {}
+        self.count = 0
+
+        for c in self.containers:
+            for u in c:
+                self._add(u)
+
+    def users_of(self, obj):
+        """
+        :returns: A list of the users which reference ``obj``, in order.
+        """
+
+        entry = self.entries.get(id(obj))
+
+        return [] if entry == None else [u for _, u in sorted(entry[1].itervalues())]
+
+    def as_dict(self, cls):
+        """
+        :param cls: A class.
+
+        :returns: A dict which maps each referenced object which is an instance of ``cls`` to a list of the users
+                  which reference it.
+        """
+
+        return dict((obj, self.users_of(obj)) for obj, _ in self.entries.itervalues() if isinstance(obj, cls))
+
+    def update(self, event, obj, detail):
+        """
+        Update the index after a change which was reported by a tracker (see ``tracking``).
+
+        :returns: ``False`` if the index must be rebuilt instead.
+        """
+
+        if event == tracking.MODIFIED:
+            user = self.users.get(id(obj))
+
+            if user != None and user[0] is obj and detail in self.names:
+                self._remove(obj)
+                self._add(obj, user[1])
+
+                return True
+        elif self.watched.get(id(obj)) is obj and any(c is obj for c in self.containers):
+            if event == tracking.REMOVED:
+                self._remove(detail)
+                return True
+
+            # Users which are appended keep the order of the users (if there is one container)
+            if event == tracking.ADDED and len(self.containers) == 1 and _is_last(obj, detail):
+                self._add(detail)
+                return True
+
+            return False
+
+        return self.watched.get(id(obj)) is not obj
+
+    def _add(self, user, position = None):
+        if position == None:
+            position = self.count
+            self.count += 1
+
+        referenced = [o for o in (getattr(user, name, None) for name in self.names) if o != None]
+        self.users[id(user)] = (user, position, referenced)
+
+        for obj in referenced:
+            entry = self.entries.get(id(obj))
+
+            if entry == None:
+                entry = self.entries[id(obj)] = (obj, {})
+
+            entry[1][id(user)] = (position, user)
+
+    def _remove(self, user):
+        found = self.users.get(id(user))
+
+        if found == None or found[0] is not user:
+            return
+
+        del self.users[id(user)]
+
+        for obj in found[2]:
+            users = self.entries[id(obj)][1]
+            users.pop(id(user), None)
+
+            if len(users) == 0:
+                del self.entries[id(obj)]
+
+def _is_last(container, item):
+    """
+    :returns: Whether ``item`` is the last item of ``container`` (a ``Key_List`` or a list).
+    """
+
+    if isinstance(container, list):
+        return len(container) > 0 and container[-1] is item
+
+    return len(container) > 0 and container.index_of(item.name) == len(container) - 1
+
+def get_index(document, key, containers, build):
+    """
+    :param document: The object to which the index belongs (e.g. a ``Board``).
+    :param key: The name of the index.
+    :param containers: A function which returns a tuple of the containers from which the index is built (e.g.
+                       ``lambda: (board.elements,)``). The index is rebuilt if they are replaced or modified.
+    :param build: A function which builds the index. If the document is tracked and the index has an
+                  ``update(event, obj, detail)`` method, it is called for each change to the document (see
+                  ``tracking``), and returns whether the index is still valid; otherwise any tracked change
+                  discards the index.
+
+    :returns: The index, which is rebuilt if the document may have been modified since it was built.
+    """
+
+    indexes = _documents.get(document)
+
+    if indexes == None:
+        indexes = _documents[document] = _Indexes()
+
+    tracker = tracking.tracker_of(document)
+
+    if tracker is not indexes.tracker:
+        indexes.watch(tracker)
+
+    containers = containers()
+    entry = indexes.entries.get(key)
+
+    if (entry == None or entry[0] != indexes.generation or len(entry[1]) != len(containers) or
+            any(a is not b for a, b in zip(entry[1], containers)) or
+            any(g != generation_of(c) for g, c in zip(entry[3], containers))):
+        entry = [indexes.generation, containers, frozenset(map(id, containers)), map(generation_of, containers), build()]
+        indexes.entries[key] = entry
+
+    return entry[4]
@@ -0,0 +1,508 @@
+"""
+Source
+======
+
+Provides incremental saving: unchanged parts of a loaded file are written by copying their original XML.
+
+A ``Source_Map`` pairs the objects of a loaded file with the nodes from which they were parsed. It is created
+by ``Eagle.load(file_name, keep_source = True)``, and is used by ``Eagle.save()``: the node of each object
+which is unchanged since the file was loaded (including all of its descendants) is written as it was read,
+and only the nodes of the modified objects are generated.
+
+The bytes of each node are copied from the original file (so its quoting, attribute order, character
+references, and whitespace are kept exactly). The byte range of each node is found by scanning the file with
+``expat`` when it is loaded. If the file is saved with a different encoding, the nodes are serialized instead,
+which keeps their attributes (including any which are not parsed) but not their formatting.
+
+Usage
+-----
+
+    e = eagle.Eagle.load('design.sch', keep_source = True)
+
+    e.drawing.document.parts['R1'].value = '10k'
+
+    e.save('design.sch') # only the node of R1 (and its ancestors) is generated
+
+Records
+-------
+
+The objects which are paired with nodes (*records*) are those which are written by a ``Writer`` (see
+``etree_utils``): the drawing, the board, schematic, or library, each item of their sections (e.g. each
+library, package, part, element, signal, sheet, and net), and the items of each sheet. Other objects (e.g.
+the wires of a package) are part of the record which contains them.
+
+Changes are detected by comparing the objects of each record with a snapshot taken when the file was loaded.
+A snapshot is shallow: it stores the attributes of each object which is contained by the record (e.g. a wire
+of a package), the items of each list, and the identity and name of each object which is referenced by the
+record (e.g. the package of an element). Assigning an attribute, replacing an object, adding or removing an item
+of a list, and renaming a referenced object are all detected.
+
+If the file is also loaded with ``track_changes`` (see ``tracking``), the records which have been modified are
+found from the events of the tracker instead, and no snapshots are taken. Renaming an object then marks every
+record as modified, since the records which reference the object are not known.
+
+Objects are assumed to be referenced only after they have been written, as in an EAGLE file (e.g. a package is
+written before the elements which reference it).
+
+The original XML (both the parsed tree and the contents of the file) is kept in memory alongside the object
+model, and the snapshots add to the memory used by the objects, so this mode is intended for scripts which make
+small changes to files.
+
+"""
+
+import collections
+import etree_utils
+import key_list
+import operator
+import tracking
+import types
+from binary import _get_class_info
+from xml.parsers import expat
+from tracking import VALUE_TYPES
+
+# How the snapshot of an attribute which is not a value is taken
+SEQUENCE, MAPPING, REFERENCE = range(3)
+
+class Source_Map(object):
+    """
+    The source nodes and snapshots of the records of an ``Eagle`` object.
+    """
+
+    def __init__(self, e, n_eagle, tracker = None, data = None):
+        """
+        :param e: An ``Eagle`` object which has just been parsed from ``n_eagle``.
+        :param n_eagle: The root (``eagle``) node.
+        :param tracker: A ``tracking.Tracker`` of ``e``, or ``None`` to take snapshots.
+        :param data: The contents of the file from which ``n_eagle`` was parsed, or ``None`` to serialize the
+            source nodes rather than copying their bytes.
+        """
+
+        # id(record) -> [record, node, snapshot, child records, parent record, (start, end) of the node in data]
+        self.entries = {}
+
+        # The records, in the order in which they are written
+        self.records = []
+
+        e.write(_Recorder(self, None, target = n_eagle))
+
+        # The encoding of the file (the bytes of its nodes are only copied to files with the same encoding)
+        self.data = data
+        self.encoding = n_eagle.getroottree().docinfo.encoding
+
+        if data != None:
+            self._find_ranges(n_eagle)
+
+        self.tracker = tracker
+
+        if tracker != None:
+            # The ids of the modified records (and of the records which contain them)
+            self._changed = set()
+            self._dirty = set()
+            self._renamed = False
+
+            # (The tracker must not keep the document alive, see ``tracking``)
+            tracker.subscribe(self._on_change, weak = True)
+        else:
+            # The objects which are contained by a record (and the records themselves)
+            owned = set(self.entries.iterkeys())
+
+            for r in self.records:
+                self.entries[id(r)][2] = _take_snapshot(r, owned)
+
+        self.reset()
+
+    def add(self, obj, node, parent):
+        self.entries[id(obj)] = [obj, node, None, [], parent, None]
+        self.records.append(obj)
+
+        if parent != None:
+            self.entries[id(parent)][3].append(obj)
+
+    def reset(self):
+        """
+        Discard the results of ``is_clean()``. This is called at the start of each save (since the
+        objects may since have been modified).
+        """
+
+        self._clean = {}
+
+    def is_clean(self, obj):
+        """
+        :param obj: An object.
+
+        :returns: ``True`` if ``obj`` is a record which (including all of the records which it contains) is
+                  unchanged since the file was loaded.
+        """
+
+        entry = self.entries.get(id(obj))
+
+        if entry == None or entry[0] is not obj:
+            return False
+
+        if self.tracker != None:
+            return not self._renamed and id(obj) not in self._dirty
+
+        clean = self._clean.get(id(obj))
+
+        if clean == None:
+            clean = _is_unchanged(entry[2]) and all(self.is_clean(c) for c in entry[3])
+            self._clean[id(obj)] = clean
+
+        return clean
+
+    def node(self, obj):
+        """
+        :param obj: An object.
+
+        :returns: The source node of ``obj``, if ``obj`` is clean (see ``is_clean()``), or ``None``.
+        """
+
+        if self.is_clean(obj):
+            return self.entries[id(obj)][1]
+
+        return None
+
+    def original(self, obj):
+        """
+        :param obj: A record.
+
+        :returns: The bytes of the source node of ``obj`` as they were read from the file, or ``None`` if they are
+                  not known.
+        """
+
+        entry = self.entries.get(id(obj))
+
+        if entry == None or entry[0] is not obj or entry[5] == None:
+            return None
+
+        start, end = entry[5]
+
+        return self.data[start:end]
+
+    def _find_ranges(self, n_eagle):
+        """
+        Find the byte range of the source node of each record.
+        """
+
+        try:
+            ranges = element_ranges(self.data)
+        except expat.ExpatError:
+            return
+
+        elements = [n for n in n_eagle.getroottree().getroot().iter() if isinstance(n.tag, basestring)]
+
+        # (The tree may not match the file, e.g. if entities declared by its DTD were expanded)
+        if len(ranges) != len(elements):
+            return
+
+        indexes = dict((n, i) for i, n in enumerate(elements))
+
+        for entry in self.entries.itervalues():
+            start, end = ranges[indexes[entry[1]]]
+
+            if not self.data.startswith('<' + entry[1].tag, start):
+                return
+
+            entry[5] = (start, end)
+
+    def modified(self):
+        """
+        :returns: A list of the records which have been modified since the file was loaded (not including records
+                  which are only modified because a record which they contain has been modified), in the order
+                  in which they are written.
+        """
+
+        if self.tracker != None:
+            return [r for r in self.records if id(r) in self._changed]
+
+        return [r for r in self.records if not _is_unchanged(self.entries[id(r)][2])]
+
+    def _on_change(self, event, obj, detail):
+        if event == tracking.MODIFIED and detail == 'name':
+            self._renamed = True
+
+        # Find the record which contains the object
+        while obj != None and not self.entries.has_key(id(obj)):
+            obj = self.tracker.parent(obj)
+
+        if obj == None:
+            return
+
+        self._changed.add(id(obj))
+
+        while obj != None and id(obj) not in self._dirty:
+            self._dirty.add(id(obj))
+            obj = self.entries[id(obj)][4]
+
+_get_dict = operator.attrgetter('__dict__')
+
+def element_ranges(data):
+    """
+    Find the byte range of each element of an XML document.
+
+    :param data: The contents of the document (a byte string).
+
+    :raises: An ``expat.ExpatError`` if the document is not well-formed.
+
+    :returns: A list of the ``(start, end)`` byte offsets of each element (from its start tag to the end of its
+              end tag), in document order.
+    """
+
+    parser = expat.ParserCreate()
+    ranges = []
+    open_elements = []
+
+    # The elements which have ended. Expat reports the offset at which each event starts, so an element ends
+    # where the next event starts.
+    ended = []
+
+    def on_event(*args):
+        offset = parser.CurrentByteIndex
+
+        for i in ended:
+            ranges[i][1] = offset
+
+        del ended[:]
+
+        return offset
+
+    def on_start(name, attributes):
+        open_elements.append(len(ranges))
+        ranges.append([on_event(), None])
+
+    def on_end(name):
+        on_event()
+        ended.append(open_elements.pop())
+
+    parser.StartElementHandler = on_start
+    parser.EndElementHandler = on_end
+    parser.CharacterDataHandler = on_event
+    parser.CommentHandler = on_event
+    parser.ProcessingInstructionHandler = on_event
+    parser.StartCdataSectionHandler = on_event
+    parser.DefaultHandler = on_event
+
+    parser.Parse(data, True)
+
+    # The root element is followed only by whitespace (or by nothing)
+    for i in ended:
+        ranges[i][1] = data.rindex('>') + 1
+
+    return map(tuple, ranges)
+
+def _get_values(obj):
+    """
+    :returns: The attributes of an object which has both slots and a ``__dict__``: a tuple of its slots, 
+              followed by a copy of its ``__dict__``.
+    """
+
+    _, slots, getter = _get_class_info(type(obj))
+
+    try:
+        values = getter(obj)
+    except AttributeError:
+        values = tuple([getattr(obj, s, None) for s in slots])
+
+    return values + (obj.__dict__.copy(),)
+
+# type -> the function which returns the attributes of its instances, or ``None`` if they are values
+_getters = {types.InstanceType: _get_dict}
+
+def _get_getter(t):
+    """
+    :param t: A type.
+
+    :returns: A function which returns the attributes of an instance of ``t`` (its ``__dict__`` or a tuple of
+              its slots), or ``None`` if the instances of ``t`` are values (whose attributes are not part of a
+              snapshot).
+    """
+
+    try:
+        return _getters[t]
+    except KeyError:
+        pass
+
+    getter = None
+
+    if t not in VALUE_TYPES and not issubclass(t, (type, types.ClassType)):
+        reduced, slots, slots_getter = _get_class_info(t)
+
+        # Immutable values (e.g. ``Rotation``) have a ``__reduce__`` method
+        if not reduced:
+            if t.__dictoffset__ != 0:
+                getter = _get_values if len(slots) > 0 else _get_dict
+            elif len(slots) > 0:
+                getter = slots_getter
+
+    _getters[t] = getter
+
+    return getter
+
+def _convert(values, kinds):
+    """
+    Convert the attributes which are not values (see ``_take_snapshot``).
+    """
+
+    if len(kinds) == 0:
+        return values
+
+    converted = values.copy() if type(values) is dict else list(values)
+
+    try:
+        for k, kind in kinds:
+            v = values[k]
+
+            if kind == SEQUENCE:
+                converted[k] = tuple(v)
+            elif kind == MAPPING:
+                converted[k] = tuple(v.items())
+            else:
+                converted[k] = (v, getattr(v, 'name', None))
+    except Exception:
+        # The type of the attribute has changed
+        return None
+
+    return converted if type(values) is dict else tuple(converted)
+
+def _take_snapshot(record, owned):
+    """
+    :param record: A record.
+    :param owned: The ids of the objects which have already been claimed by a record. The objects which are 
+                  contained by ``record`` are added.
+
+    :returns: A list of ``(object, getter, kinds, values)`` tuples: one for the record and one for each object 
+              which it contains. ``kinds`` lists the index (or key) and kind of each attribute which is not a value.
+    """
+
+    snapshot = []
+    stack = [record]
+
+    while len(stack) > 0:
+        obj = stack.pop()
+        get = _get_getter(type(obj))
+        values = get(obj)
+        kinds = []
+        is_dict = type(values) is dict
+
+        # Most objects (e.g. wires) only have values
+        if set(map(type, values.itervalues() if is_dict else values)) <= VALUE_TYPES:
+            snapshot.append((obj, get, kinds, values.copy() if is_dict else values))
+            continue
+
+        for k, v in (values.iteritems() if is_dict else enumerate(values)):
+            t = type(v)
+
+            if t in VALUE_TYPES:
+                continue
+
+            if isinstance(v, (list, tuple, key_list.Key_List)):
+                kinds.append((k, SEQUENCE))
+                children = v
+            elif t is dict or t is collections.OrderedDict:
+                kinds.append((k, MAPPING))
+                children = v.itervalues()
+            elif id(v) in owned or _get_getter(t) == None:
+                # A record, an object which is contained by another record, or an immutable value
+                kinds.append((k, REFERENCE))
+                continue
+            else:
+                children = (v,)
+
+            for c in children:
+                tc = type(c)
+
+                if tc not in VALUE_TYPES and id(c) not in owned and (_getters[tc] if tc in _getters else _get_getter(tc)) != None:
+                    owned.add(id(c))
+                    stack.append(c)
+
+        if len(kinds) == 0 and is_dict:
+            values = values.copy()
+
+        snapshot.append((obj, get, kinds, _convert(values, kinds)))
+
+    return snapshot
+
+def _is_unchanged(snapshot):
+    try:
+        for obj, get, kinds, values in snapshot:
+            current = get(obj)
+
+            if kinds:
+                current = _convert(current, kinds)
+
+            if current != values:
+                return False
+    except AttributeError:
+        # A slot has been deleted
+        return False
+
+    return True
+
+class _Recorder(etree_utils.Writer):
+    """
+    Pairs the objects which are written with the children of a source node, which are expected in the same
+    order. If an object does not match its node (i.e. its tag or name differ), the remaining objects within the
+    node are not paired.
+    """
+
+    def __init__(self, source, node, record = None, target = None):
+        """
+        :param source: The ``Source_Map``.
+        :param node: The source node whose children are written, or ``None`` if nothing is paired.
+        :param record: The record which contains the children.
+        :param target: If specified, the source node of the next (and only) child element.
+        """
+
+        self.source = source
+        self.record = record
+        self.target = target
+        self.children = [] if node == None else [c for c in node if isinstance(c.tag, basestring)]
+        self.index = 0
+
+    @property
+    def text(self):
+        return None
+
+    @text.setter
+    def text(self, text):
+        pass
+
+    def element(self, node):
+        if self.target != None:
+            target = self.target
+            self.target = None
+
+            if target.tag == node.tag:
+                return _Recorder(self.source, target, self.record)
+
+            return _Recorder(self.source, None)
+
+        # Sections are found by tag, skipping any unknown nodes
+        while self.index < len(self.children):
+            c = self.children[self.index]
+            self.index += 1
+
+            if c.tag == node.tag:
+                return _Recorder(self.source, c, self.record)
+
+        return _Recorder(self.source, None)
+
+    def append(self, obj):
+        if self.index >= len(self.children):
+            return
+
+        c = self.children[self.index]
+        self.index += 1
+
+        tag = getattr(obj, 'TAG_NAME', None)
+        name = getattr(obj, 'name', None)
+
+        if (tag != None and tag != c.tag) or (isinstance(name, basestring) and c.get('name', name) != name):
+            self.children = []
+            return
+
+        self.source.add(obj, c, self.record)
+
+        if hasattr(obj, 'write'):
+            obj.write(_Recorder(self.source, None, obj, c))
+
@@ -0,0 +1,435 @@
+"""
+Spatial
+=======
+
+Provides a spatial index of the geometry of a board, for "what is near this point" and "what is inside this box"
+queries which would otherwise iterate over every item of every signal, element and plain item.
+
+The items are stored in an R-tree for each layer, which is bulk-loaded using the Sort-Tile-Recursive algorithm:
+the items are sorted into vertical slices by the x-coordinate of their centers, each slice is sorted by the
+y-coordinate of their centers, and consecutive items are packed into nodes (and so on for the nodes). A query
+only visits the nodes whose bounding boxes intersect it, so it takes logarithmic time (plus the number of
+results) rather than linear time.
+
+Items are indexed using their bounding boxes (see ``geometry.bounds()``), so the results of a query may
+include items whose bounding boxes (but not their shapes) intersect it.
+
+Layers
+------
+
+Wires, polygons, SMDs, circles, and rectangles are indexed on their layers (placed items are indexed on the
+layers on which their elements place them). As in EAGLE, pads (which have copper on every layer) are indexed on
+the ``Pads`` layer, vias on the ``Vias`` layer, and holes on the ``Holes`` layer, so a query for the copper of
+the top layer should include those layers:
+
+    index = board.spatial_index()
+    layers = (constants.LAYERS.TOP, constants.LAYERS.PADS, constants.LAYERS.VIAS)
+
+    for entry in index.search((10, 10, 20, 20), layers):
+        print(entry.item, entry.owner)
+
+Texts are not indexed (their sizes depend on their fonts).
+
+Reuse
+-----
+
+``Board.spatial_index()`` builds the index of a board once, and reuses it until the board is modified (see
+``references``). Adding or removing elements, signals, or plain items is detected; moving an element, or changing
+the items of a signal, is only detected if the board is tracked (see ``tracking``), so otherwise call
+``references.changed(board)`` after making such changes. The index is then rebuilt when it is next used. A
+``Board_Index`` which is built directly is not updated.
+
+"""
+
+import geometry
+import heapq
+import itertools
+import math
+import placement
+
+# The maximum number of entries in each node of an R-tree
+DEFAULT_CAPACITY = 16
+
+class Entry(object):
+    """
+    An item in a spatial index.
+    """
+
+    __slots__ = ('item', 'owner', 'layer', 'bounds')
+
+    def __init__(self, item, owner, layer, bounds):
+        """
+        :param item: The primitive. The coordinates of placed items are relative to their packages.
+        :param owner: The ``Signal`` or ``Element`` which contains the item, or ``None`` for a plain item.
+        :param layer: The layer on which the item is indexed.
+        :param bounds: The bounding box of the item on the board.
+        """
+
+        self.item = item
+        self.owner = owner
+        self.layer = layer
+        self.bounds = bounds
+
+    def __repr__(self):
+        return 'Entry({0!r}, {1!r}, {2!r}, {3!r})'.format(self.item, self.owner, self.layer, self.bounds)
+
+def board_entries(board):
+    """
+    Generate an ``Entry`` for each item of a board which has a bounding box: the items of the signals, the items
+    of the packages of the elements (placed on the board), and the plain items.
+
+    If NumPy is available, the items of the elements are placed in a batch (see ``Board.placed_items()``).
+    """
+
+    bounds = geometry.bounds
+    item_layer = geometry.item_layer
+
+    for signal in board.signals:
+        for item in signal.items:
+            b = bounds(item)
+
+            if b != None:
+                yield Entry(item, signal, item_layer(item), b)
+
+    if placement.numpy != None:
+        # Place the items of every element at once
+        placed = board.placed_items()
+        elements = placed.elements_of_rows()
+
+        for item, element, layer, b in itertools.izip(placed.items, elements, placed.layer.tolist(), placed.bounds.tolist()):
+            yield Entry(item, element, layer, tuple(b))
+    else:
+        for element in board.elements:
+            p = geometry.Placement(element)
+
+            for item in element.package.items:
+                b = bounds(item)
+
+                if b != None:
+                    layer = geometry.ITEM_LAYERS.get(item.__class__)
+                    yield Entry(item, element, layer if layer != None else p.layer(item.layer), p.bounds(b))
+
+    for item in board.plain_items:
+        b = bounds(item)
+
+        if b != None:
+            yield Entry(item, None, item_layer(item), b)
+
+def _pack(entries, capacity):
+    """
+    Pack entries into nodes (Sort-Tile-Recursive).
+
+    :returns: A list of nodes (lists of entries).
+    """
+
+    count = len(entries)
+    slices = int(math.ceil(math.sqrt(math.ceil(count / float(capacity)))))
+    per_slice = slices * capacity
+
+    entries.sort(key = lambda e: e[0] + e[2])
+    nodes = []
+
+    for start in xrange(0, count, per_slice):
+        part = entries[start:start + per_slice]
+        part.sort(key = lambda e: e[1] + e[3])
+
+        for i in xrange(0, len(part), capacity):
+            nodes.append(part[i:i + capacity])
+
+    return nodes
+
+def _node_entry(node):
+    return (min(e[0] for e in node), min(e[1] for e in node), max(e[2] for e in node), max(e[3] for e in node), node)
+
+def _box_distance(e, x, y):
+    dx = max(e[0] - x, 0, x - e[2])
+    dy = max(e[1] - y, 0, y - e[3])
+    return math.sqrt(dx * dx + dy * dy)
+
+def _nearest(roots, x, y, count, distance):
+    """
+    Best-first search of the entries nearest to a point in a set of R-trees.
+
+    :param roots: A list of ``(root node, height)`` tuples.
+    """
+
+    # (distance, sequence, is value, node or value, height)
+    heap = []
+    sequence = itertools.count()
+    result = []
+
+    for node, height in roots:
+        if len(node) > 0:
+            heap.append((0, next(sequence), False, node, height))
+
+    heapq.heapify(heap)
+
+    while heap and len(result) < count:
+        d, _, is_value, obj, height = heapq.heappop(heap)
+
+        if is_value:
+            result.append((d, obj))
+        elif height == 1:
+            for e in obj:
+                # The distance to the bounding box is a lower bound of the exact distance
+                heapq.heappush(heap, (_box_distance(e, x, y) if distance == None else distance(e[4]), next(sequence), True, e[4], 0))
+        else:
+            for e in obj:
+                heapq.heappush(heap, (_box_distance(e, x, y), next(sequence), False, e[4], height - 1))
+
+    return result
+
+def _join(a, level_a, b, level_b, margin, result):
+    """
+    Append the pairs of values of two (sub)trees whose bounding boxes are within ``margin`` of each other.
+
+    :param a: The entry of the root of the first tree.
+    :param level_a: The height of the first tree (0 for a value).
+    :param b: The entry of the root of the second tree (which may be ``a``, in which case each pair of distinct
+        values is appended once).
+    """
+
+    stack = [(a, level_a, b, level_b)]
+
+    while stack:
+        a, level_a, b, level_b = stack.pop()
+
+        if a is b:
+            if level_a == 0:
+                continue
+
+            children = a[4]
+            n = len(children)
+
+            for i in xrange(n):
+                ca = children[i]
+                stack.append((ca, level_a - 1, ca, level_a - 1))
+
+                for j in xrange(i + 1, n):
+                    cb = children[j]
+
+                    if ca[0] - margin <= cb[2] and cb[0] - margin <= ca[2] and ca[1] - margin <= cb[3] and cb[1] - margin <= ca[3]:
+                        stack.append((ca, level_a - 1, cb, level_a - 1))
+        elif level_a == 0 and level_b == 0:
+            result.append((a[4], b[4]))
+        elif level_a >= level_b:
+            for ca in a[4]:
+                if ca[0] - margin <= b[2] and b[0] - margin <= ca[2] and ca[1] - margin <= b[3] and b[1] - margin <= ca[3]:
+                    stack.append((ca, level_a - 1, b, level_b))
+        else:
+            for cb in b[4]:
+                if a[0] - margin <= cb[2] and cb[0] - margin <= a[2] and a[1] - margin <= cb[3] and cb[1] - margin <= a[3]:
+                    stack.append((a, level_a, cb, level_b - 1))
+
+class R_Tree(object):
+    """
+    A static R-tree of values with bounding boxes.
+
+    Nodes are lists of ``(x_min, y_min, x_max, y_max, child)`` tuples, where each child is a node (or a value,
+    for the nodes at the lowest level).
+    """
+
+    def __init__(self, items, capacity = DEFAULT_CAPACITY):
+        """
+        :param items: An iterable of ``(bounds, value)`` tuples.
+        :param capacity: The maximum number of entries in each node.
+        """
+
+        entries = [tuple(b) + (v,) for b, v in items]
+
+        self.count = len(entries)
+        self.height = 1
+
+        while len(entries) > capacity:
+            entries = [_node_entry(n) for n in _pack(entries, capacity)]
+            self.height += 1
+
+        self.root = entries
+
+    def __len__(self):
+        return self.count
+
+    def _root_entry(self):
+        return _node_entry(self.root) if len(self.root) > 0 else None
+
+    def bounds(self):
+        """
+        :returns: The bounding box of the values, or ``None`` if the tree is empty.
+        """
+
+        entry = self._root_entry()
+        return entry[:4] if entry != None else None
+
+    def values(self):
+        """
+        Generate the values (in no particular order).
+        """
+
+        stack = [(self.root, self.height)]
+
+        while stack:
+            node, height = stack.pop()
+
+            if height == 1:
+                for e in node:
+                    yield e[4]
+            else:
+                stack.extend((e[4], height - 1) for e in node)
+
+    def search(self, bounds, margin = 0):
+        """
+        :param bounds: A bounding box.
+        :param margin: The distance by which to expand the box.
+
+        :returns: A list of the values whose bounding boxes intersect the box (in no particular order).
+        """
+
+        x1 = bounds[0] - margin
+        y1 = bounds[1] - margin
+        x2 = bounds[2] + margin
+        y2 = bounds[3] + margin
+
+        result = []
+        stack = [(self.root, self.height)]
+
+        while stack:
+            node, height = stack.pop()
+
+            if height == 1:
+                result.extend(e[4] for e in node if e[0] <= x2 and x1 <= e[2] and e[1] <= y2 and y1 <= e[3])
+            else:
+                stack.extend((e[4], height - 1) for e in node if e[0] <= x2 and x1 <= e[2] and e[1] <= y2 and y1 <= e[3])
+
+        return result
+
+    def at_point(self, x, y):
+        """
+        :returns: A list of the values whose bounding boxes contain the point ``(x, y)``.
+        """
+
+        return self.search((x, y, x, y))
+
+    def nearest(self, x, y, count = 1, distance = None):
+        """
+        :param count: The number of values to return.
+        :param distance: A function which returns the distance from the point to a value, or ``None`` to use the
+            distance to the bounding box of the value. The distance to a value must not be less than the distance
+            to its bounding box.
+
+        :returns: A list of the ``(distance, value)`` tuples of the ``count`` values nearest to the point
+            ``(x, y)``, nearest first.
+        """
+
+        return _nearest([(self.root, self.height)], x, y, count, distance)
+
+    def pairs(self, other = None, margin = 0):
+        """
+        :param other: Another ``R_Tree``, or ``None`` to find pairs of values of this tree.
+        :param margin: The distance within which bounding boxes are considered to overlap.
+
+        :returns: A list of the ``(value, other value)`` pairs whose bounding boxes overlap (in no particular
+            order). Pairs of values of this tree are only returned once.
+        """
+
+        a = self._root_entry()
+        b = a if other == None or other is self else other._root_entry()
+        result = []
+
+        if a != None and b != None:
+            _join(a, self.height, b, self.height if b is a else other.height, margin, result)
+
+        return result
+
+class Board_Index(object):
+    """
+    A spatial index of the items of a board, with an ``R_Tree`` of ``Entry`` objects for each layer.
+    """
+
+    def __init__(self, board, capacity = DEFAULT_CAPACITY):
+        """
+        :param board: A ``Board``.
+        :param capacity: The maximum number of entries in each node of the trees.
+        """
+
+        layers = {}
+
+        for entry in board_entries(board):
+            items = layers.get(entry.layer)
+
+            if items == None:
+                items = layers[entry.layer] = []
+
+            items.append((entry.bounds, entry))
+
+        self.trees = dict((layer, R_Tree(items, capacity)) for layer, items in layers.iteritems())
+
+    def __len__(self):
+        return sum(len(t) for t in self.trees.itervalues())
+
+    def layers(self):
+        """
+        :returns: A sorted list of the layers which contain items.
+        """
+
+        return sorted(self.trees.keys())
+
+    def _trees(self, layers):
+        if layers == None:
+            return [self.trees[l] for l in sorted(self.trees)]
+        elif isinstance(layers, int):
+            layers = (layers,)
+
+        return [self.trees[l] for l in layers if self.trees.has_key(l)]
+
+    def entries(self, layers = None):
+        """
+        :param layers: A layer, a sequence of layers, or ``None`` for every layer.
+
+        :returns: A list of the entries on the layers.
+        """
+
+        return [e for t in self._trees(layers) for e in t.values()]
+
+    def search(self, bounds, layers = None, margin = 0):
+        """
+        :param bounds: A bounding box.
+        :param layers: A layer, a sequence of layers, or ``None`` for every layer.
+        :param margin: The distance by which to expand the box.
+
+        :returns: A list of the entries on the layers whose bounding boxes intersect the box.
+        """
+
+        return [e for t in self._trees(layers) for e in t.search(bounds, margin)]
+
+    def at_point(self, x, y, layers = None):
+        """
+        :returns: A list of the entries on the layers whose bounding boxes contain the point ``(x, y)``.
+        """
+
+        return self.search((x, y, x, y), layers)
+
+    def nearest(self, x, y, count = 1, layers = None, distance = None):
+        """
+        :returns: A list of the ``(distance, entry)`` tuples of the ``count`` entries on the layers which are
+            nearest to the point ``(x, y)``, nearest first (see ``R_Tree.nearest()``).
+        """
+
+        return _nearest([(t.root, t.height) for t in self._trees(layers)], x, y, count, distance)
+
+    def pairs(self, layers = None, margin = 0):
+        """
+        :param layers: A layer, a sequence of layers, or ``None`` for every layer.
+        :param margin: The distance within which bounding boxes are considered to overlap.
+
+        :returns: A list of the pairs of entries on the layers (including pairs on different layers) whose
+            bounding boxes overlap. Each pair is only returned once.
+        """
+
+        trees = self._trees(layers)
+        result = []
+
+        for i, tree in enumerate(trees):
+            for other in trees[i:]:
+                result.extend(tree.pairs(other, margin))
+
+        return result
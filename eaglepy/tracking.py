@@ -0,0 +1,718 @@
+"""
+Tracking
+========
+
+Provides opt-in tracking of changes to the object model.
+
+A ``Tracker`` records which objects (e.g. a part whose value has been assigned) and containers (e.g. the
+items of a package, or the elements of a board) have been modified since a checkpoint, and sends an event to
+each subscriber when an object is modified or an item is added to or removed from a container. Data which is
+derived from a document (e.g. an index) can then be updated in proportion to the number of changes, rather
+than being recomputed from the entire document.
+
+Usage
+-----
+
+    e = eagle.Eagle.load('board.brd', track_changes = True)
+
+    def handler(event, obj, detail):
+        print event, obj, detail
+
+    e.tracker.subscribe(handler)
+
+    e.drawing.document.elements['R1'].value = '10k'    # handler(MODIFIED, element, 'value')
+    e.drawing.document.signals['GND'].items.pop()      # handler(REMOVED, items, wire)
+
+    changed = e.tracker.checkpoint()
+    e.tracker.close()
+
+A tracker is also a context manager, which closes it:
+
+    with tracking.Tracker(board) as tracker:
+        ...
+
+Events
+------
+
+Each handler is called as ``handler(event, obj, detail)``:
+
+* ``MODIFIED``: the attribute named ``detail`` of ``obj`` has been assigned.
+* ``ADDED``: ``detail`` has been added to the container ``obj``.
+* ``REMOVED``: ``detail`` has been removed from the container ``obj``.
+* ``REORDERED``: the items of the container ``obj`` have been reordered.
+
+Implementation
+--------------
+
+While at least one tracker is open, a ``__setattr__`` method is installed on the classes of the object model,
+and the methods of ``Key_List`` which modify it are wrapped. The lists of tracked objects are replaced with
+``Tracked_List`` objects (a subclass of ``list`` which reports its changes; the ``Item_List`` objects of
+packages, symbols, and plain items are ``Tracked_List`` objects already). Objects which are added to
+a tracked object are tracked too. When the last tracker is closed (see ``Tracker.close()``), the classes are
+restored, so there is no cost unless tracking is used. While a tracker is open, assigning an attribute of an
+object which is not tracked costs a function call, and parsing a file takes about 1.5 times as long, so a tracker
+should be closed as soon as it is no longer needed.
+
+A change is also reported to the ``Tracked_List`` objects which contain the changed object, directly or through
+other objects (see ``Tracked_List._item_changed()``), so that an ``Item_List`` can discard its bounding box when
+one of its items is moved.
+
+Attributes which are listed in the ``TRANSIENT_ATTRIBUTES`` of a class (e.g. the ``tracker`` of an ``Eagle``
+object) are not part of the document, and are not tracked.
+
+The items of a ``Lazy_Key_List`` which have not been parsed are not tracked (and are not parsed by tracking the
+list); each item is tracked when it is parsed.
+
+A tracker keeps the objects which it tracks alive until it is closed, but only references its root weakly: if the
+root (e.g. an ``Eagle`` object) is collected, the tracker is closed, so a document which is dropped without closing
+its tracker is not kept alive. (The handlers of a tracker should not reference its root, or it will not be
+collected; see ``subscribe()``.)
+
+Changes which are made without assigning an attribute or calling a method of a container (e.g. modifying a
+``dict``, or the columns of an ``Item_Columns``) are not detected.
+
+"""
+
+import collections
+import etree_utils
+import key_list
+import types
+import weakref
+from binary import _get_class_info
+
+MODIFIED = 'modified'
+ADDED = 'added'
+REMOVED = 'removed'
+REORDERED = 'reordered'
+
+# The types whose instances are values, rather than objects which can be modified
+VALUE_TYPES = frozenset([type(None), bool, int, long, float, str, unicode])
+
+# The open trackers
+_trackers = []
+
+# The classes on which ``__setattr__`` has been installed
+_hooked_classes = []
+
+# (class, name, original method) for each wrapped method of ``Key_List``
+_wrapped_methods = []
+
+# The parent of the objects which are contained by the root of a tracker (which is only referenced weakly)
+_ROOT = object()
+
+class Tracker(object):
+    """
+    Tracks the changes to the objects which are contained by a root object (e.g. an ``Eagle`` object).
+    """
+
+    def __init__(self, root):
+        """
+        :param root: The object whose contents to track. The tracker is closed when it is collected.
+        """
+
+        self.root_id = id(root)
+        self._root_reference = weakref.ref(root, lambda r, tracker = weakref.ref(self): tracker() and tracker().close())
+        self._root_attached = False
+
+        # id -> tracked object, and id -> the object or container which contains it
+        self.objects = {}
+        self.parents = {}
+
+        # id -> object or container which has been modified since the last checkpoint
+        self.changed = collections.OrderedDict()
+
+        self.handlers = []
+
+        _install()
+        _trackers.append(self)
+
+        self._attach_root(root)
+
+    @property
+    def root(self):
+        """
+        The object whose contents are tracked, or ``None`` if it has been collected.
+        """
+
+        return self._root_reference()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def subscribe(self, handler, weak = False):
+        """
+        :param handler: A function which is called as ``handler(event, obj, detail)`` for each change.
+        :param weak: Whether ``handler`` is a bound method whose object is only referenced weakly (so that, e.g.,
+            an object which references the root can subscribe without keeping it alive).
+
+        :returns: The handler which was subscribed (to pass to ``unsubscribe()``).
+        """
+
+        if weak:
+            handler = _weak_method(handler)
+
+        self.handlers.append(handler)
+
+        return handler
+
+    def unsubscribe(self, handler):
+        self.handlers.remove(handler)
+
+    def is_tracked(self, obj):
+        i = id(obj)
+
+        if i == self.root_id:
+            return self._root_reference() is obj
+
+        return self.objects.get(i) is obj
+
+    def is_open(self):
+        """
+        :returns: Whether the tracker is still tracking changes (see ``close()``).
+        """
+
+        return self in _trackers
+
+    def parent(self, obj):
+        """
+        :returns: The object or container which contains ``obj``, or ``None``.
+        """
+
+        p = self.parents.get(id(obj))
+
+        return self._root_reference() if p is _ROOT else p
+
+    def is_modified(self, obj):
+        """
+        :returns: Whether ``obj`` (an object or a container) has been modified since the last checkpoint.
+        """
+
+        return self.changed.get(id(obj)) is obj
+
+    def modified(self):
+        """
+        :returns: A list of the objects and containers which have been modified since the last checkpoint, in the
+                  order in which they were first modified.
+        """
+
+        return self.changed.values()
+
+    def checkpoint(self):
+        """
+        Start a new set of changes.
+
+        :returns: The objects and containers which were modified since the last checkpoint (see ``modified()``).
+        """
+
+        changed = self.changed.values()
+        self.changed.clear()
+
+        return changed
+
+    def close(self):
+        """
+        Stop tracking changes. The classes of the object model are restored if no other tracker is open. (The
+        lists of the tracked objects remain ``Tracked_List`` objects, which behave as lists.)
+        """
+
+        if self in _trackers:
+            _trackers.remove(self)
+
+        self.objects.clear()
+        self.parents.clear()
+
+        if len(_trackers) == 0:
+            _uninstall()
+
+    def _attach_root(self, root):
+        # Records (see ``source``) are attached in the order in which they are written, so that objects
+        # which are referenced by several records (e.g. the packages of elements) are assigned to the
+        # record which contains them.
+        walker = _Record_Walker()
+
+        if hasattr(root, 'write'):
+            root.write(walker)
+
+        records = set(id(r) for r in walker.records)
+        self._attach(root, None, records)
+
+        for r in walker.records:
+            self._attach(r, self.parents.get(id(r)), records)
+
+        # The root is only referenced weakly
+        del self.objects[id(root)]
+        del self.parents[id(root)]
+
+        for i, p in self.parents.iteritems():
+            if p is root:
+                self.parents[i] = _ROOT
+
+        self._root_attached = True
+
+    def _attach(self, obj, parent, records = ()):
+        """
+        Track an object and the objects which it contains (other than ``records``, which are attached separately).
+        """
+
+        stack = [(obj, parent)]
+
+        while len(stack) > 0:
+            o, p = stack.pop()
+
+            if self.objects.has_key(id(o)) or (self._root_attached and id(o) == self.root_id):
+                continue
+
+            if self._root_attached and id(p) == self.root_id:
+                p = _ROOT
+
+            self.objects[id(o)] = o
+            self.parents[id(o)] = p
+
+            if isinstance(o, key_list.Lazy_Key_List):
+                children = _parsed_items(o)
+            elif isinstance(o, (key_list.Key_List, Tracked_List)):
+                children = o
+            else:
+                children = []
+
+                for name, v in _get_attributes(o):
+                    t = type(v)
+
+                    if t in VALUE_TYPES:
+                        continue
+
+                    if t is list:
+                        v = Tracked_List(v)
+                        _set_attribute(o, name, v)
+
+                    children.append(v)
+
+            for c in children:
+                t = type(c)
+
+                if t in VALUE_TYPES:
+                    continue
+
+                if t is tuple or t is dict or t is collections.OrderedDict:
+                    # Values which cannot be tracked; their items are contained by ``o``
+                    for cc in (c.itervalues() if t is not tuple else c):
+                        if _is_trackable(cc):
+                            stack.append((cc, o))
+                elif id(c) in records:
+                    if not self.parents.has_key(id(c)):
+                        self.parents[id(c)] = _ROOT if self._root_attached and id(o) == self.root_id else o
+                elif _is_trackable(c):
+                    stack.append((c, o))
+
+    def _modified(self, obj, name, value):
+        if _is_trackable(value):
+            self._attach(value, obj)
+
+        self._notify(MODIFIED, obj, name)
+
+    def _container_changed(self, container, event, item):
+        if event == ADDED and _is_trackable(item):
+            self._attach(item, container)
+
+        self._notify(event, container, item)
+
+    def _notify(self, event, obj, detail):
+        if not self.changed.has_key(id(obj)):
+            self.changed[id(obj)] = obj
+
+        # The lists which contain ``obj`` (e.g. the ``Item_List`` of a package whose wire was moved)
+        p = self.parents.get(id(obj))
+
+        while p != None:
+            if isinstance(p, Tracked_List):
+                p._item_changed(event, obj, detail)
+
+            p = self.parents.get(id(p))
+
+        for h in self.handlers:
+            h(event, obj, detail)
+
+class _Record_Walker(etree_utils.Writer):
+    """
+    Lists the objects which are written by a ``Writer``, in order.
+    """
+
+    def __init__(self, records = None):
+        self.records = [] if records == None else records
+        self.text = None
+
+    def element(self, node):
+        return self
+
+    def append(self, obj):
+        self.records.append(obj)
+
+        if hasattr(obj, 'write'):
+            obj.write(self)
+
+    def append_grandchildren(self, tag, children, add_node_if_empty = True):
+        if isinstance(children, key_list.Lazy_Key_List):
+            children = _parsed_items(children)
+
+        for c in children:
+            self.append(c)
+
+class Tracked_List(list):
+    """
+    A list which reports its changes to the trackers which track it. It is pickled (and copied) as a list.
+
+    Its ``generation`` is incremented whenever it is modified, whether or not it is tracked (see ``references``).
+    """
+
+    generation = 0
+
+    def _changed(self, event, items):
+        self.generation += 1
+
+        for t in _trackers:
+            if t.is_tracked(self):
+                for i in items:
+                    t._container_changed(self, event, i)
+
+    def append(self, item):
+        list.append(self, item)
+        self._changed(ADDED, (item,))
+
+    def extend(self, items):
+        items = list(items)
+        list.extend(self, items)
+        self._changed(ADDED, items)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __imul__(self, n):
+        items = list(self)
+        list.__imul__(self, n)
+        self._changed(REMOVED, items)
+        self._changed(ADDED, list(self))
+        return self
+
+    def insert(self, index, item):
+        list.insert(self, index, item)
+        self._changed(ADDED, (item,))
+
+    def pop(self, index = -1):
+        item = list.pop(self, index)
+        self._changed(REMOVED, (item,))
+        return item
+
+    def remove(self, item):
+        del self[self.index(item)]
+
+    def __setitem__(self, index, value):
+        removed = self[index]
+
+        if isinstance(index, slice):
+            value = list(value)
+
+        list.__setitem__(self, index, value)
+
+        if isinstance(index, slice):
+            self._changed(REMOVED, removed)
+            self._changed(ADDED, value)
+        else:
+            self._changed(REMOVED, (removed,))
+            self._changed(ADDED, (value,))
+
+    def __delitem__(self, index):
+        removed = self[index]
+        list.__delitem__(self, index)
+        self._changed(REMOVED, removed if isinstance(index, slice) else (removed,))
+
+    def __setslice__(self, i, j, values):
+        self.__setitem__(slice(max(0, i), max(0, j)), values)
+
+    def __delslice__(self, i, j):
+        self.__delitem__(slice(max(0, i), max(0, j)))
+
+    def sort(self, *args, **kwargs):
+        list.sort(self, *args, **kwargs)
+        self._notify_reordered()
+
+    def reverse(self):
+        list.reverse(self)
+        self._notify_reordered()
+
+    def _item_changed(self, event, obj, detail):
+        """
+        Called by a tracker when an object which the list contains (directly or indirectly) is changed, with the
+        arguments of the event (see ``Tracker.subscribe()``).
+        """
+
+        pass
+
+    def _notify_reordered(self):
+        self.generation += 1
+
+        for t in _trackers:
+            if t.is_tracked(self):
+                t._notify(REORDERED, self, None)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+def _weak_method(method):
+    """
+    :returns: A function which calls a bound method, without keeping its object alive.
+    """
+
+    obj = weakref.ref(method.im_self)
+    function = method.im_func
+
+    def call(*args):
+        o = obj()
+
+        if o != None:
+            function(o, *args)
+
+    return call
+
+def tracker_of(obj):
+    """
+    :returns: An open ``Tracker`` which tracks ``obj``, or ``None``.
+    """
+
+    for t in _trackers:
+        if t.is_tracked(obj):
+            return t
+
+    return None
+
+def _parsed_items(lazy_key_list):
+    """
+    :returns: A list of the items of a ``Lazy_Key_List`` which have been parsed (without parsing the others).
+    """
+
+    return [lazy_key_list.list[name] for name in lazy_key_list.names() if lazy_key_list.is_parsed(name)]
+
+def _is_trackable(v):
+    """
+    :returns: Whether ``v`` is an object or container which can be tracked (rather than a value).
+    """
+
+    t = type(v)
+
+    if t in VALUE_TYPES:
+        return False
+
+    if t is types.InstanceType or issubclass(t, Tracked_List):
+        return True
+
+    if t is list or t is tuple or t is dict or t is collections.OrderedDict or issubclass(t, (type, types.ClassType)):
+        return False
+
+    reduced, slots, _ = _get_class_info(t)
+
+    # Immutable values (e.g. ``Rotation``) have a ``__reduce__`` method
+    return not reduced and (len(slots) > 0 or t.__dictoffset__ != 0)
+
+def _get_attributes(obj):
+    """
+    :returns: A list of ``(name, value)`` tuples of the (non-transient) attributes of an object.
+    """
+
+    t = type(obj)
+
+    if t is types.InstanceType:
+        attributes = obj.__dict__.items()
+    else:
+        _, slots, getter = _get_class_info(t)
+
+        try:
+            attributes = zip(slots, getter(obj))
+        except AttributeError:
+            # A slot is not assigned
+            attributes = [(s, getattr(obj, s)) for s in slots if hasattr(obj, s)]
+
+        if t.__dictoffset__ != 0:
+            attributes.extend(obj.__dict__.items())
+
+    transient = getattr(obj, 'TRANSIENT_ATTRIBUTES', ())
+
+    if len(transient) > 0:
+        attributes = [a for a in attributes if a[0] not in transient]
+
+    return attributes
+
+def _set_attribute(obj, name, value):
+    """
+    Assign an attribute without reporting the change.
+    """
+
+    if type(obj) is types.InstanceType:
+        obj.__dict__[name] = value
+    else:
+        object.__setattr__(obj, name, value)
+
+def _make_setattr(set_attribute, old_style):
+    def __setattr__(self, name, value):
+        # Most assignments are to objects which are not tracked (e.g. while another file is parsed), so they
+        # are made directly
+        i = id(self)
+
+        for t in _trackers:
+            if t.objects.get(i) is self or t.root_id == i:
+                break
+        else:
+            if old_style:
+                self.__dict__[name] = value
+            else:
+                object.__setattr__(self, name, value)
+
+            return
+
+        trackers = [t for t in _trackers if t.is_tracked(self)]
+
+        if name in getattr(self, 'TRANSIENT_ATTRIBUTES', ()):
+            trackers = []
+
+        if len(trackers) > 0 and type(value) is list:
+            value = Tracked_List(value)
+
+        set_attribute(self, name, value)
+
+        for t in trackers:
+            t._modified(self, name, value)
+
+    return __setattr__
+
+def _model_classes():
+    """
+    :returns: The classes of the object model.
+    """
+
+    import attributes
+    import eagle
+    import primitives
+
+    classes = [attributes.Extent]
+
+    for module in (eagle, primitives):
+        for v in module.__dict__.itervalues():
+            # (A class may have several names.)
+            if isinstance(v, (type, types.ClassType)) and v.__module__ == module.__name__ and hasattr(v, 'TAG_NAME') and v not in classes:
+                classes.append(v)
+
+    return classes
+
+def _wrap(cls, name, make_wrapper):
+    original = cls.__dict__[name]
+    _wrapped_methods.append((cls, name, original))
+    setattr(cls, name, make_wrapper(original))
+
+def _container_changed(container, event, items):
+    for t in _trackers:
+        if t.is_tracked(container):
+            for i in items:
+                t._container_changed(container, event, i)
+
+def _wrap_append(f):
+    def append(self, obj):
+        replaced = self.list.get(obj.name) if _trackers and self.has_name(obj.name) else None
+        f(self, obj)
+
+        if replaced != None:
+            _container_changed(self, REMOVED, (replaced,))
+
+        _container_changed(self, ADDED, (obj,))
+
+    return append
+
+def _wrap_insert_at(f):
+    def insert_at(self, index, obj):
+        replaced = self.list.get(obj.name) if _trackers and self.has_name(obj.name) else None
+        f(self, index, obj)
+
+        if replaced != None:
+            _container_changed(self, REMOVED, (replaced,))
+
+        _container_changed(self, ADDED, (obj,))
+
+    return insert_at
+
+def _wrap_move(f):
+    def move(self, name, index):
+        f(self, name, index)
+        _container_changed(self, REORDERED, (None,))
+
+    return move
+
+def _wrap_pop(f):
+    def pop(self, name):
+        obj = f(self, name)
+        _container_changed(self, REMOVED, (obj,))
+        return obj
+
+    return pop
+
+def _wrap_remove(f):
+    def remove(self, obj):
+        f(self, obj)
+        _container_changed(self, REMOVED, (obj,))
+
+    return remove
+
+def _wrap_parse(f):
+    def _parse(self, name):
+        obj = f(self, name)
+
+        # (Parsing an item does not modify the list, so it is not reported)
+        for t in _trackers:
+            if t.is_tracked(self):
+                t._attach(obj, self)
+
+        return obj
+
+    return _parse
+
+def _wrap_clear(f):
+    def clear(self):
+        items = list(self.list.itervalues()) if _trackers else ()
+        f(self)
+        _container_changed(self, REMOVED, [i for i in items if i != None])
+
+    return clear
+
+# The methods of ``Key_List`` which modify it (the methods of its subclasses call these methods)
+KEY_LIST_WRAPPERS = {'append': _wrap_append,
+                     'insert_at': _wrap_insert_at,
+                     'move': _wrap_move,
+                     'pop': _wrap_pop,
+                     'remove': _wrap_remove,
+                     'clear': _wrap_clear}
+
+def _install():
+    if len(_hooked_classes) > 0:
+        return
+
+    for cls in _model_classes():
+        if type(cls) is types.ClassType:
+            set_attribute = lambda obj, name, value: obj.__dict__.__setitem__(name, value)
+        else:
+            set_attribute = object.__setattr__
+
+        cls.__setattr__ = _make_setattr(set_attribute, type(cls) is types.ClassType)
+        _hooked_classes.append(cls)
+
+    for name, make_wrapper in KEY_LIST_WRAPPERS.iteritems():
+        _wrap(key_list.Key_List, name, make_wrapper)
+
+    _wrap(key_list.Lazy_Key_List, '_parse', _wrap_parse)
+
+def _uninstall():
+    while len(_hooked_classes) > 0:
+        del _hooked_classes.pop().__setattr__
+
+    while len(_wrapped_methods) > 0:
+        cls, name, original = _wrapped_methods.pop()
+        setattr(cls, name, original)
@@ -0,0 +1,139 @@
+"""
+Walker
+======
+
+Traverses the objects of a document once, and calls the handlers of one or more visitors for each object.
+
+A visitor (see ``Visitor``) defines a handler method for each class of object in which it is interested, named
+``visit_`` followed by the name of the class (e.g. ``visit_Wire``). The handler of a class is also called for its
+subclasses (e.g. the ``Wire_View`` objects of columnar signals), unless they have their own handler. The handlers
+of each class are looked up once per walk and stored in a table, so each object is dispatched using a dictionary
+lookup rather than a chain of ``isinstance`` checks.
+
+Each handler is called as ``handler(obj, path)``, where ``path`` is a list of the ancestors of ``obj`` (the root
+first, e.g. ``[e, drawing, board, signal]`` for a wire of a signal). The list is modified as the walk proceeds, so
+it should be copied if it is kept. If a handler returns ``PRUNE``, the descendants of the object are not visited
+by that visitor.
+
+When several visitors are passed to ``walk()``, they are all run in the same traversal, so a number of reports
+cost one traversal of the document rather than one each.
+
+The children of an object are the objects in the attributes which are listed in the ``CHILD_ATTRIBUTES`` of its
+class (e.g. the ``elements`` and ``signals`` of a ``Board``); each attribute contains either an object or a
+sequence of objects. References to other objects (e.g. the package of an element) are not followed, so each
+object of the document is visited once, in the order in which it is written to a file.
+
+Usage
+-----
+
+    class Via_Counter(walker.Visitor):
+
+        def __init__(self):
+            self.count = 0
+
+        def visit_Via(self, via, path):
+            self.count += 1
+
+        def visit_Library(self, library, path):
+            return walker.PRUNE
+
+    vias = Via_Counter()
+    e.walk(vias, other_visitor)
+
+"""
+
+import inspect
+
+# Returned by a handler to skip the descendants of an object
+PRUNE = 'prune'
+
+class Visitor(object):
+    """
+    The base class of visitors. Subclasses define handlers named ``visit_`` followed by the name of a class.
+    """
+
+    def handler(self, cls):
+        """
+        :param cls: The class of an object.
+
+        :returns: The handler for objects of the class, or ``None`` if they are ignored.
+        """
+
+        for c in inspect.getmro(cls):
+            h = getattr(self, 'visit_' + c.__name__, None)
+
+            if h != None:
+                return h
+
+        return None
+
+def walk(root, *visitors):
+    """
+    Visit an object and its descendants.
+
+    :param root: The object at which to start (e.g. an ``Eagle``, ``Board``, or ``Package`` object).
+    :param visitors: The visitors, which are called in order for each object.
+    """
+
+    _Walk(visitors).visit(root, tuple(range(len(visitors))))
+
+class _Walk(object):
+
+    def __init__(self, visitors):
+        self.visitors = visitors
+        self.path = []
+
+        # (class, indexes of the active visitors) -> ((index, handler) for each handler, child attributes)
+        self.table = {}
+
+    def plan(self, cls, active):
+        handlers = []
+
+        for i in active:
+            h = self.visitors[i].handler(cls)
+
+            if h != None:
+                handlers.append((i, h))
+
+        entry = self.table[(cls, active)] = (tuple(handlers), getattr(cls, 'CHILD_ATTRIBUTES', ()))
+
+        return entry
+
+    def visit(self, obj, active):
+        cls = obj.__class__
+        entry = self.table.get((cls, active))
+
+        if entry == None:
+            entry = self.plan(cls, active)
+
+        handlers, children = entry
+        path = self.path
+
+        if len(handlers) > 0:
+            pruned = [i for i, h in handlers if h(obj, path) == PRUNE]
+
+            if len(pruned) > 0:
+                active = tuple(i for i in active if i not in pruned)
+
+                if len(active) == 0:
+                    return
+
+        if len(children) == 0:
+            return
+
+        path.append(obj)
+        visit = self.visit
+
+        for name in children:
+            value = getattr(obj, name, None)
+
+            if value == None:
+                continue
+
+            if hasattr(value, '__iter__'):
+                for child in value:
+                    visit(child, active)
+            else:
+                visit(value, active)
+
+        path.pop()
@@ -11,50 +11,57 @@ Replace the value of ``input_file`` with a board which actually exists.
 
 """
 
-from eaglepy import constants, eagle, primitives
+from eaglepy import constants, eagle, geometry, primitives, walker
     
 input_file = 'eagle.brd'
 
-# Parse the board 
-e_brd = eagle.Eagle.load(input_file)
+# Parse the board (only the sections which are used below)
+e_brd = eagle.Eagle.load(input_file, sections = {'elements', 'plain', 'signals'})
 board = e_brd.drawing.document
 
-# Variables to hold the board statistics
+# A package can contain holes, pads, and SMDs. The SMDs of mirrored elements are on the other side of the board.
 num_pads = 0
-num_vias = 0
 num_smds_top = 0
 num_smds_bottom = 0
 num_holes = 0
 
-# A package can contain holes, pads, and SMDs
 for e in board.elements:
-    for i in e.package.items:
-        if isinstance(i, primitives.Hole):
-            num_holes += 1
-        elif isinstance(i, primitives.Pad):
-            num_pads += 1
-        elif isinstance(i, primitives.SMD):
-            if e.rotation.mirrored:
-                if i.layer == constants.LAYERS.TOP:
-                    num_smds_bottom += 1
-                elif i.layer == constants.LAYERS.BOTTOM:
-                    num_smds_top += 1
-            else:
-                if i.layer == constants.LAYERS.TOP:
-                    num_smds_top += 1
-                elif i.layer == constants.LAYERS.BOTTOM:
-                    num_smds_bottom += 1
- 
-# The plain items can contain holes   
-for i in board.plain_items:
-    if isinstance(i, primitives.Hole):
-        num_holes += 1
+    items = e.package.items
+    num_pads += len(items.of_type(primitives.Pad))
+    num_holes += len(items.of_type(primitives.Hole))
+    
+    for smd in items.of_type(primitives.SMD):
+        layer = geometry.mirror_layer(smd.layer) if e.rotation.mirrored else smd.layer
+        
+        if layer == constants.LAYERS.TOP:
+            num_smds_top += 1
+        elif layer == constants.LAYERS.BOTTOM:
+            num_smds_bottom += 1
+
+# The plain items can contain holes, and the signals can contain vias. The packages were counted above, so the
+# libraries (and elements) are skipped.
+class Drill_Counter(walker.Visitor):
+    
+    def __init__(self):
+        self.holes = 0
+        self.vias = 0
+    
+    def visit_Hole(self, hole, path):
+        self.holes += 1
+    
+    def visit_Via(self, via, path):
+        self.vias += 1
+    
+    def visit_Library(self, library, path):
+        return walker.PRUNE
+    
+    def visit_Element(self, element, path):
+        return walker.PRUNE
 
-# The signals can contain vias
-for s in board.signals:
-    for i in s.items:
-        if isinstance(i, primitives.Via):
-            num_vias += 1
+drills = Drill_Counter()
+walker.walk(board, drills)
+num_holes += drills.holes
+num_vias = drills.vias
             
 print('Pads: {0}'.format(num_pads))
 print('Vias: {0}'.format(num_vias))
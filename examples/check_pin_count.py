@@ -10,30 +10,20 @@ have one connection.
 Replace the value of ``file_name`` with a board which actually exists.
 
 """
-from eaglepy import eagle, primitives
+from eaglepy import eagle
     
 file_name = 'schematic.sch'
 
-e = eagle.Eagle.load(file_name)
+# Only the sheets are required
+e = eagle.Eagle.load(file_name, sections = {'sheets'})
 
 schematic = e.drawing.document
 
-# A dictionary--key is the net name, value is the pin count
-nets = {}
+# The netlist combines the nets of every sheet, and maps each net name
+# to the Pin_Refs of the pins which it connects
+netlist = schematic.netlist()
 
-# Iterate over each segment of each net on each sheet.
-# For each Pin_Ref which the segment contains, update the pin count.
-for s in schematic.sheets:
-    for n in s.nets:
-        if not nets.has_key(n.name):
-            nets[n.name] = 0
-            
-        for seg in n.segments:
-            for i in seg.items:
-                if isinstance(i, primitives.Pin_Ref):
-                    nets[n.name] += 1
-
-keys = nets.keys()
+keys = netlist.names
 
 nets_no_pins = []
 nets_one_pin = []
@@ -41,9 +31,9 @@ nets_one_pin = []
 # Iterate over all of the nets, and extract nets with no
 # connections and with one connection.
 for k in keys:
-    if nets[k] == 0:
+    if len(netlist.pins_of(k)) == 0:
         nets_no_pins.append(k)
-    elif nets[k] == 1:
+    elif len(netlist.pins_of(k)) == 1:
         nets_one_pin.append(k)
   
 # Determine if all nets have at least two connections.
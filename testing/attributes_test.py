@@ -0,0 +1,72 @@
+"""
+
+Unit testing for the attribute converters in ``attributes``.
+
+"""
+
+from eaglepy import attributes, primitives
+import copy
+import pickle
+import unittest
+
+class TestRotation(unittest.TestCase):
+
+    def test_parse(self):
+        r = attributes.ATTR_ROT.parse('MSR90')
+
+        self.assertEqual((r.angle, r.mirrored, r.spin), (90.0, True, True))
+        self.assertEqual(attributes.ATTR_ROT.parse('R180'), attributes.Rotation(180))
+        self.assertRaises(Exception, attributes.ATTR_ROT.parse, 'X90')
+        self.assertRaises(Exception, attributes.ATTR_ROT.parse, 'M')
+
+    def test_interned(self):
+        self.assertIs(attributes.ATTR_ROT.parse('MR270'), attributes.ATTR_ROT.parse('MR270'))
+
+    def test_cache_bounded(self):
+        cache = dict(attributes.ATTR_ROT._cache)
+
+        try:
+            for i in range(attributes.ATTR_ROT.CACHE_SIZE + 10):
+                attributes.ATTR_ROT.parse('R{0}.5'.format(i))
+
+            self.assertEqual(len(attributes.ATTR_ROT._cache), attributes.ATTR_ROT.CACHE_SIZE)
+            self.assertEqual(attributes.ATTR_ROT.parse('R12345.5').angle, 12345.5)
+        finally:
+            attributes.ATTR_ROT._cache.clear()
+            attributes.ATTR_ROT._cache.update(cache)
+
+    def test_immutable(self):
+        r = attributes.Rotation(90)
+
+        self.assertRaises(AttributeError, setattr, r, 'angle', 180)
+        self.assertRaises(AttributeError, setattr, r, 'color', 'red')
+        self.assertEqual(r.angle, 90)
+
+    def test_to_str(self):
+        self.assertEqual(attributes.ATTR_ROT.to_str(attributes.Rotation(90, True)), 'MR90')
+        self.assertEqual(attributes.ATTR_ROT.to_str(attributes.Rotation(90.0, False, True)), 'SR90.0')
+
+        r = attributes.ATTR_ROT.parse('MR180')
+        self.assertEqual(attributes.ATTR_ROT.to_str(r), 'MR180.0')
+        self.assertEqual(attributes.ATTR_ROT.to_str(r), 'MR180.0')
+
+    def test_hash_and_equality(self):
+        self.assertEqual(attributes.Rotation(90), attributes.Rotation(90.0))
+        self.assertEqual(hash(attributes.Rotation(90)), hash(attributes.Rotation(90.0)))
+        self.assertNotEqual(attributes.Rotation(90), attributes.Rotation(90, True))
+        self.assertNotEqual(attributes.Rotation(90), None)
+
+    def test_copy_and_pickle(self):
+        r = attributes.Rotation(270, True)
+
+        self.assertIs(copy.deepcopy(r), r)
+        self.assertEqual(pickle.loads(pickle.dumps(r, 2)), r)
+        self.assertEqual(pickle.loads(pickle.dumps(r)), r)
+
+    def test_shared_defaults(self):
+        w = primitives.SMD('1', 0, 0, 1, 1, 1)
+        self.assertEqual(w.rotation, attributes.Rotation())
+        self.assertFalse(w.rotation.is_set())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+
+Unit testing for the parallel loading of files in ``batch``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_library, make_schematic
+from eaglepy import batch
+import os
+import shutil
+import tempfile
+import unittest
+
+def document_class(e):
+    return e.drawing.document.__class__.__name__
+
+class TestBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        os.mkdir(os.path.join(self.directory, 'sub'))
+
+        make_eagle(make_board()).save(os.path.join(self.directory, 'a.brd'))
+        make_eagle(make_schematic()).save(os.path.join(self.directory, 'sub', 'b.sch'))
+        make_eagle(make_library()).save(os.path.join(self.directory, 'c.lbr'))
+
+        for name, data in (('bad.brd', '<eagle><drawing>'), ('notes.txt', '')):
+            f = open(os.path.join(self.directory, name), 'w')
+            f.write(data)
+            f.close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_find_files(self):
+        paths = [os.path.relpath(p, self.directory) for p in batch.find_files(self.directory)]
+        self.assertEqual(paths, ['a.brd', 'bad.brd', 'c.lbr', os.path.join('sub', 'b.sch')])
+
+    def test_map_files(self):
+        paths = batch.find_files(self.directory)
+
+        for workers in (1, 2):
+            results = dict((os.path.basename(r.path), r) for r in batch.map_files(paths, document_class, workers))
+
+            self.assertEqual(len(results), 4)
+            self.assertEqual(results['a.brd'].value, 'Board')
+            self.assertEqual(results['b.sch'].value, 'Schematic')
+            self.assertEqual(results['c.lbr'].value, 'Library')
+
+            # A failure is reported without stopping the batch
+            self.assertFalse(results['bad.brd'].succeeded())
+            self.assertTrue(results['a.brd'].succeeded())
+            self.assertTrue(results['bad.brd'].traceback != None)
+
+    def test_load_options(self):
+        path = os.path.join(self.directory, 'a.brd')
+        results = list(batch.map_files([path], document_class, 2, sections = {'elements'}))
+
+        self.assertTrue(results[0].succeeded())
+
+        results = list(batch.map_files([path], document_class, 1, no_such_option = True))
+        self.assertTrue(results[0].error.startswith('TypeError'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+"""
+
+Unit testing for the binary format in ``binary``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_library, make_schematic
+from eaglepy import attributes, binary, eagle, key_list, primitives
+import collections
+import os
+import shutil
+import tempfile
+import unittest
+
+class Slotted(object):
+    __slots__ = ('a', 'b', '__c')
+
+    def __init__(self, a):
+        self.a = a
+        self.__c = a
+
+    def c(self):
+        return self.__c
+
+class Plain:
+    pass
+
+class Command(object):
+    # Reconstructed by running a shell command which creates a file
+    def __init__(self, file_name):
+        self.file_name = file_name
+
+    def __reduce__(self):
+        return (os.system, ('touch ' + self.file_name,))
+
+class TestBinary(unittest.TestCase):
+
+    def test_documents(self):
+        for document in (make_board(), make_schematic(), make_library()):
+            e = make_eagle(document)
+            copied = binary.loads(binary.dumps(e))
+
+            self.assertEqual(copied.dumps(), e.dumps())
+
+    def test_shared_references(self):
+        board = binary.loads(binary.dumps(make_eagle(make_board()))).drawing.document
+        lib = board.libraries['lib']
+
+        for e in board.elements:
+            self.assertIs(e.library, lib)
+            self.assertIs(e.package, lib.packages['R0603'])
+
+        schematic = binary.loads(binary.dumps(make_schematic()))
+        device_set = schematic.libraries['lib'].device_sets['R']
+
+        for p in schematic.parts:
+            self.assertIs(p.device_set, device_set)
+            self.assertIs(p.device, device_set.devices['0603'])
+
+        for i in schematic.sheets[0].instances:
+            self.assertIs(i.part, schematic.parts[i.part.name])
+            self.assertIs(i.gate, device_set.gates['G$1'])
+
+    def test_values(self):
+        shared = [1, 2]
+        plain = Plain()
+        plain.self = plain
+        slotted = Slotted(u'\xb5')
+        values = [None, True, 0, -2 ** 40, 2 ** 70, 3L, 1.5, 'abc', u'abc', u'\xb5F', (1, ('x', None)),
+                  shared, shared, {'k': 1.0, 2: 'v'}, collections.OrderedDict([('z', 1), ('a', 2)]),
+                  attributes.Rotation(90, True), plain, slotted, key_list.Key_List([eagle.Param('p', 'v')])]
+
+        # (The classes of this module are not part of the object model)
+        self.assertRaises(Exception, binary.loads, binary.dumps(values))
+        copied = binary.loads(binary.dumps(values), classes = (Plain, Slotted))
+
+        self.assertEqual(copied[:11], values[:11])
+        self.assertEqual([type(v) for v in copied[:11]], [type(v) for v in values[:11]])
+        self.assertIs(copied[11], copied[12])
+        self.assertEqual(copied[13], values[13])
+        self.assertEqual(copied[14].keys(), ['z', 'a'])
+        self.assertEqual(copied[15], attributes.Rotation(90, True))
+        self.assertIs(copied[16].self, copied[16])
+        self.assertEqual(copied[17].c(), u'\xb5')
+        self.assertFalse(hasattr(copied[17], 'b'))
+        self.assertEqual(copied[18]['p'].value, 'v')
+
+    def test_unsupported(self):
+        self.assertRaises(Exception, binary.dumps, [lambda: None])
+        self.assertRaises(Exception, binary.dumps, 1)
+        self.assertRaises(Exception, binary.loads, 'not binary data')
+
+        data = binary.dumps([1])
+        self.assertRaises(Exception, binary.loads, data[:8] + '\xff\xff' + data[10:])
+
+    def test_untrusted(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            file_name = os.path.join(directory, 'marker')
+            crafted = binary.dumps([Command(file_name)])
+
+            # Reading the data would run ``os.system``, which is not allowed
+            self.assertRaises(Exception, binary.loads, crafted)
+            self.assertFalse(os.path.exists(file_name))
+
+            e_file = os.path.join(directory, 'test.brdb')
+            f = open(e_file, 'wb')
+            f.write(crafted)
+            f.close()
+            self.assertRaises(Exception, eagle.Eagle.load_binary, e_file)
+            self.assertFalse(os.path.exists(file_name))
+
+            self.assertIs(binary.allowed_classes()[('eaglepy.eagle', 'Board')], eagle.Board)
+            self.assertFalse(('posix', 'system') in binary.allowed_classes())
+        finally:
+            shutil.rmtree(directory)
+
+    def test_files(self):
+        directory = tempfile.mkdtemp()
+
+        try:
+            e = make_eagle(make_board())
+            file_name = os.path.join(directory, 'test.brdb')
+            e.save_binary(file_name)
+
+            self.assertEqual(eagle.Eagle.load_binary(file_name).dumps(), e.dumps())
+
+            f = open(file_name, 'rb')
+            self.assertEqual(eagle.Eagle.load_binary(f).dumps(), e.dumps())
+            f.close()
+
+            binary.dump(primitives.Hole(0, 0, 1), open(file_name, 'wb'))
+            self.assertRaises(Exception, eagle.Eagle.load_binary, file_name)
+        finally:
+            shutil.rmtree(directory)
+
+if __name__ == '__main__':
+    unittest.main()
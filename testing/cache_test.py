@@ -0,0 +1,100 @@
+"""
+
+Unit testing for the on-disk cache of parsed files in ``cache``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_library
+from eaglepy import cache, eagle
+import os
+import shutil
+import tempfile
+import unittest
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = cache.Cache(os.path.join(self.directory, 'cache'))
+        self.file_name = os.path.join(self.directory, 'test.brd')
+        make_eagle(make_board()).save(self.file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def snapshots(self):
+        return sorted(f for f in os.listdir(self.cache.directory))
+
+    def test_load(self):
+        expected = eagle.Eagle.load(self.file_name).dumps()
+
+        e = eagle.Eagle.load(self.file_name, cache = self.cache)
+        self.assertEqual(e.dumps(), expected)
+        self.assertEqual(len(self.snapshots()), 1)
+
+        # The snapshot is used (rather than the file) if the file is unchanged
+        key = self.snapshots()[0][:-len(cache.Cache.EXTENSION)]
+        self.assertEqual(self.cache.get(key).dumps(), expected)
+
+        e = eagle.Eagle.load(self.file_name, cache = self.cache)
+        self.assertEqual(e.dumps(), expected)
+
+        board = e.drawing.document
+        self.assertIs(board.elements['R0'].package, board.libraries['lib'].packages['R0603'])
+
+        # A changed file has a new key
+        make_eagle(make_board(5)).save(self.file_name)
+        self.assertEqual(len(eagle.Eagle.load(self.file_name, cache = self.cache).drawing.document.elements), 5)
+        self.assertEqual(len(self.snapshots()), 2)
+
+        self.assertRaises(Exception, eagle.Eagle.load, self.file_name, sections = {'signals'}, cache = self.cache)
+
+    def test_key(self):
+        data = open(self.file_name, 'rb').read()
+
+        self.assertEqual(self.cache.key(data), self.cache.key(data))
+        self.assertNotEqual(self.cache.key(data), self.cache.key(data + ' '))
+        self.assertNotEqual(self.cache.key(data), self.cache.key(data, columnar = True))
+
+    def test_corrupt_snapshot(self):
+        eagle.Eagle.load(self.file_name, cache = self.cache)
+        path = os.path.join(self.cache.directory, self.snapshots()[0])
+
+        f = open(path, 'wb')
+        f.write('corrupt')
+        f.close()
+
+        self.assertEqual(len(eagle.Eagle.load(self.file_name, cache = self.cache).drawing.document.elements), 4)
+        self.assertTrue(os.path.getsize(path) > len('corrupt'))
+
+    def test_eviction(self):
+        library_file_name = os.path.join(self.directory, 'test.lbr')
+        make_eagle(make_library()).save(library_file_name)
+
+        eagle.Eagle.load(library_file_name, cache = self.cache)
+        library_snapshot = self.snapshots()[0]
+        os.utime(os.path.join(self.cache.directory, library_snapshot), (0, 1e9))
+
+        eagle.Eagle.load(self.file_name, cache = self.cache)
+        make_eagle(make_board(6)).save(self.file_name)
+        eagle.Eagle.load(self.file_name, cache = self.cache)
+
+        # Loading the library again marks its snapshot as the most recently used
+        eagle.Eagle.load(library_file_name, cache = self.cache)
+        sizes = dict((f, os.path.getsize(os.path.join(self.cache.directory, f))) for f in self.snapshots())
+        oldest = min(self.snapshots(), key = lambda f: os.path.getmtime(os.path.join(self.cache.directory, f)))
+        os.utime(os.path.join(self.cache.directory, oldest), (0, 1e9))
+
+        self.assertEqual(len(sizes), 3)
+        self.assertNotEqual(oldest, library_snapshot)
+
+        # Only the least-recently-used snapshot is deleted
+        self.cache.max_size = sum(sizes.values()) - sizes[oldest]
+        self.cache.evict()
+        self.assertEqual(self.snapshots(), sorted(f for f in sizes if f != oldest))
+
+        self.cache.clear()
+        self.assertEqual(self.snapshots(), [])
+
+if __name__ == '__main__':
+    unittest.main()
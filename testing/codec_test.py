@@ -0,0 +1,126 @@
+"""
+
+Unit testing for the compiled parsers and serializers in ``codec``.
+
+"""
+
+from eaglepy import attributes, codec, constants, eagle, primitives
+from lxml import etree
+import unittest
+
+def make_node(tag, attrib):
+    n = etree.Element(tag)
+
+    for k, v in attrib:
+        n.set(k, v)
+
+    return n
+
+class TestCodec(unittest.TestCase):
+
+    def test_parse_defaults(self):
+        n = make_node('wire', [('x1', '0'), ('y1', '1.5'), ('x2', '2'), ('y2', '3'), ('width', '0.254'), ('layer', '16')])
+        w = primitives.Wire.parse(n)
+
+        self.assertEqual((w.x1, w.y1, w.x2, w.y2, w.width, w.layer), (0.0, 1.5, 2.0, 3.0, 0.254, 16))
+        self.assertEqual(w.curve, primitives.Wire.DEFAULT_CURVE)
+        self.assertEqual(w.extent, None)
+        self.assertEqual(w.cap, primitives.Wire.DEFAULT_CAP)
+
+    def test_parse_converters(self):
+        n = make_node('via', [('x', '1'), ('y', '2'), ('drill', '0.3'), ('diameter', 'auto'), ('extent', '1-16'),
+                              ('rot', 'MR90'), ('alwaysstop', 'yes')])
+        v = primitives.Via.parse(n)
+
+        self.assertEqual(v.diameter, None)
+        self.assertEqual((v.extent.layer_from, v.extent.layer_to), (1, 16))
+        self.assertEqual(v.rotation, attributes.Rotation(90, True))
+        self.assertEqual(v.always_stop, True)
+
+    def test_parse_matches_generic(self):
+        n = make_node('smd', [('name', '1'), ('x', '1'), ('y', '2'), ('dx', '0.5'), ('dy', '0.6'), ('layer', '1'),
+                              ('roundness', '50'), ('cream', 'no')])
+        c = primitives.SMD.CODEC
+
+        self.assertEqual(c.parse(n), c.parse_generic(n))
+
+    def test_parse_errors(self):
+        # A missing required attribute raises a ``KeyError``, as ``attributes.parse`` does
+        n = make_node('hole', [('x', '1'), ('y', '2')])
+        self.assertRaises(KeyError, primitives.Hole.parse, n)
+
+        # An invalid value raises the exception raised by the ``ATTR_`` class
+        n = make_node('hole', [('x', '1'), ('y', 'abc'), ('drill', '1')])
+
+        try:
+            primitives.Hole.parse(n)
+            self.fail()
+        except KeyError:
+            self.fail()
+        except Exception as e:
+            self.assertEqual(str(e), 'Invalid floating-point value abc.')
+
+        n = make_node('smd', [('name', '1'), ('x', '1'), ('y', '2'), ('dx', '0.5'), ('dy', '0.6'), ('layer', '1'), ('cream', 'maybe')])
+        self.assertRaises(Exception, primitives.SMD.parse, n)
+
+    def test_factory_defaults(self):
+        c = codec.Codec('param', eagle.Param.ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name', factory = list)])
+        n = make_node('param', [])
+
+        self.assertEqual(c.parse(n), ([],))
+        self.assertFalse(c.parse(n)[0] is c.parse(n)[0])
+
+    def test_append(self):
+        parent = etree.Element('signal')
+        primitives.Wire(0, 1.5, 2, 3, 0.254, 16, curve = 90.0).append_node(parent)
+        primitives.Wire(0, 0, 1, 1, 0.1, 1).append_node(parent)
+
+        self.assertEqual(parent[0].items(), [('x1', '0'), ('y1', '1.5'), ('x2', '2'), ('y2', '3'),
+                                             ('width', '0.254'), ('layer', '16'), ('curve', '90.0')])
+
+        # Default values are not written
+        self.assertEqual(len(parent[1].attrib), 6)
+
+    def test_append_write_order(self):
+        parent = etree.Element('symbol')
+        primitives.Pin('1', 2.54, 0, rotation = attributes.Rotation(180)).append_node(parent)
+
+        self.assertEqual(parent[0].keys(), ['x', 'y', 'name', 'rot'])
+        self.assertEqual(parent[0].get('rot'), 'R180')
+
+    def test_unmapped_attributes(self):
+        # ``layer`` is not contained in the ``ATTR_MAP`` of ``Dimension``, so it is read and written as a string
+        parent = etree.Element('plain')
+        primitives.Dimension(0, 0, 1, 1, 2, 2, 47, dimension_type = constants.DIMENSION_TYPE.HORIZONTAL).append_node(parent)
+        d = primitives.Dimension.parse(parent[0])
+
+        self.assertEqual(d.layer, '47')
+        self.assertEqual(d.dimension_type, constants.DIMENSION_TYPE.HORIZONTAL)
+        self.assertEqual(d.text_ratio, primitives.Dimension.DEFAULT_TEXT_RATIO)
+
+    def test_ref_fields(self):
+        lib = eagle.Library('lib')
+        package = eagle.Package('P')
+        lib.packages.append(package)
+        board = eagle.Board()
+        board.libraries.append(lib)
+
+        parent = etree.Element('elements')
+        eagle.Element('U1', lib, package, 'V', 1, 2).append_node(parent)
+
+        self.assertEqual(parent[0].get('library'), 'lib')
+        self.assertEqual(parent[0].get('package'), 'P')
+
+        e = eagle.Element.parse(parent[0], board)
+        self.assertIs(e.package, package)
+
+    def test_custom_codec(self):
+        c = codec.Codec('param', eagle.Param.ATTR_MAP, [codec.Field(constants.ATTRIBUTES.NAME, 'name'),
+                                                        codec.Field(constants.ATTRIBUTES.VALUE, 'value', 'x', 'x')])
+
+        self.assertEqual(c.parse(make_node('param', [('name', 'a')])), ('a', 'x'))
+        n = c.append(eagle.Param('a', 'x'), etree.Element('pass'))
+        self.assertEqual(n.items(), [('name', 'a')])
+
+if __name__ == '__main__':
+    unittest.main()
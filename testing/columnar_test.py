@@ -0,0 +1,137 @@
+"""
+
+Unit testing for the columnar storage of wires and vias in ``columnar``.
+
+"""
+
+from eagle_test import make_board, make_eagle
+from eaglepy import columnar, eagle, primitives
+from lxml import etree
+import math
+import os
+import shutil
+import tempfile
+import unittest
+
+@unittest.skipIf(columnar.numpy == None, 'NumPy is not available')
+class TestColumnar(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.directory, 'test.brd')
+
+        board = make_board()
+        signal = board.signals['N$0']
+        signal.items.append(primitives.Wire(0.8, 0, 4.2, 0, 0.254, 16, curve = 90.0, style = 'dashdot'))
+        signal.items.append(primitives.Via(1, 2, 0.35, 0.6, extent = None, shape = 'octagon'))
+        make_eagle(board).save(self.file_name)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def save_to_string(self, e):
+        file_name = os.path.join(self.directory, 'out')
+        e.save(file_name)
+
+        f = open(file_name)
+        data = f.read()
+        f.close()
+
+        return data
+
+    def test_round_trip(self):
+        expected = self.save_to_string(eagle.Eagle.load(self.file_name))
+
+        for streaming in (False, True):
+            e = eagle.Eagle.load(self.file_name, streaming = streaming, columnar = True)
+            self.assertIsInstance(e.drawing.document.signals['N$0'].items, columnar.Item_Columns)
+            self.assertEqual(self.save_to_string(e), expected)
+
+    def test_views(self):
+        items = eagle.Eagle.load(self.file_name, columnar = True).drawing.document.signals['N$0'].items
+
+        self.assertEqual(len(items), 6)
+        self.assertEqual([i.__class__ for i in items], [primitives.Contact_Ref, primitives.Contact_Ref, columnar.Wire_View,
+                                                         columnar.Via_View, columnar.Wire_View, columnar.Via_View])
+
+        wire = items[4]
+        self.assertIsInstance(wire, primitives.Wire)
+        self.assertEqual((wire.x1, wire.layer, wire.curve, wire.style), (0.8, 16, 90.0, 'dashdot'))
+        self.assertIs(type(wire.layer), int)
+        self.assertEqual((items[3].diameter, items[-1].diameter), (None, 0.6))
+
+        # Assignments are stored in the columns
+        wire.x1 = 1
+        self.assertEqual(items.wires.column('x1').tolist(), [0.8, 1.0])
+
+        # Appended items are serialized in order
+        items.append(primitives.Wire(0, 0, 1, 0, 0.1, 1))
+        items.append(primitives.Hole(0, 0, 1))
+        parent = etree.Element('signal')
+        items.append_nodes(parent)
+
+        self.assertEqual([n.tag for n in parent], ['contactref', 'contactref', 'wire', 'via', 'wire', 'via', 'wire', 'hole'])
+        self.assertEqual(parent[4].get('x1'), '1.0')
+        self.assertEqual(parent[5].get('diameter'), '0.6')
+        self.assertEqual(parent[3].get('diameter'), None)
+
+    def test_editing(self):
+        e = eagle.Eagle.load(self.file_name, columnar = True)
+        items = e.drawing.document.signals['N$0'].items
+
+        # Removing a wire removes its row, and the rows of the following wires move
+        removed = items.pop(2)
+        self.assertIs(type(removed), primitives.Wire)
+        self.assertEqual(removed.x2, 4.2)
+        self.assertEqual(len(items.wires), 1)
+        self.assertEqual(items[3].curve, 90.0)
+
+        items.remove(items[2])
+        self.assertEqual(len(items.vias), 1)
+        self.assertEqual(items.index(items[3]), 3)
+        self.assertRaises(ValueError, items.index, primitives.Hole(0, 0, 1))
+
+        # Inserting, assigning and deleting items and slices
+        items.insert(0, primitives.Wire(0, 0, 1, 0, 0.1, 1))
+        items[-1] = primitives.Hole(0, 0, 1)
+        items.insert(-1, primitives.Via(3, 3, 0.35))
+        del items[1]
+        self.assertEqual([i.__class__.__name__ for i in items], ['Wire_View', 'Contact_Ref', 'Wire_View', 'Via_View', 'Hole'])
+
+        items[1:3] = [items[2], primitives.Via(4, 4, 0.35)]
+        del items[-1:]
+        self.assertEqual([(i.__class__.__name__, i.x1 if isinstance(i, primitives.Wire) else i.x) for i in items],
+                         [('Wire_View', 0), ('Wire_View', 0.8), ('Via_View', 4), ('Via_View', 3)])
+        self.assertAlmostEqual(items.total_length(), 1 + 3.4 * (math.pi / 4) / math.sin(math.pi / 4))
+
+        # The edited items are saved
+        e.save(self.file_name)
+        saved = eagle.Eagle.load(self.file_name).drawing.document.signals['N$0'].items
+        self.assertEqual([(i.__class__.__name__, i.x1 if isinstance(i, primitives.Wire) else i.x) for i in saved],
+                         [('Wire', 0), ('Wire', 0.8), ('Via', 4), ('Via', 3)])
+
+    def test_analysis(self):
+        board = eagle.Eagle.load(self.file_name, columnar = True).drawing.document
+        arc_length = 3.4 * (math.pi / 4) / math.sin(math.pi / 4)
+
+        self.assertAlmostEqual(columnar.total_length(board.signals), 3.4 * 3 + arc_length)
+
+        stats = columnar.layer_stats(board.signals)
+        self.assertEqual(sorted(stats.keys()), [1, 16])
+        self.assertEqual(stats[1]['wires'], 3)
+        self.assertAlmostEqual(stats[16]['length'], arc_length)
+        self.assertAlmostEqual(stats[16]['area'], arc_length * 0.254)
+
+        # The via with diameter ``auto`` extends to its drill
+        x_min, y_min, x_max, y_max = columnar.bounds(board.signals)
+        self.assertAlmostEqual(x_min, 0.8 - 0.127)
+        self.assertAlmostEqual(y_max, 2.3)
+        self.assertAlmostEqual(x_max, 14.2 + 0.127)
+
+        # Signals which were not parsed using columnar storage can also be analyzed
+        board = eagle.Eagle.load(self.file_name).drawing.document
+        self.assertAlmostEqual(columnar.total_length(board.signals), 3.4 * 3 + arc_length)
+        self.assertEqual(columnar.bounds([]), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""
+
+Unit testing for the connectivity of the copper of signals in ``connectivity``.
+
+"""
+
+from eagle_test import make_board
+from eaglepy import attributes, connectivity, eagle, geometry, primitives, references, tracking
+import math
+import unittest
+
+class TestConnectivity(unittest.TestCase):
+
+    def setUp(self):
+        # R0 is at (0, 0), so its SMDs are at (-0.8, 0) and (0.8, 0) on the top layer. R1 is mirrored and rotated by
+        # 90 degrees at (5, 0), so its SMDs are at (5, 0.8) and (5, -0.8) on the bottom layer.
+        self.board = make_board(2)
+        self.signal = self.board.signals['N$0']
+
+    def analyze(self):
+        return connectivity.Connectivity(self.board)['N$0']
+
+    def summary(self, result):
+        return [([i.__class__.__name__ for i in island.items], [(e.name, p.name) for e, p in island.pads]) for island in result.islands]
+
+    def test_open(self):
+        # The wire connects the SMD of R0 (and the via), but ends short of the SMD of R1 (which is on the bottom)
+        result = self.analyze()
+
+        self.assertEqual(self.summary(result), [(['Wire', 'Via'], [('R0', '2')]), ([], [('R1', '1')])])
+        self.assertFalse(result.is_routed())
+        self.assertEqual(result.stubs, [self.signal.items[2]])
+        self.assertEqual(len(result.connected_islands()), 2)
+        self.assertEqual(result.floating_islands(), [])
+        self.assertIs(result.island_of(self.signal.items[3]), result.islands[0])
+
+    def test_routed(self):
+        # A wire to the via, and a wire on the bottom layer from the via to the SMD of R1
+        self.signal.items[2].x2 = 2.5
+        self.signal.items.append(primitives.Wire(2.5, 0, 5, 0.8, 0.254, 16))
+
+        result = self.analyze()
+        self.assertTrue(result.is_routed())
+        self.assertEqual(self.summary(result), [(['Wire', 'Via', 'Wire'], [('R0', '2'), ('R1', '1')])])
+        self.assertEqual(result.stubs, [])
+
+        # A via which only connects the inner layers
+        self.signal.items[3].extent = attributes.Extent(2, 15)
+        self.assertFalse(self.analyze().is_routed())
+
+    def test_polygons_and_arcs(self):
+        del self.signal.items[2:]
+
+        # A polygon on the top layer connects the SMD of R0, and the end of an arc on the bottom layer connects
+        # the SMD of R1, through a via in the polygon
+        self.signal.items.append(primitives.Polygon(1, [(0, -1, '0'), (3, -1, '0'), (3, 1, '0'), (0, 1, '0')], 0.2))
+        self.signal.items.append(primitives.Via(2.5, 0.5, 0.3))
+        self.signal.items.append(primitives.Wire(2.5, 0.5, 5, 0.8, 0.2, 16, curve = -90.0))
+
+        result = self.analyze()
+        self.assertTrue(result.is_routed())
+        self.assertEqual(self.summary(result), [(['Polygon', 'Via', 'Wire'], [('R0', '2'), ('R1', '1')])])
+
+        # A wire which ends on an arc (but not at one of its ends)
+        cx, cy, r = geometry.arc_center(2.5, 0.5, 5, 0.8, -90.0)
+        angle = math.atan2(0.5 - cy, 2.5 - cx) - math.pi / 4
+        x, y = cx + r * math.cos(angle), cy + r * math.sin(angle)
+        self.signal.items.append(primitives.Wire(x, y, x + 1, y - 3, 0.2, 16))
+
+        result = self.analyze()
+        self.assertEqual(len(result.islands), 1)
+        self.assertEqual(result.stubs, [self.signal.items[5]])
+
+    def test_unresolved(self):
+        self.signal.items.append(primitives.Contact_Ref('R9', '1'))
+        self.signal.items.append(primitives.Contact_Ref('R1', '9'))
+        self.signal.items.append(primitives.Wire(20, 20, 21, 20, 0.2, 1))
+
+        result = self.analyze()
+        self.assertEqual(result.unresolved, self.signal.items[4:6])
+        self.assertEqual(len(result.floating_islands()), 1)
+
+    def test_reuse(self):
+        c = self.board.connectivity()
+        self.assertIs(self.board.connectivity(), c)
+        self.assertEqual(len(c.open_signals()), 1)
+        self.assertEqual(c.stubs(), [(self.signal, self.signal.items[2])])
+
+        self.board.signals.append(eagle.Signal('N$9'))
+        self.assertIsNot(self.board.connectivity(), c)
+        self.assertEqual(len(self.board.connectivity()), 2)
+
+    def test_reuse_after_routing(self):
+        self.check_routing(lambda: references.changed(self.board))
+
+    def test_tracked(self):
+        with tracking.Tracker(self.board):
+            self.check_routing(lambda: None)
+
+    def check_routing(self, changed):
+        self.assertFalse(self.board.connectivity()['N$0'].is_routed())
+
+        # Routing the signal (changing an item, then adding one)
+        self.signal.items[2].x2 = 2.5
+        changed()
+        self.assertEqual(self.board.connectivity().stubs(), [])
+
+        self.signal.items.append(primitives.Wire(2.5, 0, 5, 0.8, 0.254, 16))
+        changed()
+        self.assertTrue(self.board.connectivity()['N$0'].is_routed())
+        self.assertEqual(self.board.connectivity().open_signals(), [])
+
+        # Moving an element away from the wire
+        self.board.elements['R1'].y = 3
+        changed()
+        self.assertFalse(self.board.connectivity()['N$0'].is_routed())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+
+Unit testing for the design rule check in ``drc``.
+
+"""
+
+from eagle_test import make_board
+from eaglepy import drc, eagle, geometry, primitives
+import unittest
+
+class TestDRC(unittest.TestCase):
+
+    def setUp(self):
+        # R0 is at (0, 0), so its SMDs are at (-0.8, 0) and (0.8, 0) on the top layer. R1 is mirrored and rotated by
+        # 90 degrees at (5, 0), so its SMDs are on the bottom layer. The vias have a drill of 0.35mm.
+        self.board = make_board(2)
+        self.board.design_rules.params.append(eagle.Param('msDrill', '0.3mm'))
+        self.signal = self.board.signals['N$0']
+
+    def check(self, **kwargs):
+        return self.board.check_design_rules(workers = 1, **kwargs)
+
+    def summary(self, violations):
+        return [(v.kind, v.layer, [i.__class__.__name__ for i in v.items]) for v in violations]
+
+    def test_clean(self):
+        self.assertEqual(self.check(), [])
+
+    def test_parse_value(self):
+        self.assertAlmostEqual(drc.parse_value('8mil'), 0.2032)
+        self.assertAlmostEqual(drc.parse_value('0.35mm'), 0.35)
+        self.assertAlmostEqual(drc.parse_value('0.25'), 0.25)
+        self.assertAlmostEqual(drc.parse_value('1.5mm 0mm 0mm 1.5mm'), 1.5)
+        self.assertRaises(Exception, drc.parse_value, '8furlongs')
+        self.assertRaises(Exception, drc.parse_value, '')
+
+    def test_rules(self):
+        rules = drc.Rules(self.board.design_rules, self.board.classes)
+        self.assertAlmostEqual(rules.clearance(drc.WIRE, drc.WIRE), 0.2032)
+        self.assertAlmostEqual(rules.clearance(drc.SMD, drc.WIRE), 0.2032)
+        self.assertAlmostEqual(rules.min_drill(), 0.3)
+
+        # The clearance between net classes applies if it is larger
+        self.board.classes[0].clearances[0].value = 0.5
+        rules = drc.Rules(self.board.design_rules, self.board.classes)
+        self.assertAlmostEqual(rules.clearance(drc.VIA, drc.PAD), 0.5)
+        self.assertAlmostEqual(rules.max_clearance, 0.5)
+
+        # The restring of a via is limited to the minimum and maximum
+        self.assertAlmostEqual(rules.restring(0.35, True), 0.2032)
+        self.assertAlmostEqual(rules.restring(1.0, True), 0.25)
+        self.assertAlmostEqual(rules.restring(4.0, True), 0.508)
+
+    def test_clearance(self):
+        # A plain wire on the top layer which passes 0.1mm above the signal's wire (whose half width is 0.127)
+        self.board.plain_items.append(primitives.Wire(1.6, 0.277, 1.75, 0.277, 0.1, 1))
+
+        violations = self.check()
+        self.assertEqual(self.summary(violations), [(drc.CLEARANCE, 1, ['Wire', 'Wire'])])
+
+        v = violations[0]
+        self.assertAlmostEqual(v.value, 0.1)
+        self.assertAlmostEqual(v.required, 0.2032)
+        self.assertEqual(set(v.owners), set([self.signal, None]))
+        self.assertAlmostEqual(v.location[0], 1.675)
+
+        # Moving it out of the clearance
+        self.board.plain_items[-1].y1 = self.board.plain_items[-1].y2 = 0.4
+        self.assertEqual(self.check(), [])
+
+        # The clearance of the net classes is larger
+        self.board.classes[0].clearances[0].value = 0.24
+        self.assertEqual(self.summary(self.check()), [(drc.CLEARANCE, 1, ['Wire', 'Wire'])])
+
+    def test_pads(self):
+        # A wire of another signal which ends inside an SMD of R0
+        signal = eagle.Signal('N$1')
+        signal.items.append(primitives.Wire(-0.8, 0.2, -0.8, 2, 0.2, 1))
+        self.board.signals.append(signal)
+
+        violations = self.check()
+        self.assertEqual(self.summary(violations), [(drc.CLEARANCE, 1, ['SMD', 'Wire'])])
+        self.assertEqual(violations[0].value, 0)
+        self.assertIs(violations[0].owners[0], self.board.elements['R0'])
+
+        # On the bottom layer, the wire doesn't overlap R0 (whose SMDs are on the top)
+        signal.items[0].layer = 16
+        self.assertEqual(self.check(), [])
+
+        # Vias are on every used layer, so a via of another signal conflicts with the wire on the bottom layer
+        signal.items.append(primitives.Via(2.5, 0, 0.35))
+        self.assertEqual(self.summary(self.check()), [(drc.CLEARANCE, 1, ['Wire', 'Via']),
+                                                      (drc.CLEARANCE, 1, ['Via', 'Via']),
+                                                      (drc.CLEARANCE, 16, ['Via', 'Via'])])
+
+    def test_arcs(self):
+        # A semicircle around (2.5, 1.6) with a radius of 1, whose middle passes 0.6mm above the center of the via
+        self.board.plain_items.append(primitives.Wire(1.5, 1.6, 3.5, 1.6, 0.1, 1, curve = 180.0))
+        radius = geometry.auto_diameter(0.35) / 2
+
+        violations = self.check()
+        self.assertEqual(self.summary(violations), [(drc.CLEARANCE, 1, ['Via', 'Wire'])])
+        self.assertAlmostEqual(violations[0].value, 0.6 - 0.05 - radius)
+
+        # The other semicircle is further away
+        self.board.plain_items[-1].curve = -180.0
+        self.assertEqual(self.check(), [])
+
+    def test_items(self):
+        # Widths, drills and restrings
+        self.signal.items[2].width = 0.1
+        self.signal.items[3].drill = 0.2
+        self.signal.items[3].diameter = 0.4
+        self.board.plain_items[1].drill = 0.1
+
+        violations = self.check()
+        self.assertEqual(self.summary(violations), [(drc.DRILL, None, ['Hole']),
+                                                    (drc.WIDTH, None, ['Wire']),
+                                                    (drc.DRILL, None, ['Via']),
+                                                    (drc.ANNULAR_RING, None, ['Via'])])
+        self.assertAlmostEqual(violations[1].required, 0.1524)
+        self.assertEqual(violations[1].location, (0.8, 0))
+        self.assertAlmostEqual(violations[3].value, 0.1)
+        self.assertAlmostEqual(violations[3].required, 0.2032)
+
+        # The minimum width and drill of the net class
+        self.signal.items[2].width = 0.254
+        self.signal.items[3].drill = 0.35
+        self.signal.items[3].diameter = None
+        self.board.plain_items[1].drill = 3.2
+        self.board.classes[0].width = 0.3
+        self.board.classes[0].drill = 0.4
+        self.assertEqual(self.summary(self.check()), [(drc.WIDTH, None, ['Wire']), (drc.DRILL, None, ['Via'])])
+
+    def test_parallel(self):
+        board = make_board(4)
+        serial = board.check_design_rules(workers = 1)
+        parallel = board.check_design_rules(workers = 2)
+
+        self.assertEqual(self.summary(serial), [(drc.DRILL, None, ['Via'])] * 3 + [(drc.CLEARANCE, 1, ['SMD', 'Wire'])] * 2)
+        self.assertEqual([(v.kind, v.layer, v.value, v.location) for v in serial],
+                         [(v.kind, v.layer, v.value, v.location) for v in parallel])
+
+if __name__ == '__main__':
+    unittest.main()
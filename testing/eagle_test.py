@@ -0,0 +1,224 @@
+"""
+
+Unit testing for the loading and saving of ``Eagle`` objects.
+
+"""
+
+from eaglepy import attributes, default_layers, eagle, primitives
+import copy
+import os
+import pickle
+import shutil
+import StringIO
+import tempfile
+import unittest
+
+def make_library():
+    lib = eagle.Library('lib')
+
+    package = eagle.Package('R0603')
+    package.items.append(primitives.SMD('1', -0.8, 0, 0.9, 1.0, 1))
+    package.items.append(primitives.SMD('2', 0.8, 0, 0.9, 1.0, 1, attributes.Rotation(90)))
+    package.items.append(primitives.Wire(-1.5, -0.8, 1.5, -0.8, 0.127, 21))
+    package.items.append(primitives.Text('>NAME', -1, 1, 25, 1.27))
+    lib.packages.append(package)
+
+    symbol = eagle.Symbol('R')
+    symbol.items.append(primitives.Pin('1', -5.08, 0))
+    symbol.items.append(primitives.Pin('2', 5.08, 0, rotation = attributes.Rotation(180)))
+    lib.symbols.append(symbol)
+
+    device_set = eagle.Device_Set('R', 'R', True)
+    device_set.gates.append(eagle.Gate('G$1', symbol, 0, 0))
+    device_set.devices.append(eagle.Device('0603', package, [eagle.Connect('G$1', '1', '1'), eagle.Connect('G$1', '2', '2')]))
+    lib.device_sets.append(device_set)
+
+    return lib
+
+def make_board(num_elements = 4):
+    lib = make_library()
+    board = eagle.Board()
+    board.libraries.append(lib)
+    board.plain_items.append(primitives.Wire(0, 0, 50, 0, 0, 20))
+    board.plain_items.append(primitives.Hole(3, 3, 3.2))
+    board.classes.append(eagle.Net_Class(0, 'default', 0, 0, [eagle.Clearance(0, 0.2)]))
+    board.design_rules = eagle.Design_Rules('default', [eagle.Param('mdWireWire', '8mil')])
+    board.autorouter = eagle.Autorouter([eagle.Pass('Default', None, True, [eagle.Param('RoutingGrid', '50mil')])])
+
+    for i in range(num_elements):
+        board.elements.append(eagle.Element('R{0}'.format(i), lib, lib.packages['R0603'], '10k', i * 5.0, 0,
+                                            rotation = attributes.Rotation(90 * (i % 4), i % 2 == 1)))
+
+    for i in range(num_elements - 1):
+        signal = eagle.Signal('N${0}'.format(i))
+        signal.items.append(primitives.Contact_Ref('R{0}'.format(i), '2'))
+        signal.items.append(primitives.Contact_Ref('R{0}'.format(i + 1), '1'))
+        signal.items.append(primitives.Wire(i * 5.0 + 0.8, 0, i * 5.0 + 4.2, 0, 0.254, 1))
+        signal.items.append(primitives.Via(i * 5.0 + 2.5, 0, 0.35))
+        board.signals.append(signal)
+
+    return board
+
+def make_schematic(num_parts = 4):
+    lib = make_library()
+    schematic = eagle.Schematic()
+    schematic.libraries.append(lib)
+    device_set = lib.device_sets['R']
+
+    for i in range(num_parts):
+        schematic.parts.append(eagle.Part('R{0}'.format(i), lib, device_set, device_set.devices['0603'], '1k'))
+
+    sheet = eagle.Sheet()
+
+    for p in schematic.parts:
+        sheet.instances.append(eagle.Instance(p, device_set.gates['G$1'], 0, 0))
+
+    for i in range(num_parts - 1):
+        segment = eagle.Segment([primitives.Pin_Ref('R{0}'.format(i), 'G$1', '2'),
+                                 primitives.Pin_Ref('R{0}'.format(i + 1), 'G$1', '1'),
+                                 primitives.Wire(0, 0, 5, 0, 0.1524, 91)])
+        sheet.nets.append(eagle.Net('N${0}'.format(i), 0, [segment]))
+
+    schematic.sheets.append(sheet)
+
+    return schematic
+
+def make_eagle(document):
+    drawing = eagle.Drawing(grid = eagle.Grid(),
+                            layers = default_layers.get_layers(),
+                            document = document,
+                            settings = [eagle.Setting('alwaysvectorfont', 'no')])
+    return eagle.Eagle(drawing)
+
+class TestLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.files = {}
+
+        for ext, document in (('brd', make_board()), ('sch', make_schematic()), ('lbr', make_library())):
+            file_name = os.path.join(self.directory, 'test.' + ext)
+            make_eagle(document).save(file_name)
+            self.files[ext] = file_name
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def save_to_string(self, e):
+        file_name = os.path.join(self.directory, 'out')
+        e.save(file_name)
+
+        f = open(file_name)
+        data = f.read()
+        f.close()
+
+        return data
+
+    def assert_loads_equal(self, **kwargs):
+        for file_name in self.files.values():
+            expected = self.save_to_string(eagle.Eagle.load(file_name))
+            actual = self.save_to_string(eagle.Eagle.load(file_name, **kwargs))
+            self.assertEqual(expected, actual)
+
+    def test_streaming(self):
+        self.assert_loads_equal(streaming = True)
+
+    def test_streaming_references(self):
+        board = eagle.Eagle.load(self.files['brd'], streaming = True).drawing.document
+        lib = board.libraries['lib']
+
+        self.assertEqual(len(board.elements), 4)
+        self.assertEqual(len(board.signals), 3)
+
+        for e in board.elements:
+            self.assertIs(e.library, lib)
+            self.assertIs(e.package, lib.packages['R0603'])
+
+        schematic = eagle.Eagle.load(self.files['sch'], streaming = True).drawing.document
+
+        for i in schematic.sheets[0].instances:
+            self.assertIs(i.part, schematic.parts[i.part.name])
+
+    def test_lazy_libraries(self):
+        self.assert_loads_equal(lazy_libraries = True)
+        self.assert_loads_equal(streaming = True, lazy_libraries = True)
+
+    def test_lazy_libraries_parse_on_demand(self):
+        lib = eagle.Eagle.load(self.files['lbr'], lazy_libraries = True).drawing.document
+
+        self.assertEqual(lib.packages.names(), ['R0603'])
+        self.assertFalse(lib.packages.is_parsed('R0603'))
+        self.assertFalse(lib.device_sets.is_parsed('R'))
+
+        device_set = lib.device_sets['R']
+        self.assertTrue(lib.device_sets.is_parsed('R'))
+        self.assertTrue(lib.packages.is_parsed('R0603'))
+
+        self.assertIs(device_set.devices['0603'].package, lib.packages['R0603'])
+        self.assertIs(device_set.gates['G$1'].symbol, lib.symbols['R'])
+
+    def test_sections(self):
+        for streaming in (False, True):
+            board = eagle.Eagle.load(self.files['brd'], streaming = streaming, sections = {'signals', 'elements'}).drawing.document
+
+            self.assertEqual(len(board.signals), 3)
+            self.assertEqual(len(board.elements), 4)
+            self.assertEqual(board.plain_items, [])
+            self.assertEqual(board.autorouter, None)
+            self.assertEqual(board.design_rules, None)
+
+            # The library is only parsed as far as the elements require
+            lib = board.libraries['lib']
+            self.assertIs(board.elements['R0'].package, lib.packages['R0603'])
+            self.assertFalse(lib.device_sets.is_parsed('R'))
+
+            schematic = eagle.Eagle.load(self.files['sch'], streaming = streaming, sections = {'sheets'}).drawing.document
+
+            self.assertEqual(len(schematic.parts), 4)
+            self.assertEqual(len(schematic.sheets[0].nets), 3)
+            self.assertEqual(schematic.classes, [])
+
+    def test_file_objects(self):
+        for file_name in self.files.values():
+            expected = self.save_to_string(eagle.Eagle.load(file_name))
+            
+            f = open(file_name, 'rb')
+            data = f.read()
+            f.seek(0)
+            
+            self.assertEqual(eagle.Eagle.load(f).dumps(), expected)
+            f.close()
+            
+            self.assertEqual(eagle.Eagle.loads(data).dumps(), expected)
+            self.assertEqual(eagle.Eagle.loads(data, streaming = True).dumps(), expected)
+            
+            out = StringIO.StringIO()
+            eagle.Eagle.loads(data).save(out)
+            self.assertEqual(out.getvalue(), expected)
+
+    def test_incremental_save(self):
+        for file_name in self.files.values():
+            for kwargs in ({}, {'lazy_libraries': True}, {'columnar': True}):
+                e = eagle.Eagle.load(file_name, **kwargs)
+                
+                # The incremental writer matches the output of ``pretty_print``
+                self.assertEqual(e.dumps(), e._dumps_tree())
+                
+        e = make_eagle(make_library())
+        e.drawing.document.description = 'line 1\n  line 2'
+        e.drawing.document.symbols['R'].items = []
+        self.assertEqual(e.dumps(), e._dumps_tree())
+
+    def test_slots(self):
+        board = eagle.Eagle.load(self.files['brd']).drawing.document
+        wire = board.signals['N$0'].items[2]
+
+        self.assertFalse(hasattr(wire, '__dict__'))
+        self.assertFalse(hasattr(board.elements['R0'], '__dict__'))
+        self.assertRaises(AttributeError, setattr, wire, 'color', 'red')
+
+        copied = pickle.loads(pickle.dumps(wire, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual((copied.x1, copied.x2, copied.layer), (wire.x1, wire.x2, wire.layer))
+
+        element = copy.deepcopy(board.elements['R1'])
+        self.assertEqual(element.rotation, board.elements['R1'].rotation)
@@ -0,0 +1,126 @@
+"""
+
+Unit testing for the bounding boxes, placement transformations and distances in ``geometry``.
+
+"""
+
+from eagle_test import make_board, make_schematic
+from eaglepy import attributes, constants, geometry, primitives
+import math
+import unittest
+
+class TestGeometry(unittest.TestCase):
+
+    def assertBoundsEqual(self, actual, expected):
+        self.assertEqual(len(actual), 4)
+
+        for a, e in zip(actual, expected):
+            self.assertAlmostEqual(a, e)
+
+    def test_bounds(self):
+        self.assertBoundsEqual(geometry.bounds(primitives.Wire(0, 0, 10, 5, 1, 1)), (-0.5, -0.5, 10.5, 5.5))
+        self.assertBoundsEqual(geometry.bounds(primitives.Via(1, 1, 0.4, 0.8)), (0.6, 0.6, 1.4, 1.4))
+        self.assertBoundsEqual(geometry.bounds(primitives.Hole(0, 0, 3.2)), (-1.6, -1.6, 1.6, 1.6))
+        self.assertBoundsEqual(geometry.bounds(primitives.Circle(1, 0, 2, 21, 0.2)), (-1.1, -2.1, 3.1, 2.1))
+        self.assertBoundsEqual(geometry.bounds(primitives.Rectangle(0, 0, 4, 2, 21, attributes.Rotation(90))), (1, -1, 3, 3))
+        self.assertIsNone(geometry.bounds(primitives.Text('>NAME', 0, 0, 25, 1.27)))
+
+        # Pads and SMDs are rotated about their centers
+        self.assertBoundsEqual(geometry.bounds(primitives.SMD('1', 0, 0, 2, 1, 1, attributes.Rotation(90))), (-0.5, -1, 0.5, 1))
+        self.assertBoundsEqual(geometry.bounds(primitives.Pad('1', 0, 0, 0.8, 1.6, shape = constants.SHAPE.LONG)), (-1.6, -0.8, 1.6, 0.8))
+        self.assertBoundsEqual(geometry.bounds(primitives.Pad('1', 0, 0, 0.8, 1.6, attributes.Rotation(90), constants.SHAPE.OFFSET)),
+                               (-0.8, -0.8, 0.8, 2.4))
+
+        # An automatic diameter is derived from the drill
+        self.assertBoundsEqual(geometry.bounds(primitives.Via(0, 0, 0.6)), (-0.554, -0.554, 0.554, 0.554))
+        self.assertBoundsEqual(geometry.bounds(primitives.Pad('1', 0, 0, 4.0)), (-2.508, -2.508, 2.508, 2.508))
+
+    def test_arcs(self):
+        # A counterclockwise quarter circle from (1, 0) to (0, 1)
+        self.assertEqual([round(v, 9) for v in geometry.arc_center(1, 0, 0, 1, 90)], [0, 0, 1])
+        self.assertBoundsEqual(geometry.arc_bounds(1, 0, 0, 1, 90), (0, 0, 1, 1))
+
+        # The clockwise arc between the same points passes the other three extreme points of the circle
+        self.assertBoundsEqual(geometry.arc_bounds(1, 0, 0, 1, -270), (-1, -1, 1, 1))
+        self.assertBoundsEqual(geometry.bounds(primitives.Wire(-1, 0, 1, 0, 0.2, 1, -180.0)), (-1.1, -0.1, 1.1, 1.1))
+
+        # A polygon with a curved edge
+        polygon = primitives.Polygon(1, [(0, 0, '0'), (2, 0, '180.0'), (2, 2, '0'), (0, 2, '0')], 0.0)
+        self.assertBoundsEqual(geometry.bounds(polygon), (0, 0, 3, 2))
+
+        polygon.points[1] = (2, 0, '-180.0')
+        self.assertBoundsEqual(geometry.bounds(polygon), (0, 0, 2, 2))
+
+    def test_placement(self):
+        board = make_board()
+        smd = board.libraries['lib'].packages['R0603'].items[0]
+
+        # R1 is mirrored and rotated by 90 degrees
+        placement = geometry.Placement(board.elements['R1'])
+        self.assertEqual(placement.point(smd.x, smd.y), (5.0, 0.8))
+        self.assertEqual(placement.layer(smd.layer), constants.LAYERS.BOTTOM)
+        self.assertEqual(placement.layer(constants.LAYERS.TPLACE), constants.LAYERS.BPLACE)
+        self.assertEqual(placement.layer(constants.LAYERS.DIMENSION), constants.LAYERS.DIMENSION)
+        self.assertBoundsEqual(placement.bounds(geometry.bounds(smd)), (4.5, 0.35, 5.5, 1.25))
+        self.assertEqual(placement.rotation_angle(0), 270)
+
+        # R2 is rotated by 180 degrees
+        placement = geometry.Placement(board.elements['R2'])
+        self.assertEqual(placement.point(smd.x, smd.y), (10.8, 0))
+        self.assertEqual(placement.layer(smd.layer), constants.LAYERS.TOP)
+
+        # The matrix of each rotation is cached
+        self.assertIs(geometry.matrix(attributes.Rotation(90, True)), geometry.matrix(attributes.Rotation(90, True)))
+
+    def test_pins(self):
+        self.assertEqual(geometry.bounds(primitives.Pin('1', -5.08, 0)), (-5.08, 0, 2.54, 0))
+        self.assertEqual(geometry.bounds(primitives.Pin('1', 0, 1, rotation = attributes.Rotation(270), length = 'short')),
+                         (0, -1.54, 0, 1))
+        self.assertEqual(geometry.bounds(primitives.Pin('1', 2, 3, length = 'point')), (2, 3, 2, 3))
+
+    def test_placed_bounds(self):
+        board = make_board()
+
+        # The bounding box of each element is that of its placed primitives
+        for element in board.elements:
+            placement = geometry.Placement(element)
+            expected = geometry.union(placement.bounds(geometry.bounds(i)) for i in element.package.items)
+            self.assertBoundsEqual(element.bounds(), expected)
+
+        self.assertBoundsEqual(board.elements['R1'].bounds(), (4.5, -1.5635, 5.8635, 1.5635))
+
+        # The instances are at (0, 0), and the wires of the nets are from (0, 0) to (5, 0)
+        sheet = make_schematic().sheets[0]
+        self.assertBoundsEqual(sheet.instances[0].bounds(), (-5.08, 0, 5.08, 0))
+        self.assertBoundsEqual(sheet.bounds(), (-5.08, -0.0762, 5.08, 0.0762))
+
+        sheet.plain.append(primitives.Circle(10, 0, 1, 94, 0.2))
+        self.assertBoundsEqual(sheet.bounds(), (-5.08, -1.1, 11.1, 1.1))
+
+    def test_segment_distance(self):
+        self.assertAlmostEqual(geometry.segment_distance(0, 0, 2, 0, 1, 1, 3, 1), 1.0)
+        self.assertAlmostEqual(geometry.segment_distance(0, 0, 2, 0, 1, -1, 1, 1), 0.0)
+        self.assertAlmostEqual(geometry.segment_distance(0, 0, 2, 0, 5, 4, 5, 4), 5.0)
+        self.assertAlmostEqual(geometry.segment_distance(0, 0, 0, 0, 3, 4, 3, 4), 5.0)
+
+    def test_arc_distance(self):
+        # A semicircle of radius 1 around (0, 0), from (1, 0) to (-1, 0) through (0, 1)
+        arc = (1, 0, -1, 0, 180.0)
+
+        self.assertAlmostEqual(geometry.arc_distance(arc, (0, 3, 0, 3, 0)), 2.0)
+        self.assertAlmostEqual(geometry.arc_distance(arc, (0, 0, 0, 0, 0)), 1.0)
+        self.assertAlmostEqual(geometry.arc_distance(arc, (0, -2, 0, -2, 0)), math.sqrt(5))
+        self.assertAlmostEqual(geometry.arc_distance(arc, (-2, 2, 2, 2, 0)), 1.0)
+        self.assertAlmostEqual(geometry.arc_distance(arc, (0, 0, 0, 2, 0)), 0.0)
+        self.assertAlmostEqual(geometry.arc_distance((0, 3, 0, 3, 0), arc), 2.0)
+
+        # A smaller concentric arc
+        self.assertAlmostEqual(geometry.arc_distance(arc, (0.5, 0, -0.5, 0, 180.0)), 0.5)
+
+        # The lower half of a circle of radius 1 around (0, -0.5), and the lower half of one around (0, 0.5) (which
+        # crosses the arc)
+        self.assertAlmostEqual(geometry.arc_distance(arc, (-1, -0.5, 1, -0.5, 180.0)), 0.5)
+        self.assertAlmostEqual(geometry.arc_distance(arc, (-1, 0.5, 1, 0.5, 180.0)), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
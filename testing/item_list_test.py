@@ -0,0 +1,197 @@
+"""
+
+Unit testing for the buckets of ``Item_List``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_library
+from eaglepy import binary, constants, eagle, item_list, primitives, tracking
+import copy
+import pickle
+import unittest
+
+class TestItemList(unittest.TestCase):
+
+    def setUp(self):
+        self.package = make_library().packages['R0603']
+        self.items = self.package.items
+        self.smds = self.items[0:2]
+
+    def test_queries(self):
+        items = self.items
+        self.assertTrue(isinstance(items, item_list.Item_List))
+
+        self.assertEqual(items.of_type(primitives.SMD), self.smds)
+        self.assertEqual(items.of_type((primitives.Text, primitives.Wire)), items[2:4])
+        self.assertEqual(items.of_type(primitives.Pad), [])
+
+        self.assertEqual(items.on_layer(constants.LAYERS.TOP), self.smds)
+        self.assertEqual(items.on_layer(constants.LAYERS.BOTTOM), [])
+        self.assertEqual(items.layers(), [1, 21, 25])
+
+        self.assertEqual(items.select(primitives.SMD, constants.LAYERS.TOP), self.smds)
+        self.assertEqual(items.select(primitives.Wire, constants.LAYERS.TOP), [])
+        self.assertEqual(items.select(layer = 21), [items[2]])
+        self.assertEqual(items.select(), list(items))
+
+    def test_updates(self):
+        items = self.items
+        items.of_type(primitives.SMD)
+
+        # Appending and removing the last item update the buckets
+        smd = primitives.SMD('3', 0, 2, 0.9, 1.0, 16)
+        items.append(smd)
+        self.assertIsNot(items.buckets, None)
+        self.assertEqual(items.of_type(primitives.SMD), self.smds + [smd])
+        self.assertEqual(items.on_layer(16), [smd])
+
+        items.remove(smd)
+        self.assertIsNot(items.buckets, None)
+        self.assertEqual(items.of_type(primitives.SMD), self.smds)
+        self.assertEqual(items.layers(), [1, 21, 25])
+
+        items.extend([smd, primitives.Hole(0, 0, 1)])
+        self.assertEqual(len(items.of_type(primitives.SMD)), 3)
+        self.assertEqual(len(items.of_type(primitives.Hole)), 1)
+
+        # Other modifications rebuild the buckets
+        items.insert(0, smd)
+        self.assertEqual(items.of_type(primitives.SMD), [smd] + self.smds + [smd])
+
+        del items[0]
+        items.pop(0)
+        items.reverse()
+        self.assertEqual(items.of_type(primitives.SMD), [smd, self.smds[1]])
+
+        items[:] = []
+        self.assertEqual(items.of_type(primitives.SMD), [])
+        self.assertEqual(items.layers(), [])
+
+        # Changing the layer of an item (the buckets are kept until ``changed()`` is called)
+        items.append(smd)
+        self.assertEqual(items.layers(), [16])
+        buckets = items.buckets
+        self.assertEqual(items.on_layer(16), [smd])
+        self.assertIs(items.buckets, buckets)
+
+        smd.layer = 1
+        self.assertEqual(items.on_layer(1), [])
+        items.changed()
+        self.assertEqual(items.on_layer(1), [smd])
+
+    def test_bounds(self):
+        items = self.items
+        self.assertBoundsEqual(items.bounds(), (-1.5635, -0.8635, 1.5635, 0.5))
+        self.assertIs(items.bounds(), items.bounds())
+        self.assertEqual(self.package.bounds(), items.bounds())
+
+        # Adding items extends the bounding box, and removing items recalculates it
+        hole = primitives.Hole(0, 3, 1)
+        items.append(hole)
+        self.assertBoundsEqual(items.bounds(), (-1.5635, -0.8635, 1.5635, 3.5))
+        items.extend([primitives.Text('>VALUE', 9, 9, 27, 1.27)])
+        self.assertBoundsEqual(items.bounds(), (-1.5635, -0.8635, 1.5635, 3.5))
+
+        items.remove(hole)
+        self.assertBoundsEqual(items.bounds(), (-1.5635, -0.8635, 1.5635, 0.5))
+
+        # Moving an item which is already in the list (which is not tracked, so it is kept until ``changed()``)
+        items[0].x = -5
+        self.assertBoundsEqual(items.bounds(), (-1.5635, -0.8635, 1.5635, 0.5))
+        items.changed()
+        self.assertBoundsEqual(items.bounds(), (-5.45, -0.8635, 1.5635, 0.5))
+
+        # Moving a wire of the package
+        items[2].x2 = 3
+        self.package.items.changed()
+        self.assertBoundsEqual(self.package.bounds(), (-5.45, -0.8635, 3.0635, 0.5))
+
+        # Items without bounding boxes
+        items = item_list.Item_List([primitives.Text('>NAME', 0, 0, 25, 1.27)])
+        self.assertEqual(items.bounds(), None)
+        items.append(hole)
+        self.assertBoundsEqual(items.bounds(), (-0.5, 2.5, 0.5, 3.5))
+        del items[:]
+        self.assertEqual(items.bounds(), None)
+
+    def assertBoundsEqual(self, actual, expected):
+        self.assertEqual(len(actual), 4)
+
+        for a, e in zip(actual, expected):
+            self.assertAlmostEqual(a, e)
+
+    def test_construction(self):
+        self.assertTrue(isinstance(eagle.Symbol('S').items, item_list.Item_List))
+        self.assertTrue(isinstance(eagle.Board().plain_items, item_list.Item_List))
+        self.assertTrue(isinstance(eagle.Sheet().plain, item_list.Item_List))
+
+        package = eagle.Package('P', items = [primitives.Hole(0, 0, 1)])
+        self.assertTrue(isinstance(package.items, item_list.Item_List))
+        self.assertIs(eagle.Package('P', items = self.items).items, self.items)
+
+    def test_copy(self):
+        for copied in (pickle.loads(pickle.dumps(self.items, pickle.HIGHEST_PROTOCOL)), copy.deepcopy(self.items)):
+            self.assertIs(type(copied), item_list.Item_List)
+            self.assertEqual(len(copied.of_type(primitives.SMD)), 2)
+
+        board = binary.loads(binary.dumps(make_eagle(make_board()))).drawing.document
+        items = board.libraries['lib'].packages['R0603'].items
+        self.assertIs(type(items), item_list.Item_List)
+        self.assertEqual(len(items.of_type(primitives.SMD)), 2)
+        self.assertIs(type(board.signals['N$0'].items), list)
+
+    def test_tracked_changes(self):
+        board = make_board()
+        package = board.libraries['lib'].packages['R0603']
+        items = package.items
+        wire = items[2]
+
+        with tracking.Tracker(board):
+            # The bounding box is kept until an item is changed
+            self.assertBoundsEqual(package.bounds(), (-1.5635, -0.8635, 1.5635, 0.5))
+            self.assertIs(package.bounds(), package.bounds())
+
+            wire.x2 = 3
+            self.assertBoundsEqual(package.bounds(), (-1.5635, -0.8635, 3.0635, 0.5))
+            self.assertIs(package.bounds(), package.bounds())
+
+            # Changing the layer of an item updates the buckets
+            self.assertEqual(items.on_layer(21), [wire])
+            buckets = items.buckets
+            self.assertEqual(items.layers(), [1, 21, 25])
+            self.assertIs(items.buckets, buckets)
+
+            wire.layer = 51
+            self.assertEqual(items.on_layer(21), [])
+            self.assertEqual(items.layers(), [1, 25, 51])
+            self.assertEqual(items.select(primitives.Wire, 51), [wire])
+
+            # Changes to the lists of an item (e.g. the points of a polygon) are reported too
+            polygon = primitives.Polygon(21, [(0, 0, '0'), (1, 0, '0'), (1, 1, '0')], 0.1)
+            items.append(polygon)
+            self.assertBoundsEqual(package.bounds(), (-1.5635, -0.8635, 3.0635, 1.05))
+            polygon.points[2] = (1, 2, '0')
+            self.assertBoundsEqual(package.bounds(), (-1.5635, -0.8635, 3.0635, 2.05))
+
+    def test_tracking(self):
+        e = make_eagle(make_board())
+        e.tracker = tracking.Tracker(e)
+        events = []
+        e.tracker.subscribe(lambda *event: events.append(event))
+
+        try:
+            items = e.drawing.document.libraries['lib'].packages['R0603'].items
+            self.assertIs(type(items), item_list.Item_List)
+
+            hole = primitives.Hole(0, 0, 1)
+            items.append(hole)
+            hole.drill = 2.0
+            items.pop()
+
+            self.assertEqual(events, [(tracking.ADDED, items, hole), (tracking.MODIFIED, hole, 'drill'),
+                                      (tracking.REMOVED, items, hole)])
+        finally:
+            e.tracker.close()
+
+if __name__ == '__main__':
+    unittest.main()
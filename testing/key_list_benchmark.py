@@ -0,0 +1,113 @@
+"""
+
+Key_List Benchmark
+==================
+
+Print the time taken by each operation of a ``Key_List`` of 100,000 objects, compared with the previous
+implementation (which stored the objects in a ``collections.OrderedDict``, and had no positional index).
+
+All times are per operation.
+
+Usage:
+
+    python key_list_benchmark.py
+
+"""
+
+from eaglepy import key_list
+import collections
+import random
+import time
+
+SIZE = 100000
+
+class Named:
+    def __init__(self, name):
+        self.name = name
+
+class Previous_Key_List:
+    """
+    The previous implementation (with equivalent positional operations).
+    """
+
+    def __init__(self, items = None):
+        self.list = collections.OrderedDict()
+
+        if items != None:
+            for i in items:
+                self.append(i)
+
+    def append(self, obj):
+        self.list[obj.name] = obj
+
+    def __iter__(self):
+        return self.list.itervalues()
+
+    def __getitem__(self, i):
+        return self.list[i]
+
+    def pop(self, name):
+        return self.list.pop(name)
+
+    def item_at_index(self, index):
+        return self.list[self.list.keys()[index]]
+
+    def index_of(self, name):
+        return self.list.keys().index(name)
+
+    def insert_at(self, index, obj):
+        items = self.list.items()
+        items.insert(index, (obj.name, obj))
+        self.list = collections.OrderedDict(items)
+
+    def move(self, name, index):
+        obj = self.list.pop(name)
+        self.insert_at(index, obj)
+
+def measure(function, repeat):
+    start = time.time()
+
+    for i in xrange(repeat):
+        function(i)
+
+    return (time.time() - start) / repeat
+
+def benchmark(cls, quick):
+    """
+    :returns: A list of ``(operation, seconds per operation)`` tuples.
+    """
+
+    objects = [Named('N{0}'.format(i)) for i in xrange(SIZE)]
+    indices = [random.randrange(SIZE // 2) for i in xrange(SIZE)]
+    names = [objects[i].name for i in indices]
+    l = cls()
+    results = []
+
+    # (Linear operations are repeated 100 times in the previous implementation.)
+    slow = SIZE if quick else 100
+
+    results.append(('append', measure(lambda i: l.append(objects[i]), SIZE)))
+    results.append(('iterate', measure(lambda i: list(l), 10) / SIZE))
+    results.append(('get by name', measure(lambda i: l[names[i]], SIZE)))
+    results.append(('item_at_index', measure(lambda i: l.item_at_index(indices[i]), slow)))
+    results.append(('index_of', measure(lambda i: l.index_of(names[i]), slow)))
+    results.append(('insert_at', measure(lambda i: l.insert_at(indices[i], Named(i)), 100)))
+    results.append(('move', measure(lambda i: l.move(names[i], indices[-i]), 100)))
+    results.append(('pop', measure(lambda i: l.pop(objects[SIZE // 2 + i].name), SIZE // 4)))
+
+    # (An index after a removed name requires the indices of the following names to be updated.)
+    results.append(('pop, then index', measure(lambda i: (l.pop(objects[SIZE - 1 - 2 * i].name), l.index_of(objects[SIZE - 2 - 2 * i].name)), 100)))
+
+    return results
+
+if __name__ == '__main__':
+    random.seed(0)
+    before = benchmark(Previous_Key_List, False)
+
+    random.seed(0)
+    after = benchmark(key_list.Key_List, True)
+
+    print('{0:<18}{1:>14}{2:>14}{3:>10}'.format('Operation', 'Before (us)', 'After (us)', 'Speedup'))
+
+    for (operation, b), (_, a) in zip(before, after):
+        print('{0:<18}{1:>14.3f}{2:>14.3f}{3:>9.1f}x'.format(operation, b * 1e6, a * 1e6, b / a))
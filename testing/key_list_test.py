@@ -1,4 +1,6 @@
 from eaglepy import key_list
+import collections
+import pickle
 import unittest
 
 class Test_Class():
@@ -66,7 +68,114 @@ class Testing(unittest.TestCase):
         for i in range(len(self.names)):
             o = self.key_list.item_at_index(i)
             self.assertEqual(o.name, self.names[i])
+            self.assertEqual(self.key_list.index_of(self.names[i]), i)
+            
+        self.assertEqual(self.key_list.item_at_index(-1).name, 'orange')
+        self.assertRaises(IndexError, self.key_list.item_at_index, 4)
+        
+    def test_insert_at(self):
+        self.key_list.insert_at(1, Test_Class('kiwi'))
+        self.key_list.insert_at(-1, Test_Class('lime'))
+        self.key_list.insert_at(10, Test_Class('mango'))
+        self.assertEqual(self.key_list.names(), ['banana', 'kiwi', 'apple', 'pear', 'lime', 'orange', 'mango'])
+        
+        # An object with the same name replaces the existing object
+        pear = Test_Class('pear')
+        self.key_list.insert_at(0, pear)
+        self.assertIs(self.key_list.item_at_index(0), pear)
+        self.assertEqual(len(self.key_list), 7)
+        self.assertEqual(self.key_list.index_of('lime'), 4)
+        
+    def test_move(self):
+        self.key_list.move('banana', -1)
+        self.key_list.move('pear', 0)
+        self.assertEqual(self.key_list.names(), ['pear', 'apple', 'orange', 'banana'])
+        self.assertEqual([self.key_list.index_of(n) for n in self.key_list.names()], range(4))
+        self.assertRaises(IndexError, self.key_list.move, 'pear', 4)
+        
+    def test_extend_and_slice(self):
+        self.key_list.extend(Test_Class(n) for n in ('kiwi', 'lime'))
+        self.assertEqual(self.key_list.names(), self.names + ['kiwi', 'lime'])
         
+        s = self.key_list[1:5:2]
+        self.assertTrue(isinstance(s, key_list.Key_List))
+        self.assertEqual(s.names(), ['apple', 'orange'])
+        self.assertIs(s['apple'], self.key_list['apple'])
+        self.assertEqual(self.key_list[-2:].names(), ['kiwi', 'lime'])
+        
+        # Slices behave as those of a list, including indices beyond either end
+        count = len(self.key_list)
+        self.assertEqual(self.key_list[-count - 3:].names(), self.key_list.names())
+        self.assertEqual(self.key_list[-count - 3:2].names(), self.names[:2])
+        self.assertEqual(self.key_list[:-count - 3].names(), [])
+        self.assertEqual(self.key_list[4:100].names(), ['kiwi', 'lime'])
+        self.assertEqual(self.key_list[::-2].names(), ['lime', 'orange', 'apple'])
+        
+    def test_mixed_operations(self):
+        # Compare the positions with a list, while objects are removed, inserted, and moved
+        random = __import__('random').Random(1)
+        l = key_list.Key_List(Test_Class(i) for i in range(200))
+        expected = range(200)
+        
+        for i in range(2000):
+            op = random.randrange(5)
+            
+            if op == 0 and len(expected) > 0:
+                name = random.choice(expected)
+                expected.remove(name)
+                l.pop(name)
+            elif op == 1:
+                index = random.randrange(-5, len(expected) + 5)
+                expected.insert(index, 1000 + i)
+                l.insert_at(index, Test_Class(1000 + i))
+            elif op == 2 and len(expected) > 0:
+                name = random.choice(expected)
+                index = random.randrange(len(expected))
+                expected.remove(name)
+                expected.insert(index, name)
+                l.move(name, index)
+            elif op == 3 and len(expected) > 0:
+                index = random.randrange(len(expected))
+                self.assertEqual(l.item_at_index(index).name, expected[index])
+                self.assertEqual(l.index_of(expected[index]), index)
+            else:
+                expected.append(10000 + i)
+                l.append(Test_Class(10000 + i))
+                
+            self.assertEqual(len(l), len(expected))
+        
+        self.assertEqual([o.name for o in l], expected)
+        self.assertEqual(list(l.iternames()), expected)
+        self.assertEqual([l.index_of(n) for n in expected], range(len(expected)))
+        
+    def test_remove_during_iteration(self):
+        for i in self.key_list:
+            if i.name != 'pear':
+                self.key_list.remove(i)
+                
+        self.assertEqual(self.key_list.names(), ['pear'])
+        
+    def test_previous_pickles(self):
+        # Lists which were pickled before the names were indexed
+        l = key_list.Key_List()
+        l.__dict__ = {'list': collections.OrderedDict((o.name, o) for o in self.key_list)}
+        l = pickle.loads(pickle.dumps(l))
+        
+        self.assertEqual(l.names(), self.names)
+        self.assertEqual(l.index_of('pear'), 2)
+        
+    def test_lazy(self):
+        nodes = [(n, n.upper()) for n in self.names]
+        l = key_list.Lazy_Key_List(Test_Class, nodes)
+        
+        l.insert_at(0, Test_Class('kiwi'))
+        self.assertEqual(l.names(), ['kiwi'] + self.names)
+        self.assertEqual(l.item_at_index(2).name, 'APPLE')
+        self.assertFalse(l.is_parsed('pear'))
+        self.assertEqual([o.name for o in l[3:]], ['PEAR', 'ORANGE'])
+        self.assertTrue(l.is_parsed('pear'))
+        
+
 def test_remove():
     nums = range(10)
     
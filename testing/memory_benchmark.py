@@ -0,0 +1,67 @@
+"""
+
+Memory Benchmark
+================
+
+Print the number of bytes used by each instance of the high-volume classes (the primitives, and
+``Element``, ``Instance``, ``Attribute``, and ``Part``) which use ``__slots__``, compared with an
+equivalent class which stores its variables in a per-instance ``__dict__``.
+
+The size of an object includes the object itself and its ``__dict__`` (if any), but not the values
+of its variables (which are the same in both cases).
+
+Usage:
+
+    python memory_benchmark.py
+
+"""
+
+from eaglepy import attributes, eagle, primitives
+import sys
+import types
+
+def object_size(obj):
+    size = sys.getsizeof(obj)
+
+    if hasattr(obj, '__dict__'):
+        size += sys.getsizeof(obj.__dict__)
+
+    return size
+
+def make_dict_class(cls):
+    """
+    Return a class with the same constructor as ``cls`` whose instances have a ``__dict__``
+    (i.e. the representation used before ``__slots__`` were introduced).
+    """
+
+    return types.ClassType(cls.__name__, (), {'__init__': cls.__init__.im_func})
+
+def make_instances():
+    lib = eagle.Library('lib')
+    package = eagle.Package('P')
+    device_set = eagle.Device_Set('D')
+    device = eagle.Device('', package)
+    gate = eagle.Gate('G$1', eagle.Symbol('S'), 0, 0)
+    part = eagle.Part('R1', lib, device_set, device, '10k')
+    rotation = attributes.Rotation(90)
+
+    return [(primitives.Wire, (0.0, 0.0, 1.0, 1.0, 0.254, 1)),
+            (primitives.Via, (1.0, 1.0, 0.35)),
+            (primitives.SMD, ('1', 0.0, 0.0, 1.0, 0.5, 1, rotation)),
+            (primitives.Pad, ('1', 0.0, 0.0, 0.8)),
+            (primitives.Polygon, (1, [(0.0, 0.0, 0), (1.0, 0.0, 0), (1.0, 1.0, 0)])),
+            (primitives.Text, ('>NAME', 0.0, 0.0, 25)),
+            (primitives.Contact_Ref, ('R1', '1')),
+            (primitives.Pin_Ref, ('R1', 'G$1', '1')),
+            (eagle.Element, ('R1', lib, package, '10k', 0.0, 0.0)),
+            (eagle.Instance, (part, gate, 0.0, 0.0)),
+            (eagle.Attribute, ('NAME', 'R1', 0.0, 0.0, 1.27, 25, None, rotation, None, True)),
+            (eagle.Part, ('R1', lib, device_set, device, '10k'))]
+
+if __name__ == '__main__':
+    print('{0:<16}{1:>10}{2:>10}{3:>10}'.format('Class', 'Before', 'After', 'Saved'))
+
+    for cls, args in make_instances():
+        before = object_size(make_dict_class(cls)(*args))
+        after = object_size(cls(*args))
+        print('{0:<16}{1:>10}{2:>10}{3:>9.0f}%'.format(cls.__name__, before, after, 100.0 * (before - after) / before))
@@ -0,0 +1,121 @@
+"""
+
+Unit testing for the netlists of schematics in ``netlist``.
+
+"""
+
+from eagle_test import make_schematic
+from eaglepy import eagle, netlist, primitives, references, tracking
+import unittest
+
+class TestNetlist(unittest.TestCase):
+
+    def setUp(self):
+        # R0.2 - N$0 - R1.1, R1.2 - N$1 - R2.1, R2.2 - N$2 - R3.1
+        self.schematic = make_schematic()
+
+        # A second sheet, with another segment of N$1 and a net without pins
+        sheet = eagle.Sheet()
+        sheet.nets.append(eagle.Net('N$1', 0, [eagle.Segment([primitives.Pin_Ref('R3', 'G$1', '2'),
+                                                                primitives.Wire(0, 0, 1, 0, 0.1524, 91)])]))
+        sheet.nets.append(eagle.Net('GND', 0, [eagle.Segment([primitives.Wire(0, 0, 1, 0, 0.1524, 91)])]))
+        self.schematic.sheets.append(sheet)
+
+    def pins(self, pin_refs):
+        return [(p.part, p.pin) for p in pin_refs]
+
+    def test_maps(self):
+        n = netlist.Netlist(self.schematic.sheets)
+
+        self.assertEqual(n.names, ['N$0', 'N$1', 'N$2', 'GND'])
+        self.assertEqual(len(n), 4)
+        self.assertTrue('GND' in n)
+        self.assertFalse('VCC' in n)
+
+        self.assertEqual(self.pins(n.pins_of('N$1')), [('R1', '2'), ('R2', '1'), ('R3', '2')])
+        self.assertEqual(n.pins_of('GND'), [])
+        self.assertEqual(n.pins_of('VCC'), [])
+
+        self.assertEqual(n.net_of('R3', 'G$1', '2'), 'N$1')
+        self.assertEqual(n.net_of('R0', 'G$1', '1'), None)
+
+        self.assertEqual(n.nets_of('R3'), ['N$2', 'N$1'])
+        self.assertEqual(n.nets_of(self.schematic.parts['R0']), ['N$0'])
+        self.assertEqual(n.nets_of('R9'), [])
+        self.assertEqual(n.shorts, {})
+
+    def test_shorts(self):
+        self.schematic.sheets[1].nets['GND'].segments[0].items.append(primitives.Pin_Ref('R1', 'G$1', '1'))
+
+        n = netlist.Netlist(self.schematic.sheets)
+        self.assertEqual(n.net_of('R1', 'G$1', '1'), 'N$0')
+        self.assertEqual(n.shorts, {('R1', 'G$1', '1'): ['N$0', 'GND']})
+        self.assertEqual(n.nets_of('R1'), ['N$0', 'N$1', 'GND'])
+
+    def test_reuse(self):
+        schematic = self.schematic
+        n = schematic.netlist()
+        self.assertIs(schematic.netlist(), n)
+
+        # Adding a net
+        schematic.sheets[1].nets.append(eagle.Net('VCC', 0))
+        self.assertIsNot(schematic.netlist(), n)
+        self.assertEqual(schematic.netlist().names[-1], 'VCC')
+
+        # Adding a sheet
+        n = schematic.netlist()
+        schematic.sheets.append(eagle.Sheet())
+        self.assertIsNot(schematic.netlist(), n)
+
+        # Changes to segments (which are not detected unless the schematic is tracked)
+        n = schematic.netlist()
+        schematic.sheets[0].nets['N$0'].segments[0].items.pop(0)
+        references.changed(schematic)
+        self.assertIsNot(schematic.netlist(), n)
+        self.assertEqual(self.pins(schematic.netlist().pins_of('N$0')), [('R1', '1')])
+
+    def test_reuse_after_edits(self):
+        self.check_edits(lambda: references.changed(self.schematic))
+
+    def test_tracked(self):
+        with tracking.Tracker(self.schematic):
+            self.check_edits(lambda: None)
+
+    def check_edits(self, changed):
+        schematic = self.schematic
+        segment = schematic.sheets[1].nets['GND'].segments[0]
+        self.assertEqual(schematic.netlist().pins_of('GND'), [])
+
+        # Adding a Pin_Ref to a segment
+        segment.items.append(primitives.Pin_Ref('R0', 'G$1', '1'))
+        changed()
+        self.assertEqual(self.pins(schematic.netlist().pins_of('GND')), [('R0', '1')])
+        self.assertEqual(schematic.netlist().net_of('R0', 'G$1', '1'), 'GND')
+
+        # Changing the pin of a Pin_Ref
+        segment.items[-1].pin = '2'
+        changed()
+        self.assertEqual(schematic.netlist().net_of('R0', 'G$1', '1'), None)
+        self.assertEqual(schematic.netlist().shorts, {('R0', 'G$1', '2'): ['N$0', 'GND']})
+
+        # Renaming a part (the netlist is keyed by the names in the Pin_Refs), and then its Pin_Refs
+        index = schematic.parts.index_of('R0')
+        part = schematic.parts.pop('R0')
+        part.name = 'R9'
+        schematic.parts.insert_at(index, part)
+        self.assertEqual(schematic.netlist().nets_of('R0'), ['N$0', 'GND'])
+        self.assertEqual(schematic.netlist().nets_of(part), [])
+
+        for sheet in schematic.sheets:
+            for net in sheet.nets:
+                for segment in net.segments:
+                    for item in segment.items:
+                        if isinstance(item, primitives.Pin_Ref) and item.part == 'R0':
+                            item.part = 'R9'
+
+        changed()
+        self.assertEqual(schematic.netlist().nets_of(schematic.parts['R9']), ['N$0', 'GND'])
+        self.assertEqual(schematic.netlist().nets_of('R0'), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+"""
+
+Unit testing for the batched placement of the primitives of packages in ``placement``.
+
+"""
+
+from eagle_test import make_board
+from eaglepy import attributes, constants, eagle, geometry, placement, primitives, references, spatial, tracking
+import unittest
+
+@unittest.skipIf(placement.numpy == None, 'NumPy is not available')
+class TestPlacement(unittest.TestCase):
+
+    def setUp(self):
+        self.board = make_board()
+        package = self.board.libraries['lib'].packages['R0603']
+        package.items.append(primitives.Wire(-1, 1, 1, 1, 0.2, 21, curve = 90.0))
+        package.items.append(primitives.Pad('3', 0, 2, 0.8, 1.6, attributes.Rotation(45), constants.SHAPE.LONG))
+        package.items.append(primitives.Hole(0, -2, 1))
+
+        # An element with a different package, at an arbitrary angle
+        other = eagle.Package('SOT23')
+        other.items.append(primitives.SMD('1', -0.95, -1, 0.6, 0.7, 1))
+        other.items.append(primitives.Polygon(21, [(0, 0, '0'), (1, 0, '0'), (1, 1, '0')], 0.1))
+        self.board.libraries['lib'].packages.append(other)
+        self.board.elements.insert_at(2, eagle.Element('Q1', self.board.libraries['lib'], other, '', 20, 5, rotation = attributes.Rotation(30, True)))
+
+        self.placed = placement.Placed_Items(self.board.elements)
+
+    def test_rows(self):
+        placed = self.placed
+        elements = list(self.board.elements)
+
+        # The rows are in the order of the elements, then their items (texts are omitted)
+        expected = [(e, i) for e in elements for i in e.package.items if not isinstance(i, primitives.Text)]
+        self.assertEqual(len(placed), len(expected))
+        self.assertEqual(placed.elements_of_rows(), [e for e, i in expected])
+        self.assertTrue(all(a is b for a, (e, b) in zip(placed.items, expected)))
+        self.assertEqual(placed.element.tolist(), [elements.index(e) for e, i in expected])
+
+        self.assertEqual(placed.mask(primitives.SMD).sum(), 9)
+        self.assertEqual(placed.mask(primitives.Polygon).sum(), 1)
+
+    def test_geometry(self):
+        # The results are the same as those of ``geometry.Placement``
+        placed = self.placed
+
+        for row, (element, item) in enumerate(zip(placed.elements_of_rows(), placed.items)):
+            p = geometry.Placement(element)
+
+            for actual, expected in zip(placed.bounds[row].tolist(), p.bounds(geometry.bounds(item))):
+                self.assertAlmostEqual(actual, expected)
+
+            layer = geometry.ITEM_LAYERS.get(type(item))
+            self.assertEqual(placed.layer[row], layer if layer != None else p.layer(item.layer))
+
+            if isinstance(item, primitives.Wire):
+                self.assertEqual((placed.x[row], placed.y[row]), p.point(item.x1, item.y1))
+                self.assertEqual((placed.x2[row], placed.y2[row]), p.point(item.x2, item.y2))
+                self.assertEqual(placed.curve[row], -item.curve if element.rotation.mirrored else item.curve)
+            elif not isinstance(item, primitives.Polygon):
+                self.assertEqual((placed.x[row], placed.y[row]), p.point(item.x, item.y))
+                self.assertEqual((placed.x2[row], placed.y2[row]), p.point(item.x, item.y))
+
+            angle = item.rotation.angle if isinstance(item, (primitives.SMD, primitives.Pad)) else 0
+            self.assertAlmostEqual(placed.angle[row], p.rotation_angle(angle))
+
+    def test_layers(self):
+        placed = self.placed
+        smds = placed.mask(primitives.SMD)
+
+        # R1 and R3 are mirrored (as is Q1)
+        self.assertEqual((placed.layer[smds] == constants.LAYERS.TOP).sum(), 4)
+        self.assertEqual((placed.layer[smds] == constants.LAYERS.BOTTOM).sum(), 5)
+        self.assertEqual(sorted(set(placed.layer[placed.mask(primitives.Wire)].tolist())), [constants.LAYERS.TPLACE, constants.LAYERS.BPLACE])
+        self.assertEqual(set(placed.layer[placed.mask(primitives.Pad)].tolist()), set([constants.LAYERS.PADS]))
+
+    def test_empty(self):
+        placed = placement.Placed_Items([])
+        self.assertEqual(len(placed), 0)
+        self.assertEqual(placed.bounds.shape, (0, 4))
+
+    def test_reuse(self):
+        placed = self.board.placed_items()
+        self.assertIs(self.board.placed_items(), placed)
+
+        # Adding an element
+        self.board.elements.append(eagle.Element('R9', self.board.libraries['lib'], self.board.elements['R0'].package, '', 0, 9))
+        self.assertIsNot(self.board.placed_items(), placed)
+        self.assertEqual(self.board.placed_items().elements[-1].name, 'R9')
+        self.board.elements.pop('R9')
+
+        # Assigning a package
+        placed = self.board.placed_items()
+        self.board.elements['R0'].package = self.board.libraries['lib'].packages['SOT23']
+        references.changed(self.board)
+        self.assertIsNot(self.board.placed_items(), placed)
+
+        # The spatial index uses the placed items
+        entries = spatial.Board_Index(self.board).entries(constants.LAYERS.PADS)
+        self.assertEqual(len(entries), 3)
+
+    def test_moved(self):
+        self.check_moved(lambda: references.changed(self.board))
+
+    def test_tracked(self):
+        with tracking.Tracker(self.board):
+            self.check_moved(lambda: None)
+
+    def check_moved(self, changed):
+        def rows_of(placed, name):
+            return [row for row, e in enumerate(placed.elements_of_rows()) if e.name == name]
+
+        placed = self.board.placed_items()
+        x = placed.x[rows_of(placed, 'Q1')[0]]
+
+        # Moving an element places it again
+        self.board.elements['Q1'].x = 30
+        changed()
+        moved = self.board.placed_items()
+        self.assertIsNot(moved, placed)
+        self.assertAlmostEqual(moved.x[rows_of(moved, 'Q1')[0]], x + 10)
+
+        # As does moving a primitive of its package
+        smd = self.board.libraries['lib'].packages['SOT23'].items[0]
+        smd.y = 1
+        changed()
+        moved = self.board.placed_items()
+        row = rows_of(moved, 'Q1')[0]
+        expected = geometry.Placement(self.board.elements['Q1']).point(smd.x, smd.y)
+        self.assertAlmostEqual(moved.x[row], expected[0])
+        self.assertAlmostEqual(moved.y[row], expected[1])
+
+if __name__ == '__main__':
+    unittest.main()
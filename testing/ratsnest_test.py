@@ -0,0 +1,118 @@
+"""
+
+Unit testing for the airwires of signals in ``ratsnest``.
+
+"""
+
+from eagle_test import make_board
+from eaglepy import eagle, primitives, ratsnest, references, tracking
+import math
+import random
+import unittest
+
+def brute_force_length(points, groups):
+    # Prim's algorithm over the groups, using the distances between every pair of points
+    group_count = max(groups) + 1
+    connected = set([0])
+    length = 0.0
+
+    while len(connected) < group_count:
+        d, group = min((math.hypot(p[0] - q[0], p[1] - q[1]), h)
+                       for p, g in zip(points, groups) if g in connected
+                       for q, h in zip(points, groups) if h not in connected)
+        connected.add(group)
+        length += d
+
+    return length
+
+class TestRatsnest(unittest.TestCase):
+
+    def setUp(self):
+        # The wire of N$0 connects the SMD of R0 at (0.8, 0) and the via at (2.5, 0), and ends at (4.2, 0), short of
+        # the SMD of R1 at (5, 0.8)
+        self.board = make_board(2)
+        self.signal = self.board.signals['N$0']
+
+    def test_open(self):
+        result = self.board.ratsnest()['N$0']
+        self.assertEqual(len(result.airwires), 1)
+
+        airwire = result.airwires[0]
+        self.assertEqual((airwire.x1, airwire.y1, airwire.x2, airwire.y2), (4.2, 0, 5, 0.8))
+        self.assertAlmostEqual(airwire.length, 0.8 * math.sqrt(2))
+        self.assertEqual([i.pads for i in airwire.islands], [[(self.board.elements['R0'], self.board.elements['R0'].package.items[1])],
+                                                             [(self.board.elements['R1'], self.board.elements['R1'].package.items[0])]])
+        self.assertAlmostEqual(self.board.ratsnest().length(), 0.8 * math.sqrt(2))
+
+    def test_routed(self):
+        self.signal.items[2].x2 = 2.5
+        self.signal.items.append(primitives.Wire(2.5, 0, 5, 0.8, 0.254, 16))
+
+        self.assertEqual(self.board.ratsnest()['N$0'].airwires, [])
+        self.assertEqual(self.board.ratsnest().length(), 0)
+
+    def test_floating(self):
+        # An unconnected wire is connected by an airwire from its nearest end, and pads which are not connected to
+        # any copper are connected to each other
+        self.signal.items.append(primitives.Wire(6, 3, 7, 3, 0.2, 1))
+        self.board.signals.append(eagle.Signal('N$1', items = [primitives.Contact_Ref('R0', '1'),
+                                                               primitives.Contact_Ref('R1', '2')]))
+
+        r = self.board.ratsnest()
+        self.assertEqual([(a.x1, a.y1, a.x2, a.y2) for a in r['N$0'].airwires], [(4.2, 0, 5, 0.8), (5, 0.8, 6, 3)])
+        self.assertEqual([(a.x1, a.y1, a.x2, a.y2) for a in r['N$1'].airwires], [(-0.8, 0, 5, -0.8)])
+        self.assertEqual(len(r.airwires()), 3)
+
+    def test_reuse(self):
+        r = self.board.ratsnest()
+        self.assertIs(self.board.ratsnest(), r)
+
+        self.board.signals.append(eagle.Signal('N$9'))
+        self.assertIsNot(self.board.ratsnest(), r)
+        self.assertEqual(len(self.board.ratsnest()), 2)
+        self.assertEqual(self.board.ratsnest()['N$9'].airwires, [])
+
+    def test_reuse_after_routing(self):
+        self.check_routing(lambda: references.changed(self.board))
+
+    def test_tracked(self):
+        with tracking.Tracker(self.board):
+            self.check_routing(lambda: None)
+
+    def check_routing(self, changed):
+        self.assertAlmostEqual(self.board.ratsnest().length(), 0.8 * math.sqrt(2))
+
+        # Routing the signal after the airwires were first determined
+        self.signal.items[2].x2 = 2.5
+        self.signal.items.append(primitives.Wire(2.5, 0, 5, 0.8, 0.254, 16))
+        changed()
+        self.assertEqual(self.board.ratsnest().length(), 0)
+
+        # Removing the wire again
+        self.signal.items.pop()
+        changed()
+        self.assertAlmostEqual(self.board.ratsnest().length(), math.hypot(2.5, 0.8))
+
+    def test_spanning_tree(self):
+        self.assertEqual(ratsnest.spanning_tree([], []), [])
+        self.assertEqual(ratsnest.spanning_tree([(0, 0), (1, 1)], [0, 0]), [])
+
+        # Coincident and collinear points
+        self.assertEqual(ratsnest.spanning_tree([(1, 1), (1, 1), (1, 1)], [0, 1, 2]), [(0.0, 0, 1), (0.0, 0, 2)])
+        self.assertEqual(ratsnest.spanning_tree([(0, 0), (3, 0), (1, 0)], [0, 1, 2]), [(1.0, 0, 2), (2.0, 1, 2)])
+
+        rng = random.Random(5)
+
+        for count, group_count in ((50, 50), (200, 20), (300, 3)):
+            points = [(rng.uniform(0, 100), rng.uniform(0, 30)) for _ in xrange(count)]
+            groups = range(group_count) + [rng.randrange(group_count) for _ in xrange(count - group_count)]
+
+            edges = ratsnest.spanning_tree(points, groups)
+            self.assertEqual(len(edges), group_count - 1)
+            self.assertAlmostEqual(sum(e[0] for e in edges), brute_force_length(points, groups))
+
+            # The size of the cells doesn't change the result
+            self.assertEqual(ratsnest.spanning_tree(points, groups, 0.5), edges)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,185 @@
+"""
+
+Unit testing for the reverse indexes in ``references``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_schematic
+from eaglepy import binary, eagle, key_list, primitives, references, tracking
+import gc
+import pickle
+import unittest
+import weakref
+
+class TestReferences(unittest.TestCase):
+
+    def setUp(self):
+        self.board = make_board()
+        self.lib = self.board.libraries['lib']
+        self.package = self.lib.packages['R0603']
+
+        self.other = eagle.Package('R0402')
+        self.lib.packages.append(self.other)
+
+    def names(self, objs):
+        return [o.name for o in objs]
+
+    def test_elements_using(self):
+        self.assertEqual(self.names(self.board.elements_using(self.package)), ['R0', 'R1', 'R2', 'R3'])
+        self.assertEqual(self.names(self.board.elements_using(self.lib)), ['R0', 'R1', 'R2', 'R3'])
+        self.assertEqual(self.board.elements_using(self.other), [])
+
+        elements = self.board.elements_by_package()
+        self.assertEqual(elements.keys(), [self.package])
+        self.assertEqual(self.names(elements[self.package]), ['R0', 'R1', 'R2', 'R3'])
+
+    def test_modifications(self):
+        board = self.board
+        self.assertEqual(len(board.elements_using(self.package)), 4)
+
+        # Assigning a reference (which is not detected unless the board is tracked)
+        board.elements['R1'].package = self.other
+        self.assertEqual(self.names(board.elements_using(self.other)), [])
+        references.changed(board)
+        self.assertEqual(self.names(board.elements_using(self.package)), ['R0', 'R2', 'R3'])
+        self.assertEqual(self.names(board.elements_using(self.other)), ['R1'])
+
+        # Modifying the elements
+        board.elements.pop('R0')
+        board.elements.insert_at(0, eagle.Element('R9', self.lib, self.other, '1k', 0, 0))
+        self.assertEqual(self.names(board.elements_using(self.other)), ['R9', 'R1'])
+        self.assertEqual(self.names(board.elements_using(self.package)), ['R2', 'R3'])
+
+        # Replacing the elements
+        board.elements = key_list.Key_List()
+        self.assertEqual(board.elements_using(self.package), [])
+
+    def test_reuse(self):
+        index = self.board._element_index()
+        self.assertIs(self.board._element_index(), index)
+
+        # Changes to other attributes and containers do not affect the index
+        self.board.elements['R0'].value = '1M'
+        self.board.signals['N$0'].items.append(primitives.Via(0, 0, 0.3))
+        self.board.plain_items.append(primitives.Hole(0, 0, 1))
+        self.assertIs(self.board._element_index(), index)
+
+        # Modifying the elements rebuilds it
+        self.board.elements.move('R0', 1)
+        self.assertIsNot(self.board._element_index(), index)
+        self.assertEqual(self.names(self.board.elements_using(self.package)), ['R1', 'R0', 'R2', 'R3'])
+
+        # As does ``changed()``
+        index = self.board._element_index()
+        references.changed(self.board)
+        self.assertIsNot(self.board._element_index(), index)
+
+    def test_tracked(self):
+        with tracking.Tracker(self.board):
+            index = self.board._element_index()
+
+            # Assigning references, and removing and appending users, update the index in place
+            self.board.elements['R0'].package = self.other
+            self.board.elements.pop('R1')
+            self.board.elements.append(eagle.Element('R9', self.lib, self.other, '1k', 0, 0))
+            self.assertIs(self.board._element_index(), index)
+            self.assertEqual(self.names(self.board.elements_using(self.other)), ['R0', 'R9'])
+            self.assertEqual(self.names(self.board.elements_using(self.package)), ['R2', 'R3'])
+
+            # Inserting a user rebuilds it
+            self.board.elements.insert_at(1, eagle.Element('R8', self.lib, self.other, '1k', 0, 0))
+            self.assertIsNot(self.board._element_index(), index)
+            self.assertEqual(self.names(self.board.elements_using(self.other)), ['R0', 'R8', 'R9'])
+
+        # Once the tracker is closed, references are no longer detected
+        index = self.board._element_index()
+        self.board.elements['R0'].package = self.package
+        self.assertIs(self.board._element_index(), index)
+
+    def test_documents(self):
+        # The indexes of each document are separate
+        other = make_board()
+        index = self.board._element_index()
+        other.elements.pop('R1')
+        other.elements_using(self.package)
+        self.assertIs(self.board._element_index(), index)
+
+        # Removing unused packages (see ``references``) doesn't rebuild the index
+        for package in self.lib.packages.items():
+            if len(self.board.elements_using(package)) == 0:
+                self.lib.packages.remove(package)
+
+        self.assertIs(self.board._element_index(), index)
+        self.assertEqual(self.lib.packages.names(), ['R0603'])
+
+        # Using an index doesn't track the document, and doesn't keep it alive
+        self.assertIs(tracking.tracker_of(self.board), None)
+        self.assertIs(type(self.board.signals['N$0'].items), list)
+
+        board = weakref.ref(self.board)
+        del self.board, self.lib, self.package, self.other, index
+        gc.collect()
+        self.assertIs(board(), None)
+
+    def test_parts_using(self):
+        schematic = make_schematic()
+        lib = schematic.libraries['lib']
+        device_set = lib.device_sets['R']
+        device = device_set.devices['0603']
+
+        for obj in (lib, device_set, device):
+            self.assertEqual(self.names(schematic.parts_using(obj)), ['R0', 'R1', 'R2', 'R3'])
+
+        other = eagle.Device('0402', self.other)
+        device_set.devices.append(other)
+        schematic.parts['R2'].device = other
+        references.changed(schematic)
+
+        self.assertEqual(self.names(schematic.parts_using(device)), ['R0', 'R1', 'R3'])
+        self.assertEqual(self.names(schematic.parts_using(other)), ['R2'])
+        self.assertEqual(len(schematic.parts_using(device_set)), 4)
+
+    def test_users_of(self):
+        device_set = self.lib.device_sets['R']
+        symbol = self.lib.symbols['R']
+
+        self.assertEqual(self.lib.users_of(self.package), [device_set.devices['0603']])
+        self.assertEqual(self.lib.users_of(symbol), [device_set.gates['G$1']])
+        self.assertEqual(self.lib.users_of(self.other), [])
+
+        device_set.devices['0603'].package = self.other
+        references.changed(self.lib)
+        self.assertEqual(self.lib.users_of(self.package), [])
+        self.assertEqual(self.lib.users_of(self.other), [device_set.devices['0603']])
+
+        # Adding a device set is detected, but removing a gate from a device set is not
+        other_set = eagle.Device_Set('C', gates = key_list.Key_List([eagle.Gate('G$1', symbol, 0, 0)]))
+        self.lib.device_sets.append(other_set)
+        self.assertEqual(self.lib.users_of(symbol), [device_set.gates['G$1'], other_set.gates['G$1']])
+
+        device_set.gates.pop('G$1')
+        references.changed(self.lib)
+        self.assertEqual(self.lib.users_of(symbol), [other_set.gates['G$1']])
+
+        # Unless the library is tracked
+        with tracking.Tracker(self.lib):
+            gate = other_set.gates['G$1']
+            other_set.gates.pop('G$1')
+            self.assertEqual(self.lib.users_of(symbol), [])
+            other_set.gates.append(gate)
+            self.assertEqual(self.lib.users_of(symbol), [gate])
+
+    def test_copies(self):
+        # The indexes are not part of the documents
+        e = make_eagle(self.board)
+        self.board.elements_using(self.package)
+
+        for copied in (pickle.loads(pickle.dumps(e, pickle.HIGHEST_PROTOCOL)), binary.loads(binary.dumps(e)), eagle.Eagle.loads(e.dumps())):
+            board = copied.drawing.document
+            package = board.libraries['lib'].packages['R0603']
+
+            self.assertEqual(self.names(board.elements_using(package)), ['R0', 'R1', 'R2', 'R3'])
+            self.assertIs(board.elements['R0'].package, package)
+
+if __name__ == '__main__':
+    unittest.main()
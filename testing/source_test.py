@@ -0,0 +1,151 @@
+"""
+
+Unit testing for incremental saving in ``source``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_library, make_schematic
+from eaglepy import attributes, eagle, primitives
+import unittest
+
+class TestSource(unittest.TestCase):
+
+    track_changes = False
+
+    def setUp(self):
+        self.loaded = []
+
+        # (The files are saved twice, so that their values are written in the same way as parsed values.)
+        self.data = dict((d.__class__.__name__, eagle.Eagle.loads(make_eagle(d).dumps()).dumps())
+                         for d in (make_board(), make_schematic(), make_library()))
+
+    def tearDown(self):
+        for e in self.loaded:
+            if e.tracker != None:
+                e.tracker.close()
+
+    def load(self, data, **kwargs):
+        e = eagle.Eagle.loads(data, keep_source = True, track_changes = self.track_changes, **kwargs)
+        self.loaded.append(e)
+        return e
+
+    def assert_saves_equal(self, modify):
+        """
+        Check that a modified file is saved in the same way with and without its source.
+        """
+
+        for data in self.data.values():
+            e = self.load(data)
+            expected = eagle.Eagle.loads(data)
+
+            modify(e.drawing.document)
+            modify(expected.drawing.document)
+
+            self.assertEqual(e.dumps(), expected.dumps())
+
+    def test_unchanged(self):
+        for data in self.data.values():
+            e = self.load(data)
+
+            self.assertEqual(e.dumps(), data)
+            self.assertEqual(self.load(data.replace('.0"', '"')).dumps(), data.replace('.0"', '"'))
+            self.assertEqual(e.source.modified(), [])
+            self.assertTrue(e.source.is_clean(e.drawing))
+
+    def test_source_nodes_are_copied(self):
+        # Nodes which are copied keep attributes which are not parsed
+        data = self.data['Board'].replace('<element name="R1"', '<element custom="1" name="R1"')
+        e = self.load(data)
+
+        self.assertEqual(e.dumps(), data)
+
+        board = e.drawing.document
+        board.elements['R2'].value = '4k7'
+
+        self.assertEqual(e.source.modified(), [board.elements['R2']])
+
+        out = e.dumps()
+        self.assertTrue('<element custom="1" name="R1"' in out)
+        self.assertTrue('value="4k7"' in out)
+        self.assertFalse(e.source.is_clean(board))
+        self.assertTrue(e.source.is_clean(board.elements['R1']))
+        self.assertTrue(e.source.is_clean(board.libraries['lib']))
+
+    def test_bytes_are_copied(self):
+        # The formatting of unchanged nodes is kept exactly (their quotes, spacing, character references, and
+        # attribute order), while modified nodes are generated
+        data = self.data['Board'].replace('<element name="R1"', "<element  name = 'R1'")
+        data = data.replace('<element name="R2"', '<element name="R&#50;"')
+        e = self.load(data)
+
+        self.assertEqual(e.dumps(), data)
+
+        board = e.drawing.document
+        board.elements['R0'].value = '4k7'
+
+        out = e.dumps()
+        self.assertTrue("<element  name = 'R1'" in out)
+        self.assertTrue('<element name="R&#50;"' in out)
+        self.assertTrue('<element name="R0"' in out and 'value="4k7"' in out)
+        self.assertEqual(e.source.original(board.elements['R3']),
+                         '<element name="R3" library="lib" package="R0603" value="10k" x="15.0" y="0.0" rot="MR270.0"/>')
+
+        # The nodes are serialized if the encoding changes
+        e.encoding = 'iso-8859-1'
+        out = e.dumps()
+        self.assertTrue('<element name="R1"' in out and '<element name="R2"' in out)
+
+    def test_modified_attributes(self):
+        def modify(document):
+            if isinstance(document, eagle.Board):
+                document.elements['R0'].value = '1M'
+                document.signals['N$1'].items[2].width = 0.5
+            elif isinstance(document, eagle.Schematic):
+                document.parts['R3'].value = '22k'
+                document.sheets[0].nets['N$0'].segments[0].items[2].x2 = 7.5
+            else:
+                document.packages['R0603'].items[1].rotation = attributes.Rotation(180)
+
+        self.assert_saves_equal(modify)
+
+    def test_modified_lists(self):
+        def modify(document):
+            if isinstance(document, eagle.Board):
+                document.signals['N$0'].items.pop()
+                document.elements.remove(document.elements['R3'])
+                document.plain_items.append(primitives.Hole(10, 10, 1))
+            elif isinstance(document, eagle.Schematic):
+                document.sheets[0].instances.pop()
+                document.sheets[0].nets['N$0'].segments[0].items.pop()
+            else:
+                document.symbols['R'].items.append(primitives.Wire(0, 0, 1, 1, 0.254, 94))
+
+        self.assert_saves_equal(modify)
+
+    def test_renamed_references(self):
+        # Renaming a package changes the nodes of the elements and devices which reference it
+        def modify(document):
+            lib = document if isinstance(document, eagle.Library) else document.libraries['lib']
+            lib.packages['R0603'].name = 'R0402'
+
+        self.assert_saves_equal(modify)
+
+    def test_options(self):
+        for kwargs in ({'streaming': True}, {'lazy_libraries': True}, {'columnar': True}):
+            self.assertRaises(Exception, self.load, self.data['Board'], **kwargs)
+
+class TestTrackedSource(TestSource):
+    """
+    The same tests, using a tracker (rather than snapshots) to find the modified records.
+    """
+
+    track_changes = True
+
+    def test_snapshots(self):
+        e = self.load(self.data['Board'])
+
+        self.assertIs(e.source.tracker, e.tracker)
+        self.assertTrue(all(entry[2] == None for entry in e.source.entries.itervalues()))
+
+if __name__ == '__main__':
+    unittest.main()
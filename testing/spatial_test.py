@@ -0,0 +1,166 @@
+"""
+
+Unit testing for the spatial index in ``spatial``.
+
+"""
+
+from eagle_test import make_board
+from eaglepy import constants, primitives, references, spatial, tracking
+import math
+import random
+import unittest
+
+def overlap(a, b, margin = 0):
+    return a[0] - margin <= b[2] and b[0] - margin <= a[2] and a[1] - margin <= b[3] and b[1] - margin <= a[3]
+
+class TestR_Tree(unittest.TestCase):
+
+    def setUp(self):
+        random.seed(0)
+        self.items = []
+
+        for i in range(1000):
+            x = random.uniform(0, 100)
+            y = random.uniform(0, 100)
+            self.items.append(((x, y, x + random.uniform(0, 3), y + random.uniform(0, 3)), i))
+
+        self.tree = spatial.R_Tree(self.items, capacity = 8)
+
+    def test_search(self):
+        self.assertEqual(len(self.tree), 1000)
+        self.assertEqual(sorted(self.tree.values()), range(1000))
+        self.assertTrue(self.tree.height > 1)
+
+        for i in range(20):
+            x = random.uniform(0, 100)
+            y = random.uniform(0, 100)
+            box = (x, y, x + 5, y + 5)
+
+            self.assertEqual(sorted(self.tree.search(box)), [v for b, v in self.items if overlap(b, box)])
+            self.assertEqual(sorted(self.tree.search(box, 1)), [v for b, v in self.items if overlap(b, box, 1)])
+            self.assertEqual(sorted(self.tree.at_point(x, y)), [v for b, v in self.items if overlap(b, (x, y, x, y))])
+
+    def test_nearest(self):
+        for i in range(20):
+            x = random.uniform(-10, 110)
+            y = random.uniform(-10, 110)
+            distances = sorted(spatial._box_distance(b + (v,), x, y) for b, v in self.items)
+            self.assertEqual([d for d, v in self.tree.nearest(x, y, 5)], distances[:5])
+
+        # Exact distances (to the centers of the boxes)
+        centers = dict((v, ((b[0] + b[2]) / 2.0, (b[1] + b[3]) / 2.0)) for b, v in self.items)
+        distance = lambda v: math.hypot(centers[v][0] - 50, centers[v][1] - 50)
+        self.assertEqual([v for d, v in self.tree.nearest(50, 50, 3, distance)], sorted(centers, key = distance)[:3])
+
+    def test_pairs(self):
+        expected = set()
+
+        for i, (a, u) in enumerate(self.items):
+            for b, v in self.items[i + 1:]:
+                if overlap(a, b, 0.5):
+                    expected.add((u, v))
+
+        pairs = self.tree.pairs(margin = 0.5)
+        self.assertEqual(len(pairs), len(expected))
+        self.assertEqual(set(tuple(sorted(p)) for p in pairs), expected)
+
+        # Pairs of two trees
+        other = spatial.R_Tree([((50, 50, 60, 60), 'box')])
+        self.assertEqual(sorted(v for v, o in self.tree.pairs(other)), [v for b, v in self.items if overlap(b, (50, 50, 60, 60))])
+
+    def test_empty(self):
+        tree = spatial.R_Tree([])
+        self.assertEqual(tree.search((0, 0, 1, 1)), [])
+        self.assertEqual(tree.nearest(0, 0), [])
+        self.assertEqual(tree.pairs(), [])
+        self.assertIsNone(tree.bounds())
+
+class TestBoard_Index(unittest.TestCase):
+
+    def setUp(self):
+        self.board = make_board()
+
+    def test_layers(self):
+        index = spatial.Board_Index(self.board)
+
+        # R1 and R3 are mirrored, so their SMDs and wires are on the bottom layers (texts are not indexed)
+        self.assertEqual(index.layers(), [constants.LAYERS.TOP, constants.LAYERS.BOTTOM, constants.LAYERS.VIAS,
+                                          constants.LAYERS.DIMENSION, constants.LAYERS.TPLACE, constants.LAYERS.BPLACE,
+                                          constants.LAYERS.HOLES])
+        self.assertEqual(len(index.entries(constants.LAYERS.TOP)), 7)
+        self.assertEqual(len(index.entries(constants.LAYERS.BOTTOM)), 4)
+        self.assertEqual(len(index), 20)
+
+        hole = index.entries(constants.LAYERS.HOLES)[0]
+        self.assertIs(hole.item, self.board.plain_items[1])
+        self.assertIsNone(hole.owner)
+
+    def test_queries(self):
+        index = spatial.Board_Index(self.board)
+        element = self.board.elements['R1']
+
+        # The SMDs of R1 (which is mirrored and rotated by 90 degrees) are placed at (5, 0.8) and (5, -0.8)
+        entries = index.at_point(5, 0.8)
+        self.assertEqual([(e.item.name, e.owner, e.layer) for e in entries], [('1', element, constants.LAYERS.BOTTOM)])
+        self.assertEqual(index.at_point(5, 0.8, constants.LAYERS.TOP), [])
+
+        entries = index.search((4.9, -1, 5.1, 1), (constants.LAYERS.TOP, constants.LAYERS.BOTTOM))
+        self.assertEqual(sorted(e.item.name for e in entries if e.owner is element), ['1', '2'])
+
+        distance, entry = index.nearest(2.5, 3, layers = constants.LAYERS.VIAS)[0]
+        self.assertIs(entry.owner, self.board.signals['N$0'])
+        self.assertAlmostEqual(distance, 3 - 0.429)
+
+        # The wires of the signals overlap the SMDs which they connect
+        pairs = index.pairs(constants.LAYERS.TOP)
+        self.assertEqual(len([p for p in pairs if set(type(e.item) for e in p) == set((primitives.Wire, primitives.SMD))]), 3)
+
+    def test_reuse(self):
+        index = self.board.spatial_index()
+        self.assertIs(self.board.spatial_index(), index)
+
+        self.board.elements.pop('R3')
+        self.assertIsNot(self.board.spatial_index(), index)
+        self.assertEqual(len(self.board.spatial_index().entries(constants.LAYERS.BOTTOM)), 2)
+
+        # Changes to plain lists
+        index = self.board.spatial_index()
+        self.board.plain_items.append(primitives.Hole(10, 10, 1))
+        self.assertIsNot(self.board.spatial_index(), index)
+        self.assertEqual(len(self.board.spatial_index().entries(constants.LAYERS.HOLES)), 2)
+
+    def test_moved(self):
+        index = self.board.spatial_index()
+        self.assertEqual([e.owner.name for e in index.at_point(5, 0.8)], ['R1'])
+
+        # Moving an element (which is not detected unless the board is tracked)
+        self.board.elements['R1'].x = 20
+        references.changed(self.board)
+        index = self.board.spatial_index()
+        self.assertEqual(index.at_point(5, 0.8), [])
+        self.assertEqual([e.owner.name for e in index.at_point(20, 0.8)], ['R1'])
+
+        # Moving a via of a signal
+        via = self.board.signals['N$0'].items[3]
+        self.assertEqual([e.item for e in index.at_point(2.5, 0, constants.LAYERS.VIAS)], [via])
+
+        via.x = 30
+        references.changed(self.board)
+        index = self.board.spatial_index()
+        self.assertEqual(index.at_point(2.5, 0, constants.LAYERS.VIAS), [])
+        self.assertEqual([e.item for e in index.at_point(30, 0, constants.LAYERS.VIAS)], [via])
+
+    def test_tracked(self):
+        # The changes to a tracked board are detected
+        with tracking.Tracker(self.board):
+            index = self.board.spatial_index()
+            self.board.elements['R1'].x = 20
+            self.assertIsNot(self.board.spatial_index(), index)
+            self.assertEqual([e.owner.name for e in self.board.spatial_index().at_point(20, 0.8)], ['R1'])
+
+            via = self.board.signals['N$0'].items[3]
+            via.x = 30
+            self.assertEqual([e.item for e in self.board.spatial_index().at_point(30, 0, constants.LAYERS.VIAS)], [via])
+
+if __name__ == '__main__':
+    unittest.main()
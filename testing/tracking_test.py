@@ -0,0 +1,204 @@
+"""
+
+Unit testing for change tracking in ``tracking``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_schematic
+from eaglepy import eagle, key_list, primitives, tracking
+import copy
+import gc
+import pickle
+import unittest
+import weakref
+
+KEY_LIST_APPEND = key_list.Key_List.__dict__['append']
+
+class TestTracking(unittest.TestCase):
+
+    def setUp(self):
+        self.e = eagle.Eagle.loads(make_eagle(make_board()).dumps(), track_changes = True)
+        self.board = self.e.drawing.document
+        self.events = []
+        self.e.tracker.subscribe(lambda event, obj, detail: self.events.append((event, obj, detail)))
+
+    def tearDown(self):
+        self.e.tracker.close()
+
+    def test_modified(self):
+        element = self.board.elements['R1']
+        element.value = '4k7'
+        element.value = '10k'
+
+        self.assertEqual(self.events, [(tracking.MODIFIED, element, 'value')] * 2)
+        self.assertEqual(self.e.tracker.modified(), [element])
+        self.assertTrue(self.e.tracker.is_modified(element))
+        self.assertFalse(self.e.tracker.is_modified(self.board.elements['R2']))
+
+        # Objects within a record are tracked too
+        smd = self.board.libraries['lib'].packages['R0603'].items[0]
+        smd.dx = 2.0
+        self.assertEqual(self.events[-1], (tracking.MODIFIED, smd, 'dx'))
+
+        self.assertEqual(self.e.tracker.checkpoint(), [element, smd])
+        self.assertEqual(self.e.tracker.modified(), [])
+
+    def test_containers(self):
+        items = self.board.signals['N$0'].items
+        self.assertTrue(isinstance(items, tracking.Tracked_List))
+
+        wire = items.pop(2)
+        items.append(wire)
+        items[0:1] = []
+        del items[-1]
+        items.reverse()
+
+        self.assertEqual([e[0] for e in self.events],
+                         [tracking.REMOVED, tracking.ADDED, tracking.REMOVED, tracking.REMOVED, tracking.REORDERED])
+        self.assertTrue(all(e[1] is items for e in self.events))
+        self.assertEqual(self.events[0][2], wire)
+
+        elements = self.board.elements
+        element = elements.pop('R0')
+        elements.append(element)
+        elements.remove(element)
+
+        self.assertEqual(self.events[-3:], [(tracking.REMOVED, elements, element),
+                                            (tracking.ADDED, elements, element),
+                                            (tracking.REMOVED, elements, element)])
+
+        # Replacing an item with the same name removes the original item
+        replacement = copy.copy(self.board.elements['R1'])
+        elements.append(replacement)
+        self.assertEqual(self.events[-2][2].name, 'R1')
+        self.assertIsNot(self.events[-2][2], replacement)
+        self.assertIs(self.events[-1][2], replacement)
+
+        elements.insert_at(0, element)
+        elements.move('R0', 2)
+        self.assertEqual(self.events[-2:], [(tracking.ADDED, elements, element),
+                                            (tracking.REORDERED, elements, None)])
+
+    def test_new_objects(self):
+        signal = eagle.Signal('N$9')
+        signal.items.append(primitives.Via(1, 1, 0.3))
+        self.assertEqual(self.events, [])
+
+        self.board.signals.append(signal)
+        self.assertTrue(self.e.tracker.is_tracked(signal))
+        self.assertIs(self.e.tracker.parent(signal), self.board.signals)
+
+        signal.items[0].drill = 0.4
+        self.assertEqual(self.events[-1], (tracking.MODIFIED, signal.items[0], 'drill'))
+
+        # Assigned lists are tracked
+        signal.items = [primitives.Via(2, 2, 0.3)]
+        self.assertTrue(isinstance(signal.items, tracking.Tracked_List))
+
+        signal.items.append(primitives.Via(3, 3, 0.3))
+        self.assertEqual(self.events[-1][:2], (tracking.ADDED, signal.items))
+
+    def test_parents(self):
+        lib = self.board.libraries['lib']
+        package = lib.packages['R0603']
+        tracker = self.e.tracker
+
+        self.assertIs(tracker.parent(package.items[0]), package.items)
+        self.assertIs(tracker.parent(package.items), package)
+        self.assertIs(tracker.parent(package), lib.packages)
+
+        # Referenced objects belong to the object which contains them
+        self.assertIs(tracker.parent(package), tracker.parent(self.board.elements['R0'].package))
+        self.assertIs(tracker.parent(self.board.elements), self.board)
+
+    def test_untracked(self):
+        # Other documents are not tracked
+        other = make_board()
+        other.elements['R0'].value = '1k'
+        other.elements.pop('R1')
+
+        # Transient attributes are not tracked
+        self.e.source = None
+
+        self.assertEqual(self.events, [])
+
+    def test_root(self):
+        board = make_board()
+        events = []
+
+        with tracking.Tracker(board) as tracker:
+            tracker.subscribe(lambda event, obj, detail: events.append((event, obj, detail)))
+
+            # The root is tracked, but only referenced weakly
+            board.elements['R0'].value = '1M'
+            board.description = 'Board'
+            self.assertEqual(events, [(tracking.MODIFIED, board.elements['R0'], 'value'),
+                                      (tracking.MODIFIED, board, 'description')])
+            self.assertTrue(tracker.is_tracked(board))
+            self.assertIs(tracker.root, board)
+            self.assertIs(tracker.parent(board.elements), board)
+            self.assertIs(tracker.parent(board.elements['R0']), board.elements)
+
+            # Objects which are assigned to the root are contained by it
+            board.plain_items = [primitives.Hole(0, 0, 1)]
+            self.assertIs(tracker.parent(board.plain_items), board)
+
+        self.assertFalse(tracker.is_open())
+
+    def test_collected(self):
+        # A document whose tracker was not closed is collected, and its tracker is closed
+        e = eagle.Eagle.loads(make_eagle(make_board()).dumps(), track_changes = True, keep_source = True)
+        tracker = e.tracker
+        document = weakref.ref(e.drawing.document)
+
+        del e
+        gc.collect()
+        self.assertIs(document(), None)
+        self.assertFalse(tracker.is_open())
+        self.assertEqual(tracker.objects, {})
+
+    def test_lazy(self):
+        # (The packages of the elements are parsed when the file is loaded)
+        board = make_board()
+        board.libraries['lib'].packages.append(eagle.Package('R0402', items = [primitives.SMD('1', -0.5, 0, 0.5, 0.5, 1)]))
+        e = eagle.Eagle.loads(make_eagle(board).dumps(), lazy_libraries = True)
+        packages = e.drawing.document.libraries['lib'].packages
+        tracker = tracking.Tracker(e)
+
+        try:
+            # Tracking doesn't parse the items of lazy lists; they are tracked when they are parsed
+            self.assertFalse(packages.is_parsed('R0402'))
+
+            package = packages['R0402']
+            self.assertTrue(tracker.is_tracked(package))
+            self.assertIs(tracker.parent(package), packages)
+            self.assertEqual(tracker.modified(), [])
+
+            package.items[0].dx = 2.0
+            self.assertEqual(tracker.modified(), [package.items[0]])
+        finally:
+            tracker.close()
+
+    def test_close(self):
+        e = eagle.Eagle.loads(make_eagle(make_schematic()).dumps(), track_changes = True)
+        e.tracker.close()
+
+        e.drawing.document.parts['R0'].value = '1M'
+        self.assertEqual(e.tracker.modified(), [])
+
+        # The classes are restored once every tracker has been closed
+        self.assertTrue(primitives.Wire.__dict__.has_key('__setattr__'))
+        self.e.tracker.close()
+        self.assertFalse(primitives.Wire.__dict__.has_key('__setattr__'))
+        self.assertEqual(tracking._wrapped_methods, [])
+        self.assertIs(key_list.Key_List.__dict__['append'], KEY_LIST_APPEND)
+
+    def test_pickle(self):
+        items = pickle.loads(pickle.dumps(self.board.signals['N$0'].items, pickle.HIGHEST_PROTOCOL))
+        self.assertIs(type(items), list)
+
+        copied = pickle.loads(pickle.dumps(self.e.drawing, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(len(copied.document.signals['N$0'].items), 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+
+Unit testing for the traversal of documents in ``walker``.
+
+"""
+
+from eagle_test import make_board, make_eagle, make_schematic
+from eaglepy import eagle, primitives, walker
+import unittest
+
+class Recorder(walker.Visitor):
+
+    def __init__(self):
+        self.visited = []
+
+    def visit_Wire(self, wire, path):
+        self.visited.append((wire, [p.__class__ for p in path]))
+
+class Counter(walker.Visitor):
+
+    def __init__(self, prune = None):
+        self.counts = {}
+        self.prune = prune
+
+    def handler(self, cls):
+        # Count every class (most classes are old-style, so there is no common base class to handle)
+        name = cls.__name__
+
+        def count(obj, path):
+            self.counts[name] = self.counts.get(name, 0) + 1
+
+            if name == self.prune:
+                return walker.PRUNE
+
+        return count
+
+class TestWalker(unittest.TestCase):
+
+    def setUp(self):
+        self.board = make_board(3)
+        self.e = make_eagle(self.board)
+
+    def test_board(self):
+        counter = Counter()
+        self.e.walk(counter)
+
+        counts = counter.counts
+        self.assertEqual(counts['Eagle'], 1)
+        self.assertEqual(counts['Board'], 1)
+        self.assertEqual(counts['Element'], 3)
+        self.assertEqual(counts['Signal'], 2)
+        self.assertEqual(counts['Via'], 2)
+        self.assertEqual(counts['Contact_Ref'], 4)
+        self.assertEqual(counts['SMD'], 2)
+        self.assertEqual(counts['Pin'], 2)
+        self.assertEqual(counts['Param'], 2)
+
+        # 1 plain, 1 in the package, 1 in each signal
+        self.assertEqual(counts['Wire'], 4)
+
+    def test_path(self):
+        recorder = Recorder()
+        walker.walk(self.board, recorder)
+
+        self.assertEqual([w for w, _ in recorder.visited][0], self.board.plain_items[0])
+        self.assertEqual(recorder.visited[0][1], [eagle.Board])
+        self.assertEqual(recorder.visited[1][1], [eagle.Board, eagle.Library, eagle.Package])
+        self.assertEqual(recorder.visited[2][1], [eagle.Board, eagle.Signal])
+
+    def test_subclass(self):
+        # The handler of a base class is used for subclasses
+        class Via_Counter(walker.Visitor):
+            count = 0
+
+            def visit_Via(self, via, path):
+                Via_Counter.count += 1
+
+        class Via(primitives.Via):
+            pass
+
+        self.board.signals['N$0'].items.append(Via(0, 0, 0.35))
+        walker.walk(self.board.signals['N$0'], Via_Counter())
+        self.assertEqual(Via_Counter.count, 2)
+
+    def test_prune(self):
+        counter = Counter('Library')
+        self.e.walk(counter)
+
+        self.assertEqual(counter.counts['Library'], 1)
+        self.assertFalse('Package' in counter.counts)
+        self.assertFalse('Pin' in counter.counts)
+        self.assertEqual(counter.counts['Wire'], 3)
+
+    def test_fused(self):
+        # A visitor which prunes a subtree doesn't affect the others
+        pruned = Counter('Signal')
+        full = Counter()
+        recorder = Recorder()
+        self.e.walk(pruned, full, recorder)
+
+        self.assertEqual(full.counts, self.count(Counter()))
+        self.assertEqual(full.counts['Via'], 2)
+        self.assertFalse('Via' in pruned.counts)
+        self.assertEqual(pruned.counts['Signal'], 2)
+        self.assertEqual(len(recorder.visited), 4)
+
+    def count(self, visitor):
+        self.e.walk(visitor)
+        return visitor.counts
+
+    def test_schematic(self):
+        e = make_eagle(make_schematic(3))
+        counter = Counter()
+        e.drawing.walk(counter)
+
+        counts = counter.counts
+        self.assertFalse('Eagle' in counts)
+        self.assertEqual(counts['Part'], 3)
+        self.assertEqual(counts['Instance'], 3)
+        self.assertEqual(counts['Net'], 2)
+        self.assertEqual(counts['Pin_Ref'], 4)
+        self.assertEqual(counts['Wire'], 3)
+
+if __name__ == '__main__':
+    unittest.main()